@@ -105,6 +105,10 @@ class BaseCompressionAlgorithm(ABC):
     5. Version generation capabilities
     """
     
+    # True when compress() accepts any buffer-protocol object (e.g. memoryview
+    # slices of an mmap) rather than only bytes; enables zero-copy streaming
+    accepts_buffers: bool = False
+    
     def __init__(self, version: str, design_pattern: DesignPattern):
         """
         Initialize base compression algorithm.
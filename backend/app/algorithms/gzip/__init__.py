@@ -31,13 +31,15 @@ from .versions.v2_strategy import GzipStrategy
 from .versions.v3_decorator import GzipDecorator
 from .versions.v4_adaptive import GzipAdaptive
 from .versions.v5_metarecursive import GzipMetaRecursive
+from .versions.v6_stream import GzipStream
 
 __all__ = [
     'GzipBasic',
     'GzipStrategy',
     'GzipDecorator',
     'GzipAdaptive',
-    'GzipMetaRecursive'
+    'GzipMetaRecursive',
+    'GzipStream'
 ]
 
 # Algorithm family metadata
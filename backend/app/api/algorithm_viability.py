@@ -11,14 +11,11 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from datetime import datetime
 import asyncio
-import time
 
-from app.core.compression_engine import CompressionEngine
-from app.models.compression import (
-    CompressionAlgorithm,
-    CompressionRequest,
-    CompressionParameters
-)
+from app.config import settings
+from app.core.compression_engine import CompressionEngine, get_compression_engine
+from app.services.content_analysis import ContentAnalysisService
+from app.models.compression import CompressionAlgorithm
 
 router = APIRouter(prefix="/algorithm-viability", tags=["Algorithm Viability"])
 
@@ -34,6 +31,11 @@ class ViabilityTestRequest(BaseModel):
         default=False,
         description="Include experimental algorithms in testing"
     )
+    time_budget_ms: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Per-algorithm time budget in milliseconds (defaults to server setting)"
+    )
 
 
 class AlgorithmPerformanceResult(BaseModel):
@@ -70,6 +72,10 @@ class ViabilityAnalysisResponse(BaseModel):
     # Overall recommendation
     recommended_algorithm: str
     recommendation_reasoning: List[str]
+    
+    # Shared content analysis and algorithms cut off by the time budget
+    content_analysis: Optional[Dict[str, Any]] = None
+    timed_out_algorithms: List[str] = Field(default_factory=list)
 
 
 class AlgorithmCapabilities(BaseModel):
@@ -88,13 +94,16 @@ class AlgorithmCapabilities(BaseModel):
 @router.post("/test", response_model=ViabilityAnalysisResponse)
 async def test_algorithm_viability(
     request: ViabilityTestRequest,
-    compression_engine: CompressionEngine = Depends()
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
 ) -> ViabilityAnalysisResponse:
     """
     Test multiple compression algorithms and analyze their viability.
     
     This endpoint compresses the provided content using multiple algorithms
     and returns a comprehensive analysis of their performance and viability.
+    Content is analyzed once and the algorithms run concurrently; algorithms
+    exceeding the time budget are reported as failed and listed in
+    `timed_out_algorithms`.
     """
     
     # Determine which algorithms to test
@@ -122,107 +131,99 @@ async def test_algorithm_viability(
                 CompressionAlgorithm.TOPOLOGICAL,
             ])
     
-    # Test each algorithm
+    # Analyze once, then test every algorithm concurrently
+    data = request.content.encode('utf-8')
+    original_size = len(data)
+    time_budget = (
+        request.time_budget_ms / 1000.0 if request.time_budget_ms
+        else settings.compression.comparison_time_budget
+    )
+    
+    content_analysis = await ContentAnalysisService().analyze_content(
+        request.content, {"include_quality": False, "include_predictions": False}
+    ) if request.content else {}
+    engine_results = await compression_engine.compare(
+        data,
+        [algorithm.value for algorithm in algorithms_to_test],
+        level=6,
+        time_budget=time_budget
+    )
+    
     results = []
-    original_size = len(request.content.encode('utf-8'))
+    timed_out_algorithms = []
     
     for algorithm in algorithms_to_test:
-        try:
-            # Create compression request
-            compression_request = CompressionRequest(
-                content=request.content,
-                parameters=CompressionParameters(
-                    algorithm=algorithm,
-                    level=6
-                )
+        engine_result = engine_results[algorithm.value]
+        compression_time = engine_result.compression_time
+        
+        if engine_result.success:
+            # Calculate metrics
+            compression_ratio = engine_result.compression_ratio
+            compression_percentage = engine_result.space_saved_percent
+            compressed_size = engine_result.compressed_size
+            
+            # Calculate throughput (MB/s)
+            throughput_mbps = (original_size / compression_time) / (1024 * 1024) if compression_time > 0 else 0
+            
+            # Calculate quality score (0-1)
+            quality_score = min(compression_ratio / 10.0, 1.0)
+            
+            # Calculate efficiency score (ratio per millisecond)
+            efficiency_score = compression_ratio / max(compression_time * 1000, 0.001)
+            
+            # Determine viability rating
+            viability_rating = _calculate_viability_rating(
+                compression_ratio,
+                compression_time,
+                original_size
             )
             
-            # Perform compression
-            start_time = time.time()
-            response = await compression_engine.compress(compression_request)
-            compression_time = time.time() - start_time
+            # Generate recommendation
+            recommendation = _generate_algorithm_recommendation(
+                algorithm.value,
+                compression_ratio,
+                compression_time,
+                original_size
+            )
             
-            if response.success and response.result:
-                # Calculate metrics
-                compression_ratio = response.result.compression_ratio
-                compression_percentage = response.result.compression_percentage
-                compressed_size = response.result.compressed_size
-                
-                # Calculate throughput (MB/s)
-                throughput_mbps = (original_size / compression_time) / (1024 * 1024) if compression_time > 0 else 0
-                
-                # Calculate quality score (0-1)
-                quality_score = min(compression_ratio / 10.0, 1.0)
-                
-                # Calculate efficiency score (ratio per millisecond)
-                efficiency_score = compression_ratio / max(compression_time * 1000, 0.001)
-                
-                # Determine viability rating
-                viability_rating = _calculate_viability_rating(
-                    compression_ratio,
-                    compression_time,
-                    original_size
-                )
-                
-                # Generate recommendation
-                recommendation = _generate_algorithm_recommendation(
-                    algorithm.value,
-                    compression_ratio,
-                    compression_time,
-                    original_size
-                )
-                
-                result = AlgorithmPerformanceResult(
-                    algorithm=algorithm.value,
-                    success=True,
-                    compression_ratio=round(compression_ratio, 2),
-                    compression_percentage=round(compression_percentage, 2),
-                    compression_time_ms=round(compression_time * 1000, 2),
-                    throughput_mbps=round(throughput_mbps, 2),
-                    original_size=original_size,
-                    compressed_size=compressed_size,
-                    quality_score=round(quality_score, 3),
-                    efficiency_score=round(efficiency_score, 3),
-                    viability_rating=viability_rating,
-                    recommendation=recommendation
-                )
+            result = AlgorithmPerformanceResult(
+                algorithm=algorithm.value,
+                success=True,
+                compression_ratio=round(compression_ratio, 2),
+                compression_percentage=round(compression_percentage, 2),
+                compression_time_ms=round(compression_time * 1000, 2),
+                throughput_mbps=round(throughput_mbps, 2),
+                original_size=original_size,
+                compressed_size=compressed_size,
+                quality_score=round(quality_score, 3),
+                efficiency_score=round(efficiency_score, 3),
+                viability_rating=viability_rating,
+                recommendation=recommendation
+            )
+        else:
+            if engine_result.timed_out:
+                timed_out_algorithms.append(algorithm.value)
+                recommendation = f"Exceeded time budget of {time_budget * 1000:.0f}ms"
             else:
-                # Failed compression
-                result = AlgorithmPerformanceResult(
-                    algorithm=algorithm.value,
-                    success=False,
-                    compression_ratio=1.0,
-                    compression_percentage=0.0,
-                    compression_time_ms=round(compression_time * 1000, 2),
-                    throughput_mbps=0.0,
-                    original_size=original_size,
-                    compressed_size=original_size,
-                    quality_score=0.0,
-                    efficiency_score=0.0,
-                    viability_rating="poor",
-                    recommendation="Algorithm failed to compress this content"
-                )
+                recommendation = f"Algorithm failed to compress this content: {engine_result.error}"
             
-            results.append(result)
-            
-        except Exception as e:
-            print(f"Error testing {algorithm.value}: {e}")
-            # Add failed result
+            # Failed compression
             result = AlgorithmPerformanceResult(
                 algorithm=algorithm.value,
                 success=False,
                 compression_ratio=1.0,
                 compression_percentage=0.0,
-                compression_time_ms=0.0,
+                compression_time_ms=round(compression_time * 1000, 2),
                 throughput_mbps=0.0,
                 original_size=original_size,
                 compressed_size=original_size,
                 quality_score=0.0,
                 efficiency_score=0.0,
                 viability_rating="poor",
-                recommendation=f"Error during compression: {str(e)}"
+                recommendation=recommendation
             )
-            results.append(result)
+        
+        results.append(result)
     
     # Calculate best performers
     successful_results = [r for r in results if r.success]
@@ -253,7 +254,12 @@ async def test_algorithm_viability(
         best_speed=best_speed,
         best_balanced=best_balanced,
         recommended_algorithm=recommended_algorithm,
-        recommendation_reasoning=reasoning
+        recommendation_reasoning=reasoning,
+        content_analysis={
+            key: content_analysis.get(key)
+            for key in ("content_type", "entropy", "redundancy", "compressibility", "patterns")
+        },
+        timed_out_algorithms=timed_out_algorithms
     )
 
 
@@ -5,11 +5,21 @@ This module provides endpoints for compression operations, algorithm management,
 and compression analysis with comprehensive examples and documentation.
 """
 
+import json
+from dataclasses import asdict
 from typing import Dict, List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.core.compression_engine import CompressionEngine
+from app.config import settings
+
+from app.core.compression_engine import CompressionEngine, get_compression_engine
+from app.core.compression_executor import (
+    FAST_LANE, HEAVY_LANE, CompressionQueueFullError, get_compression_executor
+)
+from app.core.zstd_dictionaries import get_dictionary_registry
+from app.core.codec_cost_model import ServiceLevel, get_codec_cost_model
+from app.core.algorithms.streaming import get_streaming_compressor
 from app.services.content_analysis import ContentAnalysisService
 from app.services.algorithm_recommender import AlgorithmRecommender
 from app.models.compression import (
@@ -25,7 +35,7 @@ router = APIRouter()
 @router.post("/compress", summary="Compress Content")
 async def compress_content(
     request: CompressionRequest,
-    compression_engine: CompressionEngine = Depends()
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
 ) -> CompressionResponse:
     """
     Compress content using dynamic algorithm selection and optimization.
@@ -69,7 +79,7 @@ async def compress_content(
     ```
     """
     try:
-        response = await compression_engine.compress(request)
+        response = await compression_engine.compress_request(request)
         
         # Create a completely custom response to bypass model serialization issues
         # Force include compressed_content field
@@ -120,6 +130,8 @@ async def compress_content(
         }
         
         return JSONResponse(content=custom_response)
+    except CompressionQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -130,13 +142,16 @@ async def compress_content(
 @router.post("/compress/batch", summary="Batch Compression", response_model=BatchCompressionResponse)
 async def batch_compress(
     request: BatchCompressionRequest,
-    compression_engine: CompressionEngine = Depends()
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
 ) -> BatchCompressionResponse:
     """
     Compress multiple content items in batch.
     
-    This endpoint allows processing multiple compression requests efficiently,
-    with optional parallel processing for improved performance.
+    This endpoint allows processing multiple compression requests efficiently.
+    When `parallel` is true, up to `max_workers` requests compress concurrently
+    on the compression executor; identical items (same algorithm, level and
+    content) are compressed once. Use `/compress/batch/stream` to receive
+    results as they complete.
     
     **Example Request:**
     ```json
@@ -163,46 +178,179 @@ async def batch_compress(
     ```
     """
     try:
-        results = []
+        results: List[Optional[CompressionResponse]] = [None] * len(request.requests)
+        
+        async for index, response in compression_engine.iter_batch(
+            request.requests,
+            max_concurrency=_batch_concurrency(request)
+        ):
+            results[index] = response
+        
+        return _build_batch_response(request, results)
+    except CompressionQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch compression failed: {str(e)}"
+        )
+
+
+@router.post("/compress/batch/stream", summary="Streaming Batch Compression")
+async def batch_compress_stream(
+    request: BatchCompressionRequest,
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
+) -> StreamingResponse:
+    """
+    Compress multiple content items, streaming each result as it completes.
+    
+    Accepts the same body as `/compress/batch` and responds with
+    newline-delimited JSON (`application/x-ndjson`). Each line carries the
+    index of the request it answers; results arrive in completion order.
+    Identical items are compressed once and marked with `duplicate_of`.
+    The final line is a summary.
+    
+    **Example Response:**
+    ```
+    {"type": "result", "index": 1, "response": {"success": true, ...}}
+    {"type": "result", "index": 0, "response": {"success": true, ...}}
+    {"type": "summary", "batch_id": "batch_001", "total_requests": 2, "successful": 2, "failed": 0}
+    ```
+    """
+    async def generate():
         successful = 0
         failed = 0
-        
-        for compression_request in request.requests:
-            try:
-                response = await compression_engine.compress(compression_request)
-                results.append(response)
+        try:
+            async for index, response in compression_engine.iter_batch(
+                request.requests,
+                max_concurrency=_batch_concurrency(request)
+            ):
                 if response.success:
                     successful += 1
                 else:
                     failed += 1
-            except Exception as e:
-                failed += 1
-                results.append(CompressionResponse(
-                    success=False,
-                    message=f"Compression failed: {str(e)}",
-                    error=str(e)
-                ))
+                yield json.dumps({
+                    "type": "result",
+                    "index": index,
+                    "response": response.model_dump(mode="json")
+                }) + "\n"
+        except CompressionQueueFullError as e:
+            yield json.dumps({"type": "error", "error": str(e), "error_code": "QUEUE_FULL"}) + "\n"
         
-        return BatchCompressionResponse(
-            batch_id=request.batch_id or "batch_001",
-            total_requests=len(request.requests),
-            successful=successful,
-            failed=failed,
-            results=results,
-            summary={
-                "average_compression_ratio": sum(
-                    r.result.compression_ratio for r in results if r.success and r.result
-                ) / successful if successful > 0 else 0,
-                "average_processing_time": sum(
-                    r.processing_time for r in results if r.processing_time
-                ) / len(results) if results else 0
-            }
-        )
+        yield json.dumps({
+            "type": "summary",
+            "batch_id": request.batch_id or "batch_001",
+            "total_requests": len(request.requests),
+            "successful": successful,
+            "failed": failed
+        }) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+STREAM_MEDIA_TYPES = {
+    CompressionAlgorithm.GZIP: "application/gzip",
+    CompressionAlgorithm.BZIP2: "application/x-bzip2",
+    CompressionAlgorithm.LZ4: "application/x-lz4",
+    CompressionAlgorithm.LZMA: "application/x-xz",
+    CompressionAlgorithm.ZSTD: "application/zstd",
+}
+
+
+@router.post("/compress/stream", summary="Streaming Compression")
+async def compress_stream(
+    request: Request,
+    algorithm: CompressionAlgorithm = Query(CompressionAlgorithm.GZIP, description="Streaming codec"),
+    level: CompressionLevel = Query(CompressionLevel.BALANCED, description="Compression level")
+) -> StreamingResponse:
+    """
+    Compress the raw request body on the fly.
+    
+    The upload is compressed chunk by chunk as it arrives and the compressed
+    stream is sent back while the upload is still in progress, so neither
+    side is held in memory. Codec calls run on the compression executor and
+    a slow client throttles how fast the upload is read.
+    
+    Supported algorithms: gzip, bzip2, lz4, lzma (xz), zstd.
+    
+    **Example:**
+    ```
+    curl -T access.log -H "Content-Type: application/octet-stream" \
+         "http://localhost:8000/api/v1/compression/compress/stream?algorithm=zstd" > access.log.zst
+    ```
+    """
+    try:
+        compressor = get_streaming_compressor(algorithm)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    chunks = compressor.compress_stream(request.stream(), level)
+    
+    # Pull the first chunk before responding so that admission control
+    # (429) and codec errors still produce a proper status code
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except CompressionQueueFullError:
+        raise
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Batch compression failed: {str(e)}"
+        raise HTTPException(status_code=500, detail=f"Streaming compression failed: {str(e)}")
+    
+    async def generate():
+        if first:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+    
+    return StreamingResponse(
+        generate(),
+        media_type=STREAM_MEDIA_TYPES[algorithm],
+        headers={"X-Compression-Algorithm": algorithm.value, "X-Compression-Level": level.value}
+    )
+
+
+def _batch_concurrency(request: BatchCompressionRequest) -> int:
+    """Concurrency limit honouring the request's parallel/max_workers fields."""
+    if not request.parallel:
+        return 1
+    return max(1, request.max_workers or settings.compression.max_workers)
+
+
+def _build_batch_response(
+    request: BatchCompressionRequest,
+    results: List[Optional[CompressionResponse]]
+) -> BatchCompressionResponse:
+    """Assemble a batch response from per-request results in request order."""
+    results = [
+        r if r is not None else CompressionResponse(
+            success=False,
+            message="Compression failed: no result produced",
+            error="no result produced"
         )
+        for r in results
+    ]
+    successful = sum(1 for r in results if r.success)
+    failed = len(results) - successful
+    
+    return BatchCompressionResponse(
+        batch_id=request.batch_id or "batch_001",
+        total_requests=len(request.requests),
+        successful=successful,
+        failed=failed,
+        results=results,
+        summary={
+            "average_compression_ratio": sum(
+                r.result.compression_ratio for r in results if r.success and r.result
+            ) / successful if successful > 0 else 0,
+            "average_processing_time": sum(
+                r.processing_time for r in results if r.processing_time
+            ) / len(results) if results else 0,
+            "unique_requests": len(results) - sum(
+                1 for r in results if r.metadata and "duplicate_of" in r.metadata
+            )
+        }
+    )
 
 
 @router.post("/compare", summary="Compare Algorithms", response_model=CompressionComparison)
@@ -212,13 +360,21 @@ async def compare_algorithms(
         default=[CompressionAlgorithm.GZIP, CompressionAlgorithm.LZMA, CompressionAlgorithm.ZSTD],
         description="List of algorithms to compare"
     ),
-    compression_engine: CompressionEngine = Depends()
+    time_budget_ms: Optional[float] = Query(
+        default=None,
+        gt=0,
+        description="Per-algorithm time budget in milliseconds (defaults to server setting)"
+    ),
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
 ) -> CompressionComparison:
     """
     Compare multiple compression algorithms on the same content.
     
     This endpoint compresses the same content using different algorithms
-    and provides a detailed comparison of their performance.
+    and provides a detailed comparison of their performance. Content is
+    analyzed once and the algorithms run concurrently; any algorithm that
+    exceeds `time_budget_ms` is left out of `results` and listed under
+    `comparison_metrics.timed_out`.
     
     **Example Request:**
     ```
@@ -265,49 +421,77 @@ async def compare_algorithms(
     ```
     """
     try:
+        parameters = {
+            algorithm: CompressionParameters(algorithm=algorithm, level=CompressionLevel.BALANCED)
+            for algorithm in algorithms
+        }
+        time_budget = (
+            time_budget_ms / 1000.0 if time_budget_ms
+            else settings.compression.comparison_time_budget
+        )
+        
+        # Analyze once for all algorithms, then run the codecs concurrently
+        content_analysis = await ContentAnalysisService().analyze_content(
+            content, {"include_quality": False, "include_predictions": False}
+        ) if content else {}
+        engine_results = await compression_engine.compare(
+            content.encode('utf-8'),
+            [algorithm.value for algorithm in parameters],
+            level=CompressionLevel.BALANCED,
+            time_budget=time_budget
+        )
+        
+        compared = []
         results = []
+        timed_out = []
+        failed = {}
+        for algorithm, params in parameters.items():
+            engine_result = engine_results[algorithm.value]
+            if engine_result.success:
+                compared.append(algorithm)
+                results.append(compression_engine.build_result_model(engine_result, params))
+            elif engine_result.timed_out:
+                timed_out.append(algorithm.value)
+            else:
+                failed[algorithm.value] = engine_result.error
         
-        for algorithm in algorithms:
-            # Create compression request for this algorithm
-            request = CompressionRequest(
-                content=content,
-                parameters=CompressionParameters(
-                    algorithm=algorithm,
-                    level=CompressionLevel.BALANCED
-                )
+        if not results:
+            raise HTTPException(
+                status_code=422,
+                detail={"message": "No algorithm completed", "timed_out": timed_out, "failed": failed}
             )
-            
-            # Execute compression
-            response = await compression_engine.compress(request)
-            
-            if response.success and response.result:
-                results.append(response.result)
         
         # Find winner based on compression ratio
-        winner = None
-        best_ratio = 0
-        
-        for result in results:
-            if result.compression_ratio > best_ratio:
-                best_ratio = result.compression_ratio
-                winner = result.algorithm_used
+        winner = max(results, key=lambda r: r.compression_ratio).algorithm_used
+        quality_scores = [r.quality_score for r in results if r.quality_score]
         
         # Calculate comparison metrics
         comparison_metrics = {
             "best_compression_ratio": max(r.compression_ratio for r in results),
             "fastest_compression": min(r.compression_time for r in results),
-            "best_quality_score": max(r.quality_score for r in results if r.quality_score),
+            "best_quality_score": max(quality_scores) if quality_scores else None,
             "average_compression_ratio": sum(r.compression_ratio for r in results) / len(results),
-            "average_compression_time": sum(r.compression_time for r in results) / len(results)
+            "average_compression_time": sum(r.compression_time for r in results) / len(results),
+            "time_budget": time_budget,
+            "timed_out": timed_out,
+            "failed": failed,
+            "content_analysis": {
+                key: content_analysis.get(key)
+                for key in ("content_type", "entropy", "redundancy", "compressibility", "patterns")
+            }
         }
         
         return CompressionComparison(
-            algorithms=algorithms,
+            algorithms=compared,
             results=results,
             winner=winner,
             comparison_metrics=comparison_metrics
         )
         
+    except CompressionQueueFullError:
+        raise
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -530,7 +714,7 @@ async def get_algorithms() -> Dict[str, Any]:
 @router.get("/analyze", summary="Analyze Content")
 async def analyze_content(
     content: str = Query(..., description="Content to analyze"),
-    compression_engine: CompressionEngine = Depends()
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
 ) -> Dict[str, Any]:
     """
     Analyze content characteristics for compression optimization.
@@ -656,7 +840,7 @@ async def analyze_content(
 @router.get("/parameters/{algorithm}", summary="Get Algorithm Parameters")
 async def get_algorithm_parameters(
     algorithm: CompressionAlgorithm,
-    compression_engine: CompressionEngine = Depends()
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
 ) -> Dict[str, Any]:
     """
     Get parameter information for a specific algorithm.
@@ -816,6 +1000,158 @@ async def get_algorithm_parameters(
         )
 
 
+@router.get("/engine/stats", summary="Get Compression Engine Statistics")
+async def get_engine_stats(
+    compression_engine: CompressionEngine = Depends(get_compression_engine)
+) -> Dict[str, Any]:
+    """
+    Get result cache and worker pool statistics for the shared engine.
+    
+    **Example Response:**
+    ```json
+    {
+        "cache": {
+            "cache_size": 42,
+            "cache_bytes": 183204,
+            "cache_hits": 310,
+            "cache_misses": 58,
+            "cache_evictions": 3,
+            "hit_rate": 0.84,
+            "total_operations": 368
+        },
+        "executor": {
+            "fast": {"workers": 4, "in_flight": 1, "queue_depth": 0, "rejected": 0},
+            "heavy": {"workers": 2, "in_flight": 2, "queue_depth": 5, "rejected": 1}
+        }
+    }
+    ```
+    """
+    return {
+        "cache": compression_engine.get_cache_stats(),
+        "executor": get_compression_executor().get_stats()
+    }
+
+
+@router.get("/dictionaries", summary="Get Zstandard Dictionaries")
+async def get_dictionaries() -> Dict[str, Any]:
+    """
+    List trained Zstandard dictionaries and sampling state per content category.
+    
+    A fraction of small zstd payloads is sampled per content category as
+    they are compressed; once a category has a trained dictionary, its payloads are
+    compressed with it automatically.
+    
+    **Example Response:**
+    ```json
+    {
+        "json": {
+            "active_version": 2,
+            "versions": [
+                {"version": 1, "dict_id": 470553669, "size": 112640, "sample_count": 512, ...},
+                {"version": 2, "dict_id": 1825431290, "size": 112640, "sample_count": 512, ...}
+            ],
+            "samples": 512,
+            "payloads_seen": 183204
+        }
+    }
+    ```
+    """
+    return get_dictionary_registry().get_stats()
+
+
+@router.post("/dictionaries/train", summary="Train Zstandard Dictionary")
+async def train_dictionary(
+    category: str = Query(..., description="Content category: json, markup or text"),
+    dict_size: int = Query(112640, ge=1024, le=1024 * 1024, description="Maximum dictionary size in bytes")
+) -> Dict[str, Any]:
+    """
+    Train a new dictionary version for a content category from its samples.
+    
+    The new version is stored on disk and becomes active immediately;
+    frames written with earlier versions remain decompressible.
+    
+    **Example Request:**
+    ```
+    POST /api/v1/compression/dictionaries/train?category=json
+    ```
+    """
+    registry = get_dictionary_registry()
+    executor = get_compression_executor()
+    # Training needs the samples held in this process, so never a process lane
+    lane = FAST_LANE if executor.lanes[HEAVY_LANE].use_processes else HEAVY_LANE
+    
+    try:
+        version = await executor.run(lane, registry.train, category, dict_size=dict_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CompressionQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dictionary training failed: {str(e)}")
+    
+    return {"success": True, "dictionary": asdict(version)}
+
+
+@router.get("/cost-model", summary="Get Codec Cost Model")
+async def get_cost_model() -> Dict[str, Any]:
+    """
+    Inspect the online codec cost model.
+
+    Every compression records its ratio and codec throughput per content
+    profile, size bucket (powers of 4 bytes), codec and level; estimates
+    decay with the configured half-life.
+
+    **Example Response:**
+    ```json
+    {
+        "half_life": 600.0,
+        "min_samples": 3,
+        "observations": 1842,
+        "compression": [
+            {"profile": "json/mid", "size_bucket": 7, "codec": "zstd", "level": 3,
+             "ratio": 6.1, "compress_mbps": 212.4, "samples": 310, "weight": 41.2, "age_seconds": 0.8}
+        ],
+        "decompression": [
+            {"codec": "zstd", "size_bucket": 7, "decompress_mbps": 905.3, "samples": 122, "age_seconds": 2.1}
+        ]
+    }
+    ```
+    """
+    return get_codec_cost_model().snapshot()
+
+
+@router.get("/cost-model/select", summary="Select Codec For Service Level")
+async def select_codec(
+    size: int = Query(..., ge=1, description="Payload size in bytes"),
+    profile: str = Query("*", description="Content profile, e.g. json/mid ('*' for any)"),
+    max_latency: Optional[float] = Query(None, gt=0, description="Maximum compression time in seconds"),
+    min_compress_mbps: Optional[float] = Query(None, gt=0, description="Minimum compression MB/s"),
+    min_decompress_mbps: Optional[float] = Query(None, gt=0, description="Minimum decompression MB/s"),
+    codecs: Optional[List[str]] = Query(None, description="Restrict to these codecs")
+) -> Dict[str, Any]:
+    """
+    Choose the codec and level with the best measured ratio that meets a service level.
+
+    If no measured option meets it, the fastest one is returned with
+    ``meets_service_level`` set to false; ``selection`` is null while the
+    model has no data for the payload.
+
+    **Example Request:**
+    ```
+    GET /api/v1/compression/cost-model/select?size=1048576&profile=json/mid&max_latency=0.01
+    ```
+    """
+    service_level = ServiceLevel(
+        max_latency=max_latency,
+        min_compress_mbps=min_compress_mbps,
+        min_decompress_mbps=min_decompress_mbps
+    )
+    return {
+        "selection": get_codec_cost_model().select(profile, size, service_level, codecs=codecs),
+        "service_level": asdict(service_level)
+    }
+
+
 @router.get("/test-new-endpoint", summary="Test New Endpoint")
 async def test_new_endpoint():
     """Test endpoint to verify backend changes are being applied."""
@@ -844,8 +1180,8 @@ async def debug_compression():
         )
         
         # Initialize engine and compress
-        engine = CompressionEngine()
-        response = await engine.compress(request)
+        engine = get_compression_engine()
+        response = await engine.compress_request(request)
         
         # Debug the response object
         debug_info = {
@@ -945,7 +1281,7 @@ async def decompress_content(
             # Use specific algorithm
             try:
                 algo_enum = CompressionAlgorithm(algorithm.lower())
-                engine = CompressionEngine()
+                engine = get_compression_engine()
                 decompressed_data = await engine.decompress(compressed_data, algo_enum)
 
                 # Validate the result
@@ -995,6 +1331,8 @@ async def decompress_content(
             "size": len(result.decompressed_data)
         }
 
+    except CompressionQueueFullError:
+        raise
     except HTTPException:
         raise
     except Exception as e:
@@ -1032,16 +1370,16 @@ async def test_compression():
         request = CompressionRequest(
             content=test_content,
             parameters=CompressionParameters(
-                algorithm=CompressionAlgorithm.CONTENT_AWARE,
+                algorithm=CompressionAlgorithm.GZIP,
                 level=6
             )
         )
 
         # Initialize engine and compress
-        engine = CompressionEngine()
+        engine = get_compression_engine()
         import time
         start_time = time.time()
-        response = await engine.compress(request)
+        response = await engine.compress_request(request)
         compression_time = time.time() - start_time
 
         if response.success:
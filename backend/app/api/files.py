@@ -16,6 +16,9 @@ from app.models.file import (
     FileSearchRequest, FileDeleteRequest, FileUpdateRequest
 )
 from app.config import settings
+from app.core.compression_executor import CompressionQueueFullError
+from app.core.upload_ingest import UploadTooLargeError, ingest_upload
+from app.algorithms.gzip.versions.v6_stream import GzipStream
 
 router = APIRouter()
 
@@ -24,7 +27,9 @@ router = APIRouter()
 async def upload_file(
     file: UploadFile = File(...),
     description: Optional[str] = Form(None),
-    tags: Optional[str] = Form(None)
+    tags: Optional[str] = Form(None),
+    compress: bool = Form(False),
+    compression_level: int = Form(6, ge=1, le=9)
 ) -> Dict[str, Any]:
     """
     Upload a file for compression processing.
@@ -32,6 +37,11 @@ async def upload_file(
     This endpoint accepts file uploads and stores them for later compression.
     Supports drag-and-drop and traditional file selection.
     
+    The upload is streamed to disk in fixed-size blocks; it is hashed and
+    content-profiled as it arrives and never held in memory as a whole.
+    With ``compress=true`` it is stored as a seekable chunk container
+    (plain gzip per chunk, no per-chunk analysis) instead of the raw bytes.
+    
     **Example Request:**
     ```
     POST /api/v1/files/upload
@@ -51,6 +61,10 @@ async def upload_file(
         "size": 1024,
         "content_type": "text/plain",
         "upload_time": "2024-01-01T12:00:00Z",
+        "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+        "stored_size": 1024,
+        "compressed": false,
+        "entropy": 4.2,
         "message": "File uploaded successfully"
     }
     ```
@@ -69,11 +83,18 @@ async def upload_file(
         # Create upload directory if it doesn't exist
         os.makedirs(settings.upload_dir, exist_ok=True)
         
-        # Save file
+        # Stream file to disk
         file_path = os.path.join(settings.upload_dir, f"{file_id}_{file.filename}")
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        if compress:
+            file_path += ".dcsk"
+        result = await ingest_upload(
+            file,
+            file_path,
+            algorithm=GzipStream(compression_level) if compress else None,
+            block_size=settings.compression.upload_block_size,
+            window_size=settings.compression.upload_window_size,
+            max_size=settings.compression.max_file_size
+        )
         
         # Parse tags
         tag_list = []
@@ -85,7 +106,7 @@ async def upload_file(
             id=file_id,
             filename=file.filename or "unknown",
             file_type="txt",  # Would detect from extension
-            size=len(content),
+            size=result.size,
             content_type=file.content_type,
             status="uploaded",
             upload_time=datetime.utcnow(),
@@ -101,10 +122,16 @@ async def upload_file(
             "size": file_info.size,
             "content_type": file_info.content_type,
             "upload_time": file_info.upload_time.isoformat(),
+            "sha256": result.sha256,
+            "stored_size": result.stored_size,
+            "compressed": result.compressed,
+            "entropy": result.profile.get("entropy"),
             "message": "File uploaded successfully"
         }
         
-    except HTTPException:
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (HTTPException, CompressionQueueFullError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -11,6 +11,7 @@ import psutil
 import asyncio
 
 from app.config import settings
+from app.core.system_sampler import get_system_sampler
 from app.database import check_db_connection
 
 router = APIRouter()
@@ -55,9 +56,10 @@ async def health_check() -> Dict[str, Any]:
     
     # Check system resources
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        snapshot = get_system_sampler().latest()
+        cpu_percent = snapshot.cpu_percent
+        memory = snapshot.memory
+        disk = snapshot.disk
         
         health_status["components"]["system"] = {
             "status": "healthy",
@@ -163,24 +165,24 @@ async def detailed_health_check() -> Dict[str, Any]:
     }
     
     try:
+        snapshot = get_system_sampler().latest()
+        memory = snapshot.memory
+        disk = snapshot.disk
+        
         # System information
         detailed_status["system_info"] = {
             "platform": psutil.sys.platform,
             "python_version": psutil.sys.version,
-            "cpu_count": psutil.cpu_count(),
+            "cpu_count": snapshot.cpu_count,
             "cpu_freq": psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None,
-            "memory_total": psutil.virtual_memory().total,
-            "disk_total": psutil.disk_usage('/').total
+            "memory_total": memory.total,
+            "disk_total": disk.total
         }
         
         # Performance metrics
-        cpu_percent = psutil.cpu_percent(interval=1, percpu=True)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
         detailed_status["performance_metrics"] = {
-            "cpu_usage_per_core": cpu_percent,
-            "cpu_usage_total": sum(cpu_percent) / len(cpu_percent),
+            "cpu_usage_per_core": list(snapshot.cpu_per_core),
+            "cpu_usage_total": snapshot.cpu_percent,
             "memory_usage_percent": memory.percent,
             "memory_available": memory.available,
             "memory_used": memory.used,
@@ -190,11 +192,14 @@ async def detailed_health_check() -> Dict[str, Any]:
         }
         
         # Resource usage
+        sample = snapshot.to_dict()
         detailed_status["resource_usage"] = {
-            "cpu_load": psutil.getloadavg() if hasattr(psutil, 'getloadavg') else None,
-            "memory_swap": psutil.swap_memory()._asdict(),
-            "disk_io": psutil.disk_io_counters()._asdict() if psutil.disk_io_counters() else None,
-            "network_io": psutil.net_io_counters()._asdict() if psutil.net_io_counters() else None
+            "cpu_load": sample["load_average"],
+            "memory_swap": sample["swap"],
+            "disk_io": sample["disk_io"],
+            "network_io": sample["net_io"],
+            "rates": sample["rates"],
+            "sampled_at": snapshot.timestamp
         }
         
         # Check thresholds and update status
@@ -262,29 +262,17 @@ async def get_metrics_history(
                 "statistics": {}
             }
         
-        # Calculate statistics
-        cpu_values = [m["cpu_usage"] for m in history]
-        memory_values = [m["memory_usage"] for m in history]
-        disk_values = [m["disk_usage"] for m in history]
-        
-        def calculate_stats(values):
-            if not values:
-                return {}
-            return {
-                "min": round(min(values), 2),
-                "max": round(max(values), 2),
-                "avg": round(sum(values) / len(values), 2),
-                "std": round((sum((x - sum(values)/len(values))**2 for x in values) / len(values))**0.5, 2)
-            }
+        # Whole-window statistics come from merged rollups, not bucket averages
+        statistics = await metrics_service.get_metrics_history_statistics(hours)
         
         return {
             "period_hours": hours,
             "data_points": len(history),
             "metrics": history,
             "statistics": {
-                "cpu_usage": calculate_stats(cpu_values),
-                "memory_usage": calculate_stats(memory_values),
-                "disk_usage": calculate_stats(disk_values)
+                field: statistics[field]
+                for field in ("cpu_usage", "memory_usage", "disk_usage")
+                if field in statistics
             }
         }
         
@@ -15,9 +15,20 @@ from app.models.metrics import (
     QualityMetrics, AlgorithmMetrics
 )
 from app.core.metrics_collector import MetricsCollector
+from app.core.timeseries_rollup import merge_buckets, pick_step
+from app.core.timeseries_store import from_millis, get_timeseries_store
 
 router = APIRouter()
 
+# Window covered by /trends for each time range, in seconds
+TREND_SPANS = {
+    TimeRange.HOUR: 3600,
+    TimeRange.DAY: 86400,
+    TimeRange.WEEK: 7 * 86400,
+    TimeRange.MONTH: 30 * 86400,
+    TimeRange.YEAR: 365 * 86400
+}
+
 # Global metrics collector instance
 _metrics_collector = None
 
@@ -273,8 +284,8 @@ async def aggregate_metrics(
                 time_range=request.time_range,
                 start_time=request.start_time,
                 end_time=request.end_time,
-                algorithm_filter=request.algorithms[0] if request.algorithms else None,
-                content_type_filter=request.content_types[0] if request.content_types else None
+                algorithm_filter=request.algorithms or None,
+                content_type_filter=request.content_types or None
             )
             aggregations[str(metric_type)] = aggregation.dict()
         
@@ -450,49 +461,60 @@ async def get_metrics_trends(
     ```
     """
     try:
-        # In a real implementation, this would query time-series data
-        # For now, generate mock trend data
-        trends = []
-        base_time = datetime.utcnow() - timedelta(hours=24)
-        base_value = 2.0
-        
-        for i in range(24):
-            timestamp = base_time + timedelta(hours=i)
-            # Simulate some variation
-            value = base_value + (i % 3 - 1) * 0.2
-            count = 10 + (i % 5)
-            
-            trends.append({
-                "timestamp": timestamp.isoformat(),
-                "value": round(value, 2),
-                "count": count
-            })
+        # Bucketed means from the rollups recorded by the metrics collector
+        span = TREND_SPANS[TimeRange(time_range)]
+        step = pick_step(span, max_points=48)
+        end_time = datetime.utcnow()
+        series_list = get_timeseries_store().aggregate(
+            MetricType(metric_type).value, step, end_time - timedelta(seconds=span), end_time,
+            tags={"algorithm": algorithm} if algorithm else None
+        )
+        buckets = [
+            (start, rollup) for start, rollup in merge_buckets(
+                ((start, rollup) for series in series_list for start, rollup in zip(series.timestamps, series.rollups)),
+                step * 1000
+            )
+            if rollup.count
+        ]
+        trends = [
+            {
+                "timestamp": from_millis(start).isoformat(),
+                "value": round(rollup.mean, 4),
+                "count": rollup.count
+            }
+            for start, rollup in buckets
+        ]
         
         # Calculate trend statistics
         values = [t["value"] for t in trends]
-        avg_change = sum(abs(values[i] - values[i-1]) for i in range(1, len(values))) / (len(values) - 1)
-        volatility = (max(values) - min(values)) / 2
+        avg_change = 0.0
+        if len(values) > 1:
+            avg_change = sum(abs(values[i] - values[i-1]) for i in range(1, len(values))) / (len(values) - 1)
+        volatility = (max(values) - min(values)) / 2 if values else 0.0
         
         # Determine trend direction
-        if values[-1] > values[0] + 0.1:
+        if values and values[-1] > values[0] + 0.1:
             trend_direction = "increasing"
-        elif values[-1] < values[0] - 0.1:
+        elif values and values[-1] < values[0] - 0.1:
             trend_direction = "decreasing"
         else:
             trend_direction = "stable"
         
+        count = sum(rollup.count for _, rollup in buckets)
         return {
             "metric_type": str(metric_type),
             "time_range": str(time_range),
             "algorithm": algorithm,
+            "step_seconds": step,
+            "data_points": len(trends),
             "trends": trends,
             "statistics": {
                 "trend_direction": trend_direction,
                 "average_change": round(avg_change, 3),
                 "volatility": round(volatility, 3),
-                "peak_value": max(values),
-                "lowest_value": min(values),
-                "average_value": sum(values) / len(values)
+                "peak_value": max((rollup.maximum for _, rollup in buckets), default=None),
+                "lowest_value": min((rollup.minimum for _, rollup in buckets), default=None),
+                "average_value": sum(rollup.total for _, rollup in buckets) / count if count else None
             }
         }
         
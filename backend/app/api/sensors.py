@@ -13,110 +13,117 @@ from datetime import datetime, timedelta
 from ..database.connection import get_db_session
 from ..models.sensor import (
     SystemMetric, Sensor, SensorReading, SensorFusion, SensorFusionResult, SystemHealth,
-    SystemMetricCreate, SystemMetricResponse,
-    SensorCreate, SensorResponse, SensorReadingCreate, SensorReadingResponse,
+    SystemMetricCreate, SystemMetricSample,
+    SensorCreate, SensorResponse, SensorReadingCreate,
     SensorFusionCreate, SensorFusionResponse,
     SensorFusionResultCreate, SensorFusionResultResponse,
     SystemHealthCreate, SystemHealthResponse,
     MetricsQueryRequest, MetricsQueryResponse,
     SensorType, MetricType, SensorStatus
 )
+from ..core.timeseries_ingest import get_bulk_writer
+from ..core.timeseries_store import get_timeseries_store
 from ..services.sensor_service import SensorService
-from ..services.metrics_service import MetricsService
+from ..services.metrics_service import METRIC_TYPE_TAG, MetricsService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/sensors", tags=["sensors"])
 
 
+def _metric_sample(metric: SystemMetric) -> SystemMetricSample:
+    """Response model for a metric read from the time-series store."""
+    return SystemMetricSample(id=metric.id, name=metric.name, type=metric.type, unit=metric.unit,
+                              value=metric.value, tags=metric.tags, timestamp=metric.timestamp)
+
+
+def _reading_sample(reading: SensorReading) -> SensorReadingCreate:
+    """Response model for a reading read from the time-series store."""
+    return SensorReadingCreate(sensor_id=reading.sensor_id, value=reading.value, raw_value=reading.raw_value,
+                               unit=reading.unit, quality=reading.quality, confidence=reading.confidence,
+                               error_margin=reading.error_margin, timestamp=reading.timestamp)
+
+
 # System Metrics Endpoints
-@router.get("/metrics", response_model=List[SystemMetricResponse])
+# Metrics live in the time-series store (see MetricsService), so they
+# carry time-series ids rather than row ids.
+@router.get("/metrics", response_model=List[SystemMetricSample])
 async def list_system_metrics(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     name: Optional[str] = Query(None, description="Filter by metric name"),
     type: Optional[MetricType] = Query(None, description="Filter by metric type"),
     start_time: Optional[datetime] = Query(None, description="Start time for filtering"),
-    end_time: Optional[datetime] = Query(None, description="End time for filtering"),
-    db: AsyncSession = Depends(get_db_session)
+    end_time: Optional[datetime] = Query(None, description="End time for filtering")
 ):
     """
-    List system metrics with optional filtering.
+    List system metrics with optional filtering, newest first.
     """
     try:
-        # Build query
-        query = select(SystemMetric)
-        
-        # Apply filters
-        filters = []
-        if name:
-            filters.append(SystemMetric.name == name)
-        if type:
-            filters.append(SystemMetric.type == type)
-        if start_time:
-            filters.append(SystemMetric.timestamp >= start_time)
-        if end_time:
-            filters.append(SystemMetric.timestamp <= end_time)
-        
-        if filters:
-            query = query.where(and_(*filters))
-        
-        # Order by timestamp (newest first)
-        query = query.order_by(desc(SystemMetric.timestamp))
-        
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-        
-        # Execute query
-        result = await db.execute(query)
-        metrics = result.scalars().all()
-        
-        return metrics
+        tags = {METRIC_TYPE_TAG: type.value} if type else None
+        metrics = await MetricsService.get_metrics(name, start_time, end_time, tags=tags, limit=skip + limit)
+        return [_metric_sample(metric) for metric in metrics[skip:]]
         
     except Exception as e:
         logger.error(f"Error listing system metrics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/metrics", response_model=SystemMetricResponse)
-async def create_system_metric(
-    metric_data: SystemMetricCreate,
-    db: AsyncSession = Depends(get_db_session)
-):
+@router.post("/metrics", response_model=SystemMetricCreate)
+async def create_system_metric(metric_data: SystemMetricCreate):
     """
-    Create a new system metric.
+    Record a system metric sample.
     """
     try:
-        metric = SystemMetric(**metric_data.dict())
-        db.add(metric)
-        await db.commit()
-        await db.refresh(metric)
-        
-        return metric
+        data = metric_data.dict()
+        data['timestamp'] = data.get('timestamp') or datetime.utcnow()
+        await MetricsService.ingest_metrics([data])
+        return SystemMetricCreate(**data)
         
     except Exception as e:
-        await db.rollback()
         logger.error(f"Error creating system metric: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/metrics/{metric_id}", response_model=SystemMetricResponse)
+@router.post("/metrics/bulk")
+async def create_system_metrics_bulk(metrics: List[SystemMetricCreate]):
+    """
+    Ingest a batch of system metrics into the time-series store.
+    """
+    try:
+        accepted = await MetricsService.ingest_metrics([metric.dict() for metric in metrics])
+        return {"accepted": accepted}
+        
+    except Exception as e:
+        logger.error(f"Error ingesting system metrics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/ingest/stats")
+async def get_ingest_stats():
+    """
+    Get bulk writer queue depth, throughput and write latency.
+    """
+    return get_bulk_writer().get_stats()
+
+
+@router.get("/metrics/{metric_id}", response_model=SystemMetricSample)
 async def get_system_metric(
-    metric_id: int = Path(..., description="Metric ID"),
-    db: AsyncSession = Depends(get_db_session)
+    metric_id: int = Path(..., description="Time-series id of the metric")
 ):
     """
-    Get system metric by ID.
+    Get the latest sample of a metric series by id.
     """
     try:
-        query = select(SystemMetric).where(SystemMetric.id == metric_id)
-        result = await db.execute(query)
-        metric = result.scalar_one_or_none()
-        
-        if not metric:
+        described = get_timeseries_store().describe(metric_id)
+        metrics = []
+        if described is not None:
+            name, tags, _ = described
+            metrics = await MetricsService.get_metrics(name, tags=tags, limit=1, series_id=metric_id)
+        if not metrics:
             raise HTTPException(status_code=404, detail="System metric not found")
         
-        return metric
+        return _metric_sample(metrics[0])
         
     except HTTPException:
         raise
@@ -125,31 +132,20 @@ async def get_system_metric(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/metrics/names/{metric_name}/history", response_model=List[SystemMetricResponse])
+@router.get("/metrics/names/{metric_name}/history", response_model=List[SystemMetricSample])
 async def get_metric_history(
     metric_name: str = Path(..., description="Metric name"),
-    hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
-    db: AsyncSession = Depends(get_db_session)
+    hours: int = Query(24, ge=1, le=168, description="Number of hours to look back")
 ):
     """
-    Get historical data for a specific metric.
+    Get historical data for a specific metric, oldest first.
     """
     try:
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
-        query = select(SystemMetric).where(
-            and_(
-                SystemMetric.name == metric_name,
-                SystemMetric.timestamp >= start_time,
-                SystemMetric.timestamp <= end_time
-            )
-        ).order_by(SystemMetric.timestamp)
-        
-        result = await db.execute(query)
-        metrics = result.scalars().all()
-        
-        return metrics
+        metrics = await MetricsService.get_metrics(metric_name, start_time, end_time, limit=None)
+        return [_metric_sample(metric) for metric in reversed(metrics)]
         
     except Exception as e:
         logger.error(f"Error getting metric history for {metric_name}: {e}")
@@ -194,9 +190,7 @@ async def list_sensors(
         
         # Add readings count
         for sensor in sensors:
-            count_query = select(func.count(SensorReading.id)).where(SensorReading.sensor_id == sensor.id)
-            count_result = await db.execute(count_query)
-            sensor.readings_count = count_result.scalar()
+            sensor.readings_count = await SensorService.count_sensor_readings(sensor.id)
         
         return sensors
         
@@ -252,9 +246,7 @@ async def get_sensor(
             raise HTTPException(status_code=404, detail="Sensor not found")
         
         # Add readings count
-        count_query = select(func.count(SensorReading.id)).where(SensorReading.sensor_id == sensor.id)
-        count_result = await db.execute(count_query)
-        sensor.readings_count = count_result.scalar()
+        sensor.readings_count = await SensorService.count_sensor_readings(sensor.id)
         
         return sensor
         
@@ -330,7 +322,7 @@ async def delete_sensor(
 
 
 # Sensor Readings Endpoints
-@router.get("/sensors/{sensor_id}/readings", response_model=List[SensorReadingResponse])
+@router.get("/sensors/{sensor_id}/readings", response_model=List[SensorReadingCreate])
 async def list_sensor_readings(
     sensor_id: int = Path(..., description="Sensor ID"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
@@ -340,7 +332,7 @@ async def list_sensor_readings(
     db: AsyncSession = Depends(get_db_session)
 ):
     """
-    List readings for a specific sensor.
+    List readings for a specific sensor, newest first.
     """
     try:
         # Verify sensor exists
@@ -349,29 +341,8 @@ async def list_sensor_readings(
         if not sensor_result.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="Sensor not found")
         
-        # Build readings query
-        query = select(SensorReading).where(SensorReading.sensor_id == sensor_id)
-        
-        # Apply time filters
-        filters = []
-        if start_time:
-            filters.append(SensorReading.timestamp >= start_time)
-        if end_time:
-            filters.append(SensorReading.timestamp <= end_time)
-        
-        if filters:
-            query = query.where(and_(*filters))
-        
-        # Order by timestamp (newest first)
-        query = query.order_by(desc(SensorReading.timestamp))
-        
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        readings = result.scalars().all()
-        
-        return readings
+        readings = await SensorService.get_sensor_readings(sensor_id, start_time, end_time, limit=skip + limit)
+        return [_reading_sample(reading) for reading in readings[skip:]]
         
     except HTTPException:
         raise
@@ -380,14 +351,14 @@ async def list_sensor_readings(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/sensors/{sensor_id}/readings", response_model=SensorReadingResponse)
+@router.post("/sensors/{sensor_id}/readings", response_model=SensorReadingCreate)
 async def create_sensor_reading(
     reading_data: SensorReadingCreate,
     sensor_id: int = Path(..., description="Sensor ID"),
     db: AsyncSession = Depends(get_db_session)
 ):
     """
-    Create a new sensor reading.
+    Record a sensor reading.
     """
     try:
         # Verify sensor exists
@@ -396,21 +367,51 @@ async def create_sensor_reading(
         if not sensor_result.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="Sensor not found")
         
-        reading = SensorReading(sensor_id=sensor_id, **reading_data.dict())
-        db.add(reading)
-        await db.commit()
-        await db.refresh(reading)
+        reading = await SensorService.save_sensor_reading({**reading_data.dict(), 'sensor_id': sensor_id})
+        if reading is None:
+            raise HTTPException(status_code=422, detail="Sensor reading has no numeric value")
         
-        return reading
+        return _reading_sample(reading)
         
     except HTTPException:
         raise
     except Exception as e:
-        await db.rollback()
         logger.error(f"Error creating sensor reading: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/readings/bulk")
+async def create_sensor_readings_bulk(
+    readings: List[SensorReadingCreate],
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Ingest a batch of sensor readings.
+    
+    Readings are queued for the time-series bulk writer rather than
+    inserted row by row, so high-rate sensors can post many samples per
+    request without holding a database connection per reading.
+    """
+    try:
+        sensor_ids = {reading.sensor_id for reading in readings}
+        if sensor_ids:
+            result = await db.execute(select(Sensor.id).where(Sensor.id.in_(sensor_ids)))
+            missing = sensor_ids - set(result.scalars().all())
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Sensors not found: {sorted(missing)}")
+        
+        accepted = await SensorService.save_sensor_readings([reading.dict() for reading in readings])
+        return {"accepted": accepted}
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error ingesting sensor readings: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # Sensor Fusion Endpoints
 @router.get("/fusion", response_model=List[SensorFusionResponse])
 async def list_sensor_fusion(
@@ -684,33 +685,27 @@ async def query_metrics(
         fusion_results = []
         system_health = []
         
-        # Query system metrics
+        limit = query_request.limit or 1000
+        
+        # System metrics and sensor readings live in the time-series store;
+        # names, sensor ids and tags are resolved by its tag index, so only
+        # matching series are scanned and the limit counts matching samples
         if query_request.metric_names:
-            metric_query = select(SystemMetric).where(
-                SystemMetric.name.in_(query_request.metric_names)
-            )
-            
-            if query_request.start_time:
-                metric_query = metric_query.where(SystemMetric.timestamp >= query_request.start_time)
-            if query_request.end_time:
-                metric_query = metric_query.where(SystemMetric.timestamp <= query_request.end_time)
-            
-            metric_result = await db.execute(metric_query)
-            metrics = metric_result.scalars().all()
-        
-        # Query sensor readings
+            for metric_name in query_request.metric_names:
+                found = await MetricsService.get_metrics(
+                    metric_name, query_request.start_time, query_request.end_time,
+                    tags=query_request.tags, limit=limit
+                )
+                metrics.extend(_metric_sample(metric) for metric in found)
+            metrics.sort(key=lambda metric: metric.timestamp, reverse=True)
+            metrics = metrics[:limit]
+        
         if query_request.sensor_ids:
-            reading_query = select(SensorReading).where(
-                SensorReading.sensor_id.in_(query_request.sensor_ids)
+            found = await SensorService.get_sensor_readings(
+                start_time=query_request.start_time, end_time=query_request.end_time,
+                limit=limit, sensor_ids=query_request.sensor_ids
             )
-            
-            if query_request.start_time:
-                reading_query = reading_query.where(SensorReading.timestamp >= query_request.start_time)
-            if query_request.end_time:
-                reading_query = reading_query.where(SensorReading.timestamp <= query_request.end_time)
-            
-            reading_result = await db.execute(reading_query)
-            sensor_readings = reading_result.scalars().all()
+            sensor_readings = [_reading_sample(reading) for reading in found]
         
         # Query fusion results (all if no specific filters)
         fusion_query = select(SensorFusionResult)
@@ -781,9 +776,7 @@ async def get_sensor_stats(
             status_counts[status.value] = len(result.scalars().all())
         
         # Get total readings
-        reading_query = select(func.count(SensorReading.id))
-        reading_result = await db.execute(reading_query)
-        total_readings = reading_result.scalar()
+        total_readings = await SensorService.count_sensor_readings()
         
         # Get total fusion results
         fusion_query = select(func.count(SensorFusionResult.id))
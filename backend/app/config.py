@@ -94,6 +94,43 @@ class CompressionSettings(BaseSettings):
     compression_levels: List[int] = Field(default=[1, 3, 6, 9])
     chunk_size: int = Field(default=8192)
     max_workers: int = Field(default=4)
+    cache_max_entries: int = Field(default=1000, env="COMPRESSION_CACHE_MAX_ENTRIES")
+    cache_max_bytes: int = Field(default=64 * 1024 * 1024, env="COMPRESSION_CACHE_MAX_BYTES")  # 64MB
+    executor_fast_workers: int = Field(default=4, env="COMPRESSION_FAST_WORKERS")
+    executor_heavy_workers: int = Field(default=2, env="COMPRESSION_HEAVY_WORKERS")
+    executor_heavy_use_processes: bool = Field(default=False, env="COMPRESSION_HEAVY_USE_PROCESSES")
+    executor_max_queue_depth: int = Field(default=64, env="COMPRESSION_MAX_QUEUE_DEPTH")
+    executor_isolated_workers: int = Field(default=2, env="COMPRESSION_ISOLATED_WORKERS")  # killable codec processes
+    comparison_time_budget: float = Field(default=5.0, env="COMPRESSION_COMPARISON_TIME_BUDGET")  # seconds per algorithm
+    upload_block_size: int = Field(default=1024 * 1024, env="COMPRESSION_UPLOAD_BLOCK_SIZE")  # 1MB
+    upload_window_size: int = Field(default=8 * 1024 * 1024, env="COMPRESSION_UPLOAD_WINDOW_SIZE")  # 8MB in memory per upload
+    dictionaries_enabled: bool = Field(default=True, env="COMPRESSION_DICTIONARIES_ENABLED")
+    dictionary_dir: str = Field(default="./data/zstd_dictionaries", env="COMPRESSION_DICTIONARY_DIR")
+    dictionary_max_payload_size: int = Field(default=32 * 1024, env="COMPRESSION_DICTIONARY_MAX_PAYLOAD_SIZE")  # 32KB
+    dictionary_max_samples: int = Field(default=512, env="COMPRESSION_DICTIONARY_MAX_SAMPLES")  # per category
+    dictionary_sample_rate: float = Field(default=0.05, env="COMPRESSION_DICTIONARY_SAMPLE_RATE")  # of small payloads
+    cost_model_enabled: bool = Field(default=True, env="COMPRESSION_COST_MODEL_ENABLED")
+    cost_model_half_life: float = Field(default=600.0, env="COMPRESSION_COST_MODEL_HALF_LIFE")  # seconds
+    cost_model_min_samples: int = Field(default=3, env="COMPRESSION_COST_MODEL_MIN_SAMPLES")
+
+
+class MonitoringSettings(BaseSettings):
+    """System monitoring configuration settings."""
+    
+    sampler_interval: float = Field(default=1.0, env="MONITORING_SAMPLER_INTERVAL")  # seconds
+    sampler_history_size: int = Field(default=300, env="MONITORING_SAMPLER_HISTORY_SIZE")  # snapshots
+    latency_probe_host: str = Field(default="", env="MONITORING_LATENCY_PROBE_HOST")  # e.g. a gateway; empty disables
+    latency_probe_port: int = Field(default=53, env="MONITORING_LATENCY_PROBE_PORT")
+    latency_probe_every: int = Field(default=10, env="MONITORING_LATENCY_PROBE_EVERY")  # samples
+    timeseries_dir: str = Field(default="./data/timeseries", env="MONITORING_TIMESERIES_DIR")
+    timeseries_block_size: int = Field(default=1024, env="MONITORING_TIMESERIES_BLOCK_SIZE")  # samples
+    timeseries_flush_interval: float = Field(default=600.0, env="MONITORING_TIMESERIES_FLUSH_INTERVAL")  # seconds
+    timeseries_segment_max_bytes: int = Field(default=64 * 1024 * 1024, env="MONITORING_TIMESERIES_SEGMENT_MAX_BYTES")
+    timeseries_rollups: str = Field(default="1m:1d,5m:7d,1h:30d,1d:365d", env="MONITORING_TIMESERIES_ROLLUPS")  # resolution:retention
+    timeseries_raw_retention: str = Field(default="30d", env="MONITORING_TIMESERIES_RAW_RETENTION")  # empty keeps raw data
+    ingest_batch_size: int = Field(default=5000, env="MONITORING_INGEST_BATCH_SIZE")  # samples per store write
+    ingest_max_delay: float = Field(default=0.25, env="MONITORING_INGEST_MAX_DELAY")  # seconds a queued sample may wait
+    ingest_queue_size: int = Field(default=10000, env="MONITORING_INGEST_QUEUE_SIZE")  # queued puts before producers wait
 
 
 class APISettings(BaseSettings):
@@ -145,6 +182,7 @@ class Settings(BaseSettings):
     redis: RedisSettings = RedisSettings()
     security: SecuritySettings = SecuritySettings()
     compression: CompressionSettings = CompressionSettings()
+    monitoring: MonitoringSettings = MonitoringSettings()
     api: APISettings = APISettings()
     
     # File storage
@@ -2,15 +2,19 @@
 Core compression engine for the Dynamic Compression Algorithms backend.
 """
 
-from .compression_engine import CompressionEngine
+from .compression_engine import CompressionEngine, CompressionCache, get_compression_engine
 from .content_analyzer import ContentAnalyzer
+from .streaming_analysis import StreamingContentAnalyzer
 from .algorithm_selector import AlgorithmSelector
 from .parameter_optimizer import ParameterOptimizer
 from .metrics_collector import MetricsCollector
 
 __all__ = [
     "CompressionEngine",
+    "CompressionCache",
+    "get_compression_engine",
     "ContentAnalyzer", 
+    "StreamingContentAnalyzer",
     "AlgorithmSelector",
     "ParameterOptimizer",
     "MetricsCollector"
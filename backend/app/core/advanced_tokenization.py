@@ -10,7 +10,7 @@ optimal compression preprocessing. It includes:
 4. Semantic tokenization using NLP techniques
 5. Binary tokenization with structure detection
 6. Adaptive tokenization based on content characteristics
-7. Token compression and encoding optimization
+7. Token compression and encoding optimization (block bit-packed ids)
 8. Reversible transformations for lossless compression
 9. Probabilistic tokenization for better entropy coding
 10. Hardware-accelerated tokenization (SIMD, GPU)
@@ -46,6 +46,8 @@ import pickle
 import mmap
 import io
 import bisect
+import heapq
+from array import array
 from functools import lru_cache
 import math
 
@@ -96,7 +98,7 @@ class NormalizationType(Enum):
     STATISTICAL = "statistical"
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """Represents a single token with metadata."""
     value: Union[str, bytes]
@@ -121,18 +123,393 @@ class Token:
         return self.value == other.value and self.type == other.type
 
 
+ID_CHUNK = 1 << 20  # Ids processed per NumPy pass, bounding temporaries
+TOKEN_BLOCK = 128  # Ids per packed block
+PACKED_CHUNK_BLOCKS = 1 << 15  # Blocks (un)packed per NumPy pass, bounding temporaries
+
+
+class PackedTokenIds:
+    """
+    Block bit-packed token ids with random access.
+    
+    Ids are cut into blocks of ``TOKEN_BLOCK``. Each block stores
+    ``id - base`` in ``width`` bits per id (frame of reference: ``base`` is
+    the block minimum), so a block occupies exactly ``16 * width`` bytes.
+    
+    Layout::
+    
+        header (magic, count, flags) | widths: uint8 per block
+        | bases: uint32 per block (omitted when byte-aligned) | payload
+    
+    The per-block offset table is the running sum of the block sizes and is
+    rebuilt from the widths on load instead of being stored. Packing and
+    unpacking are vectorized over all blocks of the same width.
+    
+    With ``byte_aligned`` the base is 0 and widths are rounded up to whole
+    bytes, so every id keeps the same byte pattern across the stream. That
+    costs some size but gives byte-oriented entropy coders (zstd, deflate,
+    lzma) stable symbols to model.
+    """
+    
+    MAGIC = b'DTB1'
+    HEADER = struct.Struct('<4sQB')
+    BYTE_ALIGNED = 0x01
+    
+    __slots__ = ('count', 'byte_aligned', 'widths', 'bases', 'offsets', 'payload', 'words')
+    
+    def __init__(self, data: bytes):
+        """
+        Open packed ids (without unpacking them).
+        
+        Args:
+            data: Output of ``PackedTokenIds.encode``
+        """
+        if len(data) < self.HEADER.size:
+            raise ValueError("Truncated packed token data")
+        magic, count, flags = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC:
+            raise ValueError("Not packed token data")
+        
+        num_blocks = -(-count // TOKEN_BLOCK)
+        self.count = count
+        self.byte_aligned = bool(flags & self.BYTE_ALIGNED)
+        offset = self.HEADER.size
+        self.widths = np.frombuffer(data, dtype=np.uint8, count=num_blocks, offset=offset)
+        offset += num_blocks
+        if self.byte_aligned:
+            self.bases = np.zeros(num_blocks, dtype=np.uint32)
+        else:
+            self.bases = np.frombuffer(data, dtype='<u4', count=num_blocks, offset=offset)
+            offset += 4 * num_blocks
+        
+        sizes = self.widths.astype(np.int64) * (TOKEN_BLOCK // 8)
+        self.offsets = np.zeros(num_blocks, dtype=np.int64)
+        np.cumsum(sizes[:-1], out=self.offsets[1:])
+        self.payload = np.frombuffer(data, dtype=np.uint8, offset=offset)
+        self.words = self.payload.view('<u8') if self.payload.size else np.zeros(0, dtype='<u8')
+        if self.payload.size != int(sizes.sum()):
+            raise ValueError("Packed token payload size does not match its block widths")
+    
+    @classmethod
+    def encode(cls, ids: np.ndarray, byte_aligned: bool = False) -> bytes:
+        """
+        Pack token ids.
+        
+        Args:
+            ids: Token ids (uint32 range)
+            byte_aligned: Round widths up to whole bytes and skip the bases
+        
+        Returns:
+            Packed bytes
+        """
+        ids = np.asarray(ids, dtype=np.uint32)
+        count = ids.size
+        num_blocks = -(-count // TOKEN_BLOCK)
+        # Pad the last block with its final id so the padding never widens it
+        blocks = np.empty(num_blocks * TOKEN_BLOCK, dtype=np.uint32)
+        blocks[:count] = ids
+        blocks[count:] = ids[-1] if count else 0
+        blocks = blocks.reshape(num_blocks, TOKEN_BLOCK)
+        
+        if byte_aligned:
+            bases = np.zeros(num_blocks, dtype=np.uint32)
+            spans = blocks.max(axis=1) if num_blocks else bases
+        else:
+            bases = blocks.min(axis=1)
+            spans = blocks.max(axis=1) - bases
+        # frexp's exponent is the bit length (exact for 32-bit integers)
+        widths = np.frexp(spans.astype(np.float64))[1].astype(np.uint8)
+        if byte_aligned:
+            widths = (widths + 7) // 8 * 8
+        
+        sizes = widths.astype(np.int64) * (TOKEN_BLOCK // 8)
+        offsets = np.zeros(num_blocks, dtype=np.int64)
+        np.cumsum(sizes[:-1], out=offsets[1:])
+        # Block sizes are multiples of 16 bytes: scatter whole 64-bit words
+        payload = np.zeros(int(sizes.sum()) // 8, dtype='<u8')
+        word_offsets = offsets // 8
+        
+        for first in range(0, num_blocks, PACKED_CHUNK_BLOCKS):
+            chunk = slice(first, min(first + PACKED_CHUNK_BLOCKS, num_blocks))
+            chunk_widths = widths[chunk]
+            uniform = chunk_widths.min() == chunk_widths.max()
+            for width in np.unique(chunk_widths):
+                if width == 0:
+                    continue
+                # Slices instead of gathers when the whole chunk shares a width
+                selected = chunk if uniform else first + np.flatnonzero(chunk_widths == width)
+                packed = _pack_bits(blocks[selected] - bases[selected, None], int(width))
+                if uniform:
+                    start = word_offsets[first]
+                    payload[start:start + packed.size] = packed.ravel()
+                else:
+                    payload[word_offsets[selected, None] + np.arange(packed.shape[1])] = packed
+        
+        header = cls.HEADER.pack(cls.MAGIC, count, cls.BYTE_ALIGNED if byte_aligned else 0)
+        parts = [header, widths.tobytes()]
+        if not byte_aligned:
+            parts.append(bases.astype('<u4').tobytes())
+        parts.append(payload.tobytes())
+        return b''.join(parts)
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __getitem__(self, index: int) -> int:
+        """Id of the ``index``-th token."""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Token index out of range")
+        block, slot = divmod(index, TOKEN_BLOCK)
+        width = int(self.widths[block])
+        if width == 0:
+            return int(self.bases[block])
+        # Read the value's bits straight out of the payload
+        start, bit = divmod(slot * width, 8)
+        start += int(self.offsets[block])
+        raw = int.from_bytes(self.payload[start:start + (bit + width + 7) // 8].tobytes(), 'little')
+        return int(self.bases[block]) + ((raw >> bit) & ((1 << width) - 1))
+    
+    def read(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Ids ``[start, stop)``, unpacking only the blocks that cover them.
+        
+        Args:
+            start: First token index
+            stop: End token index (exclusive), defaults to the end
+        
+        Returns:
+            uint32 ids
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        start = max(start, 0)
+        if start >= stop:
+            return np.zeros(0, dtype=np.uint32)
+        first = start // TOKEN_BLOCK
+        ids = self._unpack_blocks(first, -(-stop // TOKEN_BLOCK))
+        return ids[start - first * TOKEN_BLOCK:stop - first * TOKEN_BLOCK]
+    
+    def to_array(self) -> np.ndarray:
+        """All ids."""
+        return self.read()
+    
+    def _unpack_blocks(self, first: int, last: int) -> np.ndarray:
+        """Ids of blocks ``[first, last)`` (padding included)."""
+        out = np.empty((last - first, TOKEN_BLOCK), dtype=np.uint32)
+        for start in range(first, last, PACKED_CHUNK_BLOCKS):
+            stop = min(start + PACKED_CHUNK_BLOCKS, last)
+            widths = self.widths[start:stop]
+            uniform = widths.min() == widths.max()
+            for width in np.unique(widths):
+                selected = slice(start, stop) if uniform else start + np.flatnonzero(widths == width)
+                if width == 0:
+                    values = 0
+                else:
+                    size = int(width) * (TOKEN_BLOCK // 64)
+                    if uniform:
+                        offset = self.offsets[start] // 8
+                        words = self.words[offset:offset + (stop - start) * size].reshape(-1, size)
+                    else:
+                        words = self.words[self.offsets[selected, None] // 8 + np.arange(size)]
+                    values = _unpack_bits(words, int(width))
+                rows = slice(start - first, stop - first) if uniform else selected - first
+                out[rows] = values + self.bases[selected, None]
+        return out.ravel()
+
+
+_BYTE_WIDTHS = {8: '<u1', 16: '<u2', 32: '<u4'}
+
+
+def _word_layout(width: int):
+    """Word index and shift of each of 32 ``width``-bit values packed into ``width`` uint32 words."""
+    bit = np.arange(32) * width
+    return bit // 32, (bit % 32).astype(np.uint32)
+
+
+def _pack_bits(values: np.ndarray, width: int) -> np.ndarray:
+    """
+    Pack each row of uint32 ``values`` into ``width`` bits per value.
+    
+    Bits are little-endian; returns the rows as 64-bit words.
+    """
+    rows = values.shape[0]
+    if width in _BYTE_WIDTHS:
+        return values.astype(_BYTE_WIDTHS[width]).view('<u8').reshape(rows, -1)
+    # Every 32 values fill exactly ``width`` words; one pass per value slot,
+    # over slot-major (transposed) arrays so each pass is contiguous
+    values = np.ascontiguousarray(values.reshape(-1, 32).T)
+    words = np.zeros((width, values.shape[1]), dtype=np.uint32)
+    scratch = np.empty(values.shape[1], dtype=np.uint32)
+    index, shift = _word_layout(width)
+    for j in range(32):
+        np.left_shift(values[j], shift[j], out=scratch)
+        np.bitwise_or(words[index[j]], scratch, out=words[index[j]])
+        if int(shift[j]) + width > 32:
+            np.right_shift(values[j], np.uint32(32 - int(shift[j])), out=scratch)
+            np.bitwise_or(words[index[j] + 1], scratch, out=words[index[j] + 1])
+    return np.ascontiguousarray(words.T, dtype='<u4').reshape(rows, -1).view('<u8')
+
+
+def _unpack_bits(packed: np.ndarray, width: int) -> np.ndarray:
+    """Inverse of ``_pack_bits``."""
+    rows = packed.shape[0]
+    if width in _BYTE_WIDTHS:
+        return packed.view(_BYTE_WIDTHS[width]).reshape(rows, TOKEN_BLOCK)
+    words = np.ascontiguousarray(packed.view('<u4').reshape(-1, width).T)
+    values = np.empty((32, words.shape[1]), dtype=np.uint32)
+    scratch = np.empty(words.shape[1], dtype=np.uint32)
+    index, shift = _word_layout(width)
+    mask = np.uint32((1 << width) - 1)
+    for j in range(32):
+        np.right_shift(words[index[j]], shift[j], out=values[j])
+        if int(shift[j]) + width > 32:
+            np.left_shift(words[index[j] + 1], np.uint32(32 - int(shift[j])), out=scratch)
+            np.bitwise_or(values[j], scratch, out=values[j])
+        np.bitwise_and(values[j], mask, out=values[j])
+    return np.ascontiguousarray(values.T).reshape(rows, TOKEN_BLOCK)
+
+
+class TokenStream:
+    """
+    Compact token sequence.
+    
+    Tokens are stored as parallel arrays (vocabulary id, position, length)
+    referring to a vocabulary table shared with the tokenizer, instead of one
+    ``Token`` object per token. Indexing and iteration still yield ``Token``
+    objects, built on demand, so code written for ``List[Token]`` keeps
+    working.
+    """
+    
+    __slots__ = ('ids', 'positions', 'lengths', 'vocabulary', 'type')
+    
+    def __init__(self,
+                 ids: np.ndarray,
+                 positions: np.ndarray,
+                 lengths: np.ndarray,
+                 vocabulary: List[Union[str, bytes]],
+                 token_type: TokenizationType):
+        """
+        Initialize token stream.
+        
+        Args:
+            ids: Vocabulary id per token
+            positions: Position per token (uint32, or uint64 beyond 4GB)
+            lengths: Length per token
+            vocabulary: Table mapping id -> token value (shared, append-only)
+            token_type: Type of every token
+        """
+        self.ids = np.asarray(ids, dtype=np.uint32)
+        positions = np.asarray(positions)
+        self.positions = positions if positions.dtype in (np.uint32, np.uint64) else positions.astype(np.uint64)
+        self.lengths = np.asarray(lengths, dtype=np.uint32)
+        self.vocabulary = vocabulary
+        self.type = token_type
+    
+    @classmethod
+    def from_ids(cls,
+                 ids: np.ndarray,
+                 vocabulary: List[Union[str, bytes]],
+                 token_type: TokenizationType) -> 'TokenStream':
+        """Build a stream of consecutive tokens from vocabulary ids."""
+        ids = np.asarray(ids, dtype=np.uint32)
+        if ids.size and int(ids.max()) >= len(vocabulary):
+            raise ValueError(f"Token id {int(ids.max())} is not in the vocabulary")
+        value_lengths = np.fromiter(map(len, vocabulary), dtype=np.uint32, count=len(vocabulary))
+        lengths = value_lengths[ids] if ids.size else np.zeros(0, dtype=np.uint32)
+        # 32-bit positions unless the tokens span 4GB or more
+        total = int(lengths.sum(dtype=np.uint64))
+        positions = np.zeros(ids.size, dtype=np.uint32 if total < 2**32 else np.uint64)
+        np.cumsum(lengths[:-1], dtype=positions.dtype, out=positions[1:])
+        return cls(ids, positions, lengths, vocabulary, token_type)
+    
+    def __len__(self) -> int:
+        return int(self.ids.size)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TokenStream(self.ids[index], self.positions[index], self.lengths[index],
+                               self.vocabulary, self.type)
+        return Token(
+            value=self.vocabulary[self.ids[index]],
+            type=self.type,
+            position=int(self.positions[index]),
+            length=int(self.lengths[index])
+        )
+    
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def values(self) -> List[Union[str, bytes]]:
+        """Token values in order."""
+        table = np.empty(len(self.vocabulary), dtype=object)
+        table[:] = self.vocabulary
+        return table[self.ids].tolist()
+    
+    def join(self) -> bytes:
+        """
+        Concatenate the token values (str values as UTF-8).
+        
+        Gathers from one pooled copy of the vocabulary block by block, so
+        no per-token objects are created.
+        """
+        encoded = [value if isinstance(value, bytes) else value.encode('utf-8') for value in self.vocabulary]
+        pool = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        sizes = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        offsets = np.zeros(len(encoded), dtype=np.int64)
+        np.cumsum(sizes[:-1], out=offsets[1:])
+        
+        parts = []
+        for start in range(0, len(self), ID_CHUNK):
+            ids = self.ids[start:start + ID_CHUNK]
+            widths = sizes[ids]
+            block_starts = np.zeros(ids.size, dtype=np.int64)
+            np.cumsum(widths[:-1], out=block_starts[1:])
+            within = np.arange(int(widths.sum()), dtype=np.int64) - np.repeat(block_starts, widths)
+            parts.append(pool[np.repeat(offsets[ids], widths) + within].tobytes())
+        return b''.join(parts)
+    
+    def counts(self) -> np.ndarray:
+        """Occurrences per vocabulary id."""
+        counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+        # Blocked: bincount widens its input to intp
+        for start in range(0, len(self), ID_CHUNK):
+            counts += np.bincount(self.ids[start:start + ID_CHUNK], minlength=len(self.vocabulary))
+        return counts
+    
+    def encode(self, byte_aligned: bool = False) -> bytes:
+        """Pack the token ids (see ``PackedTokenIds``)."""
+        return PackedTokenIds.encode(self.ids, byte_aligned)
+    
+    @classmethod
+    def decode(cls,
+               data: bytes,
+               vocabulary: List[Union[str, bytes]],
+               token_type: TokenizationType,
+               start: int = 0,
+               stop: Optional[int] = None) -> 'TokenStream':
+        """
+        Rebuild a stream from ``encode`` output and its vocabulary.
+        
+        ``start``/``stop`` select a token range, decoding only the blocks
+        that cover it; positions are then relative to ``start``.
+        """
+        return cls.from_ids(PackedTokenIds(data).read(start, stop), vocabulary, token_type)
+
+
 @dataclass
 class TokenizationResult:
     """Result of tokenization process."""
-    tokens: List[Token]
+    tokens: Union[TokenStream, List[Token]]
     vocabulary: Dict[Union[str, bytes], int]
     statistics: Dict[str, Any]
     reversible: bool
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_bytes(self) -> bytes:
-        """Serialize tokenization result."""
-        return pickle.dumps(self)
+        """Serialize tokenization result (token streams pickle as raw arrays)."""
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
     
     @staticmethod
     def from_bytes(data: bytes) -> 'TokenizationResult':
@@ -148,6 +525,7 @@ class BaseTokenizer(ABC):
         self.config = config or {}
         self.vocabulary = {}
         self.reverse_vocabulary = {}
+        self.vocabulary_table: List[Union[str, bytes]] = []  # id -> value, shared with token streams
         self.token_frequencies = Counter()
         self.logger = logging.getLogger(self.__class__.__name__)
     
@@ -164,106 +542,158 @@ class BaseTokenizer(ABC):
     def build_vocabulary(self, tokens: List[Token]):
         """Build vocabulary from tokens."""
         for token in tokens:
-            if token.value not in self.vocabulary:
-                idx = len(self.vocabulary)
-                self.vocabulary[token.value] = idx
-                self.reverse_vocabulary[idx] = token.value
-            
+            self._intern(token.value)
             self.token_frequencies[token.value] += 1
     
-    def encode_tokens(self, tokens: List[Token]) -> bytes:
-        """Encode tokens to bytes."""
-        encoded = bytearray()
-        
-        for token in tokens:
-            if token.value in self.vocabulary:
-                idx = self.vocabulary[token.value]
-                # Variable-length encoding based on frequency
-                if idx < 128:
-                    encoded.append(idx)
-                elif idx < 16384:
-                    encoded.extend(struct.pack('>H', idx | 0x8000))
-                else:
-                    encoded.extend(struct.pack('>I', idx | 0xC0000000))
-            else:
-                # Unknown token handling
-                encoded.append(0xFF)
-                value_bytes = token.value.encode('utf-8') if isinstance(token.value, str) else token.value
-                encoded.extend(struct.pack('>H', len(value_bytes)))
-                encoded.extend(value_bytes)
-        
-        return bytes(encoded)
+    def _intern(self, value: Union[str, bytes]) -> int:
+        """Vocabulary id of ``value``, adding it if new."""
+        idx = self.vocabulary.get(value)
+        if idx is None:
+            idx = len(self.vocabulary_table)
+            self.vocabulary[value] = idx
+            self.reverse_vocabulary[idx] = value
+            self.vocabulary_table.append(value)
+        return idx
     
-    def decode_tokens(self, data: bytes) -> List[Token]:
-        """Decode bytes to tokens."""
-        tokens = []
-        i = 0
-        
-        while i < len(data):
-            if data[i] < 128:
-                # Single byte token
-                idx = data[i]
-                i += 1
-            elif data[i] & 0xC0 == 0x80:
-                # Two byte token
-                idx = struct.unpack('>H', data[i:i+2])[0] & 0x3FFF
-                i += 2
-            elif data[i] & 0xC0 == 0xC0:
-                # Four byte token
-                idx = struct.unpack('>I', data[i:i+4])[0] & 0x3FFFFFFF
-                i += 4
-            elif data[i] == 0xFF:
-                # Unknown token
-                i += 1
-                length = struct.unpack('>H', data[i:i+2])[0]
-                i += 2
-                value = data[i:i+length]
-                i += length
-                tokens.append(Token(value=value, type=TokenizationType.BYTE, position=0, length=length))
-                continue
-            else:
-                i += 1
-                continue
-            
-            if idx in self.reverse_vocabulary:
-                value = self.reverse_vocabulary[idx]
-                tokens.append(Token(value=value, type=self.type, position=0, length=len(value)))
+    def _count_stream(self, stream: 'TokenStream'):
+        """Add a token stream's occurrences to ``token_frequencies``."""
+        counts = stream.counts()
+        for idx in np.flatnonzero(counts):
+            self.token_frequencies[self.vocabulary_table[idx]] += int(counts[idx])
+    
+    def to_stream(self, tokens: Union['TokenStream', List[Token]]) -> 'TokenStream':
+        """Express tokens as a stream over this tokenizer's vocabulary."""
+        if isinstance(tokens, TokenStream):
+            if tokens.vocabulary is self.vocabulary_table:
+                return tokens
+            remap = np.fromiter((self._intern(value) for value in tokens.vocabulary),
+                                dtype=np.uint32, count=len(tokens.vocabulary))
+            return TokenStream(remap[tokens.ids] if len(tokens) else tokens.ids,
+                               tokens.positions, tokens.lengths, self.vocabulary_table, tokens.type)
+        
+        ids = np.fromiter((self._intern(token.value) for token in tokens), dtype=np.uint32, count=len(tokens))
+        return TokenStream(
+            ids,
+            np.fromiter((token.position for token in tokens), dtype=np.uint64, count=len(tokens)),
+            np.fromiter((token.length for token in tokens), dtype=np.uint32, count=len(tokens)),
+            self.vocabulary_table,
+            getattr(self, 'type', TokenizationType.BYTE)
+        )
+    
+    def encode_tokens(self, tokens: Union['TokenStream', List[Token]], byte_aligned: bool = False) -> bytes:
+        """
+        Encode tokens to bytes as block bit-packed vocabulary ids.
         
-        return tokens
+        Tokens missing from the vocabulary are added to it, so the same
+        tokenizer (or its vocabulary table) is needed to decode. Pass
+        ``byte_aligned`` when the output goes to a byte-oriented entropy
+        coder next.
+        """
+        return self.to_stream(tokens).encode(byte_aligned)
+    
+    def decode_tokens(self, data: bytes, start: int = 0, stop: Optional[int] = None) -> 'TokenStream':
+        """Decode bytes to tokens, optionally only tokens ``[start, stop)``."""
+        return TokenStream.decode(data, self.vocabulary_table, getattr(self, 'type', TokenizationType.BYTE),
+                                  start, stop)
 
 
 class ByteTokenizer(BaseTokenizer):
     """Byte-level tokenization."""
     
+    BLOCK_TOKENS = 1 << 20  # Chunks interned per NumPy pass
+    UNSEEN = np.uint32(0xFFFFFFFF)
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self.type = TokenizationType.BYTE
         self.chunk_size = config.get('chunk_size', 1) if config else 1
     
-    def tokenize(self, data: Union[str, bytes]) -> List[Token]:
+    def tokenize(self, data: Union[str, bytes]) -> TokenStream:
         """Tokenize data at byte level."""
         if isinstance(data, str):
             data = data.encode('utf-8')
         
-        tokens = []
-        position = 0
-        
-        for i in range(0, len(data), self.chunk_size):
-            chunk = data[i:i+self.chunk_size]
-            token = Token(
-                value=chunk,
-                type=self.type,
-                position=position,
-                length=len(chunk)
+        size = self.chunk_size
+        full = len(data) - len(data) % size
+        
+        if size <= 8:
+            ids = self._intern_chunks(data, full, size)
+        else:
+            ids = np.fromiter(
+                (self._intern(data[i:i + size]) for i in range(0, full, size)),
+                dtype=np.uint32, count=full // size
             )
-            tokens.append(token)
-            position += len(chunk)
         
-        self.build_vocabulary(tokens)
-        return tokens
+        if full < len(data):
+            ids = np.append(ids, np.uint32(self._intern(data[full:])))
+        
+        stream = TokenStream.from_ids(ids, self.vocabulary_table, self.type)
+        self._count_stream(stream)
+        return stream
     
-    def detokenize(self, tokens: List[Token]) -> bytes:
+    def _intern_chunks(self, data: bytes, full: int, size: int) -> np.ndarray:
+        """
+        Vocabulary ids of the ``size``-byte chunks in ``data[:full]``.
+        
+        Chunks are packed into integer keys block by block and looked up in
+        a table of the keys seen so far (dense for 1-2 byte chunks, sorted
+        otherwise). Only unseen chunks go through ``_intern``, in order of
+        first occurrence, so ids match token-by-token interning.
+        """
+        count = full // size
+        ids = np.empty(count, dtype=np.uint32)
+        dense = size <= 2
+        if dense:
+            table = np.full(1 << (8 * size), self.UNSEEN, dtype=np.uint32)
+        else:
+            seen_keys = np.zeros(0, dtype=np.uint64)
+            seen_ids = np.zeros(0, dtype=np.uint32)
+        
+        for start in range(0, count, self.BLOCK_TOKENS):
+            stop = min(start + self.BLOCK_TOKENS, count)
+            raw = np.frombuffer(data, dtype=np.uint8, count=(stop - start) * size, offset=start * size)
+            if size == 1:
+                keys = raw
+            else:
+                keys = raw[0::size].astype(np.uint64)
+                for offset in range(1, size):
+                    keys = (keys << np.uint64(8)) | raw[offset::size]
+            
+            if dense:
+                block_ids = table[keys]
+                missing = np.flatnonzero(block_ids == self.UNSEEN)
+            else:
+                positions = np.searchsorted(seen_keys, keys)
+                if seen_keys.size:
+                    missing = np.flatnonzero(seen_keys[np.minimum(positions, seen_keys.size - 1)] != keys)
+                else:
+                    missing = np.arange(keys.size)
+            
+            if missing.size:
+                new_keys, first = np.unique(keys[missing], return_index=True)
+                new_ids = np.empty(new_keys.size, dtype=np.uint32)
+                for j in np.argsort(first, kind='stable'):
+                    chunk_start = (start + int(missing[first[j]])) * size
+                    new_ids[j] = self._intern(data[chunk_start:chunk_start + size])
+                
+                if dense:
+                    table[new_keys] = new_ids
+                    block_ids = table[keys]
+                else:
+                    all_keys = np.concatenate((seen_keys, new_keys))
+                    order = np.argsort(all_keys, kind='stable')
+                    seen_keys = all_keys[order]
+                    seen_ids = np.concatenate((seen_ids, new_ids))[order]
+                    positions = np.searchsorted(seen_keys, keys)
+            
+            ids[start:stop] = block_ids if dense else seen_ids[positions]
+        
+        return ids
+    
+    def detokenize(self, tokens: Union[TokenStream, List[Token]]) -> bytes:
         """Reconstruct bytes from tokens."""
+        if isinstance(tokens, TokenStream):
+            return tokens.join()
         result = bytearray()
         for token in tokens:
             if isinstance(token.value, bytes):
@@ -274,110 +704,154 @@ class ByteTokenizer(BaseTokenizer):
 
 
 class SubwordTokenizer(BaseTokenizer):
-    """Subword tokenization using BPE-like algorithm."""
+    """
+    Subword tokenization using BPE-like algorithm.
+    
+    Training keeps pair counts in a heap with a pair -> words index, so each
+    merge only touches the words containing the merged pair. Encoding merges
+    by rank (lowest rank first) and caches the result per word.
+    """
+    
+    END_OF_WORD = '</w>'
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self.type = TokenizationType.SUBWORD
         self.vocab_size = config.get('vocab_size', 10000) if config else 10000
         self.min_frequency = config.get('min_frequency', 2) if config else 2
+        self.cache_size = config.get('bpe_cache_size', 65536) if config else 65536
         self.merge_rules = []
+        self.merge_ranks: Dict[Tuple[str, str], int] = {}
+        self._bpe_cache: Dict[str, List[str]] = {}
     
     def learn_bpe(self, data: str, num_merges: int = 1000):
-        """Learn BPE merge rules from data."""
-        # Initialize with character-level tokens
-        words = data.split()
-        word_freqs = Counter(words)
-        
-        # Split words into characters
-        splits = {}
-        for word, freq in word_freqs.items():
-            splits[word] = list(word) + ['</w>']
-        
-        for _ in range(num_merges):
-            # Count pair frequencies
-            pair_freqs = defaultdict(int)
-            
-            for word, freq in word_freqs.items():
-                split = splits[word]
-                for i in range(len(split) - 1):
-                    pair = (split[i], split[i + 1])
-                    pair_freqs[pair] += freq
-            
-            if not pair_freqs:
+        """
+        Learn BPE merge rules from data.
+        
+        Pairs are merged most frequent first (ties: smallest pair) until
+        ``num_merges`` rules are learned or no pair occurs at least
+        ``min_frequency`` times.
+        """
+        word_freqs = Counter(data.split())
+        words = [list(word) + [self.END_OF_WORD] for word in word_freqs]
+        freqs = list(word_freqs.values())
+        
+        # Pair counts and the words each pair occurs in (may hold stale words)
+        pair_counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        pair_words: Dict[Tuple[str, str], set] = defaultdict(set)
+        for index, (symbols, freq) in enumerate(zip(words, freqs)):
+            for pair in zip(symbols, symbols[1:]):
+                pair_counts[pair] += freq
+                pair_words[pair].add(index)
+        
+        heap = [(-count, pair) for pair, count in pair_counts.items()]
+        heapq.heapify(heap)
+        
+        merges = 0
+        while heap and merges < num_merges:
+            negative_count, best_pair = heapq.heappop(heap)
+            count = pair_counts.get(best_pair, 0)
+            if -negative_count != count:
+                continue  # Stale entry; the current count has its own entry
+            if count < self.min_frequency:
                 break
             
-            # Find most frequent pair
-            best_pair = max(pair_freqs.items(), key=lambda x: x[1])[0]
             self.merge_rules.append(best_pair)
+            merges += 1
             
-            # Apply merge
-            for word in splits:
-                split = splits[word]
-                new_split = []
-                i = 0
-                while i < len(split):
-                    if i < len(split) - 1 and (split[i], split[i + 1]) == best_pair:
-                        new_split.append(split[i] + split[i + 1])
-                        i += 2
-                    else:
-                        new_split.append(split[i])
-                        i += 1
-                splits[word] = new_split
+            changed: Dict[Tuple[str, str], int] = defaultdict(int)
+            for index in pair_words.pop(best_pair):
+                symbols = words[index]
+                merged = self._merge_pair(symbols, best_pair)
+                if merged is None:
+                    continue
+                freq = freqs[index]
+                for pair in zip(symbols, symbols[1:]):
+                    changed[pair] -= freq
+                for pair in zip(merged, merged[1:]):
+                    changed[pair] += freq
+                    pair_words[pair].add(index)
+                words[index] = merged
+            
+            for pair, delta in changed.items():
+                if delta == 0:
+                    continue
+                count = pair_counts[pair] + delta
+                if count > 0:
+                    pair_counts[pair] = count
+                    heapq.heappush(heap, (-count, pair))
+                else:
+                    pair_counts.pop(pair, None)
+            pair_counts.pop(best_pair, None)
+        
+        self.merge_ranks = {}
+        for rank, pair in enumerate(self.merge_rules):
+            self.merge_ranks.setdefault(tuple(pair), rank)
+        self._bpe_cache.clear()
     
-    def tokenize(self, data: Union[str, bytes]) -> List[Token]:
+    @staticmethod
+    def _merge_pair(symbols: List[str], pair: Tuple[str, str]) -> Optional[List[str]]:
+        """Merge every occurrence of ``pair`` left to right; None if absent."""
+        first, second = pair
+        merged = []
+        i = 0
+        found = False
+        while i < len(symbols):
+            if i < len(symbols) - 1 and symbols[i] == first and symbols[i + 1] == second:
+                merged.append(first + second)
+                i += 2
+                found = True
+            else:
+                merged.append(symbols[i])
+                i += 1
+        return merged if found else None
+    
+    def tokenize(self, data: Union[str, bytes]) -> TokenStream:
         """Tokenize using learned BPE rules."""
         if isinstance(data, bytes):
             data = data.decode('utf-8', errors='ignore')
         
-        tokens = []
-        position = 0
+        ids = array('I')
+        word_ids: Dict[str, List[int]] = {}
         
         for word in data.split():
             # Apply BPE to word
-            subwords = self._apply_bpe(word)
-            
-            for subword in subwords:
-                token = Token(
-                    value=subword,
-                    type=self.type,
-                    position=position,
-                    length=len(subword)
-                )
-                tokens.append(token)
-                position += len(subword)
-        
-        self.build_vocabulary(tokens)
-        return tokens
+            subword_ids = word_ids.get(word)
+            if subword_ids is None:
+                subword_ids = [self._intern(subword) for subword in self._apply_bpe(word)]
+                word_ids[word] = subword_ids
+            ids.extend(subword_ids)
+        
+        stream = TokenStream.from_ids(np.frombuffer(ids, dtype=np.uint32), self.vocabulary_table, self.type)
+        self._count_stream(stream)
+        return stream
     
     def _apply_bpe(self, word: str) -> List[str]:
-        """Apply BPE rules to a word."""
-        splits = list(word) + ['</w>']
-        
-        for merge_rule in self.merge_rules:
-            new_splits = []
-            i = 0
-            while i < len(splits):
-                if i < len(splits) - 1 and (splits[i], splits[i + 1]) == merge_rule:
-                    new_splits.append(splits[i] + splits[i + 1])
-                    i += 2
-                else:
-                    new_splits.append(splits[i])
-                    i += 1
-            splits = new_splits
+        """Apply BPE rules to a word, lowest-ranked pair first."""
+        cached = self._bpe_cache.get(word)
+        if cached is not None:
+            return cached
+        
+        splits = list(word) + [self.END_OF_WORD]
+        ranks = self.merge_ranks
+        while len(splits) > 1:
+            best_pair = min(zip(splits, splits[1:]), key=lambda pair: ranks.get(pair, math.inf))
+            if best_pair not in ranks:
+                break
+            splits = self._merge_pair(splits, best_pair)
         
+        if len(self._bpe_cache) >= self.cache_size:
+            self._bpe_cache.clear()
+        self._bpe_cache[word] = splits
         return splits
     
-    def detokenize(self, tokens: List[Token]) -> str:
+    def detokenize(self, tokens: Union[TokenStream, List[Token]]) -> str:
         """Reconstruct text from subword tokens."""
-        text = ""
-        for token in tokens:
-            value = token.value
-            if value.endswith('</w>'):
-                text += value[:-4] + " "
-            else:
-                text += value
-        return text.strip()
+        if isinstance(tokens, TokenStream):
+            text = tokens.join().decode('utf-8')
+        else:
+            text = ''.join(token.value for token in tokens)
+        return text.replace(self.END_OF_WORD, ' ').strip()
 
 
 class SemanticTokenizer(BaseTokenizer):
@@ -615,35 +1089,41 @@ class AdaptiveTokenizer:
         
         return entropy
     
-    def _calculate_statistics(self, tokens: List[Token], data: Union[str, bytes]) -> Dict[str, Any]:
+    def _calculate_statistics(self, tokens: Union[TokenStream, List[Token]], data: Union[str, bytes]) -> Dict[str, Any]:
         """Calculate tokenization statistics."""
-        if not tokens:
+        if not len(tokens):
             return {}
         
-        token_lengths = [t.length for t in tokens]
+        if isinstance(tokens, TokenStream):
+            token_lengths = tokens.lengths
+            counts = tokens.counts()
+            vocabulary_size = int(np.count_nonzero(counts))
+        else:
+            token_lengths = [t.length for t in tokens]
+            vocabulary_size = len(set(t.value for t in tokens))
         
         return {
             'num_tokens': len(tokens),
-            'avg_token_length': np.mean(token_lengths),
-            'max_token_length': max(token_lengths),
-            'min_token_length': min(token_lengths),
-            'compression_ratio': len(data) / len(tokens) if tokens else 0,
-            'vocabulary_size': len(set(t.value for t in tokens)),
+            'avg_token_length': float(np.mean(token_lengths)),
+            'max_token_length': int(np.max(token_lengths)),
+            'min_token_length': int(np.min(token_lengths)),
+            'compression_ratio': len(data) / len(tokens),
+            'vocabulary_size': vocabulary_size,
             'token_entropy': self._calculate_token_entropy(tokens)
         }
     
-    def _calculate_token_entropy(self, tokens: List[Token]) -> float:
+    def _calculate_token_entropy(self, tokens: Union[TokenStream, List[Token]]) -> float:
         """Calculate entropy of token distribution."""
-        token_counts = Counter(t.value for t in tokens)
-        total = sum(token_counts.values())
-        
-        entropy = 0.0
-        for count in token_counts.values():
-            p = count / total
-            if p > 0:
-                entropy -= p * math.log2(p)
+        if isinstance(tokens, TokenStream):
+            counts = tokens.counts()
+            counts = counts[counts > 0]
+        else:
+            counts = np.array(list(Counter(t.value for t in tokens).values()))
+        if counts.size == 0:
+            return 0.0
         
-        return entropy
+        p = counts / counts.sum()
+        return float(-(p * np.log2(p)).sum())
 
 
 class DataNormalizer:
@@ -954,7 +1434,14 @@ class UnifiedTokenizationSystem:
         # Limit vocabulary size for faster lookup
         max_vocab_size = 65536  # 16-bit encoding
         
-        if len(result.vocabulary) > max_vocab_size:
+        if len(result.vocabulary) > max_vocab_size and isinstance(result.tokens, TokenStream):
+            # Keep only most frequent tokens
+            counts = result.tokens.counts()
+            most_frequent = np.argsort(-counts, kind='stable')[:max_vocab_size]
+            result.vocabulary = {
+                result.tokens.vocabulary[idx]: i for i, idx in enumerate(most_frequent)
+            }
+        elif len(result.vocabulary) > max_vocab_size:
             # Keep only most frequent tokens
             sorted_tokens = sorted(
                 result.tokens,
@@ -2,13 +2,16 @@
 Algorithm selector for the Dynamic Compression Algorithms backend.
 
 This module implements the hierarchical search strategy for algorithm selection
-based on content analysis and historical performance data.
+based on content analysis and historical performance data. Historical
+performance comes from the online codec cost model, which is fed by every
+real compression.
 """
 
 import random
 from typing import Dict, List, Any, Optional
 # import numpy as np  # Removed for compatibility
 
+from app.core.codec_cost_model import ANY, CodecCostModel, ServiceLevel, get_codec_cost_model
 from app.models.compression import CompressionAlgorithm, ContentType
 
 
@@ -22,8 +25,15 @@ class AlgorithmSelector:
     - Level 3: Parameter optimization (window size, compression level, etc.)
     """
     
-    def __init__(self):
-        """Initialize the algorithm selector."""
+    def __init__(self, cost_model: Optional[CodecCostModel] = None):
+        """
+        Initialize the algorithm selector.
+        
+        Args:
+            cost_model: Measured codec performance (defaults to the global model)
+        """
+        self.cost_model = cost_model or get_codec_cost_model()
+        
         # Algorithm families and their variants
         self.algorithm_families = {
             'LZ77': [CompressionAlgorithm.GZIP, CompressionAlgorithm.LZ4],
@@ -60,16 +70,29 @@ class AlgorithmSelector:
         # Historical performance data (would be loaded from database in real implementation)
         self.performance_history = {}
     
-    def select_algorithm(self, content_analysis: Dict[str, Any]) -> CompressionAlgorithm:
+    def select_algorithm(self,
+                         content_analysis: Dict[str, Any],
+                         service_level: Optional[ServiceLevel] = None) -> CompressionAlgorithm:
         """
         Select the best compression algorithm based on content analysis.
         
+        If ``service_level`` is given and the cost model has measurements for
+        the content, the best-ratio codec meeting it is returned directly.
+        
         Args:
-            content_analysis: Results from content analysis
+            content_analysis: Results from content analysis ('content_size' and
+                'codec_profile' enable the cost model)
+            service_level: Latency/throughput requirements
             
         Returns:
             Selected compression algorithm
         """
+        if service_level is not None:
+            profile, size = self._cost_model_key(content_analysis)
+            choice = self.cost_model.select(profile, size, service_level, codecs=self._measurable_codecs())
+            if choice is not None and choice['meets_service_level']:
+                return CompressionAlgorithm(choice['codec'])
+        
         # Get content type
         content_type = content_analysis.get('content_type_score', {}).get('type', ContentType.TEXT)
         
@@ -213,16 +236,43 @@ class AlgorithmSelector:
             score = 0.5 + compression_potential * 0.5
         
         # Add historical performance factor
-        historical_score = self._get_historical_performance(str(variant), content_analysis)
+        historical_score = self._get_historical_performance(variant.value, content_analysis)
         score = score * 0.7 + historical_score * 0.3
         
         return score
     
+    def _cost_model_key(self, content_analysis: Dict[str, Any]):
+        """Cost model profile and size for analysed content."""
+        return content_analysis.get('codec_profile', ANY), content_analysis.get('content_size', 0)
+    
+    def _measurable_codecs(self) -> List[str]:
+        return [algorithm.value for algorithm in CompressionAlgorithm]
+    
     def _get_historical_performance(self, algorithm: str, content_analysis: Dict[str, Any]) -> float:
-        """Get historical performance score for an algorithm."""
-        # In a real implementation, this would query a database
-        # For now, return a random score to simulate historical data
-        return random.uniform(0.3, 0.9)
+        """
+        Get historical performance score for an algorithm or family.
+        
+        Scores measured ratio and throughput relative to the best measured
+        codec for this content; unmeasured algorithms score a neutral 0.5.
+        """
+        profile, size = self._cost_model_key(content_analysis)
+        options = self.cost_model.estimate(profile, size, codecs=self._measurable_codecs())
+        if not options:
+            return 0.5
+        
+        best_ratio = max(option['ratio'] for option in options)
+        best_speed = max(option['compress_mbps'] for option in options)
+        variants = self.algorithm_families.get(algorithm, [algorithm])
+        names = {variant.value if isinstance(variant, CompressionAlgorithm) else variant for variant in variants}
+        scores = [
+            self.metric_weights['compression_ratio'] * option['ratio'] / best_ratio
+            + self.metric_weights['speed'] * option['compress_mbps'] / best_speed
+            for option in options if option['codec'] in names
+        ]
+        if not scores:
+            return 0.5
+        # Normalise the ratio/speed weights to a 0-1 score
+        return max(scores) / (self.metric_weights['compression_ratio'] + self.metric_weights['speed'])
     
     def update_performance_history(self, algorithm: str, content_profile: List[float], performance: Dict[str, float]):
         """Update performance history with new results."""
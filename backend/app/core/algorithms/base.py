@@ -7,13 +7,15 @@ import abc
 import asyncio
 import time
 import logging
-from typing import Dict, Any, Optional, Union, Tuple
+from typing import Dict, Any, Optional, Union, Tuple, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 import psutil
 import threading
 from contextlib import asynccontextmanager
 
+from .streaming import ChunkSource, run_stream_codec
+from ..compression_executor import CompressionQueueFullError, FAST_LANE
 from ...models.compression import CompressionAlgorithm, CompressionLevel
 
 logger = logging.getLogger(__name__)
@@ -116,8 +118,15 @@ class BaseCompressor(abc.ABC):
     - Observer Pattern: Performance monitoring
     - Factory Pattern: Algorithm creation
     - Decorator Pattern: Performance tracking
+    
+    Subclasses supporting streaming implement ``_create_stream_compressor``
+    and ``_create_stream_decompressor``; the incremental calls then run on
+    ``stream_lane`` of the shared compression executor.
     """
     
+    # Executor lane for incremental stream calls
+    stream_lane: str = FAST_LANE
+    
     def __init__(self, algorithm: CompressionAlgorithm):
         self.algorithm = algorithm
         self.state = AlgorithmState.IDLE
@@ -322,6 +331,72 @@ class BaseCompressor(abc.ABC):
         finally:
             self._set_state(AlgorithmState.IDLE)
     
+    def _level_value(self, level: CompressionLevel) -> int:
+        """Map a compression level to the codec's numeric level."""
+        levels = getattr(self, '_compression_levels', {})
+        return levels.get(level, levels.get(CompressionLevel.BALANCED, 6))
+    
+    def _create_stream_compressor(self, level: CompressionLevel):
+        """Create an incremental compressor with ``compress(chunk)`` and ``flush()``."""
+        raise NotImplementedError(f"Streaming compression is not supported by {self.algorithm}")
+    
+    def _create_stream_decompressor(self):
+        """Create an incremental decompressor with ``decompress(chunk)``."""
+        raise NotImplementedError(f"Streaming decompression is not supported by {self.algorithm}")
+    
+    async def compress_stream(self,
+                              data_stream: ChunkSource,
+                              level: CompressionLevel = CompressionLevel.BALANCED,
+                              **options) -> AsyncIterator[bytes]:
+        """
+        Compress data from a stream without blocking the event loop.
+        
+        Args:
+            data_stream: Async (or sync) iterator of data chunks
+            level: Compression level
+            **options: Queue options for ``run_stream_codec``
+            
+        Yields:
+            Compressed data chunks
+        """
+        compressor = self._create_stream_compressor(level)
+        try:
+            async for chunk in run_stream_codec(
+                data_stream, compressor.compress, compressor.flush, self.stream_lane, **options
+            ):
+                yield chunk
+        except CompressionQueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"{self.algorithm} stream compression failed: {e}")
+            raise CompressionError(f"{self.algorithm} stream compression failed: {str(e)}") from e
+    
+    async def decompress_stream(self, compressed_stream: ChunkSource, **options) -> AsyncIterator[bytes]:
+        """
+        Decompress data from a stream without blocking the event loop.
+        
+        Args:
+            compressed_stream: Async (or sync) iterator of compressed data chunks
+            **options: Queue options for ``run_stream_codec``
+            
+        Yields:
+            Decompressed data chunks
+        """
+        decompressor = self._create_stream_decompressor()
+        try:
+            async for chunk in run_stream_codec(
+                compressed_stream, decompressor.decompress, getattr(decompressor, 'flush', None),
+                self.stream_lane, **options
+            ):
+                yield chunk
+            if not getattr(decompressor, 'eof', True):
+                raise ValueError("Compressed stream ended before the end of data")
+        except CompressionQueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"{self.algorithm} stream decompression failed: {e}")
+            raise CompressionError(f"{self.algorithm} stream decompression failed: {str(e)}") from e
+    
     def add_observer(self, observer):
         """Add performance observer (Observer pattern)."""
         self._observers.append(observer)
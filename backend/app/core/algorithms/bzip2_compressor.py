@@ -13,6 +13,7 @@ from typing import Optional, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseCompressor, CompressionError, PerformanceMetrics
+from ..compression_executor import HEAVY_LANE
 from ...models.compression import CompressionAlgorithm, CompressionLevel
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,8 @@ class Bzip2Compressor(BaseCompressor):
     - Performance monitoring
     """
     
+    stream_lane = HEAVY_LANE
+    
     def __init__(self):
         """Initialize Bzip2 compressor."""
         super().__init__(CompressionAlgorithm.BZIP2)
@@ -197,55 +200,13 @@ class Bzip2Compressor(BaseCompressor):
             ]
         }
     
-    async def compress_stream(self, data_stream, level: CompressionLevel = CompressionLevel.BALANCED):
-        """
-        Compress data from a stream.
-        
-        Args:
-            data_stream: Async iterator of data chunks
-            level: Compression level
-            
-        Yields:
-            Compressed data chunks
-        """
-        try:
-            compressor = bz2.BZ2Compressor(compresslevel=self._compression_levels[level])
-            
-            async for chunk in data_stream:
-                compressed_chunk = compressor.compress(chunk)
-                if compressed_chunk:
-                    yield compressed_chunk
-            
-            # Flush remaining data
-            final_chunk = compressor.flush()
-            if final_chunk:
-                yield final_chunk
-                
-        except Exception as e:
-            logger.error(f"Bzip2 stream compression failed: {e}")
-            raise CompressionError(f"Bzip2 stream compression failed: {str(e)}")
+    def _create_stream_compressor(self, level: CompressionLevel):
+        """Create an incremental bzip2 compressor."""
+        return bz2.BZ2Compressor(self._level_value(level))
     
-    async def decompress_stream(self, compressed_stream):
-        """
-        Decompress data from a stream.
-        
-        Args:
-            compressed_stream: Async iterator of compressed data chunks
-            
-        Yields:
-            Decompressed data chunks
-        """
-        try:
-            decompressor = bz2.BZ2Decompressor()
-            
-            async for chunk in compressed_stream:
-                decompressed_chunk = decompressor.decompress(chunk)
-                if decompressed_chunk:
-                    yield decompressed_chunk
-                    
-        except Exception as e:
-            logger.error(f"Bzip2 stream decompression failed: {e}")
-            raise CompressionError(f"Bzip2 stream decompression failed: {str(e)}")
+    def _create_stream_decompressor(self):
+        """Create an incremental bzip2 decompressor."""
+        return bz2.BZ2Decompressor()
     
     def cleanup(self):
         """Clean up resources."""
@@ -5,6 +5,7 @@ Optimized for reliability, compatibility, and balanced performance.
 
 import gzip
 import io
+import zlib
 import asyncio
 import logging
 from typing import Optional
@@ -401,6 +402,14 @@ class GzipCompressor(BaseCompressor):
             ]
         }
     
+    def _create_stream_compressor(self, level: CompressionLevel):
+        """Create an incremental compressor producing a gzip member."""
+        return zlib.compressobj(self._level_value(level), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def _create_stream_decompressor(self):
+        """Create an incremental gzip decompressor."""
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    
     def cleanup(self):
         """Clean up resources."""
         try:
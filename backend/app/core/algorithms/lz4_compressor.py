@@ -15,6 +15,22 @@ from ...models.compression import CompressionAlgorithm, CompressionLevel
 logger = logging.getLogger(__name__)
 
 
+class _LZ4FrameStream:
+    """LZ4FrameCompressor with the frame header emitted by the first call."""
+    
+    def __init__(self, **frame_options):
+        self._compressor = lz4.frame.LZ4FrameCompressor(**frame_options)
+        self._header = self._compressor.begin()
+    
+    def compress(self, data: bytes) -> bytes:
+        header, self._header = self._header, b''
+        return header + self._compressor.compress(data)
+    
+    def flush(self) -> bytes:
+        header, self._header = self._header, b''
+        return header + self._compressor.flush()
+
+
 class LZ4Compressor(BaseCompressor):
     """
     LZ4 compression algorithm implementation.
@@ -452,6 +468,20 @@ class LZ4Compressor(BaseCompressor):
             logger.error(f"LZ4 performance benchmark failed: {e}")
             raise CompressionError(f"LZ4 performance benchmark failed: {str(e)}") from e
     
+    def _create_stream_compressor(self, level: CompressionLevel):
+        """Create an incremental LZ4 frame compressor."""
+        # The frame compressor takes a BLOCKSIZE_* id, not a byte count
+        return _LZ4FrameStream(
+            compression_level=self._level_value(level),
+            block_size=lz4.frame.BLOCKSIZE_MAX64KB,
+            content_checksum=self._content_checksum,
+            block_checksum=self._block_checksum
+        )
+    
+    def _create_stream_decompressor(self):
+        """Create an incremental LZ4 frame decompressor."""
+        return lz4.frame.LZ4FrameDecompressor()
+    
     def cleanup(self):
         """Clean up resources."""
         try:
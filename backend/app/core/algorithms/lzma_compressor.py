@@ -13,6 +13,7 @@ from typing import Optional, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseCompressor, CompressionError, PerformanceMetrics
+from ..compression_executor import HEAVY_LANE
 from ...models.compression import CompressionAlgorithm, CompressionLevel
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,8 @@ class LZMACompressor(BaseCompressor):
     - Error recovery mechanisms
     """
     
+    stream_lane = HEAVY_LANE
+    
     def __init__(self):
         """Initialize LZMA compressor."""
         super().__init__(CompressionAlgorithm.LZMA)
@@ -237,67 +240,20 @@ class LZMACompressor(BaseCompressor):
             ]
         }
     
-    async def compress_stream(self, data_stream, level: CompressionLevel = CompressionLevel.BALANCED):
-        """
-        Compress data from a stream.
-        
-        Args:
-            data_stream: Async iterator of data chunks
-            level: Compression level
-            
-        Yields:
-            Compressed data chunks
-        """
-        try:
-            compression_level = self._compression_levels[level]
-            dict_size = 1024 * 1024  # 1MB default dictionary
-            
-            # Configure LZMA compression
-            filters = [
-                {
-                    "id": lzma.FILTER_LZMA2,
-                    "preset": compression_level,
-                    "dict_size": dict_size,
-                }
-            ]
-            
-            compressor = lzma.LZMACompressor(filters=filters)
-            
-            async for chunk in data_stream:
-                compressed_chunk = compressor.compress(chunk)
-                if compressed_chunk:
-                    yield compressed_chunk
-            
-            # Flush remaining data
-            final_chunk = compressor.flush()
-            if final_chunk:
-                yield final_chunk
-                
-        except Exception as e:
-            logger.error(f"LZMA stream compression failed: {e}")
-            raise CompressionError(f"LZMA stream compression failed: {str(e)}")
+    def _create_stream_compressor(self, level: CompressionLevel):
+        """Create an incremental LZMA compressor (1MB dictionary)."""
+        filters = [
+            {
+                "id": lzma.FILTER_LZMA2,
+                "preset": self._level_value(level),
+                "dict_size": 1024 * 1024,
+            }
+        ]
+        return lzma.LZMACompressor(filters=filters)
     
-    async def decompress_stream(self, compressed_stream):
-        """
-        Decompress data from a stream.
-        
-        Args:
-            compressed_stream: Async iterator of compressed data chunks
-            
-        Yields:
-            Decompressed data chunks
-        """
-        try:
-            decompressor = lzma.LZMADecompressor()
-            
-            async for chunk in compressed_stream:
-                decompressed_chunk = decompressor.decompress(chunk)
-                if decompressed_chunk:
-                    yield decompressed_chunk
-                    
-        except Exception as e:
-            logger.error(f"LZMA stream decompression failed: {e}")
-            raise CompressionError(f"LZMA stream decompression failed: {str(e)}")
+    def _create_stream_decompressor(self):
+        """Create an incremental LZMA decompressor."""
+        return lzma.LZMADecompressor()
     
     def get_compression_ratio_estimate(self, content_size: int, content_type: str) -> float:
         """
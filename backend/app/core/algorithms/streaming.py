@@ -0,0 +1,177 @@
+"""
+Async streaming codec layer for the core compressors.
+
+Incremental compressor/decompressor objects (zlib, bz2, lzma, LZ4 frame,
+zstd) are driven from async chunk sources without blocking the event loop:
+
+- every incremental ``compress``/``decompress``/``flush`` call runs on the
+  shared compression executor
+- a reader task prefetches the source into a bounded queue, so reading the
+  next chunks overlaps with compressing the current ones while a slow
+  consumer throttles the source (backpressure)
+- chunks already queued are coalesced into one executor call to amortize
+  the hand-off cost for sources that yield many small pieces
+"""
+
+import asyncio
+from contextlib import suppress
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Union
+import logging
+
+from ..compression_executor import FAST_LANE, get_compression_executor
+from ...models.compression import CompressionAlgorithm
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING_CHUNKS = 8
+DEFAULT_MIN_BATCH_SIZE = 64 * 1024
+
+ChunkSource = Union[AsyncIterable[bytes], Iterable[bytes]]
+
+_END = object()
+
+
+class _SourceError:
+    """Error raised by the chunk source, handed over through the queue."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def _iterate(source: ChunkSource) -> AsyncIterator[bytes]:
+    """Iterate sync and async chunk sources alike."""
+    if hasattr(source, '__aiter__'):
+        async for chunk in source:
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+async def _read_into(source: ChunkSource, pending: asyncio.Queue):
+    """Prefetch chunks into ``pending``; blocks while the queue is full."""
+    try:
+        async for chunk in _iterate(source):
+            if chunk:
+                await pending.put(chunk)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await pending.put(_SourceError(e))
+        return
+    await pending.put(_END)
+
+
+async def _next_batch(pending: asyncio.Queue, min_batch_size: int):
+    """
+    Wait for the next chunk and coalesce whatever else is already queued.
+
+    Returns:
+        Tuple of (batch bytes, whether the source is exhausted)
+    """
+    parts = []
+    size = 0
+    item = await pending.get()
+
+    while True:
+        if item is _END:
+            return b''.join(parts), True
+        if isinstance(item, _SourceError):
+            raise item.error
+        parts.append(item)
+        size += len(item)
+        if size >= min_batch_size or pending.empty():
+            return (parts[0] if len(parts) == 1 else b''.join(parts)), False
+        item = pending.get_nowait()
+
+
+def _thread_lane(lane: str) -> str:
+    """Incremental codec objects are stateful, so they must stay in-process."""
+    executor = get_compression_executor()
+    if executor.lanes[lane].use_processes:
+        return FAST_LANE
+    return lane
+
+
+async def run_stream_codec(source: ChunkSource,
+                           process: Callable[[bytes], bytes],
+                           finish: Optional[Callable[[], bytes]] = None,
+                           lane: str = FAST_LANE,
+                           max_pending_chunks: int = DEFAULT_MAX_PENDING_CHUNKS,
+                           min_batch_size: int = DEFAULT_MIN_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    Run an incremental codec over a chunk source off the event loop.
+
+    Args:
+        source: Async or sync iterable of input chunks
+        process: Incremental codec call (e.g. ``compressobj.compress``)
+        finish: Final call flushing buffered output, if any
+        lane: Executor lane for codec calls
+        max_pending_chunks: Source chunks read ahead of the codec
+        min_batch_size: Queued chunks are coalesced up to this many bytes
+
+    Yields:
+        Non-empty output chunks in order
+
+    Raises:
+        CompressionQueueFullError: If the executor lane rejects a call
+    """
+    executor = get_compression_executor()
+    lane = _thread_lane(lane)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending_chunks))
+    reader = asyncio.create_task(_read_into(source, pending))
+
+    try:
+        done = False
+        while not done:
+            batch, done = await _next_batch(pending, min_batch_size)
+            if batch:
+                output = await executor.run(lane, process, batch)
+                if output:
+                    yield output
+
+        if finish is not None:
+            output = await executor.run(lane, finish)
+            if output:
+                yield output
+    finally:
+        # Stop prefetching if the consumer went away early
+        if not reader.done():
+            reader.cancel()
+            with suppress(asyncio.CancelledError):
+                await reader
+
+
+def get_streaming_compressor(algorithm: CompressionAlgorithm):
+    """
+    Get the registered core compressor for ``algorithm``, creating it on first use.
+
+    Args:
+        algorithm: Compression algorithm
+
+    Returns:
+        BaseCompressor instance supporting ``compress_stream``/``decompress_stream``
+
+    Raises:
+        ValueError: If the algorithm has no streaming implementation
+    """
+    # Imported here: the compressor modules import this module via base
+    from .base import AlgorithmRegistry
+    from .bzip2_compressor import Bzip2Compressor
+    from .gzip_compressor import GzipCompressor
+    from .lz4_compressor import LZ4Compressor
+    from .lzma_compressor import LZMACompressor
+    from .zstandard_compressor import ZstandardCompressor
+
+    implementations = {
+        CompressionAlgorithm.GZIP: GzipCompressor,
+        CompressionAlgorithm.BZIP2: Bzip2Compressor,
+        CompressionAlgorithm.LZ4: LZ4Compressor,
+        CompressionAlgorithm.LZMA: LZMACompressor,
+        CompressionAlgorithm.ZSTD: ZstandardCompressor,
+    }
+    if algorithm not in implementations:
+        raise ValueError(f"Streaming is not supported for {algorithm}")
+
+    # Compressors register themselves on construction
+    return AlgorithmRegistry().get(algorithm) or implementations[algorithm]()
@@ -9,11 +9,13 @@ import asyncio
 import zstandard as zstd
 import time
 import logging
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseCompressor, CompressionError, PerformanceMetrics
+from ..codec_contexts import get_codec_context_pool
+from ..zstd_dictionaries import get_dictionary_registry
 from ...models.compression import CompressionAlgorithm, CompressionLevel
 
 logger = logging.getLogger(__name__)
@@ -80,34 +82,38 @@ class ZstandardCompressor(BaseCompressor):
             raise CompressionError(f"Zstandard initialization failed: {e}")
     
     
-    def train_dictionary(self, training_data: bytes, dict_size: int = 32768) -> bool:
+    def train_dictionary(self,
+                         training_data: Union[bytes, List[bytes]],
+                         dict_size: int = 112640,
+                         category: str = "default") -> bool:
         """
-        Train a compression dictionary from sample data.
+        Train a compression dictionary and register it for a content category.
+        
+        The dictionary is stored and versioned by the shared
+        ``ZstdDictionaryRegistry`` so other compressors and processes can
+        use it, and is enabled on this instance.
         
         Args:
-            training_data: Sample data for dictionary training
-            dict_size: Size of the dictionary in bytes
+            training_data: Sample records, or one blob of newline-separated records
+            dict_size: Maximum size of the dictionary in bytes
+            category: Content category the dictionary is registered under
             
         Returns:
             True if training was successful
         """
         try:
-            logger.info(f"Training Zstandard dictionary with {len(training_data)} bytes of data")
+            samples = training_data.splitlines(keepends=True) if isinstance(training_data, bytes) else training_data
+            logger.info(f"Training Zstandard dictionary for {category} from {len(samples)} samples")
             
-            # Train dictionary
-            self.dictionary = zstd.train_dictionary(
-                dict_size, 
-                [training_data],
-                k=50,  # Number of samples to use
-                d=8,   # Dictionary size in bytes
-                f=20,  # Number of training files
-                split_point=0.75  # Split point for training
-            )
+            registry = get_dictionary_registry()
+            version = registry.train(category, samples, dict_size=dict_size, level=self.config.level)
+            self.dictionary = registry.compression_dict(version.dict_id, self.config.level)
+            self.config.enable_dictionary = True
             
             # Reinitialize compressors with new dictionary
             self._initialize_compressors()
             
-            logger.info(f"Zstandard dictionary training completed: {len(self.dictionary)} bytes")
+            logger.info(f"Zstandard dictionary training completed: {version.size} bytes (id {version.dict_id})")
             return True
             
         except Exception as e:
@@ -198,28 +204,41 @@ class ZstandardCompressor(BaseCompressor):
         except ImportError:
             return 0.0
     
+    def _active_dictionary(self) -> Optional[zstd.ZstdCompressionDict]:
+        """Dictionary used for compression, if enabled and trained."""
+        if self.config.enable_dictionary and self.dictionary:
+            return self.dictionary
+        return None
+    
     # Required abstract method implementations
     async def _compress_impl(self, data: bytes, level: CompressionLevel) -> bytes:
         """Implementation-specific Zstandard compression logic."""
         zstd_level = self._compression_levels.get(level, 6)
+        dictionary = self._active_dictionary()
         
         loop = asyncio.get_running_loop()
         
-        # Use run_in_executor for CPU-bound compression
+        # Use run_in_executor for CPU-bound compression; worker threads
+        # reuse their cached compressor for this level/dictionary
         compressed_data = await loop.run_in_executor(
             self._executor,
-            lambda: zstd.compress(data, level=zstd_level)
+            lambda: get_codec_context_pool().zstd_compressor(zstd_level, dictionary).compress(data)
         )
         return compressed_data
     
     async def _decompress_impl(self, data: bytes) -> bytes:
         """Implementation-specific Zstandard decompression logic."""
+        dictionary = self._active_dictionary()
+        if dictionary is None or zstd.get_frame_parameters(data).dict_id != dictionary.dict_id():
+            # Frame written with a registered dictionary (or none)
+            dictionary = get_dictionary_registry().dictionary_for_frame(data)
+        
         loop = asyncio.get_running_loop()
         
         # Use run_in_executor for CPU-bound decompression
         decompressed_data = await loop.run_in_executor(
             self._executor,
-            lambda: zstd.decompress(data)
+            lambda: get_codec_context_pool().zstd_decompressor(dictionary).decompress(data)
         )
         return decompressed_data
     
@@ -241,6 +260,19 @@ class ZstandardCompressor(BaseCompressor):
         # Zstandard can handle any byte data, but empty data is not useful
         return isinstance(data, bytes) and len(data) > 0
     
+    def _create_stream_compressor(self, level: CompressionLevel):
+        """Create an incremental zstd compressor (a dedicated context, not a pooled one)."""
+        compressor = zstd.ZstdCompressor(
+            level=self._level_value(level),
+            dict_data=self._active_dictionary(),
+            write_checksum=self.config.enable_checksum
+        )
+        return compressor.compressobj()
+    
+    def _create_stream_decompressor(self):
+        """Create an incremental zstd decompressor."""
+        return zstd.ZstdDecompressor(dict_data=self._active_dictionary()).decompressobj()
+    
     def cleanup(self):
         """Clean up resources and shutdown executor."""
         try:
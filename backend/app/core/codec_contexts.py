@@ -0,0 +1,134 @@
+"""
+Codec Contexts: Per-thread reuse of compressor/decompressor objects.
+
+Constructing a ``zstd.ZstdCompressor`` allocates match tables and window
+buffers, which dominates the cost of compressing small payloads. This
+module caches codec objects per (thread, algorithm, level, dictionary) so
+that repeated calls reuse them. Zstandard contexts are not thread-safe,
+hence the thread-local storage.
+
+LZ4 and Brotli are intentionally not pooled: ``lz4.frame.compress`` already
+uses a stack-allocated context (reusing ``LZ4FrameCompressor`` is slower
+through the Python API), and the Brotli bindings expose no resettable
+encoder state.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class CodecContextPool:
+    """
+    Thread-local LRU cache of reusable codec objects.
+
+    Dictionaries are keyed by object identity; the cached entry keeps a
+    reference to the dictionary so the identity stays valid while cached.
+    """
+
+    def __init__(self, max_contexts_per_thread: int = 32):
+        """Initialize codec context pool."""
+        self.max_contexts_per_thread = max_contexts_per_thread
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def _contexts(self) -> "OrderedDict[Hashable, Any]":
+        contexts = getattr(self._local, "contexts", None)
+        if contexts is None:
+            contexts = OrderedDict()
+            self._local.contexts = contexts
+        return contexts
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get the calling thread's context for ``key``, creating it if needed.
+
+        Args:
+            key: Context key, e.g. ``("zstd-c", level, dict_key)``
+            factory: Builds a new context on a miss
+
+        Returns:
+            Codec context object
+        """
+        contexts = self._contexts()
+        entry = contexts.get(key)
+        if entry is not None:
+            contexts.move_to_end(key)
+            with self._lock:
+                self.reused += 1
+            return entry
+
+        entry = factory()
+        contexts[key] = entry
+        evicted = 0
+        while len(contexts) > self.max_contexts_per_thread:
+            contexts.popitem(last=False)
+            evicted += 1
+        with self._lock:
+            self.created += 1
+            self.evicted += evicted
+        return entry
+
+    @staticmethod
+    def _dict_key(dict_data: Optional[Any]) -> Optional[int]:
+        return id(dict_data) if dict_data is not None else None
+
+    def zstd_compressor(self, level: int, dict_data: Optional["zstd.ZstdCompressionDict"] = None) -> "zstd.ZstdCompressor":
+        """Get a reusable Zstandard compressor for this thread."""
+        key = ("zstd-c", level, self._dict_key(dict_data))
+        _, compressor = self.get(
+            key, lambda: (dict_data, zstd.ZstdCompressor(level=level, dict_data=dict_data))
+        )
+        return compressor
+
+    def zstd_decompressor(self, dict_data: Optional["zstd.ZstdCompressionDict"] = None) -> "zstd.ZstdDecompressor":
+        """Get a reusable Zstandard decompressor for this thread."""
+        key = ("zstd-d", self._dict_key(dict_data))
+        _, decompressor = self.get(
+            key, lambda: (dict_data, zstd.ZstdDecompressor(dict_data=dict_data))
+        )
+        return decompressor
+
+    def clear(self):
+        """Drop the calling thread's cached contexts."""
+        self._contexts().clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get context reuse statistics."""
+        with self._lock:
+            total = self.created + self.reused
+            return {
+                "contexts_created": self.created,
+                "contexts_reused": self.reused,
+                "contexts_evicted": self.evicted,
+                "reuse_rate": self.reused / total if total > 0 else 0.0
+            }
+
+
+# Process-wide pool (each worker process gets its own)
+_codec_context_pool: Optional[CodecContextPool] = None
+
+
+def get_codec_context_pool() -> CodecContextPool:
+    """
+    Get the global codec context pool singleton.
+
+    Returns:
+        Global CodecContextPool instance
+    """
+    global _codec_context_pool
+    if _codec_context_pool is None:
+        _codec_context_pool = CodecContextPool()
+    return _codec_context_pool
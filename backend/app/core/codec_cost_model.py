@@ -0,0 +1,354 @@
+"""
+Online codec cost model.
+
+Every real compression is recorded as::
+
+    (content profile, size bucket, codec, level) -> (ratio, compress MB/s)
+
+and every decompression as ``(codec, size bucket) -> decompress MB/s``.
+Estimates are exponentially decayed averages with a time half-life, so the
+model follows changes in hardware, load and content instead of static rule
+tables.
+
+Each observation also updates coarser buckets (any size, any profile), so a
+query for a profile/size that has not been seen yet falls back to the
+closest measured scope. ``select`` returns the codec/level with the best
+ratio among those whose estimates meet a caller-supplied service level
+(compression latency, compress or decompress throughput).
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ANY = "*"
+PROFILE_SAMPLE = 16 * 1024
+MB = 1e6
+
+# Scopes from most to least specific: (use profile, use size bucket)
+_SCOPES = ((True, True), (True, False), (False, True), (False, False))
+
+
+def size_bucket(size: int) -> int:
+    """Bucket ``b`` covers sizes in ``[4**b, 4**(b + 1))`` bytes."""
+    return (max(size, 1).bit_length() - 1) // 2
+
+
+def content_profile(data: bytes) -> str:
+    """
+    Cheap content profile of a payload: structure class and entropy band.
+
+    Looks at the first ``PROFILE_SAMPLE`` bytes only, e.g. ``'json/mid'``
+    or ``'binary/high'``.
+    """
+    sample = bytes(data[:PROFILE_SAMPLE])
+    if not sample:
+        return "empty"
+
+    try:
+        sample.decode('utf-8')
+        is_text = True
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut by the sample boundary is still text
+        is_text = e.start >= len(sample) - 3 and e.reason == 'unexpected end of data'
+
+    if is_text:
+        head = sample.lstrip()[:1]
+        kind = "json" if head in (b'{', b'[') else "markup" if head == b'<' else "text"
+    else:
+        kind = "binary"
+
+    counts = np.bincount(np.frombuffer(sample, dtype=np.uint8), minlength=256)
+    probabilities = counts[counts > 0] / len(sample)
+    entropy = float(-(probabilities * np.log2(probabilities)).sum())
+    band = "low" if entropy < 4.0 else "mid" if entropy < 7.0 else "high"
+    return f"{kind}/{band}"
+
+
+@dataclass
+class DecayedMean:
+    """Average whose samples lose half their weight every half-life."""
+    value: float = 0.0
+    weight: float = 0.0
+    updated: float = 0.0
+
+    def update(self, sample: float, now: float, half_life: float):
+        if self.weight:
+            self.weight *= 0.5 ** (max(0.0, now - self.updated) / half_life)
+        self.weight += 1.0
+        self.value += (sample - self.value) / self.weight
+        self.updated = now
+
+
+@dataclass
+class CodecEstimate:
+    """Decayed performance estimates for one bucket."""
+    ratio: DecayedMean = field(default_factory=DecayedMean)
+    throughput: DecayedMean = field(default_factory=DecayedMean)  # MB/s
+    samples: int = 0
+
+
+@dataclass
+class ServiceLevel:
+    """
+    Caller requirements for codec selection (unset fields are unconstrained).
+
+    Attributes:
+        max_latency: Seconds allowed to compress the payload
+        min_compress_mbps: Minimum compression throughput (MB/s)
+        min_decompress_mbps: Minimum decompression throughput (MB/s)
+    """
+    max_latency: Optional[float] = None
+    min_compress_mbps: Optional[float] = None
+    min_decompress_mbps: Optional[float] = None
+
+    def is_met(self, option: Dict[str, Any]) -> bool:
+        """Whether an option from ``CodecCostModel.estimate`` meets this level."""
+        if self.max_latency is not None and option['latency'] > self.max_latency:
+            return False
+        if self.min_compress_mbps is not None and option['compress_mbps'] < self.min_compress_mbps:
+            return False
+        if self.min_decompress_mbps is not None:
+            # Unmeasured decompression cannot be shown to meet the level
+            if option['decompress_mbps'] is None or option['decompress_mbps'] < self.min_decompress_mbps:
+                return False
+        return True
+
+
+class CodecCostModel:
+    """
+    Exponentially decayed per-bucket codec performance model.
+
+    Thread-safe; recording is O(1) per observation.
+    """
+
+    def __init__(self,
+                 half_life: float = 600.0,
+                 min_samples: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize model.
+
+        Args:
+            half_life: Seconds after which an observation counts half
+            min_samples: Observations a bucket needs before it is used
+            clock: Monotonic time source
+        """
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.half_life = half_life
+        self.min_samples = max(1, min_samples)
+        self._clock = clock
+        self._compress: Dict[Tuple[str, Any, str, Any], CodecEstimate] = {}
+        self._decompress: Dict[Tuple[str, Any], CodecEstimate] = {}
+        self._lock = threading.Lock()
+        self.observations = 0
+
+    def record_compression(self,
+                           profile: str,
+                           size: int,
+                           codec: str,
+                           level: Any,
+                           compressed_size: int,
+                           seconds: float):
+        """
+        Record one compression.
+
+        Args:
+            profile: Content profile (see ``content_profile``)
+            size: Original size in bytes
+            codec: Codec name
+            level: Codec level
+            compressed_size: Output size in bytes
+            seconds: Codec run time
+        """
+        if size <= 0 or compressed_size <= 0 or seconds <= 0:
+            return
+        ratio = size / compressed_size
+        mbps = size / MB / seconds
+        bucket = size_bucket(size)
+        now = self._clock()
+        with self._lock:
+            self.observations += 1
+            for use_profile, use_size in _SCOPES:
+                key = (profile if use_profile else ANY, bucket if use_size else ANY, codec, level)
+                estimate = self._compress.setdefault(key, CodecEstimate())
+                estimate.ratio.update(ratio, now, self.half_life)
+                estimate.throughput.update(mbps, now, self.half_life)
+                estimate.samples += 1
+
+    def record_decompression(self, size: int, codec: str, seconds: float):
+        """
+        Record one decompression.
+
+        Args:
+            size: Decompressed size in bytes
+            codec: Codec name
+            seconds: Codec run time
+        """
+        if size <= 0 or seconds <= 0:
+            return
+        mbps = size / MB / seconds
+        now = self._clock()
+        with self._lock:
+            for key in ((codec, size_bucket(size)), (codec, ANY)):
+                estimate = self._decompress.setdefault(key, CodecEstimate())
+                estimate.throughput.update(mbps, now, self.half_life)
+                estimate.samples += 1
+
+    def _lookup(self, table: dict, keys) -> Tuple[Optional[CodecEstimate], Optional[Tuple]]:
+        """First of ``keys`` with enough samples."""
+        for key in keys:
+            estimate = table.get(key)
+            if estimate is not None and estimate.samples >= self.min_samples:
+                return estimate, key
+        return None, None
+
+    def estimate(self,
+                 profile: str,
+                 size: int,
+                 codecs: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Current estimates for every measured codec/level.
+
+        Args:
+            profile: Content profile
+            size: Payload size in bytes
+            codecs: Restrict to these codecs
+
+        Returns:
+            One option per codec/level with ratio, throughputs, predicted
+            latency and the scope the estimate came from
+        """
+        bucket = size_bucket(size)
+        with self._lock:
+            pairs = sorted({(codec, level) for _, _, codec, level in self._compress
+                            if codecs is None or codec in codecs}, key=lambda pair: (pair[0], str(pair[1])))
+            options = []
+            for codec, level in pairs:
+                keys = [(profile if use_profile else ANY, bucket if use_size else ANY, codec, level)
+                        for use_profile, use_size in _SCOPES]
+                estimate, key = self._lookup(self._compress, keys)
+                if estimate is None:
+                    continue
+                decompress, _ = self._lookup(self._decompress, [(codec, bucket), (codec, ANY)])
+                compress_mbps = estimate.throughput.value
+                options.append({
+                    'codec': codec,
+                    'level': level,
+                    'ratio': estimate.ratio.value,
+                    'compress_mbps': compress_mbps,
+                    'decompress_mbps': decompress.throughput.value if decompress is not None else None,
+                    'latency': size / MB / compress_mbps if compress_mbps > 0 else math.inf,
+                    'samples': estimate.samples,
+                    'scope': {'profile': key[0], 'size_bucket': key[1]}
+                })
+        return options
+
+    def select(self,
+               profile: str,
+               size: int,
+               service_level: Optional[ServiceLevel] = None,
+               codecs: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Choose a codec/level for a payload.
+
+        Picks the best ratio among options meeting ``service_level`` (ties go
+        to the faster one). If none does, picks the fastest option and marks
+        it with ``meets_service_level = False``.
+
+        Args:
+            profile: Content profile
+            size: Payload size in bytes
+            service_level: Requirements (None accepts every option)
+            codecs: Restrict to these codecs
+
+        Returns:
+            Selected option, or None if the model has no data yet
+        """
+        options = self.estimate(profile, size, codecs)
+        if not options:
+            return None
+
+        service_level = service_level or ServiceLevel()
+        eligible = [option for option in options if service_level.is_met(option)]
+        if eligible:
+            choice = max(eligible, key=lambda option: (option['ratio'], option['compress_mbps']))
+        else:
+            choice = max(options, key=lambda option: option['compress_mbps'])
+        return dict(choice, meets_service_level=bool(eligible))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Model contents for inspection."""
+        now = self._clock()
+        with self._lock:
+            def age(mean: DecayedMean) -> float:
+                return round(now - mean.updated, 3)
+
+            compression = [
+                {
+                    'profile': profile, 'size_bucket': bucket, 'codec': codec, 'level': level,
+                    'ratio': estimate.ratio.value, 'compress_mbps': estimate.throughput.value,
+                    'samples': estimate.samples, 'weight': estimate.ratio.weight,
+                    'age_seconds': age(estimate.ratio)
+                }
+                for (profile, bucket, codec, level), estimate in self._compress.items()
+            ]
+            decompression = [
+                {
+                    'codec': codec, 'size_bucket': bucket, 'decompress_mbps': estimate.throughput.value,
+                    'samples': estimate.samples, 'age_seconds': age(estimate.throughput)
+                }
+                for (codec, bucket), estimate in self._decompress.items()
+            ]
+            return {
+                'half_life': self.half_life,
+                'min_samples': self.min_samples,
+                'observations': self.observations,
+                'compression': compression,
+                'decompression': decompression
+            }
+
+    def clear(self):
+        """Forget all observations."""
+        with self._lock:
+            self._compress.clear()
+            self._decompress.clear()
+            self.observations = 0
+
+
+# Process-wide model fed by every compression
+_cost_model: Optional[CodecCostModel] = None
+_cost_model_lock = threading.Lock()
+
+
+def get_codec_cost_model() -> CodecCostModel:
+    """
+    Get the global codec cost model singleton.
+
+    Returns:
+        Global CodecCostModel instance
+    """
+    global _cost_model
+    if _cost_model is None:
+        with _cost_model_lock:
+            if _cost_model is None:
+                from ..config import settings
+                _cost_model = CodecCostModel(
+                    half_life=settings.compression.cost_model_half_life,
+                    min_samples=settings.compression.cost_model_min_samples
+                )
+    return _cost_model
+
+
+def cost_model_enabled() -> bool:
+    """Whether compressions are recorded into the global model."""
+    from ..config import settings
+    return settings.compression.cost_model_enabled
@@ -5,12 +5,26 @@ Supports: gzip, zstd, lz4, lzma, brotli
 Features: Content-hash caching, performance metrics, algorithm selection
 """
 
+import base64
 import hashlib
 import time
 import asyncio
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 import logging
 
+from .codec_contexts import get_codec_context_pool
+from .zstd_dictionaries import get_dictionary_registry
+from .codec_cost_model import content_profile, cost_model_enabled, get_codec_cost_model
+from .compression_executor import (
+    CompressionQueueFullError, get_compression_executor, take_last_run_time, FAST_LANE, HEAVY_LANE
+)
+from ..models.compression import (
+    CompressionRequest, CompressionResponse, CompressionParameters,
+    CompressionResult as CompressionResultModel, CompressionLevel
+)
+
 # Compression libraries (import conditionally)
 try:
     import gzip
@@ -56,7 +70,8 @@ class CompressionResult:
         compression_time: float,
         compressed_data: Optional[bytes] = None,
         success: bool = True,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        timed_out: bool = False
     ):
         self.algorithm = algorithm
         self.original_size = original_size
@@ -65,6 +80,7 @@ class CompressionResult:
         self.compression_time = compression_time
         self.success = success
         self.error = error
+        self.timed_out = timed_out
 
         # Computed metrics
         self.compression_ratio = (
@@ -77,24 +93,114 @@ class CompressionResult:
         )
 
 
+class CompressionCache:
+    """
+    Byte-budgeted LRU cache for compression results.
+    
+    Entries are keyed on ``algorithm:level:sha256`` and evicted in
+    least-recently-used order once either the entry limit or the byte
+    budget (sum of compressed payload sizes) is exceeded.
+    """
+    
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CompressionResult]" = OrderedDict()
+        self.current_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _entry_size(result: CompressionResult) -> int:
+        """Bytes charged against the budget for a cached result."""
+        return len(result.compressed_data) if result.compressed_data else 0
+    
+    def get(self, key: str) -> Optional[CompressionResult]:
+        """Get a cached result and mark it as most recently used."""
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+    
+    def put(self, key: str, result: CompressionResult) -> bool:
+        """
+        Store a result, evicting least recently used entries as needed.
+        
+        Returns:
+            False if the result alone exceeds the byte budget and was not cached
+        """
+        size = self._entry_size(result)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return False
+        
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self._entry_size(self.entries.pop(key))
+            
+            self.entries[key] = result
+            self.current_bytes += size
+            
+            while (len(self.entries) > self.max_entries
+                   or self.current_bytes > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= self._entry_size(evicted)
+                self.evictions += 1
+            return True
+    
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "cache_size": len(self.entries),
+                "cache_max_entries": self.max_entries,
+                "cache_bytes": self.current_bytes,
+                "cache_max_bytes": self.max_bytes,
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_evictions": self.evictions,
+                "hit_rate": self.hits / total if total > 0 else 0.0
+            }
+
+
 class CompressionEngine:
     """
     Multi-algorithm compression engine with caching.
     
     Supports parallel compression, caching by content hash,
-    and detailed performance metrics.
+    and detailed performance metrics. API endpoints share a single
+    process-wide instance obtained through ``get_compression_engine``.
     """
     
-    def __init__(self, cache_size: int = 1000):
+    def __init__(self, cache_size: int = 1000, cache_max_bytes: int = 64 * 1024 * 1024):
         """Initialize compression engine."""
         self.algorithms = self._register_algorithms()
-        self.cache: Dict[str, CompressionResult] = {}
+        self.cache = CompressionCache(max_entries=cache_size, max_bytes=cache_max_bytes)
         self.cache_size = cache_size
         
         # Performance tracking
         self.total_operations = 0
-        self.cache_hits = 0
-        self.cache_misses = 0
         
         logger.info(f"CompressionEngine initialized with {len(self.algorithms)} algorithms")
     
@@ -119,15 +225,6 @@ class CompressionEngine:
         """Get SHA-256 hash of content."""
         return hashlib.sha256(data).hexdigest()
     
-    def _manage_cache_size(self):
-        """Keep cache within size limits (simple LRU-like)."""
-        if len(self.cache) > self.cache_size:
-            # Remove oldest entries (simplified)
-            excess = len(self.cache) - self.cache_size
-            keys_to_remove = list(self.cache.keys())[:excess]
-            for key in keys_to_remove:
-                del self.cache[key]
-    
     async def compress(
         self,
         data: bytes,
@@ -146,6 +243,9 @@ class CompressionEngine:
             
         Returns:
             CompressionResult with metrics
+            
+        Raises:
+            CompressionQueueFullError: If the compression executor rejects the job
         """
         self.total_operations += 1
         
@@ -165,22 +265,26 @@ class CompressionEngine:
             content_hash = self._get_content_hash(data)
             cache_key = f"{algorithm}:{level}:{content_hash}"
             
-            if cache_key in self.cache:
-                self.cache_hits += 1
-                cached_result = self.cache[cache_key]
+            cached_result = self.cache.get(cache_key)
+            if cached_result is not None:
                 logger.debug(f"Cache hit for {cache_key}")
                 return cached_result
-            
-            self.cache_misses += 1
-            
-            # Perform compression
+        
+        # Perform compression
         compressor = self.algorithms[algorithm]
         
         start_time = time.time()
         try:
+            take_last_run_time()
             compressed_data = await compressor.compress(data, level)
             compression_time = time.time() - start_time
             
+            if cost_model_enabled():
+                get_codec_cost_model().record_compression(
+                    content_profile(data), len(data), algorithm, level, len(compressed_data),
+                    take_last_run_time() or compression_time
+                )
+            
             result = CompressionResult(
                 algorithm=algorithm,
                 original_size=len(data),
@@ -192,14 +296,16 @@ class CompressionEngine:
             
             # Cache result
             if use_cache:
-                self.cache[cache_key] = result
-                self._manage_cache_size()
+                self.cache.put(cache_key, result)
             
             logger.debug(f"Compressed {len(data)} bytes to {len(compressed_data)} bytes "
                         f"with {algorithm} in {compression_time:.3f}s")
             
             return result
             
+        except CompressionQueueFullError:
+            # Admission control: let the API layer answer with 429
+            raise
         except Exception as e:
             compression_time = time.time() - start_time
             logger.error(f"Compression failed with {algorithm}: {e}")
@@ -233,11 +339,218 @@ class CompressionEngine:
         
         compressor = self.algorithms[algorithm]
         
+        start_time = time.time()
         try:
-            return await compressor.decompress(compressed_data)
+            take_last_run_time()
+            data = await compressor.decompress(compressed_data)
         except Exception as e:
             logger.error(f"Decompression failed with {algorithm}: {e}")
             raise
+        
+        if cost_model_enabled():
+            get_codec_cost_model().record_decompression(
+                len(data), algorithm, take_last_run_time() or time.time() - start_time
+            )
+        return data
+    
+    # Named levels map onto each codec's integer level scale
+    NAMED_LEVELS = {
+        CompressionLevel.FAST: 1,
+        CompressionLevel.BALANCED: 6,
+        CompressionLevel.OPTIMAL: 8,
+        CompressionLevel.MAXIMUM: 9
+    }
+    
+    def resolve_level(self, algorithm: str, level: Any) -> int:
+        """Convert an enum or integer level to a level the codec accepts."""
+        if isinstance(level, int):
+            numeric_level = level
+        else:
+            numeric_level = self.NAMED_LEVELS.get(CompressionLevel(level), 6)
+        
+        compressor = self.algorithms.get(algorithm)
+        if compressor is None:
+            return numeric_level
+        return max(min(compressor.supported_levels), min(max(compressor.supported_levels), numeric_level))
+    
+    def _request_key(self, request: CompressionRequest) -> str:
+        """Deduplication key for a compression request."""
+        algorithm = request.parameters.algorithm.value
+        level = self.resolve_level(algorithm, request.parameters.level)
+        if request.content is None:
+            return f"{algorithm}:{level}:file:{request.file_id}"
+        return f"{algorithm}:{level}:{self._get_content_hash(request.content.encode('utf-8'))}"
+    
+    async def compress_request(self, request: CompressionRequest, use_cache: bool = True) -> CompressionResponse:
+        """
+        Compress the content of an API compression request.
+        
+        Args:
+            request: Compression request with text content and parameters
+            use_cache: Whether to use content-hash caching
+            
+        Returns:
+            CompressionResponse with result model and base64 payload
+            
+        Raises:
+            CompressionQueueFullError: If the compression executor rejects the job
+        """
+        start_time = time.time()
+        algorithm = request.parameters.algorithm.value
+        
+        if request.content is None:
+            return CompressionResponse(
+                success=False,
+                message="Compression failed: file_id requests are not supported by the engine",
+                error="file_id requests are not supported by the engine",
+                error_code="UNSUPPORTED_SOURCE",
+                processing_time=time.time() - start_time
+            )
+        
+        data = request.content.encode('utf-8')
+        level = self.resolve_level(algorithm, request.parameters.level)
+        result = await self.compress(data, algorithm=algorithm, level=level, use_cache=use_cache)
+        
+        if not result.success:
+            return CompressionResponse(
+                success=False,
+                message=f"Compression failed: {result.error}",
+                error=result.error,
+                error_code="COMPRESSION_FAILED",
+                processing_time=time.time() - start_time
+            )
+        
+        try:
+            result_model = self.build_result_model(result, request.parameters)
+        except Exception as e:
+            return CompressionResponse(
+                success=False,
+                message=f"Compression failed: {e}",
+                error=str(e),
+                error_code="RESULT_INVALID",
+                processing_time=time.time() - start_time
+            )
+        
+        return CompressionResponse(
+            success=True,
+            message="Compression completed successfully",
+            result=result_model,
+            compressed_content=base64.b64encode(result.compressed_data).decode('ascii'),
+            processing_time=time.time() - start_time,
+            metadata={"level": level}
+        )
+    
+    def build_result_model(
+        self,
+        result: CompressionResult,
+        parameters: CompressionParameters
+    ) -> CompressionResultModel:
+        """Convert an engine result into the API result model."""
+        return CompressionResultModel(
+            original_size=result.original_size,
+            compressed_size=result.compressed_size,
+            compression_ratio=result.compression_ratio,
+            compression_percentage=result.space_saved_percent,
+            algorithm_used=parameters.algorithm,
+            parameters_used=parameters,
+            compression_time=result.compression_time
+        )
+    
+    async def compare(
+        self,
+        data: bytes,
+        algorithms: List[str],
+        level: Any = 6,
+        time_budget: Optional[float] = None,
+        use_cache: bool = True
+    ) -> Dict[str, CompressionResult]:
+        """
+        Compress the same data with several algorithms concurrently.
+        
+        Each algorithm gets its own time budget; an algorithm that exceeds
+        it is reported as a failed result with ``timed_out`` set, so the
+        comparison returns partial results instead of stalling.
+        
+        Args:
+            data: Data to compress
+            algorithms: Algorithm names to compare
+            level: Level applied to every algorithm (enum or integer)
+            time_budget: Per-algorithm budget in seconds (None for no limit)
+            use_cache: Whether to use content-hash caching
+            
+        Returns:
+            Results keyed by algorithm name, in the requested order
+            
+        Raises:
+            CompressionQueueFullError: If the compression executor rejects a job
+        """
+        unique_algorithms = list(dict.fromkeys(algorithms))
+        
+        async def run(algorithm: str) -> CompressionResult:
+            codec_level = self.resolve_level(algorithm, level)
+            try:
+                return await asyncio.wait_for(
+                    self.compress(data, algorithm=algorithm, level=codec_level, use_cache=use_cache),
+                    timeout=time_budget
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"{algorithm} exceeded comparison time budget of {time_budget:.3f}s")
+                return CompressionResult(
+                    algorithm=algorithm,
+                    original_size=len(data),
+                    compressed_size=0,
+                    compressed_data=None,
+                    compression_time=time_budget,
+                    success=False,
+                    error=f"Time budget of {time_budget:.3f}s exceeded",
+                    timed_out=True
+                )
+        
+        results = await asyncio.gather(*(run(algorithm) for algorithm in unique_algorithms))
+        return dict(zip(unique_algorithms, results))
+    
+    async def iter_batch(
+        self,
+        requests: List[CompressionRequest],
+        max_concurrency: int = 4,
+        use_cache: bool = True
+    ) -> AsyncIterator[Tuple[int, CompressionResponse]]:
+        """
+        Compress a batch of requests, yielding results as they complete.
+        
+        Identical requests (same algorithm, level and content hash) are
+        compressed once; duplicates receive a copy of the response with
+        ``metadata.duplicate_of`` set to the index that was compressed.
+        
+        Args:
+            requests: Compression requests
+            max_concurrency: Maximum number of requests compressing at once
+            use_cache: Whether to use content-hash caching
+            
+        Yields:
+            (request index, response) tuples in completion order
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, request in enumerate(requests):
+            groups.setdefault(self._request_key(request), []).append(index)
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def run(indices: List[int]) -> Tuple[List[int], CompressionResponse]:
+            async with semaphore:
+                return indices, await self.compress_request(requests[indices[0]], use_cache=use_cache)
+        
+        tasks = [asyncio.ensure_future(run(indices)) for indices in groups.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indices, response = await next_done
+                yield indices[0], response
+                for duplicate in indices[1:]:
+                    metadata = dict(response.metadata or {}, duplicate_of=indices[0])
+                    yield duplicate, response.model_copy(update={"metadata": metadata})
+        finally:
+            for task in tasks:
+                task.cancel()
     
     def get_available_algorithms(self) -> List[str]:
         """Get list of available compression algorithms."""
@@ -245,33 +558,114 @@ class CompressionEngine:
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
-        total_requests = self.cache_hits + self.cache_misses
-        hit_rate = (self.cache_hits / total_requests) if total_requests > 0 else 0.0
-        
-        return {
-            "cache_size": len(self.cache),
-            "cache_hits": self.cache_hits,
-            "cache_misses": self.cache_misses,
-            "hit_rate": hit_rate,
-            "total_operations": self.total_operations
-        }
+        stats = self.cache.get_stats()
+        stats["total_operations"] = self.total_operations
+        return stats
     
     def clear_cache(self):
         """Clear compression cache."""
         self.cache.clear()
-        self.cache_hits = 0
-        self.cache_misses = 0
         logger.info("Compression cache cleared")
 
 
+# Process-wide engine shared by API endpoints
+_compression_engine: Optional[CompressionEngine] = None
+
+
+def get_compression_engine() -> CompressionEngine:
+    """
+    Get the global compression engine singleton.
+    
+    Used as a FastAPI dependency so the result cache survives across
+    requests instead of being rebuilt for each one.
+    
+    Returns:
+        Global CompressionEngine instance
+    """
+    global _compression_engine
+    if _compression_engine is None:
+        from ..config import settings
+        _compression_engine = CompressionEngine(
+            cache_size=settings.compression.cache_max_entries,
+            cache_max_bytes=settings.compression.cache_max_bytes
+        )
+    return _compression_engine
+
+
+# Codec calls (module-level so they can run in a process-backed lane)
+def _gzip_compress(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level)
+
+
+def _dictionaries_enabled() -> bool:
+    from ..config import settings
+    return settings.compression.dictionaries_enabled
+
+
+def _zstd_compress(data: bytes, level: int) -> bytes:
+    # Small payloads use (and are sampled for) their category's dictionary
+    dictionary = None
+    if _dictionaries_enabled():
+        registry = get_dictionary_registry()
+        dict_id = registry.select(data)
+        if dict_id:
+            dictionary = registry.compression_dict(dict_id, level)
+    return get_codec_context_pool().zstd_compressor(level, dictionary).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    # Frames record the id of the dictionary they were written with
+    dictionary = None
+    if _dictionaries_enabled():
+        try:
+            dictionary = get_dictionary_registry().dictionary_for_frame(data)
+        except zstd.ZstdError:
+            pass  # Not a valid frame; let decompress report it
+    return get_codec_context_pool().zstd_decompressor(dictionary).decompress(data)
+
+
+def _lz4_compress(data: bytes, level: int) -> bytes:
+    return lz4.frame.compress(data, compression_level=level)
+
+
+def _lzma_compress(data: bytes, level: int) -> bytes:
+    return lzma.compress(data, preset=level)
+
+
+def _brotli_compress(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
 # Algorithm implementations
 class BaseCompressor:
-    """Base class for compression algorithms."""
+    """
+    Base class for compression algorithms.
+    
+    Blocking codec calls are dispatched to the shared compression executor;
+    ``heavy_level`` is the lowest level routed to the heavy lane (None keeps
+    every level on the fast lane).
+    """
+    
+    heavy_level: Optional[int] = None
+    heavy_decompress: bool = False
     
     def __init__(self, name: str):
         self.name = name
         self.supported_levels = list(range(1, 10))  # Default 1-9
     
+    def lane_for(self, level: int) -> str:
+        """Get the executor lane for compressing at ``level``."""
+        if self.heavy_level is not None and level >= self.heavy_level:
+            return HEAVY_LANE
+        return FAST_LANE
+    
+    async def _run_compress(self, fn, data: bytes, level: int) -> bytes:
+        return await get_compression_executor().run(self.lane_for(level), fn, data, level)
+    
+    async def _run_decompress(self, fn, data: bytes) -> bytes:
+        lane = HEAVY_LANE if self.heavy_decompress else FAST_LANE
+        return await get_compression_executor().run(lane, fn, data)
+    
     async def compress(self, data: bytes, level: int) -> bytes:
         """Compress data (implement in subclasses)."""
         raise NotImplementedError
@@ -288,37 +682,31 @@ class GzipCompressor(BaseCompressor):
         super().__init__('gzip')
     
     async def compress(self, data: bytes, level: int) -> bytes:
-        # Run in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            lambda: gzip.compress(data, compresslevel=level)
-        )
+        return await self._run_compress(_gzip_compress, data, level)
     
     async def decompress(self, data: bytes) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, gzip.decompress, data)
+        return await self._run_decompress(gzip.decompress, data)
 
 
 class ZstdCompressor(BaseCompressor):
-    """Zstandard compression."""
+    """
+    Zstandard compression.
+    
+    Payloads of a content category with a trained dictionary (see
+    ``ZstdDictionaryRegistry``) are compressed with that dictionary.
+    """
+    
+    heavy_level = 15
     
     def __init__(self):
         super().__init__('zstd')
+        self.supported_levels = list(range(1, 23))
     
     async def compress(self, data: bytes, level: int) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: zstd.ZstdCompressor(level=level).compress(data)
-        )
+        return await self._run_compress(_zstd_compress, data, level)
     
     async def decompress(self, data: bytes) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: zstd.ZstdDecompressor().decompress(data)
-        )
+        return await self._run_decompress(_zstd_decompress, data)
 
 
 class LZ4Compressor(BaseCompressor):
@@ -326,50 +714,42 @@ class LZ4Compressor(BaseCompressor):
     
     def __init__(self):
         super().__init__('lz4')
+        self.supported_levels = list(range(0, 17))
     
     async def compress(self, data: bytes, level: int) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: lz4.frame.compress(data, compression_level=level)
-        )
+        return await self._run_compress(_lz4_compress, data, level)
     
     async def decompress(self, data: bytes) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lz4.frame.decompress, data)
+        return await self._run_decompress(lz4.frame.decompress, data)
 
 
 class LZMACompressor(BaseCompressor):
     """LZMA/XZ compression."""
     
+    heavy_level = 0
+    heavy_decompress = True
+    
     def __init__(self):
         super().__init__('lzma')
     
     async def compress(self, data: bytes, level: int) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: lzma.compress(data, preset=level)
-        )
+        return await self._run_compress(_lzma_compress, data, level)
     
     async def decompress(self, data: bytes) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lzma.decompress, data)
+        return await self._run_decompress(lzma.decompress, data)
 
 
 class BrotliCompressor(BaseCompressor):
     """Brotli compression."""
     
+    heavy_level = 10
+    
     def __init__(self):
         super().__init__('brotli')
+        self.supported_levels = list(range(0, 12))
     
     async def compress(self, data: bytes, level: int) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: brotli.compress(data, quality=level)
-        )
+        return await self._run_compress(_brotli_compress, data, level)
     
     async def decompress(self, data: bytes) -> bytes:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, brotli.decompress, data)
+        return await self._run_decompress(brotli.decompress, data)
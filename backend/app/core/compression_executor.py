@@ -0,0 +1,538 @@
+"""
+Compression Executor: Dedicated worker pools for blocking codec calls.
+
+Codec work is split into two lanes so that slow, CPU-heavy jobs (LZMA,
+high-level Brotli/Zstd) cannot starve fast codecs (LZ4, gzip, low-level
+Zstd) sharing the default asyncio executor:
+
+- fast:  thread pool for low-latency codecs
+- heavy: thread pool, or optionally a process pool, for CPU-bound codecs
+
+Each lane applies admission control: once the number of queued jobs
+reaches ``max_queue_depth`` new submissions are rejected with
+``CompressionQueueFullError`` (surfaced as HTTP 429 by the API) instead of
+piling up latency.
+
+Jobs that must be stoppable (deadlines, hedged requests) run on the
+``IsolatedProcessPool`` instead: long-lived worker processes where a job
+that overruns is killed together with its worker, which is then replaced.
+"""
+
+import asyncio
+import multiprocessing
+import pickle
+import threading
+import time
+from contextvars import ContextVar
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+FAST_LANE = "fast"
+HEAVY_LANE = "heavy"
+
+# Imported once by the fork server instead of by every worker process
+FORKSERVER_PRELOAD = (__name__, 'numpy', f'{__package__}.compression_engine')
+
+
+def worker_context(start_method: Optional[str] = None):
+    """
+    Multiprocessing context for codec worker processes.
+
+    Defaults to forkserver (spawn where unavailable): the server process
+    runs lanes, waiter threads and an event loop, and forking it could copy
+    locks held by those threads into the child. The fork server preloads
+    the codec modules so replacement workers start without re-importing
+    them.
+    """
+    if start_method is None:
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+    if start_method == 'forkserver':
+        context.set_forkserver_preload(['__main__', *FORKSERVER_PRELOAD])
+    return context
+
+
+class CompressionQueueFullError(Exception):
+    """Raised when a compression lane is saturated and rejects new work."""
+
+    def __init__(self, lane: str, queue_depth: int, retry_after: float = 1.0):
+        self.lane = lane
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        super().__init__(
+            f"Compression {lane} lane is saturated ({queue_depth} jobs queued)"
+        )
+
+
+_last_run_time: ContextVar[Optional[float]] = ContextVar("compression_last_run_time", default=None)
+
+
+def take_last_run_time() -> Optional[float]:
+    """
+    Worker run time (seconds) of the last job this task awaited via ``CompressionExecutor.run``.
+
+    Excludes time spent queued, so it measures the codec itself. The value is
+    consumed: a second call returns None until another job completes.
+    """
+    run_time = _last_run_time.get()
+    _last_run_time.set(None)
+    return run_time
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Run ``fn`` in a worker and report when it actually started."""
+    started_at = time.time()
+    result = fn(*args, **kwargs)
+    return result, started_at, time.time() - started_at
+
+
+class _Lane:
+    """A bounded worker pool with queue-depth accounting."""
+
+    def __init__(self, name: str, max_workers: int, max_queue_depth: int, use_processes: bool = False):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        """Create the underlying pool lazily on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=worker_context())
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix=f"compression-{self.name}"
+                        )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs admitted but not yet running on a worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    def admit(self):
+        """Reserve a slot or raise if the lane is saturated."""
+        with self._lock:
+            if self.in_flight >= self.max_workers + self.max_queue_depth:
+                self.rejected += 1
+                raise CompressionQueueFullError(self.name, self.queue_depth)
+            self.in_flight += 1
+            self.submitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def abort(self):
+        """Return a slot for a job that could not be submitted."""
+        with self._lock:
+            self.in_flight -= 1
+            self.submitted -= 1
+
+    def release(self, future: Future, submitted_at: float):
+        """Return a slot once the worker finishes and record timings."""
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled():
+                self.cancelled += 1
+                return
+            if future.exception() is not None:
+                self.failed += 1
+                return
+            _, started_at, run_time = future.result()
+            self.completed += 1
+            self.total_wait_time += max(0.0, started_at - submitted_at)
+            self.total_run_time += run_time
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lane statistics."""
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.max_workers,
+                "mode": "process" if self.use_processes else "thread",
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "avg_wait_time": self.total_wait_time / completed if completed else 0.0,
+                "avg_run_time": self.total_run_time / completed if completed else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class CompressionExecutor:
+    """
+    Dedicated executor for codec calls with per-lane queues.
+
+    Callables submitted to a process-backed lane must be picklable, i.e.
+    module-level functions or ``functools.partial`` objects wrapping them.
+    """
+
+    def __init__(
+        self,
+        fast_workers: int = 4,
+        heavy_workers: int = 2,
+        max_queue_depth: int = 64,
+        heavy_use_processes: bool = False
+    ):
+        """Initialize compression executor."""
+        self.lanes: Dict[str, _Lane] = {
+            FAST_LANE: _Lane(FAST_LANE, fast_workers, max_queue_depth),
+            HEAVY_LANE: _Lane(HEAVY_LANE, heavy_workers, max_queue_depth, heavy_use_processes)
+        }
+        logger.info(
+            f"CompressionExecutor initialized (fast={fast_workers}, heavy={heavy_workers}, "
+            f"heavy_mode={'process' if heavy_use_processes else 'thread'})"
+        )
+
+    async def run(self, lane: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the given lane.
+
+        Args:
+            lane: Lane name ('fast' or 'heavy')
+            fn: Blocking callable to execute
+            *args, **kwargs: Arguments for ``fn``
+
+        Returns:
+            Result of ``fn``
+
+        Raises:
+            CompressionQueueFullError: If the lane rejects the job
+
+        Cancelling the awaiting task cancels jobs still waiting in the
+        queue; a job already running completes in the background.
+        """
+        worker_lane = self.lanes.get(lane, self.lanes[FAST_LANE])
+        worker_lane.admit()
+
+        submitted_at = time.time()
+        try:
+            future = worker_lane.executor.submit(_timed_call, fn, args, kwargs)
+        except Exception:
+            worker_lane.abort()
+            raise
+        # The slot is held until the worker is actually done, even if the
+        # caller stops waiting (e.g. a comparison time budget expires)
+        future.add_done_callback(partial(worker_lane.release, submitted_at=submitted_at))
+
+        try:
+            result, _, run_time = await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            # Drop the job if it has not started yet
+            future.cancel()
+            raise
+        _last_run_time.set(run_time)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-lane queue and latency statistics."""
+        return {name: lane.get_stats() for name, lane in self.lanes.items()}
+
+    def shutdown(self, wait: bool = True):
+        """Shut down all lanes."""
+        for lane in self.lanes.values():
+            lane.shutdown(wait=wait)
+
+
+def _isolated_worker(conn):
+    """Worker process loop: run pickled calls until the pipe closes."""
+    while True:
+        try:
+            payload = conn.recv_bytes()
+        except (EOFError, OSError):
+            return
+        try:
+            fn, args, kwargs = pickle.loads(payload)
+            reply = (True, fn(*args, **kwargs))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _IsolatedWorker:
+    """One worker process and the parent end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_isolated_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, payload: bytes):
+        """Run one pickled call and wait for the reply (blocking)."""
+        self.conn.send_bytes(payload)
+        return self.conn.recv()
+
+    def interrupt(self):
+        """Send SIGKILL without waiting; the thread in ``call`` reaps the worker."""
+        self.process.kill()
+
+    def kill(self):
+        """Kill and reap the process; a pending ``call`` fails with EOFError."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class _IsolatedJob:
+    __slots__ = ('payload', 'worker', 'abandoned')
+
+    def __init__(self, payload: tuple):
+        self.payload = payload
+        self.worker: Optional[_IsolatedWorker] = None
+        self.abandoned = False
+
+
+class IsolatedProcessPool:
+    """
+    Long-lived worker processes with killable jobs.
+
+    ``run`` awaits a job without blocking the event loop (the pipe round
+    trip happens on a waiter thread). When the deadline passes or the
+    awaiting task is cancelled, the worker running the job is killed, so
+    abandoned work stops consuming CPU; a fresh worker is spawned on demand.
+
+    Callables and arguments must be picklable.
+    """
+
+    def __init__(self, max_workers: int = 2, start_method: Optional[str] = None):
+        """
+        Initialize pool.
+
+        Args:
+            max_workers: Maximum concurrent jobs (and worker processes)
+            start_method: multiprocessing start method (forkserver, or
+                spawn where unavailable, if None)
+        """
+        self.max_workers = max(1, max_workers)
+        self._context = worker_context(start_method)
+        self._idle: List[_IsolatedWorker] = []
+        self._lock = threading.Lock()
+        self._waiters: Optional[ThreadPoolExecutor] = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.killed = 0
+        self.spawned = 0
+
+    @property
+    def waiters(self) -> ThreadPoolExecutor:
+        """Threads that carry the pipe round trips, one per concurrent job."""
+        if self._waiters is None:
+            with self._lock:
+                if self._waiters is None:
+                    self._waiters = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="compression-isolated"
+                    )
+        return self._waiters
+
+    def _execute(self, job: _IsolatedJob):
+        """Run ``job`` on an idle (or new) worker; runs on a waiter thread."""
+        try:
+            payload = pickle.dumps(job.payload, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            raise pickle.PicklingError(f"Job is not picklable: {e}") from e
+
+        with self._lock:
+            if job.abandoned:
+                return False, asyncio.CancelledError()
+            worker = self._idle.pop() if self._idle else None
+        if worker is None:
+            worker = _IsolatedWorker(self._context)
+            with self._lock:
+                self.spawned += 1
+        with self._lock:
+            job.worker = worker
+            abandoned = job.abandoned
+        if abandoned:
+            self._release(worker)
+            return False, asyncio.CancelledError()
+
+        try:
+            reply = worker.call(payload)
+        except (EOFError, OSError):
+            reply = None
+        with self._lock:
+            job.worker = None
+            abandoned = job.abandoned
+        if abandoned or reply is None:
+            worker.kill()
+            if abandoned:
+                return False, asyncio.CancelledError()
+            return False, RuntimeError("Isolated worker process died")
+        self._release(worker)
+        return reply
+
+    def _release(self, worker: _IsolatedWorker):
+        with self._lock:
+            if self._waiters is not None and worker.process.is_alive():
+                self._idle.append(worker)
+                return
+        worker.kill()
+
+    def _abandon(self, job: _IsolatedJob):
+        """
+        Stop a job: drop it if queued, kill its worker if running.
+
+        Called on the event loop, so it only signals the worker; the waiter
+        thread blocked on the pipe sees it die and does the join.
+        """
+        with self._lock:
+            job.abandoned = True
+            worker = job.worker
+        if worker is not None:
+            worker.interrupt()
+            with self._lock:
+                self.killed += 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in a worker process.
+
+        Args:
+            fn: Picklable callable
+            timeout: Seconds before the job is killed
+            *args, **kwargs: Arguments for ``fn``
+
+        Returns:
+            Result of ``fn``
+
+        Raises:
+            TimeoutError: If the job exceeded ``timeout`` (it has been killed)
+            pickle.PicklingError: If the job cannot be sent to a worker
+        """
+        job = _IsolatedJob((fn, args, kwargs))
+        with self._lock:
+            self.submitted += 1
+        future = self.waiters.submit(self._execute, job)
+        try:
+            ok, value = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self._abandon(job)
+            raise TimeoutError(f"Isolated job exceeded {timeout:.3g}s and was killed") from None
+        except asyncio.CancelledError:
+            future.cancel()
+            self._abandon(job)
+            raise
+
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        if not ok:
+            raise value
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "idle": len(self._idle),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "killed": self.killed,
+                "spawned": self.spawned
+            }
+
+    def shutdown(self):
+        """Stop all workers."""
+        with self._lock:
+            waiters, self._waiters = self._waiters, None
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+        if waiters is not None:
+            waiters.shutdown(wait=False)
+
+
+# Process-wide executor shared by all compressors
+_compression_executor: Optional[CompressionExecutor] = None
+
+
+def get_compression_executor() -> CompressionExecutor:
+    """
+    Get the global compression executor singleton.
+
+    Returns:
+        Global CompressionExecutor instance
+    """
+    global _compression_executor
+    if _compression_executor is None:
+        from ..config import settings
+        _compression_executor = CompressionExecutor(
+            fast_workers=settings.compression.executor_fast_workers,
+            heavy_workers=settings.compression.executor_heavy_workers,
+            max_queue_depth=settings.compression.executor_max_queue_depth,
+            heavy_use_processes=settings.compression.executor_heavy_use_processes
+        )
+    return _compression_executor
+
+
+_isolated_pool: Optional[IsolatedProcessPool] = None
+
+
+def get_isolated_process_pool() -> IsolatedProcessPool:
+    """
+    Get the global isolated process pool singleton.
+
+    Returns:
+        Global IsolatedProcessPool instance
+    """
+    global _isolated_pool
+    if _isolated_pool is None:
+        from ..config import settings
+        _isolated_pool = IsolatedProcessPool(max_workers=settings.compression.executor_isolated_workers)
+    return _isolated_pool
+
+
+def shutdown_compression_executor(wait: bool = True):
+    """Shut down the global compression executor and isolated pool, if created."""
+    global _compression_executor, _isolated_pool
+    if _compression_executor is not None:
+        _compression_executor.shutdown(wait=wait)
+        _compression_executor = None
+    if _isolated_pool is not None:
+        _isolated_pool.shutdown()
+        _isolated_pool = None
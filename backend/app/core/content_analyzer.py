@@ -6,17 +6,165 @@ including entropy calculation, language complexity analysis, code structure dete
 and pattern recognition.
 """
 
-import math
 import re
-# import numpy as np  # Removed for compatibility
-from typing import Dict, List, Any, Optional, Tuple
-from collections import Counter, defaultdict
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Union
+from collections import defaultdict
 import hashlib
 
+from app.core.codec_cost_model import PROFILE_SAMPLE, content_profile
 from app.models.compression import ContentType
 from app.models.file import FileMetadata
 
 
+# Inputs larger than this are profiled from evenly spaced sample blocks
+DEFAULT_SAMPLE_THRESHOLD = 1024 * 1024
+DEFAULT_SAMPLE_BLOCKS = 32
+DEFAULT_SAMPLE_BLOCK_SIZE = 16 * 1024
+
+# Bounds the int64 temporary np.bincount creates for each slice
+HISTOGRAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+PATTERN_LENGTHS = (2, 3, 4, 8, 16)
+
+# Odd 64-bit constant used to mix two 8-byte codes into one 16-byte code
+_NGRAM_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+_OPENING_BRACKETS = b'{([<'
+_CLOSING_BRACKETS = b'})]>'
+_SYNTACTIC_SYMBOLS = list(b'{}()[]')
+_WHITESPACE_CONTROLS = list(b'\t\n\r')
+
+
+@dataclass
+class ContentAggregates:
+    """
+    Statistics shared by all analysis dimensions, built once per input.
+
+    The byte histogram always covers the full input; everything else is
+    computed over ``sample``, which is the full input unless sampling kicked in.
+    """
+    total_size: int
+    size: int
+    sampled: bool
+    histogram: np.ndarray
+    sample: np.ndarray
+    text: str
+    tokens: List[str]
+    ngrams: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+    run_count: int = 0
+    max_run_length: int = 0
+    nesting_depth: int = 0
+    locality_score: float = 0.0
+    temporal_score: float = 0.0
+
+
+def _byte_histogram(data: np.ndarray) -> np.ndarray:
+    """Count byte values in bounded slices."""
+    histogram = np.zeros(256, dtype=np.int64)
+    for start in range(0, data.size, HISTOGRAM_CHUNK_SIZE):
+        histogram += np.bincount(data[start:start + HISTOGRAM_CHUNK_SIZE], minlength=256)
+    return histogram
+
+
+def _sample_blocks(data: np.ndarray, blocks: int, block_size: int) -> np.ndarray:
+    """Take evenly spaced blocks, always including the first and last bytes."""
+    if data.size <= blocks * block_size:
+        return data
+    starts = np.linspace(0, data.size - block_size, blocks).astype(np.int64)
+    return np.concatenate([data[start:start + block_size] for start in starts])
+
+
+def _ngram_codes(data: np.ndarray, length: int) -> np.ndarray:
+    """
+    Encode every ``length``-byte window as one uint64.
+
+    Windows up to 8 bytes are packed exactly; longer windows mix the codes
+    of their two halves, where collisions are negligible for counting.
+    """
+    if length > 8:
+        half = _ngram_codes(data, 8)
+        tail = length - 8
+        return (half[:half.size - tail] * _NGRAM_MIX) ^ half[tail:]
+
+    codes = np.zeros(data.size - length + 1, dtype=np.uint64)
+    for offset in range(length):
+        codes <<= np.uint64(8)
+        codes |= data[offset:offset + codes.size]
+    return codes
+
+
+def _repeated_ngrams(data: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find n-grams that occur more than once.
+
+    Returns:
+        Tuple of (first offset of each repeated n-gram, occurrence counts)
+    """
+    if data.size < length:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    codes = _ngram_codes(data, length)
+    order = np.argsort(codes)
+    sorted_codes = codes[order]
+    group_starts = np.flatnonzero(
+        np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1]))
+    )
+    counts = np.diff(np.append(group_starts, sorted_codes.size))
+    repeated = counts > 1
+    # Any occurrence identifies the pattern, so an unstable sort is fine
+    return order[group_starts[repeated]], counts[repeated]
+
+
+def _max_nesting_depth(data: np.ndarray) -> int:
+    """
+    Maximum bracket depth, with unmatched closers clamped at zero.
+
+    The clamped depth is the running sum minus its running minimum (floored
+    at zero), which turns the sequential scan into two cumulative passes.
+    """
+    steps = np.zeros(256, dtype=np.int8)
+    steps[list(_OPENING_BRACKETS)] = 1
+    steps[list(_CLOSING_BRACKETS)] = -1
+    depth = np.cumsum(steps[data], dtype=np.int64)
+    if depth.size == 0:
+        return 0
+    floor = np.minimum(np.minimum.accumulate(depth), 0)
+    return int((depth - floor).max())
+
+
+def _locality_score(data: np.ndarray, window_size: int = 100) -> float:
+    """Average distinct-byte ratio over half-overlapping windows."""
+    step = window_size // 2
+    starts = np.arange(0, data.size - window_size, step)
+    if starts.size == 0:
+        return 0.0
+    windows = np.sort(
+        np.lib.stride_tricks.sliding_window_view(data, window_size)[starts], axis=1
+    )
+    distinct = 1 + np.count_nonzero(np.diff(windows, axis=1), axis=1)
+    return float(distinct.sum() / window_size) / max(1, (data.size - window_size) // step)
+
+
+def _temporal_score(data: np.ndarray, run_count: int) -> float:
+    """Average fraction of bytes equal to the byte ``distance`` positions back."""
+    max_distance = min(1000, data.size // 2)
+    if max_distance <= 10:
+        return 0.0
+
+    score = 0.0
+    for distance in range(1, max_distance, 10):
+        if distance == 1:
+            # Adjacent matches are everything except run boundaries
+            matches = data.size - run_count
+        else:
+            matches = np.count_nonzero(data[:-distance] == data[distance:])
+        score += matches / (data.size - distance)
+    return score / (max_distance // 10)
+
+
 class ContentAnalyzer:
     """
     Content analysis engine that implements multi-dimensional content profiling.
@@ -26,8 +174,27 @@ class ContentAnalyzer:
     where each pᵢ represents different content characteristics.
     """
     
-    def __init__(self):
-        """Initialize the content analyzer."""
+    def __init__(
+        self,
+        sample_threshold: int = DEFAULT_SAMPLE_THRESHOLD,
+        sample_blocks: int = DEFAULT_SAMPLE_BLOCKS,
+        sample_block_size: int = DEFAULT_SAMPLE_BLOCK_SIZE,
+        max_patterns_per_length: int = 100
+    ):
+        """
+        Initialize the content analyzer.
+        
+        Args:
+            sample_threshold: Inputs larger than this (bytes) are sampled
+            sample_blocks: Number of evenly spaced blocks in a sample
+            sample_block_size: Size of each sample block in bytes
+            max_patterns_per_length: Most frequent patterns reported per length
+        """
+        self.sample_threshold = sample_threshold
+        self.sample_blocks = sample_blocks
+        self.sample_block_size = sample_block_size
+        self.max_patterns_per_length = max_patterns_per_length
+        
         self.language_patterns = {
             'python': [r'def\s+\w+', r'import\s+\w+', r'class\s+\w+', r'if\s+__name__'],
             'javascript': [r'function\s+\w+', r'const\s+\w+', r'let\s+\w+', r'var\s+\w+'],
@@ -50,13 +217,26 @@ class ContentAnalyzer:
             'number': r'\b\d+\.?\d*\b',
             'variable': r'\b[a-zA-Z_]\w*\b',
         }
+        
+        self._compiled_language_patterns = {
+            lang: [re.compile(pattern, re.MULTILINE | re.IGNORECASE) for pattern in patterns]
+            for lang, patterns in self.language_patterns.items()
+        }
+        self._compiled_structure_patterns = {
+            name: re.compile(pattern, re.MULTILINE)
+            for name, pattern in self.structure_patterns.items()
+        }
     
-    def analyze_content(self, content: str) -> Dict[str, Any]:
+    def analyze_content(
+        self,
+        content: Union[str, bytes, bytearray, memoryview],
+        sampled: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """
         Perform comprehensive multi-dimensional content analysis.
         
         Analysis dimensions:
-        1. Shannon Entropy: Information density measurement (0-8 bits)
+        1. Shannon Entropy: Information density of the UTF-8 bytes (0-8 bits)
         2. Language Complexity: Vocabulary richness, sentence structure
         3. Code Structure: Function/class density, nesting depth
         4. Redundancy Ratio: Repetition and pattern frequency
@@ -71,8 +251,17 @@ class ContentAnalyzer:
         - Compression potential estimation
         - Protocol-specific content splitting decisions
         
+        All dimensions are derived from one set of aggregates (byte histogram,
+        n-gram counts, run-length and window statistics) built over the UTF-8
+        bytes of the content; see ``build_aggregates``. Entropy, redundancy
+        and patterns are therefore per byte, not per character: for ASCII
+        the two agree, while non-ASCII text reports the entropy of its
+        encoded form, which is what a byte-oriented codec sees.
+        
         Args:
             content: The content to analyze
+            sampled: Force (True) or disable (False) sampling; by default
+                inputs larger than ``sample_threshold`` are sampled
             
         Returns:
             Dictionary containing all analysis results and profile vector
@@ -80,17 +269,37 @@ class ContentAnalyzer:
         if not content:
             return self._empty_analysis()
         
+        aggregates = self.build_aggregates(content, sampled)
+        entropy = self._entropy_from_histogram(aggregates.histogram)
+        redundancy_ratio = 1 - np.count_nonzero(aggregates.histogram) / aggregates.total_size
+        pattern_frequency = self._patterns_from_aggregates(aggregates)
+        
         analysis = {
-            'entropy': self._calculate_entropy(content),
-            'language_complexity': self._calculate_language_complexity(content),
-            'code_structure': self._analyze_code_structure(content),
-            'redundancy_ratio': self._calculate_redundancy_ratio(content),
-            'semantic_density': self._calculate_semantic_density(content),
-            'pattern_frequency': self._detect_patterns(content),
-            'compression_potential': self._estimate_compression_potential(content),
-            'content_type_score': self._classify_content_type(content),
-            'locality_score': self._calculate_locality_score(content),
-            'temporal_score': self._calculate_temporal_score(content),
+            'entropy': entropy,
+            'language_complexity': self._language_complexity_from_aggregates(aggregates),
+            'code_structure': self._code_structure_from_aggregates(aggregates),
+            'redundancy_ratio': redundancy_ratio,
+            'semantic_density': self._semantic_density_from_aggregates(aggregates),
+            'pattern_frequency': pattern_frequency,
+            'compression_potential': self._combine_compression_potential(
+                entropy, redundancy_ratio, pattern_frequency['frequency']
+            ),
+            'content_type_score': self._classify_from_aggregates(aggregates),
+            'locality_score': aggregates.locality_score,
+            'temporal_score': aggregates.temporal_score,
+            'run_length': {
+                'runs': aggregates.run_count,
+                'mean_run_length': aggregates.size / aggregates.run_count,
+                'max_run_length': aggregates.max_run_length
+            },
+            'sampling': {
+                'sampled': aggregates.sampled,
+                'analyzed_bytes': aggregates.size,
+                'total_bytes': aggregates.total_size
+            },
+            # Cost model key (see AlgorithmSelector._cost_model_key)
+            'content_size': aggregates.total_size,
+            'codec_profile': self._codec_profile(content)
         }
         
         # Calculate overall content profile vector
@@ -98,261 +307,174 @@ class ContentAnalyzer:
         
         return analysis
     
-    def _calculate_entropy(self, content: str) -> float:
+    def build_aggregates(
+        self,
+        content: Union[str, bytes, bytearray, memoryview],
+        sampled: Optional[bool] = None
+    ) -> ContentAggregates:
         """
-        Calculate Shannon entropy - fundamental measure of information content.
-        
-        H(S) = -Σ p(x) log₂ p(x)
+        Build the shared aggregates in one pass per statistic.
         
-        Where:
-        - p(x) is the probability of character x appearing
-        - Result ranges from 0 (uniform) to 8 (maximum for 8-bit data)
-        - Lower entropy indicates more compressible content
+        The content is viewed as a uint8 array over a ``memoryview`` without
+        copying. The byte histogram covers the whole input; when sampling,
+        n-grams, runs and window statistics use evenly spaced blocks so the
+        cost stays flat for multi-MB inputs.
         
-        Used for:
-        - Primary compression potential indicator
-        - Algorithm family selection (LZ77 for low, LZ78 for high)
-        - Determining if content is already compressed
+        Args:
+            content: Text or binary content
+            sampled: Force or disable sampling (default: by size)
+            
+        Returns:
+            ContentAggregates for the content
         """
-        if not content:
-            return 0.0
-        
-        # Count character frequencies
-        char_counts = Counter(content)
-        total_chars = len(content)
-        
-        # Calculate entropy
-        entropy = 0.0
-        for count in char_counts.values():
-            probability = count / total_chars
-            if probability > 0:
-                entropy -= probability * math.log2(probability)
-        
-        return entropy
+        raw = content.encode('utf-8') if isinstance(content, str) else content
+        view = memoryview(raw)
+        if view.format != 'B' or view.ndim != 1:
+            view = view.cast('B')
+        data = np.frombuffer(view, dtype=np.uint8)
+        
+        if sampled is None:
+            sampled = data.size > self.sample_threshold
+        sample = _sample_blocks(data, self.sample_blocks, self.sample_block_size) if sampled else data
+        sampled = sample.size < data.size
+        
+        if isinstance(content, str) and not sampled:
+            text = content
+        else:
+            text = sample.tobytes().decode('utf-8', errors='replace')
+        
+        # Run boundaries: positions where the byte differs from its predecessor
+        boundaries = np.flatnonzero(sample[1:] != sample[:-1]) + 1
+        run_edges = np.concatenate(([0], boundaries, [sample.size]))
+        run_count = int(boundaries.size + 1)
+        
+        return ContentAggregates(
+            total_size=int(data.size),
+            size=int(sample.size),
+            sampled=sampled,
+            histogram=_byte_histogram(data),
+            sample=sample,
+            text=text,
+            tokens=self._tokenize_content(text),
+            ngrams={length: _repeated_ngrams(sample, length) for length in PATTERN_LENGTHS},
+            run_count=run_count,
+            max_run_length=int(np.diff(run_edges).max()),
+            nesting_depth=_max_nesting_depth(sample),
+            locality_score=_locality_score(sample),
+            temporal_score=_temporal_score(sample, run_count)
+        )
     
-    def _calculate_language_complexity(self, content: str) -> float:
-        """
-        Calculate language complexity using multiple metrics.
-        
-        Language_Complexity(S) = Σ wᵢ × freq(wᵢ) / |S|
-        """
-        if not content:
-            return 0.0
-        
-        # Tokenize content
-        tokens = self._tokenize_content(content)
+    @staticmethod
+    def _entropy_from_histogram(histogram: np.ndarray) -> float:
+        """Shannon entropy H(S) = -Σ p(x) log₂ p(x) over byte values x."""
+        counts = histogram[histogram > 0]
+        probabilities = counts / counts.sum()
+        return float(-(probabilities * np.log2(probabilities)).sum())
+    
+    def _language_complexity_from_aggregates(self, aggregates: ContentAggregates) -> float:
+        """Language complexity from shared tokens and the byte histogram."""
+        tokens = aggregates.tokens
         if not tokens:
             return 0.0
         
-        # Calculate various complexity metrics
         avg_word_length = sum(len(token) for token in tokens) / len(tokens)
         vocabulary_richness = len(set(tokens)) / len(tokens)
-        sentence_complexity = self._calculate_sentence_complexity(content)
-        syntactic_complexity = self._calculate_syntactic_complexity(content)
-        semantic_complexity = self._calculate_semantic_complexity(content)
+        sentence_complexity = self._calculate_sentence_complexity(aggregates.text)
+        syntactic_elements = int(aggregates.histogram[_SYNTACTIC_SYMBOLS].sum())
+        syntactic_complexity = min(syntactic_elements / aggregates.total_size, 1.0)
         
-        # Combine metrics with weights
-        complexity_score = (
+        # Semantic complexity is the unique-token ratio, i.e. vocabulary richness
+        return (
             avg_word_length * 0.2 +
             vocabulary_richness * 0.3 +
             sentence_complexity * 0.2 +
             syntactic_complexity * 0.2 +
-            semantic_complexity * 0.1
+            vocabulary_richness * 0.1
         )
-        
-        return complexity_score
     
-    def _analyze_code_structure(self, content: str) -> float:
-        """
-        Analyze code structure and complexity.
-        
-        Code_Structure(S) = Σ syntax_patterns / |S|
-        """
-        if not content:
-            return 0.0
-        
-        # Count structural elements
-        structure_counts = {}
-        for pattern_name, pattern in self.structure_patterns.items():
-            matches = len(re.findall(pattern, content, re.MULTILINE))
-            structure_counts[pattern_name] = matches
+    def _code_structure_from_aggregates(self, aggregates: ContentAggregates) -> float:
+        """Code structure score from regex counts over the (sampled) text."""
+        text = aggregates.text
+        structure_counts = {
+            name: len(pattern.findall(text))
+            for name, pattern in self._compiled_structure_patterns.items()
+        }
         
-        # Calculate structure score
-        total_patterns = sum(structure_counts.values())
-        structure_score = total_patterns / len(content) if len(content) > 0 else 0
+        structure_score = sum(structure_counts.values()) / len(text) if text else 0
         
-        # Add complexity factors
-        nesting_depth = self._calculate_nesting_depth(content)
-        function_count = structure_counts.get('function_def', 0)
-        class_count = structure_counts.get('class_def', 0)
+        # Absolute counts are extrapolated from the sample to the full input
+        scale = aggregates.total_size / aggregates.size
+        function_count = structure_counts['function_def'] * scale
+        class_count = structure_counts['class_def'] * scale
         
-        # Normalize and combine
         normalized_score = (
             structure_score * 0.4 +
-            (nesting_depth / 10) * 0.3 +
+            (aggregates.nesting_depth / 10) * 0.3 +
             (function_count / 100) * 0.2 +
             (class_count / 50) * 0.1
         )
         
         return min(normalized_score, 1.0)
     
-    def _calculate_redundancy_ratio(self, content: str) -> float:
-        """
-        Calculate redundancy ratio.
-        
-        Redundancy_Ratio(S) = 1 - |unique_symbols| / |total_symbols|
-        """
-        if not content:
+    @staticmethod
+    def _semantic_density_from_aggregates(aggregates: ContentAggregates) -> float:
+        """Share of tokens longer than two characters per character of text."""
+        if not aggregates.text:
             return 0.0
-        
-        unique_chars = len(set(content))
-        total_chars = len(content)
-        
-        return 1 - (unique_chars / total_chars)
+        semantic_units = sum(1 for token in aggregates.tokens if len(token) > 2)
+        return semantic_units / len(aggregates.text)
     
-    def _calculate_semantic_density(self, content: str) -> float:
-        """
-        Calculate semantic density.
-        
-        Semantic_Density(S) = semantic_units / total_units
-        """
-        if not content:
-            return 0.0
-        
-        # Count semantic units (words, meaningful tokens)
-        tokens = self._tokenize_content(content)
-        semantic_units = len([t for t in tokens if len(t) > 2])  # Filter out short tokens
-        
-        total_units = len(content)
-        
-        return semantic_units / total_units if total_units > 0 else 0.0
-    
-    def _detect_patterns(self, content: str) -> Dict[str, Any]:
-        """
-        Detect repeating patterns using multi-scale sliding window analysis.
-        
-        Pattern_Frequency(S) = Σ pattern_count / |S|
-        
-        Pattern detection strategy:
-        - Window sizes: [2, 3, 4, 8, 16] bytes
-        - Identifies local (short-range) and global (long-range) patterns
-        - Tracks pattern frequency and distribution
-        
-        Critical for:
-        - LZ77/LZSS algorithm effectiveness prediction
-        - Dictionary-based compression potential
-        - Content splitting boundaries identification
-        - Determining optimal window/dictionary sizes
-        
-        Future enhancement:
-        - Variable-length pattern detection
-        - Semantic pattern recognition for text
-        - Protocol-specific pattern templates
-        """
-        if not content:
-            return {'patterns': {}, 'frequency': 0.0}
-        
+    def _patterns_from_aggregates(self, aggregates: ContentAggregates) -> Dict[str, Any]:
+        """Repeated n-gram report; only the most frequent patterns are listed."""
+        sample = aggregates.sample
         patterns = {}
-        pattern_lengths = [2, 3, 4, 8, 16]
-        
-        for length in pattern_lengths:
-            pattern_counts = {}
-            
-            # Slide window over content
-            for i in range(len(content) - length + 1):
-                pattern = content[i:i+length]
-                pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
-            
-            # Filter significant patterns
-            significant_patterns = {
-                pattern: count for pattern, count in pattern_counts.items()
-                if count > 1 and len(pattern) > 1
+        total_patterns = 0
+        
+        for length, (offsets, counts) in aggregates.ngrams.items():
+            total_patterns += int(counts.size)
+            top = np.argsort(counts, kind='stable')[::-1][:self.max_patterns_per_length]
+            patterns[f'length_{length}'] = {
+                sample[offsets[i]:offsets[i] + length].tobytes().decode('utf-8', errors='backslashreplace'):
+                    int(counts[i])
+                for i in top
             }
-            
-            patterns[f'length_{length}'] = significant_patterns
-        
-        # Calculate overall pattern frequency
-        total_patterns = sum(len(patterns[f'length_{l}']) for l in pattern_lengths)
-        pattern_frequency = total_patterns / len(content) if len(content) > 0 else 0
         
         return {
             'patterns': patterns,
-            'frequency': pattern_frequency,
+            'frequency': total_patterns / aggregates.size,
             'total_patterns': total_patterns
         }
     
-    def _estimate_compression_potential(self, content: str) -> float:
-        """
-        Estimate compression potential using multiple heuristics.
-        """
-        if not content:
-            return 0.0
-        
-        # Get analysis results
-        entropy = self._calculate_entropy(content)
-        redundancy = self._calculate_redundancy_ratio(content)
-        pattern_data = self._detect_patterns(content)
-        pattern_density = pattern_data['frequency']
-        
-        # Normalize values
-        normalized_entropy = entropy / 8.0  # Max entropy for 8-bit data
-        normalized_redundancy = redundancy
-        normalized_pattern_density = min(pattern_density * 100, 1.0)
-        
-        # Weighted combination
+    @staticmethod
+    def _combine_compression_potential(entropy: float, redundancy: float, pattern_density: float) -> float:
+        """Weighted combination of normalized entropy, redundancy and pattern density."""
         compression_potential = (
-            normalized_entropy * 0.4 +
-            normalized_redundancy * 0.4 +
-            normalized_pattern_density * 0.2
+            (entropy / 8.0) * 0.4 +
+            redundancy * 0.4 +
+            min(pattern_density * 100, 1.0) * 0.2
         )
-        
         return min(compression_potential, 1.0)
     
-    def _classify_content_type(self, content: str) -> Dict[str, Any]:
-        """
-        Classify content type using pattern matching and heuristics.
-        
-        Classification strategy:
-        1. Language Detection: Regex patterns for 10+ programming languages
-        2. Structure Detection: JSON, XML, YAML, CSV formats
-        3. Binary Detection: Null bytes and control character analysis
-        4. Text Classification: Natural language vs. structured text
-        
-        Content types determine:
-        - Algorithm family preferences
-        - Optimal compression parameters
-        - Quality metric weighting
-        - Potential for LLM-based symbolic compression
-        
-        Future enhancements:
-        - ML-based classification model
-        - MIME type integration
-        - Protocol-specific content detection
-        - Multi-format content handling
-        """
-        if not content:
-            return {'type': ContentType.TEXT, 'language': None, 'confidence': 0.0}
-        
-        # Detect programming language
-        language_scores = {}
-        for lang, patterns in self.language_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, content, re.MULTILINE | re.IGNORECASE))
-                score += matches
-            language_scores[lang] = score
-        
-        # Find best language match
+    def _classify_from_aggregates(self, aggregates: ContentAggregates) -> Dict[str, Any]:
+        """Content type classification; binary detection uses the histogram."""
+        text = aggregates.text
+        language_scores = {
+            lang: sum(len(pattern.findall(text)) for pattern in patterns)
+            for lang, patterns in self._compiled_language_patterns.items()
+        }
         best_language = max(language_scores.items(), key=lambda x: x[1])
         
-        # Determine content type
+        histogram = aggregates.histogram
+        control_chars = int(histogram[:32].sum() - histogram[_WHITESPACE_CONTROLS].sum())
+        is_binary = histogram[0] > 0 or control_chars > aggregates.total_size * 0.1
+        
         if best_language[1] > 5:  # Strong code indicators
             content_type = ContentType.CODE
             confidence = min(best_language[1] / 20, 1.0)
-        elif self._is_structured_content(content):
-            content_type = ContentType.STRUCTURED
+        elif self._is_structured_content(text):
+            content_type = ContentType.DATA
             confidence = 0.8
-        elif self._is_binary_content(content):
+        elif is_binary:
             content_type = ContentType.BINARY
             confidence = 0.9
         else:
@@ -366,46 +488,6 @@ class ContentAnalyzer:
             'language_scores': language_scores
         }
     
-    def _calculate_locality_score(self, content: str) -> float:
-        """
-        Calculate spatial locality score.
-        """
-        if not content:
-            return 0.0
-        
-        # Analyze character repetition patterns
-        locality_score = 0.0
-        window_size = 100
-        
-        for i in range(0, len(content) - window_size, window_size // 2):
-            window = content[i:i+window_size]
-            unique_chars = len(set(window))
-            locality_score += unique_chars / window_size
-        
-        return locality_score / max(1, (len(content) - window_size) // (window_size // 2))
-    
-    def _calculate_temporal_score(self, content: str) -> float:
-        """
-        Calculate temporal redundancy score.
-        """
-        if not content:
-            return 0.0
-        
-        # Analyze temporal patterns (repetition over distance)
-        temporal_score = 0.0
-        max_distance = min(1000, len(content) // 2)
-        
-        for distance in range(1, max_distance, 10):
-            matches = 0
-            for i in range(len(content) - distance):
-                if content[i] == content[i + distance]:
-                    matches += 1
-            
-            if len(content) - distance > 0:
-                temporal_score += matches / (len(content) - distance)
-        
-        return temporal_score / (max_distance // 10) if max_distance > 10 else 0.0
-    
     def _calculate_content_profile(self, analysis: Dict[str, Any]) -> List[float]:
         """
         Calculate the 8-dimensional content profile vector for ML-based decisions.
@@ -454,36 +536,6 @@ class ContentAnalyzer:
         avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
         return min(avg_sentence_length / 20, 1.0)  # Normalize
     
-    def _calculate_syntactic_complexity(self, content: str) -> float:
-        """Calculate syntactic complexity."""
-        # Count syntactic elements
-        syntactic_elements = len(re.findall(r'[{}()\[\]]', content))
-        return min(syntactic_elements / len(content), 1.0) if content else 0.0
-    
-    def _calculate_semantic_complexity(self, content: str) -> float:
-        """Calculate semantic complexity."""
-        # Simple semantic complexity based on unique words
-        tokens = self._tokenize_content(content)
-        if not tokens:
-            return 0.0
-        
-        unique_ratio = len(set(tokens)) / len(tokens)
-        return unique_ratio
-    
-    def _calculate_nesting_depth(self, content: str) -> int:
-        """Calculate maximum nesting depth."""
-        max_depth = 0
-        current_depth = 0
-        
-        for char in content:
-            if char in '{([<':
-                current_depth += 1
-                max_depth = max(max_depth, current_depth)
-            elif char in '})]>':
-                current_depth = max(0, current_depth - 1)
-        
-        return max_depth
-    
     def _is_structured_content(self, content: str) -> bool:
         """Check if content is structured (JSON, XML, etc.)."""
         # Check for JSON structure
@@ -501,13 +553,11 @@ class ContentAnalyzer:
         
         return False
     
-    def _is_binary_content(self, content: str) -> bool:
-        """Check if content appears to be binary."""
-        # Check for null bytes and control characters
-        null_bytes = content.count('\x00')
-        control_chars = sum(1 for c in content if ord(c) < 32 and c not in '\n\r\t')
-        
-        return null_bytes > 0 or control_chars > len(content) * 0.1
+    @staticmethod
+    def _codec_profile(content: Union[str, bytes, bytearray, memoryview]) -> str:
+        """Cost model content profile, from the head of the content only."""
+        head = content[:PROFILE_SAMPLE]
+        return content_profile(head.encode('utf-8') if isinstance(head, str) else head)
     
     def _empty_analysis(self) -> Dict[str, Any]:
         """Return empty analysis results."""
@@ -522,6 +572,10 @@ class ContentAnalyzer:
             'content_type_score': {'type': ContentType.TEXT, 'language': None, 'confidence': 0.0},
             'locality_score': 0.0,
             'temporal_score': 0.0,
+            'run_length': {'runs': 0, 'mean_run_length': 0.0, 'max_run_length': 0},
+            'sampling': {'sampled': False, 'analyzed_bytes': 0, 'total_bytes': 0},
+            'content_size': 0,
+            'codec_profile': content_profile(b''),
             'content_profile': [0.0] * 8
         }
 
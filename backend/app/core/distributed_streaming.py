@@ -41,6 +41,8 @@ import multiprocessing
 import queue
 import time
 import hashlib
+import bisect
+import math
 import pickle
 import json
 import struct
@@ -48,10 +50,11 @@ import io
 import mmap
 import tempfile
 import shutil
+import zlib
 from typing import Dict, List, Any, Optional, Callable, Tuple, Union, AsyncIterator, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import numpy as np
 from collections import defaultdict, deque
 import logging
@@ -67,13 +70,17 @@ except ImportError:
     HAS_RAY = False
 
 try:
-    import dask
     import dask.array as da
-    import dask.distributed
     HAS_DASK = True
 except ImportError:
     HAS_DASK = False
 
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
 # Import compression algorithms
 import sys
 import os
@@ -87,6 +94,7 @@ class ChunkingStrategy(Enum):
     FIXED_SIZE = "fixed_size"  # Fixed chunk size
     CONTENT_AWARE = "content_aware"  # Content-based chunking
     ROLLING_HASH = "rolling_hash"  # Rabin fingerprinting
+    FASTCDC = "fastcdc"  # Gear-hash content-defined chunking
     BOUNDARY_DETECTION = "boundary"  # Detect natural boundaries
     ADAPTIVE = "adaptive"  # Adaptive based on content
 
@@ -143,6 +151,32 @@ class StreamState:
         return 1.0
 
 
+# Gear table for FastCDC; fixed seed so boundaries are stable across processes
+_GEAR_TABLE = np.random.default_rng(0x46434443).integers(0, 2**64, size=256, dtype=np.uint64)
+
+
+def _gear_fingerprints(block: np.ndarray) -> np.ndarray:
+    """
+    Gear-hash fingerprint at every position of ``block``.
+    
+    The sequential FastCDC update fp = (fp << 1) + gear[b] gives
+    fp_i = Σ_{k<64} gear[b_{i-k}] << k (mod 2^64). Doubling the window
+    six times (1, 2, 4, ..., 32) computes it for all positions at once.
+    """
+    fingerprints = _GEAR_TABLE[block]
+    shifted = np.empty_like(fingerprints)
+    shift = 1
+    while shift < 64:
+        n = fingerprints.size - shift
+        if n <= 0:
+            break
+        # Shift into a scratch buffer first; the add then reads no overlapping input
+        np.left_shift(fingerprints[:n], np.uint64(shift), out=shifted[:n])
+        np.add(fingerprints[shift:], shifted[:n], out=fingerprints[shift:])
+        shift *= 2
+    return fingerprints
+
+
 class ChunkGenerator:
     """
     Advanced chunk generation with multiple strategies.
@@ -151,6 +185,7 @@ class ChunkGenerator:
     - Fixed-size chunking
     - Content-aware chunking
     - Rolling hash (Rabin fingerprinting)
+    - FastCDC (gear-hash content-defined chunking)
     - Boundary detection
     - Adaptive chunking
     """
@@ -178,6 +213,10 @@ class ChunkGenerator:
         self.window_size = 48
         self.prime = 1031
         self.modulus = 2**20
+        self._outgoing_factor = pow(self.prime, self.window_size - 1, self.modulus)
+        
+        # FastCDC parameters: bytes hashed per vectorized block
+        self.cdc_block_size = 4 * 1024 * 1024
         
         # Content-aware parameters
         self.boundary_patterns = [
@@ -203,6 +242,8 @@ class ChunkGenerator:
             yield from self._content_aware_chunks(data)
         elif self.strategy == ChunkingStrategy.ROLLING_HASH:
             yield from self._rolling_hash_chunks(data)
+        elif self.strategy == ChunkingStrategy.FASTCDC:
+            yield from self._fastcdc_chunks(data)
         elif self.strategy == ChunkingStrategy.BOUNDARY_DETECTION:
             yield from self._boundary_detection_chunks(data)
         elif self.strategy == ChunkingStrategy.ADAPTIVE:
@@ -271,7 +312,7 @@ class ChunkGenerator:
             if len(window) == self.window_size:
                 # Remove oldest byte
                 old_byte = window[0]
-                hash_value = (hash_value - old_byte * (self.prime ** (self.window_size - 1))) % self.modulus
+                hash_value = (hash_value - old_byte * self._outgoing_factor) % self.modulus
             
             window.append(byte)
             hash_value = (hash_value * self.prime + byte) % self.modulus
@@ -309,6 +350,112 @@ class ChunkGenerator:
             )
             yield chunk, metadata
     
+    def _fastcdc_chunks(self, data: Union[bytes, io.IOBase]) -> Iterator[Tuple[bytes, ChunkMetadata]]:
+        """
+        Generate chunks using FastCDC (gear hash with normalized chunking).
+        
+        Input is processed in ``cdc_block_size`` blocks: fingerprints and
+        boundary candidates are computed with NumPy per block, and the
+        cut-point scan only touches the sparse candidates. File-like inputs
+        are read incrementally, so memory is bounded by block plus
+        ``max_size`` rather than the file size.
+        
+        Normalized chunking (Xia et al., 2016): below ``target_size`` a cut
+        needs avg_bits + 2 zero bits, above it avg_bits - 2, which narrows
+        the chunk size distribution around the target.
+        """
+        avg_bits = max(4, int(round(math.log2(self.target_size))))
+        strict_mask = np.uint64(((1 << (avg_bits + 2)) - 1) << (64 - avg_bits - 2))
+        loose_mask = np.uint64(((1 << (avg_bits - 2)) - 1) << (64 - avg_bits + 2))
+        
+        min_size = max(1, self.min_size)
+        normal_size = max(min_size, self.target_size)
+        max_size = max(normal_size, self.max_size)
+        
+        pending = bytearray()  # Bytes from the current chunk start onwards
+        chunk_start = 0  # Absolute offset of pending[0]
+        hashed_end = 0  # Absolute offset up to which fingerprints exist
+        context = np.zeros(0, dtype=np.uint8)  # Bytes preceding the next block
+        strict = np.zeros(0, dtype=np.int64)
+        loose = np.zeros(0, dtype=np.int64)
+        chunk_num = 0
+        
+        def find_cut(eof: bool) -> Optional[int]:
+            # A cut after position i gives a chunk of i - chunk_start + 1 bytes
+            first_allowed = chunk_start + min_size - 1
+            normal_point = chunk_start + normal_size - 1
+            max_point = chunk_start + max_size - 1
+            
+            i = np.searchsorted(strict, first_allowed)
+            if i < strict.size and strict[i] < normal_point:
+                return int(strict[i]) + 1
+            if hashed_end <= normal_point and not eof:
+                return None
+            
+            i = np.searchsorted(loose, normal_point)
+            if i < loose.size and loose[i] < max_point:
+                return int(loose[i]) + 1
+            if hashed_end > max_point:
+                return max_point + 1
+            if eof and hashed_end > chunk_start:
+                return hashed_end
+            return None
+        
+        for block in self._read_blocks(data, self.cdc_block_size):
+            window = np.concatenate((context, block)) if context.size else block
+            fingerprints = _gear_fingerprints(window)[context.size:]
+            strict = np.concatenate((strict, np.flatnonzero((fingerprints & strict_mask) == 0) + hashed_end))
+            loose = np.concatenate((loose, np.flatnonzero((fingerprints & loose_mask) == 0) + hashed_end))
+            context = window[-63:]
+            pending += memoryview(block)
+            hashed_end += block.size
+            
+            while True:
+                cut = find_cut(eof=False)
+                if cut is None:
+                    break
+                chunk = bytes(pending[:cut - chunk_start])
+                del pending[:cut - chunk_start]
+                yield chunk, self._chunk_metadata(chunk, chunk_num, chunk_start)
+                chunk_start = cut
+                chunk_num += 1
+            
+            # Drop candidates behind the current chunk start
+            strict = strict[np.searchsorted(strict, chunk_start):]
+            loose = loose[np.searchsorted(loose, chunk_start):]
+        
+        while chunk_start < hashed_end:
+            cut = find_cut(eof=True)
+            chunk = bytes(pending[:cut - chunk_start])
+            del pending[:cut - chunk_start]
+            yield chunk, self._chunk_metadata(chunk, chunk_num, chunk_start)
+            chunk_start = cut
+            chunk_num += 1
+    
+    @staticmethod
+    def _read_blocks(data: Union[bytes, io.IOBase], block_size: int) -> Iterator[np.ndarray]:
+        """Yield uint8 blocks from bytes-like or file-like input without reading it whole."""
+        if isinstance(data, io.IOBase):
+            while True:
+                block = data.read(block_size)
+                if not block:
+                    break
+                yield np.frombuffer(block, dtype=np.uint8)
+        else:
+            view = memoryview(data).cast('B')
+            for start in range(0, len(view), block_size):
+                yield np.frombuffer(view[start:start + block_size], dtype=np.uint8)
+    
+    @staticmethod
+    def _chunk_metadata(chunk: bytes, chunk_num: int, offset: int) -> ChunkMetadata:
+        """Build metadata for a chunk."""
+        return ChunkMetadata(
+            chunk_id=f"chunk_{chunk_num:06d}",
+            offset=offset,
+            size=len(chunk),
+            checksum=hashlib.sha256(chunk).hexdigest()
+        )
+    
     def _content_aware_chunks(self, data: Union[bytes, io.IOBase]) -> Iterator[Tuple[bytes, ChunkMetadata]]:
         """Generate chunks based on content patterns."""
         if isinstance(data, io.IOBase):
@@ -379,8 +526,8 @@ class ChunkGenerator:
         # Use adjusted size for chunking
         self.target_size = max(self.min_size, min(adjusted_size, self.max_size))
         
-        # Use rolling hash for adaptive chunks
-        yield from self._rolling_hash_chunks(data)
+        # Use content-defined chunking for adaptive chunks
+        yield from self._fastcdc_chunks(data)
     
     def _calculate_entropy(self, data: bytes) -> float:
         """Calculate Shannon entropy of data."""
@@ -402,6 +549,396 @@ class ChunkGenerator:
         return entropy
 
 
+# Algorithm instance unpickled once per worker process by the pool initializer
+_worker_algorithm: Optional[BaseCompressionAlgorithm] = None
+
+
+def _init_compression_worker(algorithm_pickle: bytes):
+    """Process pool initializer: load the shared algorithm state once."""
+    global _worker_algorithm
+    _worker_algorithm = pickle.loads(algorithm_pickle)
+
+
+def _compress_chunk_with(algorithm: BaseCompressionAlgorithm,
+                         chunk_data: bytes,
+                         chunk_meta: ChunkMetadata) -> Tuple[bytes, ChunkMetadata]:
+    """Compress a single chunk and record per-chunk metrics."""
+    start_time = time.time()
+    
+    compressed, metadata = algorithm.compress(chunk_data)
+    
+    chunk_meta.compression_ratio = len(chunk_data) / len(compressed) if compressed else 1.0
+    chunk_meta.processing_time = time.time() - start_time
+    chunk_meta.worker_id = str(multiprocessing.current_process().pid)
+    
+    return compressed, chunk_meta
+
+
+def _compress_chunk_in_worker(chunk_data: bytes, chunk_meta: ChunkMetadata) -> Tuple[bytes, ChunkMetadata]:
+    """Process pool task: compress with the worker's preloaded algorithm."""
+    return _compress_chunk_with(_worker_algorithm, chunk_data, chunk_meta)
+
+
+def _write_buffers(stream: io.IOBase, *buffers):
+    """Write buffers back to back, in one call when the stream supports writev."""
+    if hasattr(stream, 'writev'):
+        stream.writev(buffers)
+    else:
+        for buffer in buffers:
+            stream.write(buffer)
+
+
+def write_chunk_frame(stream: io.IOBase, compressed: bytes, original_size: int):
+    """
+    Write a compressed chunk with its frame header.
+    
+    Format: [original_size:4][compressed_size:4][compressed_data]
+    """
+    _write_buffers(stream, struct.pack('!II', original_size, len(compressed)), compressed)
+
+
+class _VectoredFileWriter:
+    """
+    Unbuffered writer over a file descriptor.
+    
+    Each frame goes out in a single ``os.writev`` call without being joined
+    into a new buffer first. The file can be preallocated up front and is
+    truncated to the bytes actually written.
+    """
+    
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.position = 0
+    
+    def preallocate(self, size: int):
+        """Reserve ``size`` bytes of disk space for the output."""
+        if size > 0 and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(self.fd, 0, size)
+            except OSError:
+                # Filesystem without fallocate support; the hint is optional
+                pass
+    
+    def write(self, data) -> int:
+        return self.writev((data,))
+    
+    def writev(self, buffers) -> int:
+        views = [memoryview(buffer).cast('B') for buffer in buffers if len(buffer)]
+        total = sum(len(view) for view in views)
+        
+        while views:
+            if hasattr(os, 'writev'):
+                written = os.writev(self.fd, views)
+            else:
+                written = os.write(self.fd, views[0])
+            
+            # Drop fully written buffers and resume a partially written one
+            while views and written >= len(views[0]):
+                written -= len(views.pop(0))
+            if views and written:
+                views[0] = views[0][written:]
+        
+        self.position += total
+        return total
+    
+    def truncate(self):
+        """Cut off any preallocated space beyond the written bytes."""
+        os.ftruncate(self.fd, self.position)
+
+
+def _madvise(mapped: mmap.mmap, advice: str, start: int = 0, length: int = 0):
+    """Apply an madvise hint when the platform provides it."""
+    if hasattr(mapped, 'madvise') and hasattr(mmap, advice):
+        mapped.madvise(getattr(mmap, advice), start, length)
+
+
+# Seekable container layout (all integers big-endian):
+#   header:  [magic:4][version:1][checksum_type:1][level:2][dictionary_id:4][codec_length:2][codec]
+#   frames:  [original_size:4][compressed_size:4][checksum:8][compressed_data]
+#   end:     all-zero frame header
+#   index:   per chunk [frame_offset:8][original_offset:8][original_size:4][compressed_size:4]
+#   trailer: [index_offset:8][chunk_count:4][trailer_magic:4]
+# Offsets are relative to the start of the container header.
+CONTAINER_MAGIC = b'DCSK'
+CONTAINER_TRAILER_MAGIC = b'DCSX'
+CONTAINER_VERSION = 1
+
+CHECKSUM_CRC32 = 1
+CHECKSUM_XXH64 = 2
+
+_CONTAINER_HEADER = struct.Struct('!4sBBhIH')
+_CONTAINER_FRAME = struct.Struct('!IIQ')
+_CONTAINER_INDEX_ENTRY = struct.Struct('!QQII')
+_CONTAINER_TRAILER = struct.Struct('!QI4s')
+
+
+class ContainerFormatError(ValueError):
+    """Raised for malformed, mismatched or corrupted seekable containers."""
+
+
+def _chunk_checksum(data: bytes, checksum_type: int) -> int:
+    """Checksum of a chunk's uncompressed bytes."""
+    if checksum_type == CHECKSUM_XXH64:
+        if not HAS_XXHASH:
+            raise ContainerFormatError("Container uses xxh64 checksums but xxhash is not installed")
+        return xxhash.xxh64_intdigest(data)
+    if checksum_type == CHECKSUM_CRC32:
+        return zlib.crc32(data)
+    raise ContainerFormatError(f"Unknown checksum type {checksum_type}")
+
+
+@dataclass
+class ContainerHeader:
+    """Versioned header of a seekable container."""
+    codec: str
+    level: int = 0
+    dictionary_id: int = 0
+    checksum_type: int = CHECKSUM_XXH64 if HAS_XXHASH else CHECKSUM_CRC32
+    version: int = CONTAINER_VERSION
+    
+    @classmethod
+    def for_algorithm(cls, algorithm: BaseCompressionAlgorithm) -> 'ContainerHeader':
+        """Describe the codec an algorithm instance writes."""
+        return cls(
+            codec=type(algorithm).__name__,
+            level=int(getattr(algorithm, 'compression_level', 0) or 0),
+            dictionary_id=int(getattr(algorithm, 'dictionary_id', 0) or 0)
+        )
+    
+    def pack(self) -> bytes:
+        """Serialize the header."""
+        codec = self.codec.encode('utf-8')
+        return _CONTAINER_HEADER.pack(
+            CONTAINER_MAGIC, self.version, self.checksum_type,
+            self.level, self.dictionary_id, len(codec)
+        ) + codec
+    
+    @classmethod
+    def read(cls, stream: io.IOBase, prefix: bytes = b'') -> 'ContainerHeader':
+        """
+        Read a header from a stream.
+        
+        Args:
+            stream: Stream positioned at (or ``len(prefix)`` bytes into) the header
+            prefix: Header bytes already consumed by the caller
+            
+        Returns:
+            Parsed header
+        """
+        raw = prefix + stream.read(_CONTAINER_HEADER.size - len(prefix))
+        if len(raw) < _CONTAINER_HEADER.size:
+            raise ContainerFormatError("Truncated container header")
+        
+        magic, version, checksum_type, level, dictionary_id, codec_length = _CONTAINER_HEADER.unpack(raw)
+        if magic != CONTAINER_MAGIC:
+            raise ContainerFormatError("Not a seekable container")
+        if version > CONTAINER_VERSION:
+            raise ContainerFormatError(f"Unsupported container version {version}")
+        
+        codec = stream.read(codec_length)
+        if len(codec) < codec_length:
+            raise ContainerFormatError("Truncated container header")
+        
+        return cls(codec.decode('utf-8'), level, dictionary_id, checksum_type, version)
+    
+    def check_algorithm(self, algorithm: BaseCompressionAlgorithm):
+        """Reject decoding with a different codec than the one that wrote the container."""
+        if type(algorithm).__name__ != self.codec:
+            raise ContainerFormatError(
+                f"Container was written by {self.codec}, not {type(algorithm).__name__}"
+            )
+
+
+@dataclass
+class ContainerIndexEntry:
+    """Footer index entry locating one chunk."""
+    frame_offset: int
+    original_offset: int
+    original_size: int
+    compressed_size: int
+
+
+def _decode_container_chunk(algorithm: BaseCompressionAlgorithm,
+                            header: ContainerHeader,
+                            compressed: bytes,
+                            original_size: int,
+                            checksum: int) -> bytes:
+    """Decompress one container chunk and verify its size and checksum."""
+    data = algorithm.decompress(compressed)
+    if len(data) != original_size or _chunk_checksum(data, header.checksum_type) != checksum:
+        raise ContainerFormatError("Chunk checksum mismatch")
+    return data
+
+
+class SeekableContainerWriter:
+    """
+    Write compressed chunks into a seekable container.
+    
+    The index is kept in memory (24 bytes per chunk) and written as a
+    footer by ``close``.
+    """
+    
+    def __init__(self, stream: io.IOBase, header: ContainerHeader):
+        """
+        Initialize writer and emit the header.
+        
+        Args:
+            stream: Writable binary stream
+            header: Container header
+        """
+        self.stream = stream
+        self.header = header
+        self.index: List[ContainerIndexEntry] = []
+        
+        self._position = 0
+        self._original_offset = 0
+        self._write(header.pack())
+    
+    def _write(self, *buffers):
+        _write_buffers(self.stream, *buffers)
+        self._position += sum(len(buffer) for buffer in buffers)
+    
+    def write_chunk(self, compressed: bytes, original: bytes) -> Optional[ContainerIndexEntry]:
+        """
+        Append a compressed chunk.
+        
+        Args:
+            compressed: Compressed chunk
+            original: Uncompressed chunk, used for the checksum
+            
+        Returns:
+            Index entry for the chunk, or None for an empty chunk
+        """
+        # An all-zero frame header marks the end of the chunks
+        if not original:
+            return None
+        
+        entry = ContainerIndexEntry(self._position, self._original_offset, len(original), len(compressed))
+        checksum = _chunk_checksum(original, self.header.checksum_type)
+        
+        self._write(_CONTAINER_FRAME.pack(len(original), len(compressed), checksum), compressed)
+        
+        self.index.append(entry)
+        self._original_offset += len(original)
+        return entry
+    
+    def close(self):
+        """Write the end marker, footer index and trailer."""
+        self._write(_CONTAINER_FRAME.pack(0, 0, 0))
+        
+        index_offset = self._position
+        self._write(b''.join(
+            _CONTAINER_INDEX_ENTRY.pack(
+                entry.frame_offset, entry.original_offset, entry.original_size, entry.compressed_size
+            )
+            for entry in self.index
+        ))
+        self._write(_CONTAINER_TRAILER.pack(index_offset, len(self.index), CONTAINER_TRAILER_MAGIC))
+
+
+class SeekableContainerReader:
+    """
+    Random access to a seekable container through its footer index.
+    
+    ``read_range`` decompresses only the chunks covering the requested
+    bytes, which is what serving HTTP range requests needs.
+    """
+    
+    def __init__(self,
+                 stream: io.IOBase,
+                 algorithm: BaseCompressionAlgorithm,
+                 end: Optional[int] = None):
+        """
+        Initialize reader and load the index.
+        
+        Args:
+            stream: Seekable binary stream positioned at the container header
+            algorithm: Algorithm matching the container codec
+            end: Stream offset just past the container trailer, for
+                containers followed by other data (default: end of stream)
+        """
+        self.stream = stream
+        self.algorithm = algorithm
+        
+        self._base = stream.tell()
+        self._end = stream.seek(0, io.SEEK_END) if end is None else end
+        stream.seek(self._base)
+        self.header = ContainerHeader.read(stream)
+        self.header.check_algorithm(algorithm)
+        self.index = self._read_index()
+        self._offsets = [entry.original_offset for entry in self.index]
+    
+    @property
+    def size(self) -> int:
+        """Total uncompressed size."""
+        if not self.index:
+            return 0
+        last = self.index[-1]
+        return last.original_offset + last.original_size
+    
+    def _read_index(self) -> List[ContainerIndexEntry]:
+        trailer_offset = self._end - _CONTAINER_TRAILER.size
+        if trailer_offset < self._base:
+            raise ContainerFormatError("Missing container index")
+        self.stream.seek(trailer_offset)
+        index_offset, chunk_count, magic = _CONTAINER_TRAILER.unpack(self.stream.read(_CONTAINER_TRAILER.size))
+        if magic != CONTAINER_TRAILER_MAGIC:
+            raise ContainerFormatError("Missing container index")
+        # The index sits directly in front of the trailer
+        if self._base + index_offset + chunk_count * _CONTAINER_INDEX_ENTRY.size != trailer_offset:
+            raise ContainerFormatError("Container index does not match trailer")
+        
+        self.stream.seek(self._base + index_offset)
+        raw = self.stream.read(chunk_count * _CONTAINER_INDEX_ENTRY.size)
+        if len(raw) < chunk_count * _CONTAINER_INDEX_ENTRY.size:
+            raise ContainerFormatError("Truncated container index")
+        
+        return [ContainerIndexEntry(*fields) for fields in _CONTAINER_INDEX_ENTRY.iter_unpack(raw)]
+    
+    def read_chunk(self, entry: ContainerIndexEntry) -> bytes:
+        """Read, decompress and verify one indexed chunk."""
+        self.stream.seek(self._base + entry.frame_offset)
+        frame = self.stream.read(_CONTAINER_FRAME.size + entry.compressed_size)
+        if len(frame) < _CONTAINER_FRAME.size + entry.compressed_size:
+            raise ContainerFormatError("Truncated container chunk")
+        
+        original_size, compressed_size, checksum = _CONTAINER_FRAME.unpack_from(frame)
+        if (original_size, compressed_size) != (entry.original_size, entry.compressed_size):
+            raise ContainerFormatError("Container index does not match chunk frame")
+        
+        return _decode_container_chunk(
+            self.algorithm, self.header, frame[_CONTAINER_FRAME.size:], original_size, checksum
+        )
+    
+    def read_range(self, offset: int, length: int) -> bytes:
+        """
+        Read uncompressed bytes ``[offset, offset + length)``.
+        
+        Args:
+            offset: Uncompressed start offset
+            length: Number of bytes to read (clamped to the end of data)
+            
+        Returns:
+            Requested bytes
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must be non-negative")
+        
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b''
+        
+        first = bisect.bisect_right(self._offsets, offset) - 1
+        parts = []
+        for entry in self.index[first:]:
+            if entry.original_offset >= end:
+                break
+            parts.append(self.read_chunk(entry))
+        
+        start = offset - self.index[first].original_offset
+        return b''.join(parts)[start:start + end - offset]
+
+
 class DistributedCompressor:
     """
     Distributed compression system with multiple backend support.
@@ -411,12 +948,17 @@ class DistributedCompressor:
     - Ray distributed computing
     - Dask distributed computing
     - Custom worker pools
+    
+    Chunks are generated lazily and at most ``max_in_flight`` are submitted
+    at a time; results are yielded in offset order, so peak memory is
+    bounded by the window rather than the input and output sizes.
     """
     
     def __init__(self,
                  algorithm: BaseCompressionAlgorithm,
                  backend: str = "multiprocessing",
-                 num_workers: Optional[int] = None):
+                 num_workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None):
         """
         Initialize distributed compressor.
         
@@ -424,10 +966,17 @@ class DistributedCompressor:
             algorithm: Compression algorithm to use
             backend: Backend for distribution ("multiprocessing", "ray", "dask")
             num_workers: Number of workers (None for auto)
+            max_in_flight: Chunks submitted but not yet yielded (None for 2 per worker)
         """
         self.algorithm = algorithm
         self.backend = backend
         self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.max_in_flight = max(1, max_in_flight or 2 * self.num_workers)
+        
+        # Serialize the algorithm once; workers receive it at startup
+        self._algorithm_pickle = pickle.dumps(algorithm)
+        
+        self.logger = logging.getLogger('distributed_compressor')
         
         # Initialize backend
         self._init_backend()
@@ -440,28 +989,40 @@ class DistributedCompressor:
             'total_time': 0.0,
             'worker_times': defaultdict(float)
         }
-        
-        self.logger = logging.getLogger('distributed_compressor')
     
     def _init_backend(self):
         """Initialize distributed backend."""
         if self.backend == "ray" and HAS_RAY:
             if not ray.is_initialized():
                 ray.init(num_cpus=self.num_workers)
+            self._ray_algorithm = ray.put(self._algorithm_pickle)
+            self._ray_compress = ray.remote(
+                lambda algorithm_pickle, chunk_data, chunk_meta: _compress_chunk_with(
+                    pickle.loads(algorithm_pickle), chunk_data, chunk_meta
+                )
+            )
             self.logger.info(f"Initialized Ray with {self.num_workers} CPUs")
             
         elif self.backend == "dask" and HAS_DASK:
             from dask.distributed import Client
             self.dask_client = Client(n_workers=self.num_workers, threads_per_worker=1)
+            self._dask_algorithm = self.dask_client.scatter(self.algorithm, broadcast=True)
             self.logger.info(f"Initialized Dask with {self.num_workers} workers")
             
         elif self.backend == "multiprocessing":
-            self.executor = ProcessPoolExecutor(max_workers=self.num_workers)
+            self.executor = self._create_process_pool()
             self.logger.info(f"Initialized multiprocessing with {self.num_workers} workers")
         else:
             self.logger.warning(f"Backend {self.backend} not available, using multiprocessing")
             self.backend = "multiprocessing"
-            self.executor = ProcessPoolExecutor(max_workers=self.num_workers)
+            self.executor = self._create_process_pool()
+    
+    def _create_process_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=_init_compression_worker,
+            initargs=(self._algorithm_pickle,)
+        )
     
     def compress_distributed(self, 
                             data: Union[bytes, str, Path],
@@ -476,129 +1037,158 @@ class DistributedCompressor:
             chunk_size: Target chunk size
             
         Returns:
-            Tuple of (compressed_chunks, metadata)
+            Tuple of (compressed_chunks in offset order, metadata)
         """
         start_time = time.time()
         
-        # Get data source
-        if isinstance(data, (str, Path)):
-            with open(data, 'rb') as f:
-                data_source = f
-                chunks = self._generate_chunks(data_source, chunk_strategy, chunk_size)
-        else:
-            chunks = self._generate_chunks(data, chunk_strategy, chunk_size)
-        
-        # Process chunks
-        if self.backend == "ray" and HAS_RAY:
-            results = self._process_with_ray(chunks)
-        elif self.backend == "dask" and HAS_DASK:
-            results = self._process_with_dask(chunks)
-        else:
-            results = self._process_with_multiprocessing(chunks)
-        
-        # Collect results
         compressed_chunks = []
         chunk_metadata = []
-        
-        for compressed, metadata in results:
+        for compressed, metadata in self.iter_compressed(data, chunk_strategy, chunk_size):
             compressed_chunks.append(compressed)
             chunk_metadata.append(metadata)
+        
+        return compressed_chunks, self._summarize(chunk_metadata, start_time)
+    
+    def compress_to_file(self,
+                         data: Union[bytes, str, Path],
+                         output: Union[str, Path, io.IOBase],
+                         chunk_strategy: ChunkingStrategy = ChunkingStrategy.ADAPTIVE,
+                         chunk_size: int = 1024 * 1024) -> Dict[str, Any]:
+        """
+        Compress data and stream the frames to ``output`` in offset order.
+        
+        Each chunk is written as soon as it and all of its predecessors
+        are done, in the StreamingCompressor frame format, so the output
+        can be read back with ``StreamingCompressor.decompress_stream``.
+        
+        Args:
+            data: Input data (bytes, file path, or Path object)
+            output: Output path or writable binary stream
+            chunk_strategy: Chunking strategy
+            chunk_size: Target chunk size
             
-            self.metrics['chunks_processed'] += 1
-            self.metrics['bytes_processed'] += metadata.size
-            self.metrics['bytes_compressed'] += len(compressed)
+        Returns:
+            Compression metadata
+        """
+        start_time = time.time()
         
-        self.metrics['total_time'] = time.time() - start_time
+        if isinstance(output, (str, Path)):
+            with open(output, 'wb') as stream:
+                return self.compress_to_file(data, stream, chunk_strategy, chunk_size)
         
-        # Calculate overall metrics
-        overall_metadata = {
-            'num_chunks': len(compressed_chunks),
-            'total_original_size': self.metrics['bytes_processed'],
-            'total_compressed_size': self.metrics['bytes_compressed'],
-            'compression_ratio': self.metrics['bytes_processed'] / max(self.metrics['bytes_compressed'], 1),
-            'processing_time': self.metrics['total_time'],
-            'throughput_mbps': (self.metrics['bytes_processed'] / 1e6) / max(self.metrics['total_time'], 0.001),
-            'chunk_metadata': chunk_metadata,
-            'backend': self.backend,
-            'num_workers': self.num_workers
-        }
+        chunk_metadata = []
+        for compressed, metadata in self.iter_compressed(data, chunk_strategy, chunk_size):
+            write_chunk_frame(output, compressed, metadata.size)
+            chunk_metadata.append(metadata)
         
-        return compressed_chunks, overall_metadata
+        return self._summarize(chunk_metadata, start_time)
     
-    def _generate_chunks(self, data, strategy, size):
-        """Generate chunks from data."""
-        generator = ChunkGenerator(strategy=strategy, target_size=size)
-        return list(generator.generate_chunks(data))
-    
-    def _process_with_multiprocessing(self, chunks):
-        """Process chunks using multiprocessing."""
-        futures = []
-        
-        for chunk_data, chunk_meta in chunks:
-            future = self.executor.submit(self._compress_chunk, chunk_data, chunk_meta)
-            futures.append(future)
-        
-        results = []
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-        
-        return results
-    
-    def _process_with_ray(self, chunks):
-        """Process chunks using Ray."""
-        if not HAS_RAY:
-            return self._process_with_multiprocessing(chunks)
-        
-        # Define Ray remote function
-        @ray.remote
-        def compress_remote(algorithm_pickle, chunk_data, chunk_meta):
-            algorithm = pickle.loads(algorithm_pickle)
-            compressed, metadata = algorithm.compress(chunk_data)
-            chunk_meta.compression_ratio = len(chunk_data) / len(compressed)
-            return compressed, chunk_meta
-        
-        # Serialize algorithm once
-        algorithm_pickle = pickle.dumps(self.algorithm)
-        
-        # Submit tasks
-        futures = []
-        for chunk_data, chunk_meta in chunks:
-            future = compress_remote.remote(algorithm_pickle, chunk_data, chunk_meta)
-            futures.append(future)
+    def iter_compressed(self,
+                        data: Union[bytes, str, Path],
+                        chunk_strategy: ChunkingStrategy = ChunkingStrategy.ADAPTIVE,
+                        chunk_size: int = 1024 * 1024) -> Iterator[Tuple[bytes, ChunkMetadata]]:
+        """
+        Yield compressed chunks in offset order with a bounded submission window.
         
-        # Get results
-        results = ray.get(futures)
-        return results
+        Args:
+            data: Input data (bytes, file path, or Path object)
+            chunk_strategy: Chunking strategy
+            chunk_size: Target chunk size
+            
+        Yields:
+            Tuples of (compressed_chunk, chunk_metadata)
+        """
+        if isinstance(data, (str, Path)):
+            # Keep the file open while chunks are generated lazily
+            with open(data, 'rb') as data_source:
+                yield from self._process_windowed(self._generate_chunks(data_source, chunk_strategy, chunk_size))
+        else:
+            yield from self._process_windowed(self._generate_chunks(data, chunk_strategy, chunk_size))
+    
+    def _generate_chunks(self, data, strategy, size) -> Iterator[Tuple[bytes, ChunkMetadata]]:
+        """Generate chunks from data lazily."""
+        generator = ChunkGenerator(strategy=strategy, target_size=size)
+        return generator.generate_chunks(data)
     
-    def _process_with_dask(self, chunks):
-        """Process chunks using Dask."""
-        if not HAS_DASK:
-            return self._process_with_multiprocessing(chunks)
+    def _process_windowed(self, chunks: Iterator[Tuple[bytes, ChunkMetadata]]) -> Iterator[Tuple[bytes, ChunkMetadata]]:
+        """
+        Keep up to ``max_in_flight`` chunks submitted and yield results in order.
         
-        from dask import delayed
+        Waiting on the oldest submission preserves order; later submissions
+        keep running meanwhile, so workers stay busy while the window is full.
+        """
+        submit, collect = self._backend_calls()
+        window = deque()
         
-        # Create delayed tasks
-        tasks = []
         for chunk_data, chunk_meta in chunks:
-            task = delayed(self._compress_chunk)(chunk_data, chunk_meta)
-            tasks.append(task)
+            window.append(submit(chunk_data, chunk_meta))
+            if len(window) >= self.max_in_flight:
+                yield self._record(collect(window.popleft()))
         
-        # Compute results
-        results = dask.compute(*tasks)
-        return results
+        while window:
+            yield self._record(collect(window.popleft()))
     
-    def _compress_chunk(self, chunk_data: bytes, chunk_meta: ChunkMetadata) -> Tuple[bytes, ChunkMetadata]:
-        """Compress a single chunk."""
-        start_time = time.time()
-        
-        compressed, metadata = self.algorithm.compress(chunk_data)
-        
-        chunk_meta.compression_ratio = len(chunk_data) / len(compressed) if compressed else 1.0
-        chunk_meta.processing_time = time.time() - start_time
-        chunk_meta.worker_id = str(multiprocessing.current_process().pid)
-        
-        return compressed, chunk_meta
+    def _backend_calls(self) -> Tuple[Callable, Callable]:
+        """Get (submit, collect) functions for the active backend."""
+        if self.backend == "ray" and HAS_RAY:
+            return (
+                lambda chunk_data, chunk_meta: self._ray_compress.remote(self._ray_algorithm, chunk_data, chunk_meta),
+                ray.get
+            )
+        if self.backend == "dask" and HAS_DASK:
+            return (
+                lambda chunk_data, chunk_meta: self.dask_client.submit(
+                    _compress_chunk_with, self._dask_algorithm, chunk_data, chunk_meta, pure=False
+                ),
+                lambda future: future.result()
+            )
+        return (
+            lambda chunk_data, chunk_meta: self.executor.submit(_compress_chunk_in_worker, chunk_data, chunk_meta),
+            lambda future: future.result()
+        )
+    
+    def _record(self, result: Tuple[bytes, ChunkMetadata]) -> Tuple[bytes, ChunkMetadata]:
+        """Update running metrics for a finished chunk."""
+        compressed, metadata = result
+        self.metrics['chunks_processed'] += 1
+        self.metrics['bytes_processed'] += metadata.size
+        self.metrics['bytes_compressed'] += len(compressed)
+        if metadata.worker_id is not None and metadata.processing_time is not None:
+            self.metrics['worker_times'][metadata.worker_id] += metadata.processing_time
+        return result
+    
+    def _summarize(self, chunk_metadata: List[ChunkMetadata], start_time: float) -> Dict[str, Any]:
+        """Build overall metadata for one compression call."""
+        elapsed = time.time() - start_time
+        self.metrics['total_time'] += elapsed
+        
+        original_size = sum(metadata.size for metadata in chunk_metadata)
+        compressed_size = sum(
+            metadata.size / metadata.compression_ratio
+            for metadata in chunk_metadata if metadata.compression_ratio
+        )
+        
+        return {
+            'num_chunks': len(chunk_metadata),
+            'total_original_size': original_size,
+            'total_compressed_size': int(round(compressed_size)),
+            'compression_ratio': original_size / max(compressed_size, 1),
+            'processing_time': elapsed,
+            'throughput_mbps': (original_size / 1e6) / max(elapsed, 0.001),
+            'chunk_metadata': chunk_metadata,
+            'backend': self.backend,
+            'num_workers': self.num_workers,
+            'max_in_flight': self.max_in_flight
+        }
+    
+    def shutdown(self, wait: bool = True):
+        """Release backend workers."""
+        if getattr(self, 'executor', None) is not None:
+            self.executor.shutdown(wait=wait)
+            self.executor = None
+        if getattr(self, 'dask_client', None) is not None:
+            self.dask_client.close()
+            self.dask_client = None
 
 
 class StreamingCompressor:
@@ -611,6 +1201,7 @@ class StreamingCompressor:
     - Async streaming
     - Backpressure handling
     - Progressive compression
+    - Seekable containers with random-access range reads
     """
     
     def __init__(self,
@@ -635,7 +1226,8 @@ class StreamingCompressor:
     def compress_stream(self, 
                         input_stream: io.IOBase,
                         output_stream: io.IOBase,
-                        chunk_size: Optional[int] = None) -> StreamState:
+                        chunk_size: Optional[int] = None,
+                        seekable: bool = False) -> StreamState:
         """
         Compress data from input stream to output stream.
         
@@ -643,11 +1235,13 @@ class StreamingCompressor:
             input_stream: Input data stream
             output_stream: Output compressed stream
             chunk_size: Chunk size for processing
+            seekable: Write a seekable container instead of bare frames
             
         Returns:
             Stream processing state
         """
         chunk_size = chunk_size or self.buffer_size
+        container = self._open_container(output_stream) if seekable else None
         
         try:
             while True:
@@ -660,13 +1254,19 @@ class StreamingCompressor:
                 compressed, metadata = self.algorithm.compress(chunk)
                 
                 # Write compressed data with header
-                self._write_chunk(output_stream, compressed, len(chunk))
+                if container:
+                    container.write_chunk(compressed, chunk)
+                else:
+                    self._write_chunk(output_stream, compressed, len(chunk))
                 
                 # Update state
                 self.state.chunk_count += 1
                 self.state.bytes_processed += len(chunk)
                 self.state.bytes_compressed += len(compressed)
                 self.state.position = input_stream.tell() if hasattr(input_stream, 'tell') else 0
+            
+            if container:
+                container.close()
                 
         except Exception as e:
             self.state.errors.append(str(e))
@@ -717,13 +1317,15 @@ class StreamingCompressor:
     
     def compress_file_streaming(self, 
                                input_path: Path,
-                               output_path: Path) -> StreamState:
+                               output_path: Path,
+                               seekable: bool = False) -> StreamState:
         """
         Compress file using streaming with memory mapping.
         
         Args:
             input_path: Input file path
             output_path: Output file path
+            seekable: Write a seekable container instead of bare frames
             
         Returns:
             Stream processing state
@@ -732,49 +1334,83 @@ class StreamingCompressor:
         
         if self.use_mmap and input_size > self.buffer_size:
             # Use memory-mapped file for large files
-            return self._compress_with_mmap(input_path, output_path)
+            return self._compress_with_mmap(input_path, output_path, seekable)
         else:
             # Use regular streaming for small files
             with open(input_path, 'rb') as infile:
                 with open(output_path, 'wb') as outfile:
-                    return self.compress_stream(infile, outfile)
+                    return self.compress_stream(infile, outfile, seekable=seekable)
     
-    def _compress_with_mmap(self, input_path: Path, output_path: Path) -> StreamState:
-        """Compress using memory-mapped file."""
+    def _compress_with_mmap(self, input_path: Path, output_path: Path, seekable: bool = False) -> StreamState:
+        """
+        Compress using memory-mapped file.
+        
+        Algorithms with ``accepts_buffers`` get memoryview slices of the map
+        instead of copies. Frames are written with one ``os.writev`` each
+        into a preallocated file, and pages already compressed are released
+        so resident memory stays near one chunk.
+        """
+        zero_copy = getattr(self.algorithm, 'accepts_buffers', False)
+        
         with open(input_path, 'rb') as infile:
             with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mmapped:
-                with open(output_path, 'wb') as outfile:
-                    offset = 0
+                _madvise(mmapped, 'MADV_SEQUENTIAL')
+                
+                with open(output_path, 'wb', buffering=0) as outfile:
+                    output = _VectoredFileWriter(outfile.fileno())
+                    output.preallocate(len(mmapped))
+                    container = self._open_container(output) if seekable else None
                     
-                    while offset < len(mmapped):
-                        # Read chunk from mmap
-                        chunk_size = min(self.buffer_size, len(mmapped) - offset)
-                        chunk = mmapped[offset:offset + chunk_size]
+                    with memoryview(mmapped) as view:
+                        offset = 0
+                        released = 0
                         
-                        # Compress chunk
-                        compressed, metadata = self.algorithm.compress(chunk)
-                        
-                        # Write compressed data
-                        self._write_chunk(outfile, compressed, len(chunk))
-                        
-                        # Update state
-                        self.state.chunk_count += 1
-                        self.state.bytes_processed += len(chunk)
-                        self.state.bytes_compressed += len(compressed)
-                        
-                        offset += chunk_size
+                        while offset < len(mmapped):
+                            # Slice chunk from mmap
+                            chunk_size = min(self.buffer_size, len(mmapped) - offset)
+                            with view[offset:offset + chunk_size] as chunk:
+                                data = chunk if zero_copy else chunk.tobytes()
+                                
+                                # Compress chunk
+                                compressed, metadata = self.algorithm.compress(data)
+                                
+                                # Write compressed data
+                                if container:
+                                    container.write_chunk(compressed, data)
+                                else:
+                                    self._write_chunk(output, compressed, chunk_size)
+                                del data
+                            
+                            # Update state
+                            self.state.chunk_count += 1
+                            self.state.bytes_processed += chunk_size
+                            self.state.bytes_compressed += len(compressed)
+                            
+                            offset += chunk_size
+                            
+                            # Drop pages already compressed from the resident set
+                            page_end = offset - offset % mmap.PAGESIZE
+                            if page_end > released:
+                                _madvise(mmapped, 'MADV_DONTNEED', released, page_end - released)
+                                released = page_end
+                    
+                    if container:
+                        container.close()
+                    output.truncate()
         
         return self.state
     
+    def _open_container(self, stream: io.IOBase) -> SeekableContainerWriter:
+        """Start a seekable container describing this compressor's algorithm."""
+        return SeekableContainerWriter(stream, ContainerHeader.for_algorithm(self.algorithm))
+    
     def _write_chunk(self, stream: io.IOBase, compressed: bytes, original_size: int):
         """
         Write compressed chunk with metadata header.
         
         Format: [original_size:4][compressed_size:4][compressed_data]
         """
-        header = struct.pack('!II', original_size, len(compressed))
-        stream.write(header)
-        stream.write(compressed)
+        write_chunk_frame(stream, compressed, original_size)
     
     def decompress_stream(self,
                          input_stream: io.IOBase,
@@ -782,6 +1418,9 @@ class StreamingCompressor:
         """
         Decompress stream data.
         
+        Accepts both bare frames and seekable containers; containers are
+        read sequentially and every chunk checksum is verified.
+        
         Args:
             input_stream: Compressed data stream
             output_stream: Output decompressed stream
@@ -792,9 +1431,12 @@ class StreamingCompressor:
         state = StreamState()
         
         try:
+            header = input_stream.read(8)
+            if header[:4] == CONTAINER_MAGIC:
+                return self._decompress_container(input_stream, output_stream, header, state)
+            
             while True:
                 # Read chunk header
-                header = input_stream.read(8)
                 if not header or len(header) < 8:
                     break
                 
@@ -816,12 +1458,66 @@ class StreamingCompressor:
                 state.bytes_processed += compressed_size
                 state.bytes_compressed += len(decompressed)
                 
+                header = input_stream.read(8)
+                
         except Exception as e:
             state.errors.append(str(e))
             self.logger.error(f"Stream decompression error: {e}")
             raise
         
         return state
+    
+    def _decompress_container(self,
+                              input_stream: io.IOBase,
+                              output_stream: io.IOBase,
+                              prefix: bytes,
+                              state: StreamState) -> StreamState:
+        """Sequentially decompress a seekable container up to its end marker."""
+        header = ContainerHeader.read(input_stream, prefix)
+        header.check_algorithm(self.algorithm)
+        
+        while True:
+            frame = input_stream.read(_CONTAINER_FRAME.size)
+            if len(frame) < _CONTAINER_FRAME.size:
+                raise ContainerFormatError("Container ended without end marker")
+            
+            original_size, compressed_size, checksum = _CONTAINER_FRAME.unpack(frame)
+            if original_size == 0 and compressed_size == 0:
+                break
+            
+            compressed = input_stream.read(compressed_size)
+            if len(compressed) < compressed_size:
+                raise ContainerFormatError("Truncated container chunk")
+            
+            decompressed = _decode_container_chunk(self.algorithm, header, compressed, original_size, checksum)
+            output_stream.write(decompressed)
+            
+            state.chunk_count += 1
+            state.bytes_processed += compressed_size
+            state.bytes_compressed += len(decompressed)
+        
+        return state
+    
+    def read_range(self,
+                   input_stream: io.IOBase,
+                   offset: int,
+                   length: int,
+                   end: Optional[int] = None) -> bytes:
+        """
+        Read an uncompressed byte range from a seekable container.
+        
+        Only the chunks covering the range are decompressed.
+        
+        Args:
+            input_stream: Seekable stream positioned at the container header
+            offset: Uncompressed start offset
+            length: Number of bytes to read
+            end: Stream offset just past the container (default: end of stream)
+            
+        Returns:
+            Requested bytes
+        """
+        return SeekableContainerReader(input_stream, self.algorithm, end).read_range(offset, length)
 
 
 class PipelineProcessor:
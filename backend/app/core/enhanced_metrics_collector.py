@@ -4,9 +4,9 @@ Collects ALL system metrics with accurate, live data.
 """
 
 import psutil
-import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
+from app.core.system_sampler import get_system_sampler
 from app.models.metrics import PerformanceMetrics
 
 
@@ -20,20 +20,21 @@ class EnhancedSystemMetrics:
         Works in Docker containers on Windows, Linux, and macOS.
         """
         try:
+            snapshot = get_system_sampler().latest()
             return {
                 # Basic system metrics
-                "cpu_usage": psutil.cpu_percent(interval=0.1),
-                "memory_usage": psutil.virtual_memory().percent,
-                "disk_usage": psutil.disk_usage('/').percent,
+                "cpu_usage": snapshot.cpu_percent,
+                "memory_usage": snapshot.memory.percent,
+                "disk_usage": snapshot.disk.percent,
                 "network_usage": EnhancedSystemMetrics._get_network_usage_percent(),
                 
                 # Process information
-                "processes": len(psutil.pids()),
+                "processes": snapshot.process_count,
                 "threads": sum([p.num_threads() for p in psutil.process_iter(['num_threads']) if p.info.get('num_threads')]),
                 "open_files": EnhancedSystemMetrics._get_open_files_count(),
                 
                 # System uptime
-                "uptime": int(time.time() - psutil.boot_time()),
+                "uptime": int(snapshot.uptime),
                 
                 # Network connections
                 "network_connections": len(psutil.net_connections(kind='inet')),
@@ -55,7 +56,7 @@ class EnhancedSystemMetrics:
                 "load_average": EnhancedSystemMetrics._get_load_average(),
                 
                 # Additional metrics
-                "swap_usage": psutil.swap_memory().percent,
+                "swap_usage": snapshot.swap.percent,
                 "disk_io": EnhancedSystemMetrics._get_disk_io_stats(),
                 "timestamp": datetime.utcnow().isoformat()
             }
@@ -67,15 +68,9 @@ class EnhancedSystemMetrics:
     def _get_network_usage_percent() -> float:
         """Calculate network usage as a percentage."""
         try:
-            # Get network I/O stats
-            net_io1 = psutil.net_io_counters()
-            time.sleep(0.1)
-            net_io2 = psutil.net_io_counters()
-            
-            # Calculate bytes per second
-            bytes_sent_per_sec = (net_io2.bytes_sent - net_io1.bytes_sent) / 0.1
-            bytes_recv_per_sec = (net_io2.bytes_recv - net_io1.bytes_recv) / 0.1
-            total_bytes_per_sec = bytes_sent_per_sec + bytes_recv_per_sec
+            # Rates come from consecutive sampler readings
+            snapshot = get_system_sampler().latest()
+            total_bytes_per_sec = snapshot.net_sent_bytes_per_sec + snapshot.net_recv_bytes_per_sec
             
             # Assume 1 Gbps connection (125 MB/s), calculate percentage
             # Adjust this value based on your actual network capacity
@@ -107,16 +102,9 @@ class EnhancedSystemMetrics:
         """Get detailed CPU information."""
         try:
             cpu_freq = psutil.cpu_freq()
-            cpu_percent_per_cpu = psutil.cpu_percent(interval=0.1, percpu=True)
-            
-            # Try to get temperature (works on some systems)
-            temperature = 0.0
-            try:
-                temps = psutil.sensors_temperatures()
-                if temps and 'coretemp' in temps:
-                    temperature = temps['coretemp'][0].current
-            except (AttributeError, KeyError):
-                temperature = 0.0
+            snapshot = get_system_sampler().latest()
+            cpu_percent_per_cpu = list(snapshot.cpu_per_core)
+            temperature = snapshot.cpu_temperature or 0.0
             
             return {
                 "cores": psutil.cpu_count(logical=False) or psutil.cpu_count(),
@@ -143,8 +131,9 @@ class EnhancedSystemMetrics:
     def _get_memory_details() -> Dict[str, Any]:
         """Get detailed memory information."""
         try:
-            mem = psutil.virtual_memory()
-            swap = psutil.swap_memory()
+            snapshot = get_system_sampler().latest()
+            mem = snapshot.memory
+            swap = snapshot.swap
             
             return {
                 "total": mem.total,
@@ -180,8 +169,9 @@ class EnhancedSystemMetrics:
     def _get_disk_details() -> Dict[str, Any]:
         """Get detailed disk information."""
         try:
-            disk = psutil.disk_usage('/')
-            io_counters = psutil.disk_io_counters()
+            snapshot = get_system_sampler().latest()
+            disk = snapshot.disk
+            io_counters = snapshot.disk_io
             
             return {
                 "total": disk.total,
@@ -285,7 +275,7 @@ class EnhancedSystemMetrics:
                 return list(psutil.getloadavg())
             else:
                 # Fallback for Windows - estimate from CPU usage
-                cpu_percent = psutil.cpu_percent(interval=0.1)
+                cpu_percent = get_system_sampler().latest().cpu_percent
                 return [cpu_percent / 100.0] * 3
         except Exception:
             return [0.0, 0.0, 0.0]
@@ -294,11 +284,12 @@ class EnhancedSystemMetrics:
     def _get_disk_io_stats() -> Dict[str, Any]:
         """Get disk I/O statistics."""
         try:
-            io_counters = psutil.disk_io_counters()
+            snapshot = get_system_sampler().latest()
+            io_counters = snapshot.disk_io
             if io_counters:
                 return {
-                    "read_mb_per_sec": 0.0,  # Would need sampling
-                    "write_mb_per_sec": 0.0,  # Would need sampling
+                    "read_mb_per_sec": snapshot.disk_read_bytes_per_sec / (1024 * 1024),
+                    "write_mb_per_sec": snapshot.disk_write_bytes_per_sec / (1024 * 1024),
                     "total_read_mb": io_counters.read_bytes / (1024 * 1024),
                     "total_write_mb": io_counters.write_bytes / (1024 * 1024)
                 }
@@ -0,0 +1,232 @@
+"""
+Gorilla-style block codec for time series.
+
+Encodes a block of (timestamp, value) samples the way Facebook's Gorilla
+TSDB does (Pelkonen et al., VLDB 2015):
+
+- Timestamps (integer milliseconds) as delta-of-delta with variable-length
+  prefix codes; a regular cadence costs one bit per sample.
+- Values (float64) XORed with the previous value; unchanged values cost one
+  bit, and slowly changing values store only the meaningful bits inside
+  the previous leading/trailing-zero window.
+
+A block is self-contained: the first timestamp and value are stored raw,
+so range scans can decode any block independently. The sample count is
+kept by the caller (the block header), not in the payload.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Delta-of-delta buckets: (prefix, prefix bits, value bits)
+_DOD_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+    (0b11110, 5, 32),
+)
+_DOD_FALLBACK = (0b11111, 5, 64)
+# Value width by number of leading prefix ones
+_DOD_WIDTHS = (0,) + tuple(bucket[2] for bucket in _DOD_BUCKETS) + (_DOD_FALLBACK[2],)
+
+_MASK64 = (1 << 64) - 1
+
+
+def _dod_bucket(dod: int) -> Tuple[int, int, int]:
+    for bucket in _DOD_BUCKETS:
+        bits = bucket[2]
+        if -(1 << (bits - 1)) <= dod < (1 << (bits - 1)):
+            return bucket
+    return _DOD_FALLBACK
+
+
+def encode_block(timestamps: Sequence[int], values: Sequence[float]) -> bytes:
+    """
+    Encode one block of samples.
+
+    Args:
+        timestamps: Non-decreasing integer timestamps (milliseconds)
+        values: Float values, same length
+
+    Returns:
+        Encoded payload
+
+    Raises:
+        ValueError: If the inputs are empty, of different lengths or unsorted
+    """
+    count = len(timestamps)
+    if count == 0 or count != len(values):
+        raise ValueError("encode_block needs equal, non-zero numbers of timestamps and values")
+
+    times = [int(t) for t in timestamps]
+    bits_list = np.ascontiguousarray(values, dtype='<f8').view('<u8').tolist()
+
+    out = bytearray()
+    acc = 0
+    nbits = 0
+
+    # Header sample, stored raw
+    acc = ((times[0] & _MASK64) << 64) | bits_list[0]
+    nbits = 128
+
+    previous_time = times[0]
+    previous_delta = 0
+    previous_bits = bits_list[0]
+    previous_lead = -1
+    previous_trail = 0
+
+    for i in range(1, count):
+        # Timestamp
+        timestamp = times[i]
+        delta = timestamp - previous_time
+        if delta < 0:
+            raise ValueError("timestamps must be non-decreasing within a block")
+        dod = delta - previous_delta
+        if dod == 0:
+            acc <<= 1
+            nbits += 1
+        else:
+            prefix, prefix_bits, value_bits = _dod_bucket(dod)
+            acc = (((acc << prefix_bits) | prefix) << value_bits) | (dod & ((1 << value_bits) - 1))
+            nbits += prefix_bits + value_bits
+        previous_time = timestamp
+        previous_delta = delta
+
+        # Value
+        bits = bits_list[i]
+        xor = bits ^ previous_bits
+        if xor == 0:
+            acc <<= 1
+            nbits += 1
+        else:
+            lead = min(64 - xor.bit_length(), 31)
+            trail = (xor & -xor).bit_length() - 1
+            if previous_lead >= 0 and lead >= previous_lead and trail >= previous_trail:
+                meaningful = 64 - previous_lead - previous_trail
+                acc = (((acc << 2) | 0b10) << meaningful) | (xor >> previous_trail)
+                nbits += 2 + meaningful
+            else:
+                meaningful = 64 - lead - trail
+                acc = (((((acc << 2) | 0b11) << 5 | lead) << 6 | (meaningful - 1)) << meaningful) | (xor >> trail)
+                nbits += 13 + meaningful
+                previous_lead = lead
+                previous_trail = trail
+        previous_bits = bits
+
+        # Move whole bytes out of the accumulator
+        if nbits >= 256:
+            whole = nbits >> 3
+            rest = nbits & 7
+            out += (acc >> rest).to_bytes(whole, 'big')
+            acc &= (1 << rest) - 1
+            nbits = rest
+
+    if nbits:
+        whole = (nbits + 7) >> 3
+        out += (acc << (whole * 8 - nbits)).to_bytes(whole, 'big')
+    return bytes(out)
+
+
+def decode_block(payload: bytes, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a block produced by ``encode_block``.
+
+    Args:
+        payload: Encoded block
+        count: Number of samples in the block
+
+    Returns:
+        (timestamps as int64, values as float64)
+
+    Raises:
+        ValueError: If the payload is truncated
+    """
+    if count <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    if len(payload) < 16:
+        raise ValueError("Truncated time-series block")
+
+    data = bytes(payload) + bytes(9)
+    from_bytes = int.from_bytes
+    first_time = from_bytes(data[0:8], 'big')
+    if first_time >> 63:
+        first_time -= 1 << 64
+    times = [first_time]
+    bits_list = [from_bytes(data[8:16], 'big')]
+    dod_widths = _DOD_WIDTHS
+
+    # Bits are read from a 72-bit window loaded at the byte holding the
+    # read position; ``avail`` counts unread bits left in the window.
+    # After a reload at least 65 bits are available.
+    byte = 16
+    window = from_bytes(data[byte:byte + 9], 'big')
+    avail = 72
+    previous_time = first_time
+    previous_delta = 0
+    previous_bits = bits_list[0]
+    previous_lead = 0
+    previous_trail = 0
+    for _ in range(count - 1):
+        if avail < 16:
+            position = byte * 8 + 72 - avail
+            byte = position >> 3
+            window = from_bytes(data[byte:byte + 9], 'big')
+            avail = 72 - (position & 7)
+
+        # Timestamp: up to five prefix ones, then a fixed-width delta-of-delta
+        avail -= 1
+        if (window >> avail) & 1:
+            ones = 1
+            while ones < 5:
+                avail -= 1
+                if not (window >> avail) & 1:
+                    break
+                ones += 1
+            width = dod_widths[ones]
+            if width > avail:
+                position = byte * 8 + 72 - avail
+                byte = position >> 3
+                window = from_bytes(data[byte:byte + 9], 'big')
+                avail = 72 - (position & 7)
+            avail -= width
+            dod = (window >> avail) & ((1 << width) - 1)
+            if dod >> (width - 1):
+                dod -= 1 << width
+            previous_delta += dod
+        previous_time += previous_delta
+        times.append(previous_time)
+
+        # Value: '0' repeat, '10' same window, '11' new window
+        if avail < 13:
+            position = byte * 8 + 72 - avail
+            byte = position >> 3
+            window = from_bytes(data[byte:byte + 9], 'big')
+            avail = 72 - (position & 7)
+        avail -= 1
+        if (window >> avail) & 1:
+            avail -= 1
+            if (window >> avail) & 1:
+                avail -= 11
+                control = (window >> avail) & 0x7FF
+                previous_lead = control >> 6
+                meaningful = (control & 0x3F) + 1
+                previous_trail = 64 - previous_lead - meaningful
+            else:
+                meaningful = 64 - previous_lead - previous_trail
+            if meaningful > avail:
+                position = byte * 8 + 72 - avail
+                byte = position >> 3
+                window = from_bytes(data[byte:byte + 9], 'big')
+                avail = 72 - (position & 7)
+            avail -= meaningful
+            previous_bits ^= ((window >> avail) & ((1 << meaningful) - 1)) << previous_trail
+        bits_list.append(previous_bits)
+
+    if byte * 8 + 72 - avail > len(payload) * 8:
+        raise ValueError("Truncated time-series block")
+
+    timestamps = np.array(times, dtype=np.int64)
+    values = np.array(bits_list, dtype=np.uint64).view(np.float64)
+    return timestamps, values
@@ -6,12 +6,13 @@ This system provides intelligent fallback mechanisms for compression operations:
 2. Automatic algorithm switching on failure
 3. Resource-aware degradation
 4. Circuit breaker pattern implementation
-5. Retry with exponential backoff
+5. Retry with exponential backoff (non-blocking)
 6. Health monitoring and recovery
 7. Performance-based routing
 8. Load shedding under pressure
 9. Predictive failure detection
 10. Self-healing capabilities
+11. Killable attempts on a shared process pool, and hedged requests
 
 Mathematical Model:
 ------------------
@@ -38,6 +39,7 @@ References:
 import time
 import threading
 import queue
+import pickle
 import logging
 import traceback
 import functools
@@ -49,7 +51,6 @@ from enum import Enum
 from datetime import datetime, timedelta
 from collections import deque, defaultdict
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
 import psutil
 import gc
 import warnings
@@ -60,6 +61,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from algorithms.base_algorithm import BaseCompressionAlgorithm
+from .codec_cost_model import ServiceLevel, content_profile, cost_model_enabled, get_codec_cost_model
+from .compression_executor import (
+    FAST_LANE, HEAVY_LANE, get_compression_executor, get_isolated_process_pool
+)
 
 
 class HealthStatus(Enum):
@@ -213,6 +218,27 @@ class RetryPolicy:
         return delay
 
 
+@dataclass
+class HedgingPolicy:
+    """
+    Hedged request configuration.
+    
+    When an attempt runs past the ``percentile`` of its algorithm's recent
+    latencies, a backup attempt with the fast fallback codec is launched and
+    the first successful result wins; the loser is cancelled.
+    """
+    enabled: bool = True
+    percentile: float = 95.0
+    min_samples: int = 20
+    algorithm: Optional[str] = None  # Defaults to the end of the fallback chain
+    
+    def get_threshold(self, latencies) -> Optional[float]:
+        """Hedge delay in seconds, or None without enough history."""
+        if not self.enabled or len(latencies) < self.min_samples:
+            return None
+        return float(np.percentile(latencies, self.percentile))
+
+
 class ResourceMonitor:
     """
     Monitor system resources for adaptive degradation.
@@ -340,19 +366,30 @@ class GracefulDegradationSystem:
     Features:
     - Multi-level fallback hierarchy
     - Circuit breaker pattern
-    - Retry with backoff
+    - Retry with non-blocking backoff
+    - Attempts on the shared isolated process pool, killed on timeout
+    - Hedged requests against tail latency
     - Resource-aware degradation
     - Health monitoring
     - Predictive failure detection
     - Self-healing
     """
     
-    def __init__(self, algorithms: Dict[str, BaseCompressionAlgorithm]):
+    def __init__(self,
+                 algorithms: Dict[str, BaseCompressionAlgorithm],
+                 retry_policy: Optional[RetryPolicy] = None,
+                 hedging_policy: Optional[HedgingPolicy] = None,
+                 isolate: bool = True):
         """
         Initialize degradation system.
         
         Args:
             algorithms: Dictionary of available algorithms
+            retry_policy: Retry configuration
+            hedging_policy: Hedged request configuration
+            isolate: Run attempts in killable worker processes; otherwise
+                (and for unpicklable algorithms) on the compression
+                executor's threads, where a timed-out attempt is abandoned
         """
         self.algorithms = algorithms
         self.primary_algorithm = list(algorithms.keys())[0] if algorithms else None
@@ -367,8 +404,15 @@ class GracefulDegradationSystem:
         for name in algorithms:
             self.circuit_breakers[name] = CircuitBreaker(name)
         
-        # Retry policies
-        self.retry_policy = RetryPolicy()
+        # Retry and hedging policies
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedging_policy = hedging_policy or HedgingPolicy()
+        self.hedge_stats = {'launched': 0, 'won': 0}
+        
+        # Long-lived worker pool shared by all systems
+        self.process_pool = get_isolated_process_pool() if isolate else None
+        self._unpicklable = set()
+        self.cost_model = get_codec_cost_model()
         
         # Resource monitoring
         self.resource_monitor = ResourceMonitor()
@@ -409,7 +453,7 @@ class GracefulDegradationSystem:
         
         return chain
     
-    def compress_with_fallback(self, data: bytes, **params) -> Tuple[bytes, Any]:
+    async def compress_with_fallback_async(self, data: bytes, **params) -> Tuple[bytes, Any]:
         """
         Compress with automatic fallback on failure.
         
@@ -418,7 +462,8 @@ class GracefulDegradationSystem:
             **params: Compression parameters
             
         Returns:
-            Tuple of (compressed_data, metadata)
+            Tuple of (compressed_data, metadata); the algorithm that produced
+            the data is recorded in ``metadata.data_characteristics['degradation']``
         """
         errors = []
         
@@ -437,35 +482,16 @@ class GracefulDegradationSystem:
                 self.logger.info(f"Circuit breaker open for {algo_name}, skipping")
                 continue
             
-            # Try compression with retry
+            # Try compression with retry, hedged by the fast fallback codec
             try:
-                result = self._compress_with_retry(
-                    algo_name, data, **params
-                )
+                result, used_algorithm = await self._compress_hedged(algo_name, data, **params)
                 
                 if result:
-                    # Success - update health
-                    self.health_status[algo_name].success_count += 1
-                    self.health_status[algo_name].total_requests += 1
-                    self.health_status[algo_name].last_success_time = datetime.now()
-                    self.health_status[algo_name].update_status()
-                    
-                    # Record success in circuit breaker
-                    self.circuit_breakers[algo_name].record_success()
-                    
-                    return result
+                    self._record_success(used_algorithm)
+                    return self._annotate(result, used_algorithm, hedged=used_algorithm != algo_name)
                     
             except Exception as e:
-                # Failure - update health
-                self.health_status[algo_name].failure_count += 1
-                self.health_status[algo_name].total_requests += 1
-                self.health_status[algo_name].last_failure_time = datetime.now()
-                self.health_status[algo_name].error_messages.append(str(e))
-                self.health_status[algo_name].update_status()
-                
-                # Record failure in circuit breaker
-                self.circuit_breakers[algo_name].record_failure()
-                
+                self._record_failure(algo_name, e)
                 errors.append({
                     'algorithm': algo_name,
                     'error': str(e),
@@ -476,9 +502,84 @@ class GracefulDegradationSystem:
         
         # All algorithms failed - last resort fallback
         self.logger.critical("All algorithms failed, using emergency fallback")
-        return self._emergency_fallback(data, errors)
+        return await get_compression_executor().run(FAST_LANE, self._emergency_fallback, data, errors)
+    
+    def _record_success(self, algo_name: str):
+        health = self.health_status[algo_name]
+        health.success_count += 1
+        health.total_requests += 1
+        health.last_success_time = datetime.now()
+        health.update_status()
+        self.circuit_breakers[algo_name].record_success()
+    
+    def _record_failure(self, algo_name: str, error: Exception):
+        health = self.health_status[algo_name]
+        health.failure_count += 1
+        health.total_requests += 1
+        health.last_failure_time = datetime.now()
+        health.error_messages.append(str(error))
+        health.update_status()
+        self.circuit_breakers[algo_name].record_failure()
+    
+    @staticmethod
+    def _annotate(result: Tuple[bytes, Any], algo_name: str, hedged: bool) -> Tuple[bytes, Any]:
+        """Record which algorithm produced ``result`` in its metadata."""
+        characteristics = getattr(result[1], 'data_characteristics', None)
+        if isinstance(characteristics, dict):
+            characteristics['degradation'] = {'algorithm': algo_name, 'hedged': hedged}
+        return result
+    
+    def _attempt_timeout(self, data: bytes) -> float:
+        """Per-attempt deadline based on data size."""
+        return max(10, len(data) / 1e6 * 5)  # 5 seconds per MB
+    
+    def _hedge_algorithm(self, algo_name: str) -> Optional[str]:
+        """Fast codec to hedge ``algo_name`` with, if any."""
+        hedge_name = self.hedging_policy.algorithm or (self.fallback_chain[-1] if self.fallback_chain else None)
+        if hedge_name is None or hedge_name == algo_name or hedge_name not in self.algorithms:
+            return None
+        if self.circuit_breakers[hedge_name].state == CircuitState.OPEN:
+            return None
+        return hedge_name
     
-    def _compress_with_retry(self, algo_name: str, data: bytes, **params) -> Optional[Tuple[bytes, Any]]:
+    async def _run_attempt(self, algo_name: str, data: bytes, timeout: float, **params) -> Tuple[bytes, Any]:
+        """
+        Run one compression attempt with a deadline.
+        
+        On the process pool an attempt that overruns is killed. Algorithms
+        that cannot be pickled run on the compression executor instead,
+        where an overrunning attempt keeps its lane slot until it finishes.
+        """
+        algorithm = self.algorithms[algo_name]
+        start = time.perf_counter()
+        
+        result = None
+        if self.process_pool is not None and algo_name not in self._unpicklable:
+            try:
+                result = await self.process_pool.run(algorithm.compress, data, timeout=timeout, **params)
+            except pickle.PicklingError:
+                self.logger.info(f"{algo_name} cannot be sent to worker processes, using threads")
+                self._unpicklable.add(algo_name)
+        
+        if result is None:
+            executor = get_compression_executor()
+            lane = FAST_LANE if executor.lanes[HEAVY_LANE].use_processes else HEAVY_LANE
+            try:
+                result = await asyncio.wait_for(executor.run(lane, algorithm.compress, data, **params), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Compression timeout after {timeout}s") from None
+        
+        elapsed = time.perf_counter() - start
+        health = self.health_status[algo_name]
+        health.performance_history.append(elapsed)
+        health.avg_response_time = float(np.mean(health.performance_history))
+        if cost_model_enabled():
+            self.cost_model.record_compression(
+                content_profile(data), len(data), algo_name, params.get('level'), len(result[0]), elapsed
+            )
+        return result
+    
+    async def _compress_with_retry(self, algo_name: str, data: bytes, **params) -> Optional[Tuple[bytes, Any]]:
         """
         Compress with retry logic.
         
@@ -490,26 +591,18 @@ class GracefulDegradationSystem:
         Returns:
             Compression result or None on failure
         """
-        algorithm = self.algorithms.get(algo_name)
-        if not algorithm:
+        if algo_name not in self.algorithms:
             return None
         
+        timeout = self._attempt_timeout(data)
         last_exception = None
         
         for attempt in range(self.retry_policy.max_attempts):
             try:
-                # Set timeout based on data size
-                timeout = max(10, len(data) / 1e6 * 5)  # 5 seconds per MB
+                return await self._run_attempt(algo_name, data, timeout, **params)
                 
-                # Execute with timeout
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(algorithm.compress, data, **params)
-                    result = future.result(timeout=timeout)
-                    
-                    return result
-                    
-            except TimeoutError:
-                last_exception = TimeoutError(f"Compression timeout after {timeout}s")
+            except TimeoutError as e:
+                last_exception = e
                 self.logger.warning(f"Attempt {attempt + 1} timed out for {algo_name}")
                 
             except Exception as e:
@@ -518,8 +611,7 @@ class GracefulDegradationSystem:
             
             # Wait before retry (except for last attempt)
             if attempt < self.retry_policy.max_attempts - 1:
-                delay = self.retry_policy.get_delay(attempt)
-                time.sleep(delay)
+                await asyncio.sleep(self.retry_policy.get_delay(attempt))
         
         # All retries failed
         if last_exception:
@@ -527,6 +619,51 @@ class GracefulDegradationSystem:
         
         return None
     
+    async def _compress_hedged(self, algo_name: str, data: bytes, **params) -> Tuple[Optional[Tuple[bytes, Any]], str]:
+        """
+        Compress with ``algo_name``, hedging with the fast codec on slow attempts.
+        
+        Returns:
+            Tuple of (result, name of the algorithm that produced it)
+        """
+        primary = asyncio.create_task(self._compress_with_retry(algo_name, data, **params))
+        hedge_name = self._hedge_algorithm(algo_name)
+        threshold = self.hedging_policy.get_threshold(self.health_status[algo_name].performance_history)
+        if hedge_name is None or threshold is None:
+            return await primary, algo_name
+        
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done:
+            return primary.result(), algo_name
+        
+        self.hedge_stats['launched'] += 1
+        self.logger.info(f"{algo_name} exceeded p{self.hedging_policy.percentile:g} "
+                         f"({threshold:.3f}s), hedging with {hedge_name}")
+        hedge = asyncio.create_task(self._run_attempt(hedge_name, data, self._attempt_timeout(data), **params))
+        names = {primary: algo_name, hedge: hedge_name}
+        pending = set(names)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result():
+                        if task is hedge:
+                            self.hedge_stats['won'] += 1
+                            if primary.done() and (primary.exception() is not None or not primary.result()):
+                                # The caller only sees the hedge: record the primary's failure here
+                                self._record_failure(algo_name, primary.exception() or RuntimeError("No result"))
+                        return task.result(), names[task]
+                    if task is hedge:
+                        self._record_failure(hedge_name, task.exception() or RuntimeError("No result"))
+            # Both failed: report the primary's error
+            return primary.result(), algo_name
+        finally:
+            # Cancelling the loser kills its worker process
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
     def _emergency_fallback(self, data: bytes, errors: List[Dict]) -> Tuple[bytes, Dict]:
         """
         Emergency fallback when all algorithms fail.
@@ -609,7 +746,7 @@ class GracefulDegradationSystem:
         
         return min(max(base_prob, 0.0), 1.0)
     
-    def select_best_algorithm(self, data: bytes) -> str:
+    def select_best_algorithm(self, data: bytes, service_level: Optional[ServiceLevel] = None) -> str:
         """
         Select best algorithm based on current conditions.
         
@@ -618,16 +755,26 @@ class GracefulDegradationSystem:
         - Resource availability
         - Data characteristics
         - Historical performance
+        - Measured cost against ``service_level``: algorithms the cost model
+          predicts will miss it are skipped while any is predicted to meet it
         
         Args:
             data: Data to compress
+            service_level: Latency/throughput requirements
             
         Returns:
             Best algorithm name
         """
         scores = {}
+        candidates = list(self.algorithms)
+        
+        if service_level is not None:
+            options = self.cost_model.estimate(content_profile(data), len(data), codecs=candidates)
+            meeting = {option['codec'] for option in options if service_level.is_met(option)}
+            if meeting:
+                candidates = [algo_name for algo_name in candidates if algo_name in meeting]
         
-        for algo_name in self.algorithms:
+        for algo_name in candidates:
             # Skip if circuit breaker is open
             if self.circuit_breakers[algo_name].state == CircuitState.OPEN:
                 continue
@@ -729,6 +876,8 @@ class GracefulDegradationSystem:
                 for name, health in self.health_status.items()
             },
             'degradation_level': self.resource_monitor.get_degradation_level(),
+            'hedging': dict(self.hedge_stats),
+            'isolated_pool': self.process_pool.get_stats() if self.process_pool is not None else None,
             'timestamp': datetime.now().isoformat()
         }
     
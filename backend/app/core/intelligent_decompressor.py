@@ -3,26 +3,138 @@ Intelligent Decompression System with Auto-Algorithm Detection.
 
 This module provides advanced decompression capabilities with automatic
 algorithm detection using multiple strategies:
-1. Magic byte signature detection
-2. Brute-force algorithm testing
+1. Container header validation (magic bytes plus header fields)
+2. Parallel trial decompression of a bounded prefix
 3. Content validation through text analysis
 4. Entropy-based verification
+
+Only the winning candidate is decompressed in full, so detection cost and
+memory stay bounded by the probe size rather than the payload size.
 """
 
 import asyncio
+import bz2
+import io
 import logging
+import lzma
 import math
 import re
+import struct
+import zlib
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from collections import Counter
 
-from .compression_engine import CompressionEngine
+import brotli
+import lz4.frame
+import zstandard as zstd
+
+from .compression_engine import get_compression_engine
+from .compression_executor import CompressionQueueFullError, FAST_LANE, get_compression_executor
 from ..models.compression import CompressionAlgorithm
 
 logger = logging.getLogger(__name__)
 
 
+# Header validators: magic bytes alone are too weak (e.g. b'BZ'), so each
+# check also verifies fixed fields of the container header.
+
+def _is_gzip_header(data: bytes) -> bool:
+    """RFC 1952: magic, deflate method, reserved flag bits clear."""
+    return len(data) >= 10 and data[:3] == b'\x1f\x8b\x08' and data[3] & 0xE0 == 0
+
+
+def _is_zstd_header(data: bytes) -> bool:
+    """RFC 8878: frame magic and a frame header descriptor with reserved bit clear."""
+    return len(data) >= 6 and data[:4] == b'\x28\xb5\x2f\xfd' and data[4] & 0x08 == 0
+
+
+def _is_xz_header(data: bytes) -> bool:
+    """XZ stream header: magic, known check type and matching CRC32 of the flags."""
+    if len(data) < 12 or data[:6] != b'\xfd7zXZ\x00':
+        return False
+    flags = data[6:8]
+    if flags[0] != 0 or flags[1] not in (0x00, 0x01, 0x04, 0x0A):
+        return False
+    return zlib.crc32(flags) == struct.unpack('<I', data[8:12])[0]
+
+
+def _is_lzma_alone_header(data: bytes) -> bool:
+    """Legacy .lzma header: valid lc/lp/pb properties and a 2^n or 3*2^n dictionary."""
+    if len(data) < 13 or data[0] >= 225:
+        return False
+    dict_size = struct.unpack('<I', data[1:5])[0]
+    if dict_size < 4096:
+        return False
+    if dict_size % 3 == 0:
+        dict_size //= 3
+    return (dict_size & (dict_size - 1)) == 0
+
+
+def _is_bzip2_header(data: bytes) -> bool:
+    """bzip2: 'BZh', block size digit, then block or end-of-stream magic."""
+    return (
+        len(data) >= 10 and data[:3] == b'BZh' and data[3:4] in b'123456789'
+        and data[4:10] in (b'\x31\x41\x59\x26\x53\x59', b'\x17\x72\x45\x38\x50\x90')
+    )
+
+
+def _is_lz4_frame_header(data: bytes) -> bool:
+    """LZ4 frame: magic, version 01, reserved bits clear, valid block max size."""
+    if len(data) < 7 or data[:4] != b'\x04\x22\x4d\x18':
+        return False
+    flg, bd = data[4], data[5]
+    return flg >> 6 == 1 and flg & 0x02 == 0 and bd & 0x8F == 0 and (bd >> 4) & 0x07 >= 4
+
+
+# Bounded prefix decoders; each returns at most ``limit`` bytes of output
+# and tolerates the input being cut mid-stream.
+
+def _probe_gzip(data: bytes, limit: int) -> bytes:
+    return zlib.decompressobj(wbits=31).decompress(data, limit)
+
+
+def _probe_zstd(data: bytes, limit: int) -> bytes:
+    with zstd.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+        return reader.read(limit)
+
+
+def _probe_lz4(data: bytes, limit: int) -> bytes:
+    return lz4.frame.LZ4FrameDecompressor().decompress(data, max_length=limit)
+
+
+def _probe_lzma(data: bytes, limit: int) -> bytes:
+    return lzma.LZMADecompressor().decompress(data, max_length=limit)
+
+
+def _probe_bzip2(data: bytes, limit: int) -> bytes:
+    return bz2.BZ2Decompressor().decompress(data, max_length=limit)
+
+
+def _probe_brotli(data: bytes, limit: int) -> bytes:
+    # The Brotli decoder has no output cap, so feed small slices instead
+    decompressor = brotli.Decompressor()
+    output = bytearray()
+    for start in range(0, len(data), 4096):
+        output += decompressor.process(data[start:start + 4096])
+        if len(output) >= limit:
+            break
+    return bytes(output[:limit])
+
+
+def _trim_partial_utf8(data: bytes) -> bytes:
+    """Drop a multi-byte UTF-8 sequence cut off at the end of a probe."""
+    for cut in range(1, 4):
+        if len(data) <= cut:
+            break
+        try:
+            data[:-cut].decode('utf-8')
+            return data[:-cut]
+        except UnicodeDecodeError:
+            continue
+    return data
+
+
 @dataclass
 class DecompressionResult:
     """Result of decompression attempt."""
@@ -39,23 +151,43 @@ class IntelligentDecompressor:
     Intelligent decompression system with automatic algorithm detection.
 
     Features:
-    - Magic byte signature detection
-    - Brute-force algorithm testing
+    - Container header validation
+    - Parallel bounded-prefix probing
     - Text analysis and validation
     - Language detection
     - Structure validation (JSON, XML, etc.)
     - Entropy-based verification
     """
 
-    # Magic byte signatures for common compression formats
-    MAGIC_BYTES = {
-        CompressionAlgorithm.GZIP: [b'\x1f\x8b'],
-        CompressionAlgorithm.BZIP2: [b'BZ', b'BZh'],
-        CompressionAlgorithm.LZMA: [b'\xfd7zXZ\x00', b'\x5d\x00\x00'],
-        CompressionAlgorithm.ZSTD: [b'\x28\xb5\x2f\xfd'],
-        # LZ4 doesn't have a standard magic byte
+    # Container header validators, checked in order
+    HEADER_CHECKS = [
+        (CompressionAlgorithm.ZSTD, _is_zstd_header),
+        (CompressionAlgorithm.GZIP, _is_gzip_header),
+        (CompressionAlgorithm.LZMA, _is_xz_header),
+        (CompressionAlgorithm.BZIP2, _is_bzip2_header),
+        (CompressionAlgorithm.LZ4, _is_lz4_frame_header),
+        (CompressionAlgorithm.LZMA, _is_lzma_alone_header),
+    ]
+
+    # Algorithms probed when no header matches; Brotli has no magic bytes
+    PROBE_ALGORITHMS = {
+        CompressionAlgorithm.GZIP: _probe_gzip,
+        CompressionAlgorithm.ZSTD: _probe_zstd,
+        CompressionAlgorithm.LZ4: _probe_lz4,
+        CompressionAlgorithm.BZIP2: _probe_bzip2,
+        CompressionAlgorithm.LZMA: _probe_lzma,
+        CompressionAlgorithm.BROTLI: _probe_brotli,
     }
 
+    # Codecs the compression engine does not provide
+    FALLBACK_DECOMPRESSORS = {
+        CompressionAlgorithm.BZIP2: bz2.decompress,
+    }
+
+    # Input fed to, and output taken from, each trial decoder
+    PROBE_INPUT_BYTES = 64 * 1024
+    PROBE_OUTPUT_BYTES = 64 * 1024
+
     # Common words for English text validation
     COMMON_WORDS = {
         'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
@@ -66,7 +198,7 @@ class IntelligentDecompressor:
 
     def __init__(self):
         """Initialize the intelligent decompressor."""
-        self.compression_engine = CompressionEngine()
+        self.compression_engine = get_compression_engine()
         logger.info("IntelligentDecompressor initialized")
 
     async def decompress_auto(self, compressed_data: bytes) -> DecompressionResult:
@@ -80,18 +212,20 @@ class IntelligentDecompressor:
             DecompressionResult with algorithm and decompressed data
         """
         try:
-            # Step 1: Try magic byte detection
+            # Step 1: Trust a validated container header
             detected_algorithm = self._detect_by_magic_bytes(compressed_data)
             if detected_algorithm:
-                logger.info(f"Magic bytes detected algorithm: {detected_algorithm}")
+                logger.info(f"Container header detected algorithm: {detected_algorithm}")
                 result = await self._try_decompress(compressed_data, detected_algorithm)
                 if result.success:
                     return result
 
-            # Step 2: Brute force all algorithms
-            logger.info("Trying brute-force algorithm detection")
-            return await self._brute_force_decompress(compressed_data)
+            # Step 2: Probe a prefix with every remaining codec
+            logger.info("Trying prefix-probe algorithm detection")
+            return await self._brute_force_decompress(compressed_data, exclude=detected_algorithm)
 
+        except CompressionQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Auto-decompression failed: {e}")
             return DecompressionResult(
@@ -105,7 +239,9 @@ class IntelligentDecompressor:
 
     def _detect_by_magic_bytes(self, data: bytes) -> Optional[CompressionAlgorithm]:
         """
-        Detect compression algorithm by magic bytes.
+        Detect compression algorithm from its container header.
+
+        Only the first few bytes are inspected; nothing is decoded.
 
         Args:
             data: Compressed data
@@ -113,55 +249,74 @@ class IntelligentDecompressor:
         Returns:
             Detected algorithm or None
         """
-        for algorithm, signatures in self.MAGIC_BYTES.items():
-            for signature in signatures:
-                if data.startswith(signature):
-                    return algorithm
+        for algorithm, is_header in self.HEADER_CHECKS:
+            if is_header(data):
+                return algorithm
         return None
 
-    async def _brute_force_decompress(self, compressed_data: bytes) -> DecompressionResult:
+    async def _brute_force_decompress(
+        self,
+        compressed_data: bytes,
+        exclude: Optional[CompressionAlgorithm] = None
+    ) -> DecompressionResult:
         """
-        Try all algorithms and return the best result.
+        Probe all algorithms on a bounded prefix and fully decompress the best.
+
+        Trial decoders run concurrently on the compression executor, each
+        reading at most ``PROBE_INPUT_BYTES`` and producing at most
+        ``PROBE_OUTPUT_BYTES``. Candidates are ranked by the confidence of
+        their prefix output; only the best is decompressed in full, falling
+        back to the next one if it fails.
 
         Args:
             compressed_data: Compressed data
+            exclude: Algorithm already tried in full
 
         Returns:
             Best decompression result
         """
-        algorithms_to_try = [
-            CompressionAlgorithm.GZIP,
-            CompressionAlgorithm.ZSTD,
-            CompressionAlgorithm.LZ4,
-            CompressionAlgorithm.BZIP2,
-            CompressionAlgorithm.LZMA,
-        ]
-
-        results = []
-
-        for algorithm in algorithms_to_try:
-            result = await self._try_decompress(compressed_data, algorithm)
+        prefix = compressed_data[:self.PROBE_INPUT_BYTES]
+        algorithms = [a for a in self.PROBE_ALGORITHMS if a != exclude]
+        executor = get_compression_executor()
+
+        outputs = await asyncio.gather(
+            *(
+                executor.run(FAST_LANE, self.PROBE_ALGORITHMS[algorithm], prefix, self.PROBE_OUTPUT_BYTES)
+                for algorithm in algorithms
+            ),
+            return_exceptions=True
+        )
+
+        candidates = []
+        for algorithm, output in zip(algorithms, outputs):
+            if isinstance(output, CompressionQueueFullError):
+                raise output
+            if isinstance(output, Exception) or not output:
+                logger.debug(f"Probe with {algorithm} failed: {output!r}")
+                continue
+            validation_metrics = self._validate_decompressed_data(self._probe_sample(output))
+            candidates.append((self._calculate_confidence_score(validation_metrics), algorithm, validation_metrics))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        for _, algorithm, validation_metrics in candidates:
+            result = await self._try_decompress(compressed_data, algorithm, validation_metrics)
             if result.success:
-                results.append(result)
-
-        if not results:
-            return DecompressionResult(
-                success=False,
-                algorithm=None,
-                decompressed_data=None,
-                confidence_score=0.0,
-                validation_metrics={},
-                error_message="No algorithm successfully decompressed the data"
-            )
+                return result
 
-        # Return result with highest confidence
-        best_result = max(results, key=lambda r: r.confidence_score)
-        return best_result
+        return DecompressionResult(
+            success=False,
+            algorithm=None,
+            decompressed_data=None,
+            confidence_score=0.0,
+            validation_metrics={},
+            error_message="No algorithm successfully decompressed the data"
+        )
 
     async def _try_decompress(
         self,
         compressed_data: bytes,
-        algorithm: CompressionAlgorithm
+        algorithm: CompressionAlgorithm,
+        probe_metrics: Optional[Dict[str, Any]] = None
     ) -> DecompressionResult:
         """
         Try to decompress with specific algorithm and validate result.
@@ -169,19 +324,30 @@ class IntelligentDecompressor:
         Args:
             compressed_data: Compressed data
             algorithm: Algorithm to try
+            probe_metrics: Validation metrics already computed on a probe
+                prefix; otherwise a prefix of the output is validated
 
         Returns:
             DecompressionResult
         """
         try:
             # Attempt decompression
-            decompressed_data = await self.compression_engine.decompress(
-                compressed_data,
-                algorithm
-            )
-
-            # Validate the decompressed data
-            validation_metrics = self._validate_decompressed_data(decompressed_data)
+            if algorithm in self.FALLBACK_DECOMPRESSORS and algorithm not in self.compression_engine.algorithms:
+                decompressed_data = await get_compression_executor().run(
+                    FAST_LANE, self.FALLBACK_DECOMPRESSORS[algorithm], compressed_data
+                )
+            else:
+                decompressed_data = await self.compression_engine.decompress(
+                    compressed_data,
+                    algorithm
+                )
+
+            # Validate a bounded prefix of the decompressed data
+            if probe_metrics is None:
+                probe_metrics = self._validate_decompressed_data(self._probe_sample(decompressed_data))
+            validation_metrics = dict(probe_metrics)
+            validation_metrics['probe_size'] = probe_metrics.get('data_size', 0)
+            validation_metrics['data_size'] = len(decompressed_data)
             confidence_score = self._calculate_confidence_score(validation_metrics)
 
             return DecompressionResult(
@@ -192,6 +358,8 @@ class IntelligentDecompressor:
                 validation_metrics=validation_metrics
             )
 
+        except CompressionQueueFullError:
+            raise
         except Exception as e:
             logger.debug(f"Decompression with {algorithm} failed: {e}")
             return DecompressionResult(
@@ -203,6 +371,12 @@ class IntelligentDecompressor:
                 error_message=str(e)
             )
 
+    def _probe_sample(self, data: bytes) -> bytes:
+        """Bounded prefix of decompressed data used for validation."""
+        if len(data) < self.PROBE_OUTPUT_BYTES:
+            return data
+        return _trim_partial_utf8(data[:self.PROBE_OUTPUT_BYTES])
+
     def _validate_decompressed_data(self, data: bytes) -> Dict[str, Any]:
         """
         Validate decompressed data quality.
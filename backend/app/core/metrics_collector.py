@@ -6,8 +6,9 @@ for compression performance, quality, and system monitoring.
 """
 
 import time
+import logging
 import psutil
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 # import numpy as np  # Removed for compatibility
 
@@ -15,6 +16,9 @@ from app.models.metrics import (
     CompressionMetrics, PerformanceMetrics, QualityMetrics,
     AlgorithmMetrics, MetricsAggregation, MetricType, TimeRange
 )
+from app.core.timeseries_store import get_timeseries_store
+
+logger = logging.getLogger(__name__)
 
 
 class MetricsCollector:
@@ -51,7 +55,8 @@ class MetricsCollector:
                                   memory_usage: Optional[int] = None,
                                   cpu_usage: Optional[float] = None,
                                   algorithm: str = "unknown",
-                                  parameters: Dict[str, Any] = None) -> CompressionMetrics:
+                                  parameters: Dict[str, Any] = None,
+                                  content_type: Optional[str] = None) -> CompressionMetrics:
         """
         Collect compression performance metrics.
         
@@ -64,6 +69,7 @@ class MetricsCollector:
             cpu_usage: CPU usage percentage
             algorithm: Algorithm used
             parameters: Parameters used
+            content_type: Content type compressed, recorded as a series tag
             
         Returns:
             CompressionMetrics object
@@ -111,8 +117,26 @@ class MetricsCollector:
         # Update algorithm-specific metrics
         self._update_algorithm_metrics(algorithm, metrics, parameters)
         
+        # Keep a series per metric, algorithm and content type for trend
+        # and aggregation queries
+        self._record_time_series(metrics, algorithm, content_type)
+        
         return metrics
     
+    def _record_time_series(self, metrics: CompressionMetrics, algorithm: str, content_type: Optional[str] = None):
+        """Append each numeric metric to the time-series store, tagged by algorithm and content type."""
+        try:
+            store = get_timeseries_store()
+            tags = {'algorithm': algorithm}
+            if content_type:
+                tags['content_type'] = content_type
+            for metric_type in MetricType:
+                value = getattr(metrics, metric_type.value, None)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    store.append(metric_type.value, value, metrics.timestamp, tags=tags)
+        except Exception as e:
+            logger.warning(f"Could not record compression metrics time series: {e}")
+    
     def collect_performance_metrics(self) -> PerformanceMetrics:
         """Collect system performance metrics."""
         # Get system metrics
@@ -244,45 +268,59 @@ class MetricsCollector:
                          time_range: TimeRange,
                          start_time: datetime,
                          end_time: datetime,
-                         algorithm_filter: Optional[str] = None,
-                         content_type_filter: Optional[str] = None) -> MetricsAggregation:
-        """Aggregate metrics for analysis."""
-        # Filter metrics by time range and filters
-        filtered_metrics = self._filter_metrics(
-            start_time, end_time, algorithm_filter, content_type_filter
-        )
-        
-        if not filtered_metrics:
-            return self._empty_aggregation(metric_type, time_range, start_time, end_time)
-        
-        # Extract values for the specified metric type
-        values = self._extract_metric_values(filtered_metrics, metric_type)
-        
-        # Calculate aggregation statistics
-        aggregation = MetricsAggregation(
-            metric_type=metric_type,
-            time_range=time_range,
-            start_time=start_time,
-            end_time=end_time,
-            count=len(values),
-            min_value=min(values) if values else 0.0,
-            max_value=max(values) if values else 0.0,
-            mean_value=self._mean(values) if values else 0.0,
-            median_value=self._median(values) if values else 0.0,
-            std_deviation=self._std(values) if values else 0.0,
-            p25=self._percentile(values, 25) if values else 0.0,
-            p75=self._percentile(values, 75) if values else 0.0,
-            p90=self._percentile(values, 90) if values else 0.0,
-            p95=self._percentile(values, 95) if values else 0.0,
-            p99=self._percentile(values, 99) if values else 0.0,
-            total_value=sum(values) if values else 0.0,
-            variance=self._variance(values) if values else 0.0,
-            algorithm_filter=algorithm_filter,
-            content_type_filter=content_type_filter
-        )
+                         algorithm_filter: Optional[Union[str, List[str]]] = None,
+                         content_type_filter: Optional[Union[str, List[str]]] = None) -> MetricsAggregation:
+        """
+        Aggregate metrics for analysis.
         
+        Filters are tag predicates resolved by the time-series store's tag
+        index, so only the series of matching algorithms and content types
+        are read. A list filter matches any of its values.
+        """
+        tags = {}
+        if algorithm_filter:
+            tags['algorithm'] = algorithm_filter
+        if content_type_filter:
+            tags['content_type'] = content_type_filter
+        
+        try:
+            series_list = get_timeseries_store().query(metric_type.value, start_time, end_time, tags=tags)
+        except Exception as e:
+            logger.warning(f"Could not read compression metrics time series: {e}")
+            series_list = []
+        values = [value for series in series_list for value in series.values.tolist()]
+        
+        aggregation = self._empty_aggregation(metric_type, time_range, start_time, end_time)
+        if values:
+            aggregation = MetricsAggregation(
+                metric_type=metric_type,
+                time_range=time_range,
+                start_time=start_time,
+                end_time=end_time,
+                count=len(values),
+                min_value=min(values),
+                max_value=max(values),
+                mean_value=self._mean(values),
+                median_value=self._median(values),
+                std_deviation=self._std(values),
+                p25=self._percentile(values, 25),
+                p75=self._percentile(values, 75),
+                p90=self._percentile(values, 90),
+                p95=self._percentile(values, 95),
+                p99=self._percentile(values, 99),
+                total_value=sum(values),
+                variance=self._variance(values)
+            )
+        aggregation.algorithm_filter = self._describe_filter(algorithm_filter)
+        aggregation.content_type_filter = self._describe_filter(content_type_filter)
         return aggregation
     
+    def _describe_filter(self, value: Optional[Union[str, List[str]]]) -> Optional[str]:
+        """Render a tag filter for the aggregation response."""
+        if isinstance(value, (list, tuple)):
+            return ','.join(value) or None
+        return value
+    
     def _calculate_quality_score(self, compression_ratio: float, compression_speed: float, cpu_usage: float) -> float:
         """Calculate overall quality score."""
         # Normalize metrics
@@ -604,64 +642,6 @@ class MetricsCollector:
         
         return best_algorithm
     
-    def _filter_metrics(self, start_time: datetime, end_time: datetime, 
-                       algorithm_filter: Optional[str], content_type_filter: Optional[str]) -> List[CompressionMetrics]:
-        """Filter metrics by time range and filters."""
-        filtered = []
-        
-        for metric in self.metrics_history:
-            if start_time <= metric.timestamp <= end_time:
-                # Apply algorithm filter
-                if algorithm_filter:
-                    algo = getattr(metric, 'algorithm_used', 'unknown')
-                    if algo != algorithm_filter:
-                        continue
-                
-                # Apply content type filter (would need content type in metrics)
-                if content_type_filter:
-                    # Simplified - would need to store content type in metrics
-                    pass
-                
-                filtered.append(metric)
-        
-        return filtered
-    
-    def _extract_metric_values(self, metrics: List[CompressionMetrics], metric_type: MetricType) -> List[float]:
-        """Extract values for the specified metric type."""
-        values = []
-        
-        for metric in metrics:
-            if metric_type == MetricType.COMPRESSION_RATIO:
-                values.append(metric.compression_ratio)
-            elif metric_type == MetricType.COMPRESSION_SPEED:
-                values.append(metric.compression_speed)
-            elif metric_type == MetricType.DECOMPRESSION_SPEED:
-                if metric.decompression_speed:
-                    values.append(metric.decompression_speed)
-            elif metric_type == MetricType.MEMORY_USAGE:
-                if metric.memory_usage:
-                    values.append(metric.memory_usage)
-            elif metric_type == MetricType.CPU_USAGE:
-                if metric.cpu_usage:
-                    values.append(metric.cpu_usage)
-            elif metric_type == MetricType.QUALITY_SCORE:
-                if metric.quality_score:
-                    values.append(metric.quality_score)
-            elif metric_type == MetricType.INFORMATION_PRESERVATION:
-                if metric.information_preservation:
-                    values.append(metric.information_preservation)
-            elif metric_type == MetricType.ENTROPY_REDUCTION:
-                if metric.entropy_reduction:
-                    values.append(metric.entropy_reduction)
-            elif metric_type == MetricType.PATTERN_EFFICIENCY:
-                if metric.pattern_efficiency:
-                    values.append(metric.pattern_efficiency)
-            elif metric_type == MetricType.ALGORITHM_EFFICIENCY:
-                if metric.algorithm_efficiency:
-                    values.append(metric.algorithm_efficiency)
-        
-        return values
-    
     def _get_historical_compression_ratio(self, algorithm: str) -> float:
         """Get historical compression ratio for algorithm."""
         # Simplified - would query database in real implementation
@@ -0,0 +1,384 @@
+"""
+Streaming Analysis: Incremental content profiling with mergeable sketches.
+
+``ContentAnalyzer`` needs the whole payload in memory. This module profiles
+content chunk by chunk with fixed-size state so multi-GB inputs can be
+analyzed as they stream in:
+
+- byte histogram: exact entropy, redundancy and unique-byte counts
+- HyperLogLog: distinct n-gram estimates per pattern length
+- Count-Min sketch: heavy-hitter n-grams with bounded overestimation
+- run-length statistics carried across chunk boundaries
+
+All state is mergeable, so partial profiles computed on different workers
+(or different shards of one file) combine into one profile with ``merge``.
+
+Accuracy:
+HyperLogLog standard error ≈ 1.04 / √(2^precision)  (~0.8% at precision 14)
+Count-Min overestimate ≤ (e / width) × N with probability 1 - e^(-depth)
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+import logging
+
+import numpy as np
+
+from .content_analyzer import PATTERN_LENGTHS, _byte_histogram, _ngram_codes
+
+logger = logging.getLogger(__name__)
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Positions per chunk considered when looking for heavy-hitter candidates
+_CANDIDATE_SAMPLE = 4096
+
+# Fixed seeds keep sketches built on different workers mergeable
+_SKETCH_SEEDS = (
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x2545F4914F6CDD1D, 0x27BB2EE687B0B0FD,
+)
+
+
+def _mix64(codes: np.ndarray, seed: int = 0) -> np.ndarray:
+    """SplitMix64 finalizer, vectorized over uint64 codes."""
+    with np.errstate(over='ignore'):
+        h = codes + np.uint64(seed)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return h ^ (h >> np.uint64(31))
+
+
+def _as_array(chunk: BytesLike) -> np.ndarray:
+    """View a bytes-like chunk as uint8 without copying."""
+    view = memoryview(chunk)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return np.frombuffer(view, dtype=np.uint8)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit hashes."""
+
+    def __init__(self, precision: int = 14):
+        """Initialize HyperLogLog with 2^precision registers."""
+        if not 11 <= precision <= 18:
+            raise ValueError("precision must be between 11 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        """
+        Add pre-hashed uint64 values.
+
+        Args:
+            hashes: Well-mixed uint64 hashes
+        """
+        if hashes.size == 0:
+            return
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+        # remainder < 2^53, so the float conversion and frexp exponent are exact
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (value_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self) -> float:
+        """Estimate the number of distinct values added."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return float(estimate)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge another sketch into this one (union of the inputs)."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+
+class CountMinSketch:
+    """Count-Min sketch over uint64 keys."""
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        """Initialize Count-Min sketch; width is rounded up to a power of two."""
+        if not 1 <= depth <= len(_SKETCH_SEEDS):
+            raise ValueError(f"depth must be between 1 and {len(_SKETCH_SEEDS)}")
+        self.width_bits = max(1, int(width - 1).bit_length())
+        self.width = 1 << self.width_bits
+        self.depth = depth
+        self.table = np.zeros((depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, keys: np.ndarray, row: int) -> np.ndarray:
+        return (_mix64(keys, _SKETCH_SEEDS[row]) >> np.uint64(64 - self.width_bits)).astype(np.intp)
+
+    def add(self, keys: np.ndarray):
+        """Count each key once per occurrence."""
+        if keys.size == 0:
+            return
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._columns(keys, row), minlength=self.width)
+        self.total += int(keys.size)
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        """Estimate counts for keys; never underestimates."""
+        estimates = self.table[0][self._columns(keys, 0)]
+        for row in range(1, self.depth):
+            estimates = np.minimum(estimates, self.table[row][self._columns(keys, row)])
+        return estimates
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Merge another sketch into this one (sum of the inputs)."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+
+class StreamingContentAnalyzer:
+    """
+    Incremental content profiler.
+
+    Call ``update`` with consecutive chunks, then ``finalize`` for the
+    profile. N-grams and runs that span chunk boundaries are counted.
+    Profiles of separate pieces combine with ``merge``; n-grams and runs
+    spanning the seam between merged pieces are not counted.
+    """
+
+    def __init__(
+        self,
+        pattern_lengths: Tuple[int, ...] = PATTERN_LENGTHS,
+        hll_precision: int = 14,
+        cms_width: int = 4096,
+        cms_depth: int = 4,
+        heavy_hitters: int = 16
+    ):
+        """
+        Initialize streaming analyzer.
+
+        Args:
+            pattern_lengths: N-gram lengths to sketch (1-16 bytes)
+            hll_precision: HyperLogLog precision (registers = 2^precision)
+            cms_width: Count-Min sketch width
+            cms_depth: Count-Min sketch depth
+            heavy_hitters: Most frequent n-grams reported per length
+        """
+        if not pattern_lengths or min(pattern_lengths) < 1 or max(pattern_lengths) > 16:
+            raise ValueError("pattern_lengths must be between 1 and 16 bytes")
+        self.pattern_lengths = tuple(sorted(pattern_lengths))
+        self.heavy_hitters = heavy_hitters
+
+        self.total_bytes = 0
+        self.histogram = np.zeros(256, dtype=np.int64)
+        self.distinct = {length: HyperLogLog(hll_precision) for length in self.pattern_lengths}
+        self.frequencies = {length: CountMinSketch(cms_width, cms_depth) for length in self.pattern_lengths}
+        # Candidate heavy hitters per length: code -> pattern bytes
+        self.candidates: Dict[int, Dict[int, bytes]] = {length: {} for length in self.pattern_lengths}
+
+        self.run_count = 0
+        self.max_run_length = 0
+        self._current_run = 0
+        self._last_byte: Optional[int] = None
+        self._tail = b''
+
+    def update(self, chunk: BytesLike) -> "StreamingContentAnalyzer":
+        """
+        Add the next chunk of content.
+
+        Args:
+            chunk: Bytes-like chunk, consecutive with the previous one
+
+        Returns:
+            self, for chaining
+        """
+        data = _as_array(chunk)
+        if data.size == 0:
+            return self
+
+        self.histogram += _byte_histogram(data)
+        self._update_runs(data)
+
+        # Prefix the carried tail so boundary-spanning n-grams are seen once
+        tail = self._tail
+        window = np.concatenate((np.frombuffer(tail, dtype=np.uint8), data)) if tail else data
+        for length in self.pattern_lengths:
+            if window.size < length:
+                continue
+            first_new = max(0, len(tail) - length + 1)
+            codes = _ngram_codes(window, length)[first_new:]
+            self.distinct[length].add_hashes(_mix64(codes))
+            self.frequencies[length].add(codes)
+            self._update_candidates(length, window, codes, first_new)
+
+        keep = self.pattern_lengths[-1] - 1
+        self._tail = window[-keep:].tobytes() if keep else b''
+        self.total_bytes += int(data.size)
+        return self
+
+    def _update_runs(self, data: np.ndarray):
+        """Track runs of identical bytes, continuing the run from the last chunk."""
+        boundaries = np.flatnonzero(data[1:] != data[:-1]) + 1
+        edges = np.concatenate(([0], boundaries, [data.size]))
+        lengths = np.diff(edges)
+
+        continues = self._last_byte == data[0]
+        if continues:
+            lengths[0] += self._current_run
+        self.run_count += int(lengths.size) - (1 if continues else 0)
+        self.max_run_length = max(self.max_run_length, int(lengths.max()))
+        self._current_run = int(lengths[-1])
+        self._last_byte = int(data[-1])
+
+    def _update_candidates(self, length: int, window: np.ndarray, codes: np.ndarray, offset: int):
+        """
+        Offer frequent n-grams from the chunk as heavy-hitter candidates.
+
+        A strided sample of positions is ranked by sketch estimate; a
+        heavy hitter occupies enough positions to be sampled.
+        """
+        step = max(1, codes.size // _CANDIDATE_SAMPLE)
+        sampled_codes, first_index = np.unique(codes[::step], return_index=True)
+        estimates = self.frequencies[length].estimate(sampled_codes)
+        top = np.argsort(estimates)[::-1][:self.heavy_hitters]
+
+        candidates = self.candidates[length]
+        for i in top:
+            code = int(sampled_codes[i])
+            if code not in candidates:
+                start = offset + int(first_index[i]) * step
+                candidates[code] = window[start:start + length].tobytes()
+        self._prune_candidates(length)
+
+    def _prune_candidates(self, length: int):
+        """Keep the candidates with the highest sketch estimates."""
+        candidates = self.candidates[length]
+        limit = self.heavy_hitters * 4
+        if len(candidates) <= limit:
+            return
+        codes = np.fromiter(candidates.keys(), dtype=np.uint64, count=len(candidates))
+        estimates = self.frequencies[length].estimate(codes)
+        keep = {int(code) for code in codes[np.argsort(estimates)[::-1][:limit]]}
+        self.candidates[length] = {code: candidates[code] for code in keep}
+
+    def merge(self, other: "StreamingContentAnalyzer") -> "StreamingContentAnalyzer":
+        """
+        Merge a profile computed on another piece of content.
+
+        Args:
+            other: Analyzer built with the same pattern lengths and sketch sizes
+
+        Returns:
+            self, for chaining
+        """
+        if other.pattern_lengths != self.pattern_lengths:
+            raise ValueError("Cannot merge analyzers with different pattern lengths")
+
+        self.total_bytes += other.total_bytes
+        self.histogram += other.histogram
+        for length in self.pattern_lengths:
+            self.distinct[length].merge(other.distinct[length])
+            self.frequencies[length].merge(other.frequencies[length])
+            for code, pattern in other.candidates[length].items():
+                self.candidates[length].setdefault(code, pattern)
+            self._prune_candidates(length)
+
+        self.run_count += other.run_count
+        self.max_run_length = max(self.max_run_length, other.max_run_length)
+        # Subsequent updates continue from the merged piece
+        self._current_run = other._current_run
+        self._last_byte = other._last_byte
+        self._tail = other._tail
+        return self
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Build the profile for all content seen so far.
+
+        The analyzer stays usable; more chunks can be added afterwards.
+
+        Returns:
+            Dictionary with entropy, redundancy, distinct n-gram estimates,
+            heavy hitters and run-length statistics
+        """
+        if self.total_bytes == 0:
+            return self._empty_profile()
+
+        counts = self.histogram[self.histogram > 0]
+        probabilities = counts / self.total_bytes
+        entropy = float(-(probabilities * np.log2(probabilities)).sum())
+
+        distinct_ngrams = {}
+        ngram_repetition = {}
+        heavy_hitters = {}
+        for length in self.pattern_lengths:
+            windows = self.frequencies[length].total
+            distinct = min(self.distinct[length].count(), float(windows))
+            distinct_ngrams[length] = distinct
+            ngram_repetition[length] = 1 - distinct / windows if windows else 0.0
+            heavy_hitters[f'length_{length}'] = self._heavy_hitters(length)
+
+        return {
+            'total_bytes': self.total_bytes,
+            'entropy': entropy,
+            'unique_bytes': int(counts.size),
+            'redundancy_ratio': 1 - counts.size / self.total_bytes,
+            'distinct_ngrams': distinct_ngrams,
+            'ngram_repetition': ngram_repetition,
+            'heavy_hitters': heavy_hitters,
+            'run_length': {
+                'runs': self.run_count,
+                'mean_run_length': self.total_bytes / self.run_count,
+                'max_run_length': self.max_run_length
+            }
+        }
+
+    def _heavy_hitters(self, length: int) -> Dict[str, int]:
+        """Top candidates with their estimated counts."""
+        candidates = self.candidates[length]
+        if not candidates:
+            return {}
+        codes = np.fromiter(candidates.keys(), dtype=np.uint64, count=len(candidates))
+        estimates = self.frequencies[length].estimate(codes)
+        top = np.argsort(estimates, kind='stable')[::-1][:self.heavy_hitters]
+        return {
+            candidates[int(codes[i])].decode('utf-8', errors='backslashreplace'): int(estimates[i])
+            for i in top
+        }
+
+    def _empty_profile(self) -> Dict[str, Any]:
+        """Profile of empty content."""
+        return {
+            'total_bytes': 0,
+            'entropy': 0.0,
+            'unique_bytes': 0,
+            'redundancy_ratio': 0.0,
+            'distinct_ngrams': {length: 0.0 for length in self.pattern_lengths},
+            'ngram_repetition': {length: 0.0 for length in self.pattern_lengths},
+            'heavy_hitters': {f'length_{length}': {} for length in self.pattern_lengths},
+            'run_length': {'runs': 0, 'mean_run_length': 0.0, 'max_run_length': 0}
+        }
+
+
+def analyze_chunks(chunks: Iterable[BytesLike], **kwargs) -> Dict[str, Any]:
+    """
+    Profile an iterable of chunks.
+
+    Args:
+        chunks: Consecutive bytes-like chunks
+        **kwargs: StreamingContentAnalyzer options
+
+    Returns:
+        Finalized profile
+    """
+    analyzer = StreamingContentAnalyzer(**kwargs)
+    for chunk in chunks:
+        analyzer.update(chunk)
+    return analyzer.finalize()
@@ -0,0 +1,363 @@
+"""
+Shared non-blocking system sampler.
+
+One background task reads psutil counters on a fixed cadence and derives
+rates (CPU utilisation, network throughput, disk I/O) from consecutive
+readings. Health, metrics and sensor endpoints read the latest snapshot
+instead of calling ``psutil.cpu_percent(interval=...)`` or shelling out to
+``ping``, either of which stalls the event loop.
+
+Snapshots live in a fixed-size ring buffer with a single writer; readers
+never take a lock. Counter reads run on a worker thread so the loop stays
+free even when /proc is slow.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """
+    One reading of system counters plus rates since the previous reading.
+
+    Rates are per second; they are zero on the first reading.
+    """
+    timestamp: float
+    interval: float
+    cpu_percent: float
+    cpu_per_core: Tuple[float, ...]
+    cpu_count: int
+    cpu_freq_mhz: Optional[float]
+    cpu_temperature: Optional[float]
+    load_average: Tuple[float, float, float]
+    memory: Any  # psutil svmem
+    swap: Any  # psutil sswap
+    disk: Any  # psutil sdiskusage for '/'
+    disk_io: Any  # psutil sdiskio or None
+    net_io: Any  # psutil snetio or None
+    process_count: int
+    boot_time: float
+    net_sent_bytes_per_sec: float = 0.0
+    net_recv_bytes_per_sec: float = 0.0
+    disk_read_bytes_per_sec: float = 0.0
+    disk_write_bytes_per_sec: float = 0.0
+    disk_read_ops_per_sec: float = 0.0
+    disk_write_ops_per_sec: float = 0.0
+    network_latency_ms: Optional[float] = None
+    cpu_times: Tuple[Tuple[float, float], ...] = field(default=(), repr=False)  # (busy, total) per core
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was taken."""
+        return time.time() - self.timestamp
+
+    @property
+    def uptime(self) -> float:
+        return self.timestamp - self.boot_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly view used by the API."""
+        return {
+            'timestamp': self.timestamp,
+            'interval': self.interval,
+            'cpu_percent': self.cpu_percent,
+            'cpu_per_core': list(self.cpu_per_core),
+            'cpu_count': self.cpu_count,
+            'cpu_freq_mhz': self.cpu_freq_mhz,
+            'cpu_temperature': self.cpu_temperature,
+            'load_average': list(self.load_average),
+            'memory': self.memory._asdict(),
+            'swap': self.swap._asdict(),
+            'disk': self.disk._asdict(),
+            'disk_io': self.disk_io._asdict() if self.disk_io else None,
+            'net_io': self.net_io._asdict() if self.net_io else None,
+            'process_count': self.process_count,
+            'uptime': self.uptime,
+            'rates': {
+                'net_sent_bytes_per_sec': self.net_sent_bytes_per_sec,
+                'net_recv_bytes_per_sec': self.net_recv_bytes_per_sec,
+                'disk_read_bytes_per_sec': self.disk_read_bytes_per_sec,
+                'disk_write_bytes_per_sec': self.disk_write_bytes_per_sec,
+                'disk_read_ops_per_sec': self.disk_read_ops_per_sec,
+                'disk_write_ops_per_sec': self.disk_write_ops_per_sec
+            },
+            'network_latency_ms': self.network_latency_ms
+        }
+
+
+def _busy_total(times) -> Tuple[float, float]:
+    total = sum(times)
+    idle = times.idle + getattr(times, 'iowait', 0.0)
+    return total - idle, total
+
+
+def _utilisation(previous: Tuple[float, float], current: Tuple[float, float]) -> float:
+    busy = current[0] - previous[0]
+    total = current[1] - previous[1]
+    if total <= 0:
+        return 0.0
+    return round(min(100.0, max(0.0, 100.0 * busy / total)), 1)
+
+
+def _rate(previous, current, name: str, elapsed: float) -> float:
+    if previous is None or current is None or elapsed <= 0:
+        return 0.0
+    # Counters can wrap or reset (e.g. an interface going away)
+    return max(0.0, (getattr(current, name) - getattr(previous, name)) / elapsed)
+
+
+def _cpu_temperature() -> Optional[float]:
+    try:
+        sensors = psutil.sensors_temperatures()
+    except (AttributeError, OSError):
+        return None
+    for name, entries in (sensors or {}).items():
+        if 'cpu' in name.lower() or 'core' in name.lower() or 'k10temp' in name.lower():
+            for entry in entries:
+                if entry.current:
+                    return entry.current
+    return None
+
+
+def read_snapshot(previous: Optional[SystemSnapshot] = None,
+                  network_latency_ms: Optional[float] = None) -> SystemSnapshot:
+    """
+    Read system counters once, without sleeping.
+
+    Args:
+        previous: Earlier snapshot to derive rates from (None for utilisation
+            since boot and zero rates)
+        network_latency_ms: Latest latency probe result to carry along
+
+    Returns:
+        New snapshot
+    """
+    now = time.time()
+    cpu_times = tuple(_busy_total(times) for times in psutil.cpu_times(percpu=True))
+    if previous is not None and len(previous.cpu_times) == len(cpu_times):
+        baseline = previous.cpu_times
+    else:
+        baseline = tuple((0.0, 0.0) for _ in cpu_times)
+    per_core = tuple(_utilisation(before, after) for before, after in zip(baseline, cpu_times))
+    overall = _utilisation(
+        (sum(busy for busy, _ in baseline), sum(total for _, total in baseline)),
+        (sum(busy for busy, _ in cpu_times), sum(total for _, total in cpu_times))
+    )
+
+    try:
+        freq = psutil.cpu_freq()
+    except (NotImplementedError, OSError, FileNotFoundError):
+        freq = None
+    try:
+        load_average = psutil.getloadavg()
+    except (AttributeError, OSError):
+        load_average = (0.0, 0.0, 0.0)
+
+    disk_io = psutil.disk_io_counters()
+    net_io = psutil.net_io_counters()
+    elapsed = now - previous.timestamp if previous is not None else 0.0
+    previous_disk = previous.disk_io if previous is not None else None
+    previous_net = previous.net_io if previous is not None else None
+
+    return SystemSnapshot(
+        timestamp=now,
+        interval=elapsed,
+        cpu_percent=overall,
+        cpu_per_core=per_core,
+        cpu_count=len(cpu_times),
+        cpu_freq_mhz=freq.current if freq else None,
+        cpu_temperature=_cpu_temperature(),
+        load_average=tuple(load_average),
+        memory=psutil.virtual_memory(),
+        swap=psutil.swap_memory(),
+        disk=psutil.disk_usage('/'),
+        disk_io=disk_io,
+        net_io=net_io,
+        process_count=len(psutil.pids()),
+        boot_time=psutil.boot_time(),
+        net_sent_bytes_per_sec=_rate(previous_net, net_io, 'bytes_sent', elapsed),
+        net_recv_bytes_per_sec=_rate(previous_net, net_io, 'bytes_recv', elapsed),
+        disk_read_bytes_per_sec=_rate(previous_disk, disk_io, 'read_bytes', elapsed),
+        disk_write_bytes_per_sec=_rate(previous_disk, disk_io, 'write_bytes', elapsed),
+        disk_read_ops_per_sec=_rate(previous_disk, disk_io, 'read_count', elapsed),
+        disk_write_ops_per_sec=_rate(previous_disk, disk_io, 'write_count', elapsed),
+        network_latency_ms=network_latency_ms,
+        cpu_times=cpu_times
+    )
+
+
+class SystemSampler:
+    """
+    Background sampler serving the latest system snapshot.
+
+    ``latest()`` is a lock-free attribute read. Without a running sampler
+    (scripts, tests) a stale snapshot is refreshed inline, which costs a
+    few milliseconds but never sleeps.
+    """
+
+    def __init__(self,
+                 interval: float = 1.0,
+                 history_size: int = 300,
+                 latency_host: Optional[str] = None,
+                 latency_port: int = 53,
+                 latency_every: int = 10):
+        """
+        Initialize sampler.
+
+        Args:
+            interval: Seconds between readings
+            history_size: Snapshots kept in the ring buffer
+            latency_host: Host for the TCP connect latency probe (None disables it)
+            latency_port: Port for the latency probe
+            latency_every: Probe latency every N readings
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.latency_host = latency_host
+        self.latency_port = latency_port
+        self.latency_every = max(1, latency_every)
+        self._ring: List[Optional[SystemSnapshot]] = [None] * max(1, history_size)
+        self._written = 0
+        self._latest: Optional[SystemSnapshot] = None
+        self._latency_ms: Optional[float] = None
+        self._write_lock = threading.Lock()  # Writers only
+        self._task: Optional[asyncio.Task] = None
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def sample(self) -> SystemSnapshot:
+        """Take a reading now and append it to the history."""
+        with self._write_lock:
+            snapshot = read_snapshot(self._latest, self._latency_ms)
+            self._ring[self._written % len(self._ring)] = snapshot
+            self._written += 1
+            self._latest = snapshot
+        return snapshot
+
+    def latest(self) -> SystemSnapshot:
+        """
+        Latest snapshot.
+
+        Refreshed inline only if the background task is not keeping it
+        current.
+        """
+        snapshot = self._latest
+        if snapshot is None or (not self.running and snapshot.age > self.interval):
+            snapshot = self.sample()
+        return snapshot
+
+    def history(self, limit: Optional[int] = None) -> List[SystemSnapshot]:
+        """
+        Recent snapshots, oldest first.
+
+        Args:
+            limit: Maximum number of snapshots
+
+        Returns:
+            Snapshots from the ring buffer
+        """
+        written = self._written
+        count = min(written, len(self._ring), limit if limit is not None else len(self._ring))
+        snapshots = [self._ring[(written - count + i) % len(self._ring)] for i in range(count)]
+        return [snapshot for snapshot in snapshots if snapshot is not None]
+
+    async def probe_latency(self) -> Optional[float]:
+        """Time a TCP connect to the probe host (ms), or None if unreachable."""
+        if not self.latency_host:
+            return None
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.latency_host, self.latency_port), timeout=2.0
+            )
+        except (OSError, asyncio.TimeoutError):
+            return None
+        latency = (time.perf_counter() - start) * 1000
+        writer.close()
+        return round(latency, 2)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        readings = 0
+        while True:
+            started = loop.time()
+            try:
+                if self.latency_host and readings % self.latency_every == 0:
+                    self._latency_ms = await self.probe_latency()
+                await loop.run_in_executor(None, self.sample)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"System sampling failed: {e}")
+            readings += 1
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    async def start(self):
+        """Start sampling on the running loop (no-op if already running)."""
+        if self.running:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.sample)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"System sampler started (interval {self.interval}s)")
+
+    async def stop(self):
+        """Stop the background task."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Sampler state for diagnostics."""
+        latest = self._latest
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'samples': self._written,
+            'history_size': len(self._ring),
+            'errors': self.errors,
+            'latest_age': latest.age if latest is not None else None
+        }
+
+
+# Process-wide sampler shared by every metrics endpoint
+_sampler: Optional[SystemSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_system_sampler() -> SystemSampler:
+    """
+    Get the global system sampler singleton.
+
+    Returns:
+        Global SystemSampler instance
+    """
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                from ..config import settings
+                _sampler = SystemSampler(
+                    interval=settings.monitoring.sampler_interval,
+                    history_size=settings.monitoring.sampler_history_size,
+                    latency_host=settings.monitoring.latency_probe_host or None,
+                    latency_port=settings.monitoring.latency_probe_port,
+                    latency_every=settings.monitoring.latency_probe_every
+                )
+    return _sampler
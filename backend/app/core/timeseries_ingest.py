@@ -0,0 +1,262 @@
+"""
+Batched, non-blocking ingest into the time-series store.
+
+Producers (sensor readings at 10 Hz and up, live and collected system
+metrics) put samples on an asyncio queue instead of writing through the
+store on the request path. One background task drains the queue and hands
+batches to ``TimeSeriesStore.append_many`` on a worker thread once
+``batch_size`` samples are waiting or the oldest has waited ``max_delay``
+seconds, so the store lock, block encoding and segment writes are paid
+once per batch and never on the event loop.
+
+The queue is bounded: a full queue makes ``put`` wait, pushing back on the
+producer rather than dropping samples. Without a running writer (scripts,
+tests) samples are written through immediately.
+
+Write latency (enqueue to stored) and queue depth are reported by
+``get_stats`` and recorded per batch as the ``ingest.write_latency_ms``
+and ``ingest.queue_depth`` series.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .timeseries_store import Sample, TimeSeriesStore, get_timeseries_store
+
+logger = logging.getLogger(__name__)
+
+# (enqueued at, samples) per put
+_Entry = Tuple[float, Sequence[Sample]]
+
+
+class BulkWriter:
+    """
+    Background writer batching samples into the time-series store.
+    """
+
+    def __init__(self,
+                 store: Optional[TimeSeriesStore] = None,
+                 batch_size: int = 5000,
+                 max_delay: float = 0.25,
+                 queue_size: int = 10000,
+                 latency_window: int = 1000):
+        """
+        Initialize writer.
+
+        Args:
+            store: Target store (None for the global store, resolved per write)
+            batch_size: Samples that trigger a write
+            max_delay: Seconds the oldest queued sample may wait
+            queue_size: Puts that may be queued before ``put`` waits
+            latency_window: Batches kept for the latency percentiles
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        self._store = store
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._latencies = deque(maxlen=max(1, latency_window))  # ms, per batch
+        self._write_lock = threading.Lock()
+
+        self.queued_samples = 0
+        self.max_queued_samples = 0
+        self.batches_written = 0
+        self.samples_written = 0
+        self.written_through = 0
+        self.last_batch_size = 0
+        self.last_write_ms = 0.0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def store(self) -> TimeSeriesStore:
+        return self._store if self._store is not None else get_timeseries_store()
+
+    async def put(self, name: str, value: float, timestamp=None,
+                  tags: Optional[Dict[str, Any]] = None, unit: Optional[str] = None):
+        """Queue one sample (see ``TimeSeriesStore.append``)."""
+        await self.put_many([(name, value, timestamp, tags, unit)])
+
+    async def put_many(self, samples: Sequence[Sample]):
+        """
+        Queue a group of samples, waiting while the queue is full.
+
+        Timestamps should be given: a missing one is taken when the batch
+        is written, not when it is queued.
+
+        Args:
+            samples: (name, value, timestamp, tags, unit) tuples
+        """
+        if not samples:
+            return
+        if not self.running:
+            store = self.store
+            store.append_many(samples)
+            store.flush_due()
+            self.written_through += len(samples)
+            return
+        await self._queue.put((time.perf_counter(), samples))
+        self.queued_samples += len(samples)
+        self.max_queued_samples = max(self.max_queued_samples, self.queued_samples)
+
+    def _write(self, batch: List[_Entry]) -> int:
+        """Append a batch to the store and record its latency."""
+        samples = [sample for _, group in batch for sample in group]
+        with self._write_lock:
+            store = self.store
+            started = time.perf_counter()
+            try:
+                store.append_many(samples)
+                store.flush_due()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Writing {len(samples)} time-series samples failed: {e}")
+                return 0
+            finished = time.perf_counter()
+            latency_ms = (finished - min(enqueued for enqueued, _ in batch)) * 1000
+            self._latencies.append(latency_ms)
+            self.batches_written += 1
+            self.samples_written += len(samples)
+            self.last_batch_size = len(samples)
+            self.last_write_ms = (finished - started) * 1000
+            try:
+                now = time.time()
+                store.append_many([
+                    ('ingest.write_latency_ms', latency_ms, now, None, 'ms'),
+                    ('ingest.queue_depth', self.queued_samples, now, None, 'samples')
+                ])
+            except Exception as e:
+                logger.debug(f"Could not record ingest metrics: {e}")
+        return len(samples)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            entry = await queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            count = len(entry[1])
+            deadline = loop.time() + self.max_delay
+            while count < self.batch_size:
+                try:
+                    entry = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+                count += len(entry[1])
+            self.queued_samples -= count
+            await loop.run_in_executor(None, self._write, batch)
+
+    async def start(self):
+        """Start the writer on the running loop (no-op if already running)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Time-series bulk writer started (batch {self.batch_size}, delay {self.max_delay}s)")
+
+    async def stop(self):
+        """Write everything queued, then stop the background task."""
+        task = self._task
+        if task is None:
+            return
+        if not task.done():
+            await self._queue.put(None)
+            try:
+                await task
+            except Exception as e:
+                logger.error(f"Time-series bulk writer failed: {e}")
+        self._task = None
+        # Anything left (the task died or was cancelled) is written inline
+        leftover = []
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not None:
+                leftover.append(entry)
+        if leftover:
+            self._write(leftover)
+        self.queued_samples = 0
+        self._queue = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and write latency for diagnostics."""
+        latencies = np.array(self._latencies) if self._latencies else None
+        return {
+            'running': self.running,
+            'queued_samples': self.queued_samples,
+            'max_queued_samples': self.max_queued_samples,
+            'queued_puts': self._queue.qsize() if self._queue is not None else 0,
+            'queue_size': self.queue_size,
+            'batch_size': self.batch_size,
+            'max_delay': self.max_delay,
+            'batches_written': self.batches_written,
+            'samples_written': self.samples_written,
+            'written_through': self.written_through,
+            'last_batch_size': self.last_batch_size,
+            'last_write_ms': round(self.last_write_ms, 3),
+            'write_latency_ms': {
+                'p50': round(float(np.percentile(latencies, 50)), 3),
+                'p99': round(float(np.percentile(latencies, 99)), 3),
+                'max': round(float(latencies.max()), 3)
+            } if latencies is not None else None,
+            'errors': self.errors
+        }
+
+
+# Process-wide writer shared by the metrics and sensor services
+_bulk_writer: Optional[BulkWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_bulk_writer() -> BulkWriter:
+    """
+    Get the global bulk writer singleton.
+
+    Returns:
+        Global BulkWriter instance
+    """
+    global _bulk_writer
+    if _bulk_writer is None:
+        with _writer_lock:
+            if _bulk_writer is None:
+                from ..config import settings
+                _bulk_writer = BulkWriter(
+                    batch_size=settings.monitoring.ingest_batch_size,
+                    max_delay=settings.monitoring.ingest_max_delay,
+                    queue_size=settings.monitoring.ingest_queue_size
+                )
+    return _bulk_writer
+
+
+async def shutdown_bulk_writer():
+    """Write queued samples and stop the global writer, if created."""
+    global _bulk_writer
+    if _bulk_writer is not None:
+        await _bulk_writer.stop()
+        _bulk_writer = None
@@ -0,0 +1,514 @@
+"""
+Continuous rollups for the time-series store.
+
+Every appended sample updates one bucket per rollup resolution (1m, 5m,
+1h and 1d by default). A bucket holds count, min, max, sum, sum of squares
+and a mergeable quantile sketch, so queries at a coarse step read a few
+buckets instead of decoding every raw block in range.
+
+Buckets are appended to ``rollups.log`` once they close (and all of them
+on close); a later record for the same bucket replaces an earlier one.
+After a crash the open buckets are rebuilt from raw blocks newer than the
+last persisted bucket (see ``TimeSeriesStore``). Buckets older than their
+resolution's retention are dropped, and the log is compacted when it is
+mostly superseded records.
+"""
+
+import math
+import os
+import re
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# resolution (seconds) -> retention (seconds)
+DEFAULT_ROLLUP_POLICY = {60: 86400, 300: 7 * 86400, 3600: 30 * 86400, 86400: 365 * 86400}
+
+# series id, resolution (s), bucket start (ms), count, min, max, sum, sum of squares, sketch length
+_ROLLUP_RECORD = struct.Struct('<IIqIddddI')
+_ROLLUP_CRC = struct.Struct('<I')
+_SKETCH_HEADER = struct.Struct('<fIHH')
+
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_duration(text: str) -> int:
+    """
+    Parse a duration such as ``'90s'``, ``'5m'``, ``'1h'``, ``'7d'`` or ``'2w'``.
+
+    Returns:
+        Seconds
+
+    Raises:
+        ValueError: If the text is not a duration
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([smhdw]?)\s*', text or '')
+    if not match:
+        raise ValueError(f"Invalid duration: {text!r}")
+    return int(match.group(1)) * _DURATION_UNITS[match.group(2) or 's']
+
+
+def parse_rollup_policy(spec: str) -> Dict[int, int]:
+    """
+    Parse ``'1m:1d,5m:7d'`` into {resolution seconds: retention seconds}.
+
+    An empty spec disables rollups.
+    """
+    policy = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        resolution, _, retention = item.partition(':')
+        policy[parse_duration(resolution)] = parse_duration(retention)
+    return dict(sorted(policy.items()))
+
+
+def pick_step(span: float, max_points: int = 360,
+              steps: Tuple[int, ...] = (60, 300, 900, 3600, 21600, 86400, 604800)) -> int:
+    """
+    Smallest step (seconds) that covers ``span`` seconds in ``max_points`` buckets.
+
+    The default steps are all multiples of a default rollup resolution.
+    """
+    for step in steps:
+        if span / step <= max_points:
+            return step
+    return steps[-1]
+
+
+class QuantileSketch:
+    """
+    Relative-error quantile sketch (DDSketch, Masson et al., VLDB 2019).
+
+    Values fall into logarithmic bins, so every quantile estimate is within
+    ``relative_accuracy`` of a true value at that rank. Sketches merge by
+    adding bin counts. Past ``max_bins`` the smallest bins are collapsed,
+    which only degrades the lowest quantiles.
+    """
+
+    __slots__ = ('relative_accuracy', 'max_bins', '_log_gamma', 'positive', 'negative', 'zero')
+
+    _MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 512):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def add(self, value: float):
+        if value > self._MIN_INDEXABLE:
+            bins = self.positive
+            key = self._key(value)
+        elif value < -self._MIN_INDEXABLE:
+            bins = self.negative
+            key = self._key(-value)
+        else:
+            self.zero += 1
+            return
+        bins[key] = bins.get(key, 0) + 1
+        if len(bins) > self.max_bins:
+            self._collapse(bins)
+
+    def merge(self, other: 'QuantileSketch'):
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+            if len(bins) > self.max_bins:
+                self._collapse(bins)
+        self.zero += other.zero
+
+    def _collapse(self, bins: Dict[int, int]):
+        keys = sorted(bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        bins[target] += sum(bins.pop(key) for key in keys[:excess])
+
+    def _value(self, key: int) -> float:
+        gamma = math.exp(self._log_gamma)
+        return 2 * gamma ** key / (gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None if empty."""
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_bytes(self) -> bytes:
+        parts = [_SKETCH_HEADER.pack(self.relative_accuracy, self.zero, len(self.positive), len(self.negative))]
+        for bins in (self.positive, self.negative):
+            parts.append(np.fromiter(bins.keys(), dtype='<i4', count=len(bins)).tobytes())
+            parts.append(np.fromiter(bins.values(), dtype='<u4', count=len(bins)).tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, max_bins: int = 512) -> 'QuantileSketch':
+        accuracy, zero, n_positive, n_negative = _SKETCH_HEADER.unpack_from(data)
+        sketch = cls(round(accuracy, 6), max_bins)
+        sketch.zero = zero
+        offset = _SKETCH_HEADER.size
+        for bins, size in ((sketch.positive, n_positive), (sketch.negative, n_negative)):
+            keys = np.frombuffer(data, dtype='<i4', count=size, offset=offset)
+            offset += 4 * size
+            counts = np.frombuffer(data, dtype='<u4', count=size, offset=offset)
+            offset += 4 * size
+            bins.update(zip(keys.tolist(), counts.tolist()))
+        return sketch
+
+
+class Rollup:
+    """
+    Aggregate of the samples in one bucket.
+
+    The sketch is kept serialized once the bucket is persisted, which keeps
+    long retention cheap in memory; ``sketch`` decodes it on demand.
+    """
+
+    __slots__ = ('count', 'minimum', 'maximum', 'total', 'squares', '_sketch', '_relative_accuracy')
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.total = 0.0
+        self.squares = 0.0
+        self._sketch = None
+        self._relative_accuracy = relative_accuracy
+
+    @property
+    def sketch(self) -> QuantileSketch:
+        if self._sketch is None:
+            self._sketch = QuantileSketch(self._relative_accuracy)
+        elif isinstance(self._sketch, bytes):
+            self._sketch = QuantileSketch.from_bytes(self._sketch)
+        return self._sketch
+
+    def add(self, value: float):
+        if value != value:  # NaN carries no information for aggregates
+            return
+        self.count += 1
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.total += value
+        self.squares += value * value
+        if math.isfinite(value):
+            self.sketch.add(value)
+
+    def merge(self, other: 'Rollup'):
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.total += other.total
+        self.squares += other.squares
+        # Decode a compacted sketch without caching it on ``other``
+        sketch = other._sketch
+        if isinstance(sketch, bytes):
+            sketch = QuantileSketch.from_bytes(sketch)
+        if sketch is not None:
+            self.sketch.merge(sketch)
+
+    def compact(self):
+        if isinstance(self._sketch, QuantileSketch):
+            self._sketch = self._sketch.to_bytes()
+
+    def sketch_bytes(self) -> bytes:
+        return self._sketch if isinstance(self._sketch, bytes) else self.sketch.to_bytes()
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self.count:
+            return None
+        mean = self.total / self.count
+        return math.sqrt(max(0.0, self.squares / self.count - mean * mean))
+
+    def value(self, aggregation: str) -> Optional[float]:
+        """
+        Aggregate value by name.
+
+        Args:
+            aggregation: avg/mean, sum, min, max, count, std, or pNN for a
+                percentile (e.g. ``p95``, ``p99.9``)
+        """
+        if aggregation in ('avg', 'mean'):
+            return self.mean
+        if aggregation == 'count':
+            return float(self.count)
+        if not self.count:
+            return None
+        if aggregation == 'sum':
+            return self.total
+        if aggregation == 'min':
+            return self.minimum
+        if aggregation == 'max':
+            return self.maximum
+        if aggregation == 'std':
+            return self.std
+        if aggregation.startswith('p'):
+            return self.sketch.quantile(float(aggregation[1:]) / 100)
+        raise ValueError(f"Unknown aggregation: {aggregation}")
+
+
+def rollup_samples(timestamps: np.ndarray, values: np.ndarray, step_ms: int,
+                   relative_accuracy: float = 0.01) -> List[Tuple[int, Rollup]]:
+    """
+    Bucket raw samples into rollups of ``step_ms``.
+
+    Returns:
+        (bucket start ms, Rollup) pairs in time order
+    """
+    buckets: Dict[int, Rollup] = {}
+    starts = (timestamps - timestamps % step_ms).tolist()
+    for start, value in zip(starts, values.tolist()):
+        rollup = buckets.get(start)
+        if rollup is None:
+            rollup = buckets[start] = Rollup(relative_accuracy)
+        rollup.add(value)
+    return sorted(buckets.items(), key=lambda item: item[0])
+
+
+def merge_buckets(buckets: Iterable[Tuple[int, Rollup]], step_ms: int,
+                  relative_accuracy: float = 0.01) -> List[Tuple[int, Rollup]]:
+    """Merge (start, Rollup) pairs into coarser ``step_ms`` buckets, in time order."""
+    merged: Dict[int, Rollup] = {}
+    for start, rollup in buckets:
+        key = start - start % step_ms
+        target = merged.get(key)
+        if target is None:
+            target = merged[key] = Rollup(relative_accuracy)
+        target.merge(rollup)
+    return sorted(merged.items(), key=lambda item: item[0])
+
+
+class RollupStore:
+    """
+    Per-series rollup buckets for every configured resolution.
+
+    Not thread-safe on its own; ``TimeSeriesStore`` calls it under its lock.
+    """
+
+    def __init__(self, path: str, policy: Dict[int, int], relative_accuracy: float = 0.01):
+        """
+        Initialize rollups, replaying the persisted log.
+
+        Args:
+            path: Rollup log file
+            policy: {resolution seconds: retention seconds}
+            relative_accuracy: Quantile sketch accuracy
+        """
+        self.path = path
+        self.policy = dict(sorted(policy.items()))
+        self.relative_accuracy = relative_accuracy
+        self._widths = [resolution * 1000 for resolution in self.policy]
+        self._buckets: Dict[Tuple[int, int], Dict[int, Rollup]] = {}
+        self._dirty: Set[Tuple[int, int, int]] = set()
+        self._persisted_end: Dict[Tuple[int, int], int] = {}
+        self._records = 0
+        self._load()
+        self._log = open(path, 'ab')
+
+    @property
+    def resolutions(self) -> List[int]:
+        return list(self.policy)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        position = 0
+        while position + _ROLLUP_RECORD.size <= len(data):
+            fields = _ROLLUP_RECORD.unpack_from(data, position)
+            series_id, resolution, start, count, minimum, maximum, total, squares, length = fields
+            end = position + _ROLLUP_RECORD.size + length
+            if end + _ROLLUP_CRC.size > len(data):
+                break
+            crc, = _ROLLUP_CRC.unpack_from(data, end)
+            if crc != zlib.crc32(data[position:end]):
+                break
+            position = end + _ROLLUP_CRC.size
+            self._records += 1
+            if resolution not in self.policy:
+                continue
+            rollup = Rollup(self.relative_accuracy)
+            rollup.count, rollup.minimum, rollup.maximum = count, minimum, maximum
+            rollup.total, rollup.squares = total, squares
+            rollup._sketch = bytes(data[end - length:end])
+            width = resolution * 1000
+            self._buckets.setdefault((series_id, width), {})[start] = rollup
+            key = (series_id, width)
+            self._persisted_end[key] = max(self._persisted_end.get(key, start + width), start + width)
+        if position < len(data):
+            logger.warning(f"Truncating torn rollup log {self.path} at byte {position}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(position)
+
+    def add(self, series_id: int, millis: int, value: float):
+        for width in self._widths:
+            start = millis - millis % width
+            buckets = self._buckets.get((series_id, width))
+            if buckets is None:
+                buckets = self._buckets[(series_id, width)] = {}
+            rollup = buckets.get(start)
+            if rollup is None:
+                rollup = buckets[start] = Rollup(self.relative_accuracy)
+            rollup.add(value)
+            self._dirty.add((series_id, width, start))
+
+    def replay(self, series_id: int, timestamps: np.ndarray, values: np.ndarray):
+        """Re-add raw samples newer than each resolution's last persisted bucket."""
+        for width in self._widths:
+            since = self._persisted_end.get((series_id, width))
+            mask = timestamps >= since if since is not None else slice(None)
+            for start, rollup in rollup_samples(timestamps[mask], values[mask], width, self.relative_accuracy):
+                buckets = self._buckets.setdefault((series_id, width), {})
+                if start in buckets:
+                    buckets[start].merge(rollup)
+                else:
+                    buckets[start] = rollup
+                self._dirty.add((series_id, width, start))
+
+    def replay_from(self, series_id: int) -> Optional[int]:
+        """Earliest timestamp (ms) raw samples must be replayed from, or None for all."""
+        ends = [self._persisted_end.get((series_id, width)) for width in self._widths]
+        return None if None in ends else min(ends)
+
+    def persist(self, now_ms: Optional[int] = None) -> int:
+        """
+        Append dirty buckets to the log.
+
+        Args:
+            now_ms: Only persist buckets ending at or before this time
+                (None persists open buckets too)
+
+        Returns:
+            Number of buckets written
+        """
+        written = []
+        for series_id, width, start in sorted(self._dirty):
+            if now_ms is not None and start + width > now_ms:
+                continue
+            rollup = self._buckets.get((series_id, width), {}).get(start)
+            written.append((series_id, width, start))
+            if rollup is None:
+                continue
+            sketch = rollup.sketch_bytes()
+            record = _ROLLUP_RECORD.pack(
+                series_id, width // 1000, start, rollup.count, rollup.minimum, rollup.maximum,
+                rollup.total, rollup.squares, len(sketch)
+            ) + sketch
+            self._log.write(record + _ROLLUP_CRC.pack(zlib.crc32(record)))
+            rollup.compact()
+            key = (series_id, width)
+            self._persisted_end[key] = max(self._persisted_end.get(key, start + width), start + width)
+            self._records += 1
+        if written:
+            self._log.flush()
+            self._dirty.difference_update(written)
+        return len(written)
+
+    def prune(self, now_ms: int) -> int:
+        """
+        Drop buckets past retention and compact a mostly-stale log.
+
+        Returns:
+            Number of buckets dropped
+        """
+        dropped = 0
+        for (series_id, width), buckets in self._buckets.items():
+            cutoff = now_ms - self.policy[width // 1000] * 1000
+            expired = [start for start in buckets if start + width <= cutoff]
+            for start in expired:
+                del buckets[start]
+                self._dirty.discard((series_id, width, start))
+            dropped += len(expired)
+        live = sum(len(buckets) for buckets in self._buckets.values())
+        if self._records > 1000 and self._records > 2 * live:
+            self._compact()
+        return dropped
+
+    def _compact(self):
+        temporary = self.path + '.tmp'
+        records = 0
+        with open(temporary, 'wb') as f:
+            for (series_id, width), buckets in self._buckets.items():
+                for start, rollup in sorted(buckets.items(), key=lambda item: item[0]):
+                    if (series_id, width, start) in self._dirty:
+                        continue
+                    sketch = rollup.sketch_bytes()
+                    record = _ROLLUP_RECORD.pack(
+                        series_id, width // 1000, start, rollup.count, rollup.minimum, rollup.maximum,
+                        rollup.total, rollup.squares, len(sketch)
+                    ) + sketch
+                    f.write(record + _ROLLUP_CRC.pack(zlib.crc32(record)))
+                    records += 1
+        self._log.close()
+        os.replace(temporary, self.path)
+        self._log = open(self.path, 'ab')
+        self._records = records
+
+    def best_resolution(self, step: int, start_ms: Optional[int], now_ms: int) -> Optional[int]:
+        """
+        Coarsest resolution that divides ``step`` and is retained back to ``start_ms``.
+
+        Returns:
+            Resolution in seconds, or None if raw samples are needed
+        """
+        for resolution in reversed(self.resolutions):
+            if step % resolution:
+                continue
+            if start_ms is not None and start_ms < now_ms - self.policy[resolution] * 1000:
+                continue
+            return resolution
+        return None
+
+    def buckets(self, series_id: int, resolution: int, start_ms: int, end_ms: int) -> List[Tuple[int, Rollup]]:
+        """Buckets of one series overlapping [start_ms, end_ms], in time order."""
+        width = resolution * 1000
+        buckets = self._buckets.get((series_id, width), {})
+        return sorted(((start, rollup) for start, rollup in buckets.items()
+                       if start + width > start_ms and start <= end_ms), key=lambda item: item[0])
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'rollup_buckets': sum(len(buckets) for buckets in self._buckets.values()),
+            'rollup_dirty': len(self._dirty),
+            'rollup_log_records': self._records
+        }
+
+    def close(self):
+        self.persist()
+        self._log.close()
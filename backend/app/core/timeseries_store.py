@@ -0,0 +1,841 @@
+"""
+Compressed columnar time-series store.
+
+Samples are buffered per series (metric name plus tags) in memory and
+flushed as self-contained Gorilla blocks (see ``gorilla_codec``) to
+append-only segment files. Every block carries a small header with its
+series, sample count, time range and min/max/sum, so a range scan picks
+the overlapping blocks from an in-memory index and decodes only those.
+
+Layout of ``directory``:
+
+- ``series.jsonl``: one line per series (id, name, tags, unit)
+- ``segment-000001.tsb`` ...: ``b'TSG1'`` then block records
+  ``header | payload | crc32`` (see ``_BLOCK_HEADER``)
+
+Series are found through an inverted index: each (tag key, value) pair
+maps to the ids of the series carrying it, so a tag predicate intersects
+the smallest posting sets instead of scanning every series of a metric.
+
+The index is rebuilt by scanning block headers on open; a torn record at
+the end of the last segment (crash mid-write) is truncated away. Samples
+still in memory are lost on a crash, which bounds loss to one block or
+``flush_interval`` seconds per series.
+
+Appends also maintain continuous rollups (``timeseries_rollup``), and
+``aggregate`` answers bucketed queries from the coarsest adequate rollup
+resolution. Raw retention deletes whole segments once every block in them
+has expired.
+"""
+
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+import logging
+
+import numpy as np
+
+from .gorilla_codec import decode_block, encode_block
+from .timeseries_rollup import (
+    DEFAULT_ROLLUP_POLICY, Rollup, RollupStore, merge_buckets, parse_duration, parse_rollup_policy, rollup_samples
+)
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_MAGIC = b'TSG1'
+# series id, count, first/last timestamp (ms), min, max, sum, payload length
+_BLOCK_HEADER = struct.Struct('<IIqqdddI')
+_BLOCK_CRC = struct.Struct('<I')
+
+Timestamp = Union[datetime, int, float, None]
+# (name, value, timestamp, tags, unit) as taken by ``append``
+Sample = Tuple[str, float, Timestamp, Optional[Dict[str, Any]], Optional[str]]
+# Tag filters: a value, or a list/tuple/set of accepted values
+TagFilter = Optional[Dict[str, Any]]
+# Name filters: one metric name, a list/tuple/set of names, or None for any
+NameFilter = Union[str, Iterable[str], None]
+
+
+def to_millis(timestamp: Timestamp) -> int:
+    """
+    Convert a timestamp to integer epoch milliseconds.
+
+    Args:
+        timestamp: datetime (naive values are taken as UTC), epoch seconds,
+            or None for now
+
+    Returns:
+        Milliseconds since the epoch
+    """
+    if timestamp is None:
+        return int(time.time() * 1000)
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(round(timestamp.timestamp() * 1000))
+    return int(round(float(timestamp) * 1000))
+
+
+def from_millis(millis: int) -> datetime:
+    """Convert epoch milliseconds to an aware UTC datetime."""
+    return datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+
+
+_KEY_ESCAPES = str.maketrans({char: '\\' + char for char in '\\{},='})
+
+
+def series_key(name: str, tags: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Canonical series key: name plus sorted tags, e.g. ``cpu{core=0}``.
+
+    Separators inside names, tag keys and values are backslash-escaped,
+    so distinct series never share a key.
+    """
+    key = str(name).translate(_KEY_ESCAPES)
+    if not tags:
+        return key
+    pairs = sorted((str(k).translate(_KEY_ESCAPES), str(v).translate(_KEY_ESCAPES)) for k, v in tags.items())
+    return key + '{' + ','.join(f'{k}={v}' for k, v in pairs) + '}'
+
+
+@dataclass(frozen=True)
+class BlockRef:
+    """Location and summary of one flushed block."""
+    segment: int
+    offset: int  # Payload offset in the segment file
+    length: int
+    count: int
+    first: int
+    last: int
+    minimum: float
+    maximum: float
+    total: float
+
+
+@dataclass
+class _Series:
+    id: int
+    name: str
+    tags: Dict[str, str]
+    unit: Optional[str]
+    blocks: List[BlockRef] = field(default_factory=list)
+    starts: List[int] = field(default_factory=list)  # Block first timestamps
+    reach: List[int] = field(default_factory=list)  # Running max of block last timestamps
+    head_times: List[int] = field(default_factory=list)
+    head_values: List[float] = field(default_factory=list)
+    head_since: float = 0.0
+
+    def add_block(self, ref: BlockRef):
+        index = bisect.bisect_right(self.starts, ref.first)
+        self.blocks.insert(index, ref)
+        self.starts.insert(index, ref.first)
+        if index == len(self.blocks) - 1:
+            self.reach.append(max(ref.last, self.reach[-1]) if self.reach else ref.last)
+        else:
+            # Out-of-order backfill: recompute the running max
+            self.set_blocks(self.blocks)
+
+    def set_blocks(self, blocks: List[BlockRef]):
+        self.blocks = list(blocks)
+        self.starts = [ref.first for ref in self.blocks]
+        self.reach = np.maximum.accumulate(np.array([ref.last for ref in self.blocks], dtype=np.int64)).tolist()
+
+    def overlapping(self, start: int, end: int) -> List[BlockRef]:
+        low = bisect.bisect_left(self.reach, start)
+        high = bisect.bisect_right(self.starts, end)
+        return [ref for ref in self.blocks[low:high] if ref.last >= start]
+
+
+@dataclass
+class SeriesData:
+    """Samples of one series, oldest first."""
+    name: str
+    tags: Dict[str, str]
+    unit: Optional[str]
+    timestamps: np.ndarray  # int64 epoch milliseconds
+    values: np.ndarray  # float64
+    series_id: int = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def datetimes(self) -> List[datetime]:
+        return [from_millis(millis) for millis in self.timestamps.tolist()]
+
+
+@dataclass
+class RollupData:
+    """Aggregates of one series per ``step`` bucket, oldest first."""
+    name: str
+    tags: Dict[str, str]
+    unit: Optional[str]
+    step: int  # Seconds
+    resolution: int  # Rollup resolution read, in seconds (0 when computed from raw samples)
+    timestamps: List[int]  # Bucket starts, epoch milliseconds
+    rollups: List[Rollup]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def values(self, aggregation: str) -> List[Optional[float]]:
+        """Per-bucket values (see ``Rollup.value``)."""
+        return [rollup.value(aggregation) for rollup in self.rollups]
+
+
+class TimeSeriesStore:
+    """
+    Append-only Gorilla-compressed store for metric and sensor samples.
+
+    Thread-safe; appends are O(1) until a series' head buffer fills and is
+    encoded into a block.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 block_size: int = 1024,
+                 flush_interval: float = 600.0,
+                 segment_max_bytes: int = 64 * 1024 * 1024,
+                 rollup_policy: Optional[Dict[int, int]] = None,
+                 raw_retention: Optional[float] = None,
+                 clock=time.monotonic):
+        """
+        Initialize store, loading any existing series and segments.
+
+        Args:
+            directory: Directory for the series registry and segment files
+            block_size: Samples per block before a series is flushed
+            flush_interval: Seconds a sample may wait in memory before
+                ``flush_due`` writes it out
+            segment_max_bytes: Segment size at which a new file is started
+            rollup_policy: {resolution seconds: retention seconds}; None for
+                the default 1m/5m/1h/1d policy, empty to disable rollups
+            raw_retention: Seconds raw samples are kept (None keeps them)
+            clock: Monotonic clock (injectable for tests)
+        """
+        if block_size < 2:
+            raise ValueError("block_size must be at least 2")
+        self.directory = directory
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self.segment_max_bytes = segment_max_bytes
+        self.raw_retention = raw_retention
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._series: Dict[str, _Series] = {}
+        self._series_by_id: Dict[int, _Series] = {}
+        self._by_name: Dict[str, Set[int]] = {}
+        self._by_tag: Dict[Tuple[str, str], Set[int]] = {}  # (key, value) -> series ids
+        self._readers: Dict[int, Any] = {}
+        self._writer = None
+        self._segment = 0
+        self._segment_last: Dict[int, int] = {}  # Newest timestamp per segment
+        self._retention_checked = clock()
+        self._closed = False
+
+        self.blocks_written = 0
+        self.blocks_decoded = 0
+        self.bytes_written = 0
+        self.series_scanned = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._registry_path = os.path.join(directory, 'series.jsonl')
+        self._load_registry()
+        self._load_segments()
+        self._registry = open(self._registry_path, 'a', encoding='utf-8')
+
+        policy = DEFAULT_ROLLUP_POLICY if rollup_policy is None else rollup_policy
+        self.rollups: Optional[RollupStore] = None
+        if policy:
+            self.rollups = RollupStore(os.path.join(directory, 'rollups.log'), policy)
+            self._replay_rollups()
+
+    # Loading
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f'segment-{segment:06d}.tsb')
+
+    def _load_registry(self):
+        if not os.path.exists(self._registry_path):
+            return
+        with open(self._registry_path, 'rb') as f:
+            data = f.read()
+        # Drop a torn last line so later appends start on a fresh line
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            with open(self._registry_path, 'r+b') as f:
+                f.truncate(complete)
+        for line in data[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping unreadable time-series registry line")
+                continue
+            self._register(_Series(entry['id'], entry['name'], entry.get('tags') or {}, entry.get('unit')))
+
+    def _register(self, series: _Series):
+        self._series[series_key(series.name, series.tags)] = series
+        self._series_by_id[series.id] = series
+        self._by_name.setdefault(series.name, set()).add(series.id)
+        for item in series.tags.items():
+            self._by_tag.setdefault(item, set()).add(series.id)
+
+    def _load_segments(self):
+        segments = sorted(
+            int(name[8:14]) for name in os.listdir(self.directory)
+            if name.startswith('segment-') and name.endswith('.tsb')
+        )
+        for segment in segments:
+            self._scan_segment(segment, last=segment == segments[-1])
+        self._segment = segments[-1] if segments else 0
+
+    def _scan_segment(self, segment: int, last: bool):
+        path = self._segment_path(segment)
+        with open(path, 'rb') as f:
+            data = f.read()
+        position = len(SEGMENT_MAGIC)
+        if data[:position] != SEGMENT_MAGIC:
+            position = 0
+        while position < len(data):
+            end = position + _BLOCK_HEADER.size
+            if end > len(data):
+                break
+            series_id, count, first, last_ts, minimum, maximum, total, length = _BLOCK_HEADER.unpack_from(data, position)
+            record_end = end + length + _BLOCK_CRC.size
+            if record_end > len(data):
+                break
+            crc, = _BLOCK_CRC.unpack_from(data, end + length)
+            if crc != zlib.crc32(data[position:end + length]):
+                break
+            self._segment_last[segment] = max(self._segment_last.get(segment, last_ts), last_ts)
+            series = self._series_by_id.get(series_id)
+            if series is not None:
+                series.add_block(BlockRef(segment, end, length, count, first, last_ts, minimum, maximum, total))
+            position = record_end
+
+        if position < len(data) or position == 0:
+            if last:
+                logger.warning(f"Truncating torn time-series segment {path} at byte {position}")
+                with open(path, 'r+b') as f:
+                    if position == 0:
+                        f.write(SEGMENT_MAGIC)
+                        position = len(SEGMENT_MAGIC)
+                    f.truncate(position)
+            else:
+                logger.error(f"Corrupt time-series segment {path}; ignoring data after byte {position}")
+
+    def _replay_rollups(self):
+        # Rebuild buckets that were open at the last crash from raw blocks
+        for series in self._series_by_id.values():
+            since = self.rollups.replay_from(series.id)
+            refs = series.blocks if since is None else series.overlapping(since, np.iinfo(np.int64).max)
+            for ref in refs:
+                times, values = decode_block(self._read_payload(ref), ref.count)
+                self.rollups.replay(series.id, times, values)
+
+    # Writing
+
+    def _get_series(self, name: str, tags: Optional[Dict[str, Any]], unit: Optional[str]) -> _Series:
+        tags = {str(k): str(v) for k, v in (tags or {}).items()}
+        key = series_key(name, tags)
+        series = self._series.get(key)
+        if series is None:
+            series = _Series(max(self._series_by_id, default=0) + 1, name, tags, unit)
+            self._registry.write(json.dumps({'id': series.id, 'name': name, 'tags': tags, 'unit': unit}) + '\n')
+            self._registry.flush()
+            self._register(series)
+        return series
+
+    def append(self,
+               name: str,
+               value: float,
+               timestamp: Timestamp = None,
+               tags: Optional[Dict[str, Any]] = None,
+               unit: Optional[str] = None):
+        """
+        Append one sample.
+
+        Args:
+            name: Metric name
+            value: Sample value
+            timestamp: Sample time (see ``to_millis``); defaults to now
+            tags: Series tags; values are stored as strings
+            unit: Unit recorded when the series is first seen
+        """
+        millis = to_millis(timestamp)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Time-series store is closed")
+            self._append_locked(self._get_series(name, tags, unit), millis, float(value))
+
+    def append_many(self, samples: Iterable[Sample]) -> int:
+        """
+        Append a batch of samples under one lock acquisition.
+
+        Args:
+            samples: (name, value, timestamp, tags, unit) tuples, as for
+                ``append``
+
+        Returns:
+            Number of samples appended
+        """
+        prepared = [(name, float(value), to_millis(timestamp), tags, unit)
+                    for name, value, timestamp, tags, unit in samples]
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Time-series store is closed")
+            for name, value, millis, tags, unit in prepared:
+                self._append_locked(self._get_series(name, tags, unit), millis, value)
+        return len(prepared)
+
+    def _append_locked(self, series: _Series, millis: int, value: float):
+        if not series.head_times:
+            series.head_since = self._clock()
+        series.head_times.append(millis)
+        series.head_values.append(value)
+        if self.rollups is not None:
+            self.rollups.add(series.id, millis, value)
+        if len(series.head_times) >= self.block_size:
+            self._flush_series(series)
+
+    def _open_writer(self):
+        if self._writer is not None:
+            if self._writer.tell() < self.segment_max_bytes:
+                return
+            self._writer.close()
+            self._segment += 1
+        self._segment = max(self._segment, 1)
+        self._writer = open(self._segment_path(self._segment), 'ab')
+        if self._writer.tell() == 0:
+            self._writer.write(SEGMENT_MAGIC)
+
+    def _flush_series(self, series: _Series):
+        if not series.head_times:
+            return
+        times = np.array(series.head_times, dtype=np.int64)
+        values = np.array(series.head_values, dtype=np.float64)
+        if np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[order]
+        payload = encode_block(times, values)
+        header = _BLOCK_HEADER.pack(
+            series.id, len(times), int(times[0]), int(times[-1]),
+            float(values.min()), float(values.max()), float(values.sum()), len(payload)
+        )
+        record = header + payload
+        record += _BLOCK_CRC.pack(zlib.crc32(record))
+
+        self._open_writer()
+        offset = self._writer.tell() + len(header)
+        self._writer.write(record)
+        self._writer.flush()
+        series.add_block(BlockRef(
+            self._segment, offset, len(payload), len(times), int(times[0]), int(times[-1]),
+            float(values.min()), float(values.max()), float(values.sum())
+        ))
+        self._segment_last[self._segment] = max(self._segment_last.get(self._segment, int(times[-1])), int(times[-1]))
+        series.head_times = []
+        series.head_values = []
+        self.blocks_written += 1
+        self.bytes_written += len(record)
+
+    def flush(self):
+        """Write every buffered sample and closed rollup bucket to disk."""
+        with self._lock:
+            for series in self._series_by_id.values():
+                self._flush_series(series)
+            if self.rollups is not None:
+                self.rollups.persist(to_millis(None))
+
+    def flush_due(self) -> int:
+        """
+        Flush series whose oldest buffered sample exceeds ``flush_interval``.
+
+        Also persists closed rollup buckets and, at most once a minute,
+        applies retention.
+
+        Returns:
+            Number of series flushed
+        """
+        flushed = 0
+        with self._lock:
+            now = self._clock()
+            for series in self._series_by_id.values():
+                if series.head_times and now - series.head_since >= self.flush_interval:
+                    self._flush_series(series)
+                    flushed += 1
+            if self.rollups is not None:
+                self.rollups.persist(to_millis(None))
+            if now - self._retention_checked >= 60:
+                self._retention_checked = now
+                self.apply_retention()
+        return flushed
+
+    def apply_retention(self, now: Timestamp = None) -> Dict[str, int]:
+        """
+        Drop raw segments and rollup buckets past their retention.
+
+        A segment is deleted only when its newest sample has expired, so raw
+        data may outlive ``raw_retention`` by up to one segment.
+
+        Args:
+            now: Reference time (defaults to now)
+
+        Returns:
+            Counts of dropped segments, blocks and rollup buckets
+        """
+        now_ms = to_millis(now)
+        dropped = {'segments': 0, 'blocks': 0, 'rollup_buckets': 0}
+        with self._lock:
+            if self.raw_retention is not None:
+                cutoff = now_ms - int(self.raw_retention * 1000)
+                expired = {segment for segment, last in self._segment_last.items()
+                           if last < cutoff and segment != self._segment}
+                if expired:
+                    for series in self._series_by_id.values():
+                        kept = [ref for ref in series.blocks if ref.segment not in expired]
+                        if len(kept) != len(series.blocks):
+                            dropped['blocks'] += len(series.blocks) - len(kept)
+                            series.set_blocks(kept)
+                    for segment in expired:
+                        reader = self._readers.pop(segment, None)
+                        if reader is not None:
+                            reader.close()
+                        os.remove(self._segment_path(segment))
+                        del self._segment_last[segment]
+                    dropped['segments'] = len(expired)
+            if self.rollups is not None:
+                dropped['rollup_buckets'] = self.rollups.prune(now_ms)
+        if dropped['segments']:
+            logger.info(f"Time-series retention dropped {dropped['segments']} segments ({dropped['blocks']} blocks)")
+        return dropped
+
+    # Reading
+
+    def _read_payload(self, ref: BlockRef) -> bytes:
+        reader = self._readers.get(ref.segment)
+        if reader is None:
+            reader = self._readers[ref.segment] = open(self._segment_path(ref.segment), 'rb')
+        reader.seek(ref.offset)
+        return reader.read(ref.length)
+
+    def series(self, name: Optional[str] = None, tags: TagFilter = None) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        List series, optionally by name and tags.
+
+        Returns:
+            (name, tags) pairs
+        """
+        with self._lock:
+            return [(series.name, dict(series.tags)) for series in self._match(name, tags)]
+
+    def describe(self, series_id: int) -> Optional[Tuple[str, Dict[str, str], Optional[str]]]:
+        """(name, tags, unit) of a series id, or None if unknown."""
+        with self._lock:
+            series = self._series_by_id.get(series_id)
+            return (series.name, dict(series.tags), series.unit) if series is not None else None
+
+    def count(self, name: Optional[str], tags: TagFilter = None) -> int:
+        """
+        Number of samples in every series matching ``name`` and ``tags``.
+
+        Read from block headers and head buffers; nothing is decoded.
+        """
+        with self._lock:
+            return sum(sum(ref.count for ref in series.blocks) + len(series.head_times)
+                       for series in self._match(name, tags))
+
+    def tag_values(self, key: str, name: Optional[str] = None, tags: TagFilter = None) -> List[str]:
+        """
+        Distinct values of a tag, e.g. every algorithm with recorded metrics.
+
+        Args:
+            key: Tag key
+            name: Metric name (all metrics if None)
+            tags: Further tags the series must carry
+
+        Returns:
+            Sorted tag values
+        """
+        with self._lock:
+            values = {series.tags[key] for series in self._match(name, tags) if key in series.tags}
+        return sorted(values)
+
+    def _match(self, name: NameFilter, tags: TagFilter, series_id: Optional[int] = None) -> List[_Series]:
+        """
+        Series of ``name`` (any name if None) carrying every tag in ``tags``.
+
+        A name or tag whose filter is a list, tuple or set matches any of
+        its values, and ``series_id`` restricts the match to one series.
+        Posting sets are intersected smallest first; a missing (key, value)
+        pair ends the lookup without touching any series.
+        """
+        postings: List[Set[int]] = []
+        if series_id is not None:
+            postings.append({series_id} if series_id in self._series_by_id else set())
+        if isinstance(name, str):
+            postings.append(self._by_name.get(name, set()))
+        elif name is not None:
+            union: Set[int] = set()
+            for value in name:
+                union |= self._by_name.get(value, set())
+            postings.append(union)
+        for key, wanted in (tags or {}).items():
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                union: Set[int] = set()
+                for value in wanted:
+                    union |= self._by_tag.get((str(key), str(value)), set())
+                postings.append(union)
+            else:
+                postings.append(self._by_tag.get((str(key), str(wanted)), set()))
+
+        if not postings:
+            ids = sorted(self._series_by_id)
+        else:
+            postings.sort(key=len)
+            matched = set(postings[0])
+            for posting in postings[1:]:
+                if not matched:
+                    break
+                matched &= posting
+            ids = sorted(matched)
+        self.series_scanned += len(ids)
+        return [self._series_by_id[series_id] for series_id in ids]
+
+    def query(self,
+              name: NameFilter,
+              start: Timestamp = None,
+              end: Timestamp = None,
+              tags: TagFilter = None,
+              limit: Optional[int] = None,
+              series_id: Optional[int] = None) -> List[SeriesData]:
+        """
+        Range scan over every series of a metric matching ``tags``.
+
+        Only series selected by the tag index are visited, and of those
+        only blocks overlapping [start, end] are read and decoded; buffered
+        samples are included. With ``limit``, blocks are taken newest
+        first from their headers until they hold at least ``limit``
+        samples in range, so a "latest N" query decodes a block or two
+        rather than the whole history.
+
+        Args:
+            name: Metric name, or a list of names (any metric if None)
+            start: Inclusive start (None for unbounded)
+            end: Inclusive end (None for unbounded)
+            tags: Tags the series must carry (subset match; a list value
+                matches any of its elements)
+            limit: Keep only the newest ``limit`` samples of each series
+            series_id: Only this series
+
+        Returns:
+            One SeriesData per matching series with samples in range
+        """
+        low = to_millis(start) if start is not None else np.iinfo(np.int64).min
+        high = to_millis(end) if end is not None else np.iinfo(np.int64).max
+
+        with self._lock:
+            plans = []
+            for series in self._match(name, tags, series_id):
+                head = (list(series.head_times), list(series.head_values))
+                refs = series.overlapping(low, high)
+                if limit is not None:
+                    refs = self._newest_blocks(refs, [t for t in head[0] if low <= t <= high], low, high, limit)
+                payloads = [(ref.count, self._read_payload(ref)) for ref in refs]
+                plans.append((series, payloads, head))
+            self.blocks_decoded += sum(len(payloads) for _, payloads, _ in plans)
+
+        # Decode outside the lock
+        results = []
+        for series, payloads, (head_times, head_values) in plans:
+            times_parts = []
+            values_parts = []
+            for count, payload in payloads:
+                block_times, block_values = decode_block(payload, count)
+                times_parts.append(block_times)
+                values_parts.append(block_values)
+            if head_times:
+                times_parts.append(np.array(head_times, dtype=np.int64))
+                values_parts.append(np.array(head_values, dtype=np.float64))
+            if not times_parts:
+                continue
+            times = np.concatenate(times_parts)
+            values = np.concatenate(values_parts)
+            mask = (times >= low) & (times <= high)
+            times, values = times[mask], values[mask]
+            if np.any(np.diff(times) < 0):
+                order = np.argsort(times, kind='stable')
+                times, values = times[order], values[order]
+            if limit is not None:
+                times, values = times[max(len(times) - limit, 0):], values[max(len(values) - limit, 0):]
+            if not len(times):
+                continue
+            results.append(SeriesData(series.name, dict(series.tags), series.unit, times, values, series.id))
+        return results
+
+    @staticmethod
+    def _newest_blocks(refs: List[BlockRef], head_times: List[int], low: int, high: int,
+                       limit: int) -> List[BlockRef]:
+        """
+        Blocks that can hold any of the newest ``limit`` samples in range.
+
+        Walks blocks by last timestamp, newest first, counting only blocks
+        wholly inside [low, high] (plus in-range buffered samples) until
+        ``limit`` samples are guaranteed. All of those are at or after the
+        earliest first timestamp seen, so blocks ending before it can be
+        skipped. Out-of-order blocks that overlap are kept.
+        """
+        if limit <= 0:
+            return []
+        guaranteed = len(head_times)
+        floor = min(head_times) if head_times else None
+        for ref in sorted(refs, key=lambda ref: ref.last, reverse=True):
+            if guaranteed >= limit:
+                break
+            if ref.first >= low and ref.last <= high:
+                guaranteed += ref.count
+                floor = ref.first if floor is None else min(floor, ref.first)
+        if guaranteed < limit:
+            return refs
+        return [ref for ref in refs if ref.last >= floor]
+
+    def aggregate(self,
+                  name: Optional[str],
+                  step: int,
+                  start: Timestamp = None,
+                  end: Timestamp = None,
+                  tags: TagFilter = None,
+                  now: Timestamp = None) -> List[RollupData]:
+        """
+        Bucketed aggregates of every series of a metric matching ``tags``.
+
+        Reads the coarsest rollup resolution that divides ``step`` and is
+        still retained at ``start``; otherwise buckets raw samples. Rollup
+        buckets are included whole when they overlap the range.
+
+        Args:
+            name: Metric name (any metric if None)
+            step: Bucket width in seconds (buckets align to the epoch)
+            start: Inclusive start (None for unbounded)
+            end: Inclusive end (None for unbounded)
+            tags: Tags the series must carry (as for ``query``)
+            now: Reference time for retention (defaults to now)
+
+        Returns:
+            One RollupData per matching series with data in range
+        """
+        step = int(step)
+        if step <= 0:
+            raise ValueError("step must be a positive number of seconds")
+        step_ms = step * 1000
+        low = to_millis(start) if start is not None else np.iinfo(np.int64).min
+        high = to_millis(end) if end is not None else np.iinfo(np.int64).max
+
+        resolution = None
+        if self.rollups is not None:
+            resolution = self.rollups.best_resolution(step, low if start is not None else None, to_millis(now))
+
+        results = []
+        if resolution is None:
+            accuracy = self.rollups.relative_accuracy if self.rollups is not None else 0.01
+            for data in self.query(name, start, end, tags):
+                buckets = rollup_samples(data.timestamps, data.values, step_ms, accuracy)
+                results.append(RollupData(data.name, data.tags, data.unit, step, 0,
+                                          [start for start, _ in buckets], [rollup for _, rollup in buckets]))
+            return results
+
+        with self._lock:
+            for series in self._match(name, tags):
+                buckets = self.rollups.buckets(series.id, resolution, low, high)
+                if not buckets:
+                    continue
+                # Merging also copies, so callers never hold live buckets
+                buckets = merge_buckets(buckets, step_ms, self.rollups.relative_accuracy)
+                results.append(RollupData(series.name, dict(series.tags), series.unit, step, resolution,
+                                          [start for start, _ in buckets], [rollup for _, rollup in buckets]))
+        return results
+
+    # Lifecycle
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Storage statistics for diagnostics."""
+        with self._lock:
+            blocks = [ref for series in self._series_by_id.values() for ref in series.blocks]
+            stored = sum(ref.count for ref in blocks)
+            stored_bytes = sum(ref.length + _BLOCK_HEADER.size + _BLOCK_CRC.size for ref in blocks)
+            stats = {
+                'series': len(self._series_by_id),
+                'tag_postings': len(self._by_tag),
+                'series_scanned': self.series_scanned,
+                'blocks': len(blocks),
+                'stored_samples': stored,
+                'buffered_samples': sum(len(series.head_times) for series in self._series_by_id.values()),
+                'stored_bytes': stored_bytes,
+                'bytes_per_sample': round(stored_bytes / stored, 3) if stored else None,
+                'segments': self._segment,
+                'blocks_written': self.blocks_written,
+                'blocks_decoded': self.blocks_decoded
+            }
+            if self.rollups is not None:
+                stats.update(self.rollups.get_stats())
+            return stats
+
+    def close(self):
+        """Flush buffered samples and close all files."""
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            if self.rollups is not None:
+                self.rollups.close()
+            self._closed = True
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._registry.close()
+
+
+# Process-wide store shared by the metrics and sensor services
+_timeseries_store: Optional[TimeSeriesStore] = None
+_store_lock = threading.Lock()
+
+
+def get_timeseries_store() -> TimeSeriesStore:
+    """
+    Get the global time-series store singleton.
+
+    Returns:
+        Global TimeSeriesStore instance
+    """
+    global _timeseries_store
+    if _timeseries_store is None:
+        with _store_lock:
+            if _timeseries_store is None:
+                from ..config import settings
+                _timeseries_store = TimeSeriesStore(
+                    settings.monitoring.timeseries_dir,
+                    block_size=settings.monitoring.timeseries_block_size,
+                    flush_interval=settings.monitoring.timeseries_flush_interval,
+                    segment_max_bytes=settings.monitoring.timeseries_segment_max_bytes,
+                    rollup_policy=parse_rollup_policy(settings.monitoring.timeseries_rollups),
+                    raw_retention=parse_duration(settings.monitoring.timeseries_raw_retention)
+                    if settings.monitoring.timeseries_raw_retention else None
+                )
+    return _timeseries_store
+
+
+def shutdown_timeseries_store():
+    """Flush and close the global store, if created."""
+    global _timeseries_store
+    if _timeseries_store is not None:
+        _timeseries_store.close()
+        _timeseries_store = None
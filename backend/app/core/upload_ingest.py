@@ -0,0 +1,235 @@
+"""
+Streaming upload ingest.
+
+Uploads are consumed in fixed-size blocks instead of ``await file.read()``:
+
+- each block is hashed (SHA-256) and profiled with
+  ``StreamingContentAnalyzer`` as it arrives
+- blocks are written straight to disk, either raw or compressed into the
+  seekable chunk container of ``StreamingCompressor``
+- a reader task prefetches blocks into a bounded queue, so at most
+  ``window_size`` bytes of the upload are held in memory at any time
+- hashing, profiling, compression and disk writes run on the compression
+  executor, never on the event loop
+
+Worker RSS therefore stays flat for multi-GB uploads.
+"""
+
+import asyncio
+import hashlib
+import os
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, Optional, Union
+import logging
+
+from ..algorithms.base_algorithm import BaseCompressionAlgorithm
+from .compression_executor import FAST_LANE, get_compression_executor
+from .distributed_streaming import ContainerHeader, SeekableContainerWriter
+from .streaming_analysis import StreamingContentAnalyzer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024  # 1MB
+DEFAULT_WINDOW_SIZE = 8 * 1024 * 1024  # 8MB
+
+_END = object()
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the ingest size limit."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File size exceeds maximum limit of {max_size} bytes")
+
+
+@dataclass
+class IngestResult:
+    """Outcome of a streaming ingest."""
+    path: Path
+    size: int
+    sha256: str
+    stored_size: int
+    block_count: int
+    compressed: bool = False
+    profile: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def compression_ratio(self) -> float:
+        """Original size divided by stored size."""
+        return self.size / self.stored_size if self.stored_size else 0.0
+
+
+async def _read_blocks(source, block_size: int, pending: asyncio.Queue):
+    """Read ``source`` into ``pending`` in blocks of ``block_size``."""
+    try:
+        if hasattr(source, 'read'):
+            while True:
+                block = await source.read(block_size)
+                if not block:
+                    break
+                await pending.put(block)
+        else:
+            # Re-block arbitrary async chunks (e.g. ``Request.stream()``)
+            buffer = bytearray()
+            async for chunk in source:
+                buffer += chunk
+                while len(buffer) >= block_size:
+                    await pending.put(bytes(buffer[:block_size]))
+                    del buffer[:block_size]
+            if buffer:
+                await pending.put(bytes(buffer))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await pending.put(e)
+        return
+    await pending.put(_END)
+
+
+class StreamingUploadIngestor:
+    """
+    Stream an upload to disk block by block.
+
+    One ingestor handles one upload; it is not reusable.
+    """
+
+    def __init__(self,
+                 destination: Union[str, Path],
+                 algorithm: Optional[BaseCompressionAlgorithm] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 window_size: int = DEFAULT_WINDOW_SIZE,
+                 max_size: Optional[int] = None,
+                 analyze: bool = True,
+                 **analyzer_options):
+        """
+        Initialize ingestor.
+
+        Args:
+            destination: Output file path
+            algorithm: Compress blocks into a seekable container with this
+                algorithm; store the upload unchanged if None
+            block_size: Bytes read from the upload per block
+            window_size: Maximum upload bytes held in memory
+            max_size: Reject uploads larger than this many bytes
+            analyze: Build a streaming content profile
+            **analyzer_options: StreamingContentAnalyzer options
+        """
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+
+        self.destination = Path(destination)
+        self.algorithm = algorithm
+        self.block_size = block_size
+        self.window_size = max(window_size, block_size)
+        self.max_size = max_size
+
+        self.analyzer = StreamingContentAnalyzer(**analyzer_options) if analyze else None
+        self._hasher = hashlib.sha256()
+        self._size = 0
+        self._block_count = 0
+        self._stream = None
+        self._container: Optional[SeekableContainerWriter] = None
+
+    def _open(self):
+        self._stream = open(self.destination, 'wb')
+        if self.algorithm is not None:
+            self._container = SeekableContainerWriter(self._stream, ContainerHeader.for_algorithm(self.algorithm))
+
+    def _process_block(self, block: bytes):
+        """Hash, profile, compress and write one block (runs on the executor)."""
+        self._hasher.update(block)
+        if self.analyzer is not None:
+            self.analyzer.update(block)
+
+        if self._container is not None:
+            compressed, _ = self.algorithm.compress(block)
+            self._container.write_chunk(compressed, block)
+        else:
+            self._stream.write(block)
+
+    def _close(self) -> int:
+        """Finish the output file and return its size."""
+        if self._container is not None:
+            self._container.close()
+        self._stream.close()
+        return self.destination.stat().st_size
+
+    def _discard(self):
+        if self._stream is not None:
+            self._stream.close()
+        with suppress(FileNotFoundError):
+            os.unlink(self.destination)
+
+    async def ingest(self, source: Union[AsyncIterable[bytes], Any]) -> IngestResult:
+        """
+        Consume an upload.
+
+        Args:
+            source: ``UploadFile`` (anything with an async ``read(size)``) or
+                async iterable of chunks
+
+        Returns:
+            Ingest result; the partial file is removed on failure
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds ``max_size``
+            CompressionQueueFullError: If the executor lane rejects a block
+        """
+        executor = get_compression_executor()
+        # Queued blocks plus the one being processed fit in the window
+        pending: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.window_size // self.block_size - 1))
+        reader = asyncio.create_task(_read_blocks(source, self.block_size, pending))
+
+        try:
+            await executor.run(FAST_LANE, self._open)
+            while True:
+                block = await pending.get()
+                if block is _END:
+                    break
+                if isinstance(block, Exception):
+                    raise block
+
+                self._size += len(block)
+                if self.max_size is not None and self._size > self.max_size:
+                    raise UploadTooLargeError(self.max_size)
+
+                await executor.run(FAST_LANE, self._process_block, block)
+                self._block_count += 1
+
+            stored_size = await executor.run(FAST_LANE, self._close)
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            if not reader.done():
+                reader.cancel()
+                with suppress(asyncio.CancelledError):
+                    await reader
+
+        return IngestResult(
+            path=self.destination,
+            size=self._size,
+            sha256=self._hasher.hexdigest(),
+            stored_size=stored_size,
+            block_count=self._block_count,
+            compressed=self.algorithm is not None,
+            profile=self.analyzer.finalize() if self.analyzer is not None else {}
+        )
+
+
+async def ingest_upload(source, destination: Union[str, Path], **options) -> IngestResult:
+    """
+    Stream an upload to ``destination``.
+
+    Args:
+        source: ``UploadFile`` or async iterable of chunks
+        destination: Output file path
+        **options: StreamingUploadIngestor options
+
+    Returns:
+        Ingest result
+    """
+    return await StreamingUploadIngestor(destination, **options).ingest(source)
@@ -0,0 +1,423 @@
+"""
+Zstd Dictionaries: Trained, versioned Zstandard dictionaries per content category.
+
+Small records (JSON events, log lines) compress poorly on their own because
+each frame starts with an empty history. A dictionary trained on similar
+records supplies that history up front. This registry:
+
+- samples a fraction of small payloads per content category (reservoir
+  sampling, bounded)
+- trains dictionaries from those samples (fastCOVER, all cores)
+- stores every version on disk with its dictionary id in a JSON manifest
+- keeps ``ZstdCompressionDict`` objects with precomputed compression tables
+  loaded, so using a dictionary costs no per-call setup
+- picks the active dictionary for a payload's category when compressing and
+  resolves the dictionary id stored in a frame header when decompressing
+
+Content categories are the structure classes of
+``codec_cost_model.content_profile`` ('json', 'markup', 'text'), the same
+classifier the cost model uses. A payload is only classified when it is
+picked as a training sample or some category has an active dictionary.
+Older versions stay loaded so frames written with them still decompress.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from .codec_cost_model import content_profile
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_DICT_SIZE = 112640  # zstd CLI default (110KB)
+DEFAULT_MAX_PAYLOAD_SIZE = 32 * 1024
+DEFAULT_MAX_SAMPLES = 512
+DEFAULT_MIN_SAMPLES = 64
+DEFAULT_SAMPLE_RATE = 0.05
+DEFAULT_PRELOAD_LEVELS = (1, 6)
+
+
+@dataclass
+class DictionaryVersion:
+    """One trained dictionary of a content category."""
+    category: str
+    version: int
+    dict_id: int
+    file: str
+    size: int
+    sample_count: int
+    sample_bytes: int
+    trained_at: float
+
+
+def content_category(data: bytes) -> Optional[str]:
+    """
+    Content category of a payload for dictionary selection.
+
+    The structure class of ``content_profile``; binary and empty payloads
+    have no category.
+
+    Args:
+        data: Payload
+
+    Returns:
+        Category such as 'json', or None for binary data
+    """
+    kind = content_profile(data).split('/')[0]
+    return None if kind in ('binary', 'empty') else kind
+
+
+def _file_stem(category: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', category).strip('_') or 'default'
+
+
+class ZstdDictionaryRegistry:
+    """
+    On-disk registry of trained Zstandard dictionaries.
+
+    Thread-safe; one instance per process (see ``get_dictionary_registry``).
+    Worker processes load the same directory and pick up dictionaries
+    trained elsewhere the first time they meet an unknown dictionary id.
+    """
+
+    def __init__(self,
+                 directory: Union[str, Path],
+                 max_payload_size: int = DEFAULT_MAX_PAYLOAD_SIZE,
+                 max_samples: int = DEFAULT_MAX_SAMPLES,
+                 min_samples: int = DEFAULT_MIN_SAMPLES,
+                 sample_rate: float = DEFAULT_SAMPLE_RATE,
+                 preload_levels: Iterable[int] = DEFAULT_PRELOAD_LEVELS):
+        """
+        Initialize registry and load stored dictionaries.
+
+        Args:
+            directory: Directory holding dictionaries and the manifest
+            max_payload_size: Larger payloads are neither sampled nor
+                compressed with a dictionary
+            max_samples: Samples kept per category for training
+            min_samples: Samples required before a category can be trained
+            sample_rate: Fraction of small payloads ``select`` records as
+                training samples
+            preload_levels: Levels whose compression tables are precomputed
+                for every active dictionary
+        """
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed")
+
+        self.directory = Path(directory)
+        self.max_payload_size = max_payload_size
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self.sample_rate = sample_rate
+        self.preload_levels = tuple(preload_levels)
+
+        self._lock = threading.RLock()
+        self._versions: Dict[str, List[DictionaryVersion]] = {}
+        self._active: Dict[str, int] = {}
+        self._by_id: Dict[int, DictionaryVersion] = {}
+        self._raw: Dict[int, bytes] = {}
+        self._decompression_dicts: Dict[int, "zstd.ZstdCompressionDict"] = {}
+        self._compression_dicts: Dict[Tuple[int, int], "zstd.ZstdCompressionDict"] = {}
+
+        # Reservoir samples per category: (samples, payloads seen)
+        self._samples: Dict[str, Tuple[List[bytes], int]] = {}
+        self._random = random.Random()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.reload()
+
+    # Persistence
+
+    def reload(self):
+        """Load the manifest and every dictionary it lists."""
+        manifest_path = self.directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            return
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        with self._lock:
+            for category, entry in manifest.get('categories', {}).items():
+                versions = [DictionaryVersion(**version) for version in entry.get('versions', [])]
+                for version in versions:
+                    if version.dict_id not in self._raw:
+                        self._raw[version.dict_id] = (self.directory / version.file).read_bytes()
+                    self._by_id[version.dict_id] = version
+                self._versions[category] = versions
+                if entry.get('active') is not None:
+                    self._active[category] = entry['active']
+                    self._preload(self._active_version(category))
+
+    def _write_manifest(self):
+        manifest = {
+            'categories': {
+                category: {
+                    'active': self._active.get(category),
+                    'versions': [asdict(version) for version in versions]
+                }
+                for category, versions in self._versions.items()
+            }
+        }
+        # Atomic replace so readers in other processes never see a partial file
+        temp_path = self.directory / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, self.directory / MANIFEST_NAME)
+
+    # Sampling and training
+
+    def observe(self, data: bytes, category: Optional[str] = None) -> Optional[str]:
+        """
+        Record a payload as a training sample for its category.
+
+        Args:
+            data: Payload
+            category: Content category; detected if None
+
+        Returns:
+            Category of the payload, or None if it was not sampled
+        """
+        if not data or len(data) > self.max_payload_size:
+            return None
+        category = category or content_category(data)
+        if category is None:
+            return None
+
+        with self._lock:
+            samples, seen = self._samples.get(category, ([], 0))
+            seen += 1
+            if len(samples) < self.max_samples:
+                samples.append(bytes(data))
+            else:
+                slot = self._random.randrange(seen)
+                if slot < self.max_samples:
+                    samples[slot] = bytes(data)
+            self._samples[category] = (samples, seen)
+        return category
+
+    def sample_count(self, category: str) -> int:
+        """Number of samples currently held for ``category``."""
+        with self._lock:
+            return len(self._samples.get(category, ([], 0))[0])
+
+    def train(self,
+              category: str,
+              samples: Optional[Iterable[bytes]] = None,
+              dict_size: int = DEFAULT_DICT_SIZE,
+              level: int = 3) -> DictionaryVersion:
+        """
+        Train, store and activate a new dictionary version for ``category``.
+
+        Args:
+            category: Content category
+            samples: Training samples; the sampled payloads if None
+            dict_size: Maximum dictionary size in bytes
+            level: Level the dictionary is optimized for
+
+        Returns:
+            The new dictionary version
+
+        Raises:
+            ValueError: If there are fewer than ``min_samples`` samples
+        """
+        if samples is None:
+            with self._lock:
+                samples = list(self._samples.get(category, ([], 0))[0])
+        else:
+            samples = [bytes(sample) for sample in samples if sample]
+        if len(samples) < self.min_samples:
+            raise ValueError(
+                f"Need at least {self.min_samples} samples to train a dictionary for {category}, "
+                f"got {len(samples)}"
+            )
+
+        start = time.time()
+        # k/d left at 0 so fastCOVER searches them; threads=-1 uses all cores
+        dictionary = zstd.train_dictionary(dict_size, samples, level=level, threads=-1)
+        raw = dictionary.as_bytes()
+        dict_id = dictionary.dict_id()
+
+        with self._lock:
+            if dict_id in self._by_id and self._raw[dict_id] != raw:
+                raise ValueError(f"Dictionary id {dict_id} is already used by another dictionary")
+
+            versions = self._versions.setdefault(category, [])
+            number = versions[-1].version + 1 if versions else 1
+            version = DictionaryVersion(
+                category=category,
+                version=number,
+                dict_id=dict_id,
+                file=f"{_file_stem(category)}-v{number}-{dict_id}.zdict",
+                size=len(raw),
+                sample_count=len(samples),
+                sample_bytes=sum(len(sample) for sample in samples),
+                trained_at=time.time()
+            )
+            (self.directory / version.file).write_bytes(raw)
+
+            versions.append(version)
+            self._by_id[dict_id] = version
+            self._raw[dict_id] = raw
+            self._active[category] = number
+            self._preload(version)
+            self._write_manifest()
+
+        logger.info(
+            f"Trained zstd dictionary {category} v{number} (id {dict_id}, {len(raw)} bytes) "
+            f"from {len(samples)} samples in {time.time() - start:.2f}s"
+        )
+        return version
+
+    def activate(self, category: str, version: int):
+        """Make an existing dictionary version the active one (e.g. to roll back)."""
+        with self._lock:
+            if not any(v.version == version for v in self._versions.get(category, [])):
+                raise KeyError(f"No dictionary version {version} for {category}")
+            self._active[category] = version
+            self._preload(self._active_version(category))
+            self._write_manifest()
+
+    # Lookup
+
+    def _active_version(self, category: str) -> Optional[DictionaryVersion]:
+        number = self._active.get(category)
+        for version in self._versions.get(category, []):
+            if version.version == number:
+                return version
+        return None
+
+    def _preload(self, version: Optional[DictionaryVersion]):
+        if version is not None:
+            for level in self.preload_levels:
+                self.compression_dict(version.dict_id, level)
+
+    def select(self, data: bytes) -> int:
+        """
+        Pick the dictionary for compressing ``data``.
+
+        A ``sample_rate`` fraction of small payloads is recorded as
+        training samples along the way. The payload is not classified at
+        all unless it is sampled or some category has an active dictionary.
+
+        Args:
+            data: Payload to compress
+
+        Returns:
+            Dictionary id of the active dictionary for the payload's
+            category, or 0 for no dictionary
+        """
+        if not data or len(data) > self.max_payload_size:
+            return 0
+        with self._lock:
+            sampling = self._random.random() < self.sample_rate
+            if not sampling and not self._active:
+                return 0
+
+        category = content_category(data)
+        if category is None:
+            return 0
+        if sampling:
+            self.observe(data, category)
+        with self._lock:
+            version = self._active_version(category)
+        return version.dict_id if version is not None else 0
+
+    def compression_dict(self, dict_id: int, level: int) -> "zstd.ZstdCompressionDict":
+        """
+        Dictionary with precomputed compression tables for ``level``.
+
+        The same object is returned for repeated calls, so per-thread codec
+        contexts keyed on it are reused.
+        """
+        key = (dict_id, level)
+        dictionary = self._compression_dicts.get(key)
+        if dictionary is None:
+            with self._lock:
+                dictionary = self._compression_dicts.get(key)
+                if dictionary is None:
+                    dictionary = zstd.ZstdCompressionDict(self._raw_bytes(dict_id))
+                    dictionary.precompute_compress(level=level)
+                    self._compression_dicts[key] = dictionary
+        return dictionary
+
+    def decompression_dict(self, dict_id: int) -> "zstd.ZstdCompressionDict":
+        """Dictionary for decompressing frames written with ``dict_id``."""
+        dictionary = self._decompression_dicts.get(dict_id)
+        if dictionary is None:
+            with self._lock:
+                dictionary = self._decompression_dicts.get(dict_id)
+                if dictionary is None:
+                    dictionary = zstd.ZstdCompressionDict(self._raw_bytes(dict_id))
+                    self._decompression_dicts[dict_id] = dictionary
+        return dictionary
+
+    def dictionary_for_frame(self, frame: bytes) -> Optional["zstd.ZstdCompressionDict"]:
+        """Dictionary referenced by a zstd frame header, if any."""
+        dict_id = zstd.get_frame_parameters(frame).dict_id
+        return self.decompression_dict(dict_id) if dict_id else None
+
+    def _raw_bytes(self, dict_id: int) -> bytes:
+        raw = self._raw.get(dict_id)
+        if raw is None:
+            # Possibly trained by another process since we loaded
+            self.reload()
+            raw = self._raw.get(dict_id)
+        if raw is None:
+            raise KeyError(f"Unknown zstd dictionary id {dict_id}")
+        return raw
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get dictionaries and sampling state per category."""
+        with self._lock:
+            categories = set(self._versions) | set(self._samples)
+            return {
+                category: {
+                    'active_version': self._active.get(category),
+                    'versions': [asdict(version) for version in self._versions.get(category, [])],
+                    'samples': len(self._samples.get(category, ([], 0))[0]),
+                    'payloads_seen': self._samples.get(category, ([], 0))[1]
+                }
+                for category in sorted(categories)
+            }
+
+
+# Process-wide registry (each worker process loads its own)
+_dictionary_registry: Optional[ZstdDictionaryRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_dictionary_registry() -> ZstdDictionaryRegistry:
+    """
+    Get the global dictionary registry singleton.
+
+    Returns:
+        Global ZstdDictionaryRegistry instance
+    """
+    global _dictionary_registry
+    if _dictionary_registry is None:
+        with _registry_lock:
+            if _dictionary_registry is None:
+                from ..config import settings
+                _dictionary_registry = ZstdDictionaryRegistry(
+                    settings.compression.dictionary_dir,
+                    max_payload_size=settings.compression.dictionary_max_payload_size,
+                    max_samples=settings.compression.dictionary_max_samples,
+                    sample_rate=settings.compression.dictionary_sample_rate
+                )
+    return _dictionary_registry
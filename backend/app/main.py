@@ -14,6 +14,10 @@ from pathlib import Path
 from .config import settings
 from .database.connection import init_db, close_db, check_db_health
 from .api import api_router
+from .core.compression_executor import CompressionQueueFullError, shutdown_compression_executor
+from .core.system_sampler import get_system_sampler
+from .core.timeseries_ingest import get_bulk_writer, shutdown_bulk_writer
+from .core.timeseries_store import shutdown_timeseries_store
 from .services import (
     AlgorithmService, ExperimentService, ContentAnalysisService,
     SensorService, MetricsService
@@ -52,6 +56,12 @@ async def lifespan(app: FastAPI):
         # Start background services
         logger.info("Starting background services...")
         
+        # Start the shared system sampler before anything reads metrics
+        await get_system_sampler().start()
+        
+        # Batch metric and sensor samples into the time-series store
+        await get_bulk_writer().start()
+        
         # Start metrics collection
         metrics_task = asyncio.create_task(
             MetricsService.start_metrics_collection(interval_seconds=60)
@@ -85,6 +95,16 @@ async def lifespan(app: FastAPI):
         if background_tasks:
             await asyncio.gather(*background_tasks, return_exceptions=True)
         
+        # Stop the system sampler
+        await get_system_sampler().stop()
+        
+        # Stop compression worker pools
+        shutdown_compression_executor(wait=False)
+        
+        # Write queued, then buffered, metric and sensor samples
+        await shutdown_bulk_writer()
+        shutdown_timeseries_store()
+        
         # Close database connections
         await close_db()
         
@@ -188,6 +208,27 @@ async def health_check():
         raise HTTPException(status_code=500, detail="Health check failed")
 
 
+@app.exception_handler(CompressionQueueFullError)
+async def compression_queue_full_handler(request, exc: CompressionQueueFullError):
+    """
+    Admission control handler for saturated compression lanes.
+    
+    Returns:
+        JSONResponse: 429 response with a Retry-After hint
+    """
+    logger.warning(str(exc))
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(int(max(1, exc.retry_after)))},
+        content={
+            "error": "Too many requests",
+            "detail": str(exc),
+            "lane": exc.lane,
+            "queue_depth": exc.queue_depth
+        }
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """
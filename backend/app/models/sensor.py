@@ -287,6 +287,12 @@ class SystemMetricResponse(SystemMetricCreate):
         from_attributes = True
 
 
+class SystemMetricSample(SystemMetricCreate):
+    """Pydantic model for a system metric sample read from the time-series store."""
+    
+    id: int = Field(..., description="Time-series id (one per metric name and tag set)")
+
+
 class SensorCreate(BaseModel):
     """Pydantic model for creating sensors."""
     
@@ -445,8 +451,9 @@ class MetricsQueryRequest(BaseModel):
 class MetricsQueryResponse(BaseModel):
     """Pydantic model for metrics query responses."""
     
-    metrics: List[SystemMetricResponse]
-    sensor_readings: List[SensorReadingResponse]
+    # Samples from the time-series store carry no row ids
+    metrics: List[SystemMetricSample]
+    sensor_readings: List[SensorReadingCreate]
     fusion_results: List[SensorFusionResultResponse]
     system_health: List[SystemHealthResponse]
     total_count: int
@@ -25,6 +25,7 @@ from email.mime.multipart import MIMEMultipart
 from .logging import get_logger, LoggerMixin
 from .metrics import get_metrics_collector
 from .health import get_health_monitor, HealthStatus
+from ..core.system_sampler import get_system_sampler
 
 
 class AlertSeverity(Enum):
@@ -583,7 +584,7 @@ class AlertManager(LoggerMixin):
     async def _check_high_cpu_usage(self) -> Optional[Dict[str, Any]]:
         """Check for high CPU usage."""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = get_system_sampler().latest().cpu_percent
             
             if cpu_percent > 80:
                 return {
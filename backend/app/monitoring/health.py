@@ -22,6 +22,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from .logging import get_logger, LoggerMixin
 from .metrics import get_metrics_collector
+from ..core.system_sampler import get_system_sampler
 
 
 class HealthStatus(Enum):
@@ -303,8 +304,9 @@ class HealthMonitor(LoggerMixin):
     async def _check_system_health(self) -> Dict[str, Any]:
         """Check system health."""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
+            snapshot = get_system_sampler().latest()
+            cpu_percent = snapshot.cpu_percent
+            memory = snapshot.memory
             
             details = {
                 "cpu_usage": cpu_percent,
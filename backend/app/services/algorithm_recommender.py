@@ -9,10 +9,13 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import math
 
+from ..core.codec_cost_model import ANY, CodecCostModel, get_codec_cost_model
+
 class AlgorithmRecommender:
     """Service for recommending optimal compression algorithms."""
     
-    def __init__(self):
+    def __init__(self, cost_model: Optional[CodecCostModel] = None):
+        self.cost_model = cost_model or get_codec_cost_model()
         self.algorithms = {
             'gzip': {
                 'name': 'gzip',
@@ -460,6 +463,21 @@ class AlgorithmRecommender:
             confidence += 0.1
         
         prediction['confidence'] = min(confidence, 1.0)
+        prediction['source'] = 'static'
+        
+        # Prefer what this deployment has actually measured
+        measured = self.cost_model.estimate(
+            content_analysis.get('codec_profile', ANY), content_analysis.get('content_size', 0), codecs=[algo_name]
+        )
+        if measured:
+            best = max(measured, key=lambda option: option['ratio'])
+            prediction['compression_ratio'] = best['ratio']
+            prediction['processing_time'] = best['latency']
+            prediction['compress_mbps'] = best['compress_mbps']
+            prediction['decompress_mbps'] = best['decompress_mbps']
+            prediction['level'] = best['level']
+            prediction['confidence'] = min(0.5 + best['samples'] / 20.0, 0.99)
+            prediction['source'] = 'measured'
         
         return prediction
     
@@ -12,7 +12,7 @@ from ..models.compression import (
     CompressionRequest, CompressionResponse, CompressionResult,
     CompressionParameters, CompressionAlgorithm, CompressionLevel
 )
-from ..core.compression_engine import CompressionEngine
+from ..core.compression_engine import get_compression_engine
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +21,7 @@ class CompressionService:
     """Service for handling compression operations."""
     
     def __init__(self):
-        self.engine = CompressionEngine()
+        self.engine = get_compression_engine()
     
     async def compress_content(self, request: CompressionRequest) -> CompressionResponse:
         """
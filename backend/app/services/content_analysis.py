@@ -12,6 +12,8 @@ from typing import Dict, List, Any, Optional
 from collections import Counter
 from datetime import datetime
 
+from app.core.codec_cost_model import PROFILE_SAMPLE, content_profile
+
 # Optional dependencies - handle gracefully if not available
 try:
     import chardet
@@ -115,6 +117,7 @@ class ContentAnalysisService:
         return {
             'content_type': content_type,
             'content_size': content_size,
+            'codec_profile': content_profile(content[:PROFILE_SAMPLE].encode('utf-8')),
             'encoding': encoding,
             'language': language,
             'entropy': entropy,
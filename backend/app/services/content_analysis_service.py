@@ -6,10 +6,14 @@ import logging
 import math
 import re
 import chardet
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterable, Iterable, Union
 from collections import Counter
 import numpy as np
 
+from app.core.codec_cost_model import content_profile
+from app.core.compression_executor import FAST_LANE, get_compression_executor
+from app.core.streaming_analysis import StreamingContentAnalyzer
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +35,7 @@ class ContentAnalysisService:
             analysis_result = {
                 'content_type': 'unknown',
                 'content_size': len(content_data),
+                'codec_profile': content_profile(content_data),
                 'patterns': [],
                 'entropy': 0.0,
                 'redundancy': 0.0,
@@ -578,6 +583,40 @@ class ContentAnalysisService:
         
         return results
     
+    @staticmethod
+    async def analyze_stream(
+        chunks: Union[Iterable[bytes], AsyncIterable[bytes]],
+        **options
+    ) -> Dict[str, Any]:
+        """
+        Profile content chunk by chunk without holding it in memory.
+        
+        Sketch updates run on the fast lane of the shared compression
+        executor, so large chunks do not block the event loop and analysis
+        is bounded by the same admission control as compression.
+        
+        Args:
+            chunks: Consecutive content chunks (sync or async iterable)
+            **options: StreamingContentAnalyzer options
+            
+        Returns:
+            Dict[str, Any]: Streaming profile (see StreamingContentAnalyzer.finalize)
+            
+        Raises:
+            CompressionQueueFullError: If the fast lane rejects a chunk
+        """
+        analyzer = StreamingContentAnalyzer(**options)
+        executor = get_compression_executor()
+        
+        if hasattr(chunks, '__aiter__'):
+            async for chunk in chunks:
+                await executor.run(FAST_LANE, analyzer.update, chunk)
+        else:
+            for chunk in chunks:
+                await executor.run(FAST_LANE, analyzer.update, chunk)
+        
+        return analyzer.finalize()
+    
     @staticmethod
     async def compare_content_analysis(analysis1: Dict[str, Any], analysis2: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -9,22 +9,32 @@ import asyncio
 import logging
 import psutil
 import platform
-import subprocess
 import json
-import time
 import math
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, desc
 from sqlalchemy.orm import selectinload
 
-from ..models.sensor import SystemMetric, MetricType
-from ..database.connection import get_db_session_optional
+from ..core.system_sampler import get_system_sampler
+from ..core.timeseries_ingest import get_bulk_writer
+from ..core.timeseries_rollup import Rollup, pick_step
+from ..core.timeseries_store import from_millis, get_timeseries_store
+from ..models.sensor import SystemMetric
+from .metrics_service import metric_series_tags
 
 logger = logging.getLogger(__name__)
 
+# History field -> metric saved by ``save_metrics`` (tagged live=true)
+HISTORY_SERIES = {
+    'cpu_usage': 'cpu_percent',
+    'memory_usage': 'memory_percent',
+    'disk_usage': 'disk_percent',
+    'network_latency': 'network_latency',
+    'process_count': 'process_count'
+}
+
 
 @dataclass
 class SystemInfo:
@@ -98,19 +108,20 @@ class LiveSystemMetricsService:
         """Collect comprehensive live system metrics."""
         try:
             timestamp = datetime.utcnow()
+            snapshot = get_system_sampler().latest()
             
             # CPU metrics
-            cpu_usage = psutil.cpu_percent(interval=0.1)
+            cpu_usage = snapshot.cpu_percent
             cpu_temp = await self._get_cpu_temperature()
-            load_avg = psutil.getloadavg()
+            load_avg = snapshot.load_average
             
             # Memory metrics
-            memory = psutil.virtual_memory()
+            memory = snapshot.memory
             memory_usage = memory.percent
             memory_available = memory.available
             
             # Disk metrics
-            disk = psutil.disk_usage('/')
+            disk = snapshot.disk
             disk_usage = disk.percent
             disk_free = disk.free
             
@@ -122,8 +133,8 @@ class LiveSystemMetricsService:
             power_consumption = await self._get_power_consumption()
             
             # Process metrics
-            process_count = len(psutil.pids())
-            uptime = time.time() - psutil.boot_time()
+            process_count = snapshot.process_count
+            uptime = snapshot.uptime
             
             # Network connections
             connections = len(psutil.net_connections())
@@ -155,73 +166,17 @@ class LiveSystemMetricsService:
     
     async def _get_cpu_temperature(self) -> Optional[float]:
         """Get CPU temperature if available."""
-        try:
-            # Try to get temperature from sensors
-            temps = psutil.sensors_temperatures()
-            if temps:
-                for name, entries in temps.items():
-                    if 'cpu' in name.lower() or 'core' in name.lower():
-                        for entry in entries:
-                            if entry.current:
-                                return entry.current
-            
-            # Try alternative methods based on OS
-            if platform.system() == "Linux":
-                try:
-                    # Try reading from thermal zones
-                    result = subprocess.run(['cat', '/sys/class/thermal/thermal_zone*/temp'], 
-                                          capture_output=True, text=True, timeout=1)
-                    if result.returncode == 0:
-                        temps = [int(t.strip()) / 1000 for t in result.stdout.split('\n') if t.strip()]
-                        if temps:
-                            return sum(temps) / len(temps)
-                except:
-                    pass
-            
-            return None
-            
-        except Exception as e:
-            logger.debug(f"CPU temperature not available: {e}")
-            return None
+        return get_system_sampler().latest().cpu_temperature
     
     async def _measure_network_latency(self) -> float:
-        """Measure network latency to a reliable host."""
-        try:
-            # Try to ping a reliable host (Google DNS)
-            start_time = time.time()
-            result = subprocess.run(['ping', '-c', '1', '8.8.8.8'], 
-                                  capture_output=True, text=True, timeout=5)
-            end_time = time.time()
-            
-            if result.returncode == 0:
-                # Parse ping output for latency
-                output = result.stdout
-                if 'time=' in output:
-                    latency_str = output.split('time=')[1].split(' ')[0]
-                    return float(latency_str)
-                else:
-                    return (end_time - start_time) * 1000  # Convert to ms
-            else:
-                return 999.0  # High latency if ping fails
-                
-        except Exception as e:
-            logger.debug(f"Network latency measurement failed: {e}")
-            return 999.0
+        """Network latency (ms) from the sampler's periodic connect probe."""
+        latency = get_system_sampler().latest().network_latency_ms
+        return latency if latency is not None else 999.0  # High latency if the probe fails
     
     async def _measure_network_throughput(self) -> float:
-        """Measure network throughput."""
-        try:
-            # Get network I/O counters
-            net_io = psutil.net_io_counters()
-            if net_io:
-                # Calculate bytes per second (simplified)
-                total_bytes = net_io.bytes_sent + net_io.bytes_recv
-                return total_bytes / (1024 * 1024)  # Convert to MB/s (simplified)
-            return 0.0
-            
-        except Exception as e:
-            logger.debug(f"Network throughput measurement failed: {e}")
-            return 0.0
+        """Network throughput in MB/s between the last two sampler readings."""
+        snapshot = get_system_sampler().latest()
+        return (snapshot.net_sent_bytes_per_sec + snapshot.net_recv_bytes_per_sec) / (1024 * 1024)
     
     async def _get_power_consumption(self) -> Optional[float]:
         """Get power consumption if available."""
@@ -242,7 +197,7 @@ class LiveSystemMetricsService:
                     pass
             
             # Try to estimate from CPU usage and frequency
-            cpu_usage = psutil.cpu_percent(interval=0.1)
+            cpu_usage = get_system_sampler().latest().cpu_percent
             cpu_freq = psutil.cpu_freq()
             if cpu_freq:
                 # Rough estimation: higher frequency and usage = more power
@@ -295,8 +250,8 @@ class LiveSystemMetricsService:
             compression_metrics={}
         )
     
-    async def save_metrics_to_db(self, metrics: LiveMetrics, db: AsyncSession) -> None:
-        """Save live metrics to database."""
+    async def save_metrics(self, metrics: LiveMetrics) -> None:
+        """Save live metrics to the time-series store."""
         try:
             # Create system metrics from live metrics
             system_metrics = []
@@ -305,7 +260,7 @@ class LiveSystemMetricsService:
             # CPU metrics
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.CPU_PERCENT,
+                name='cpu_percent',
                 value=metrics.cpu_usage,
                 unit='percent',
                 tags={'component': 'cpu', 'measurement': 'usage', 'live': 'true'}
@@ -314,7 +269,7 @@ class LiveSystemMetricsService:
             if metrics.cpu_temp:
                 system_metrics.append(SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.CPU_TEMPERATURE,
+                    name='cpu_temperature',
                     value=metrics.cpu_temp,
                     unit='°C',
                     tags={'component': 'cpu', 'measurement': 'temperature', 'live': 'true'}
@@ -323,7 +278,7 @@ class LiveSystemMetricsService:
             # Memory metrics
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.MEMORY_PERCENT,
+                name='memory_percent',
                 value=metrics.memory_usage,
                 unit='percent',
                 tags={'component': 'memory', 'measurement': 'usage', 'live': 'true'}
@@ -331,7 +286,7 @@ class LiveSystemMetricsService:
             
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.MEMORY_AVAILABLE,
+                name='memory_available',
                 value=metrics.memory_available / (1024**3),  # GB
                 unit='GB',
                 tags={'component': 'memory', 'measurement': 'available', 'live': 'true'}
@@ -340,7 +295,7 @@ class LiveSystemMetricsService:
             # Disk metrics
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.DISK_PERCENT,
+                name='disk_percent',
                 value=metrics.disk_usage,
                 unit='percent',
                 tags={'component': 'disk', 'measurement': 'usage', 'live': 'true'}
@@ -348,7 +303,7 @@ class LiveSystemMetricsService:
             
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.DISK_FREE,
+                name='disk_free',
                 value=metrics.disk_free / (1024**3),  # GB
                 unit='GB',
                 tags={'component': 'disk', 'measurement': 'free', 'live': 'true'}
@@ -357,7 +312,7 @@ class LiveSystemMetricsService:
             # Network metrics
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.NETWORK_LATENCY,
+                name='network_latency',
                 value=metrics.network_latency,
                 unit='ms',
                 tags={'component': 'network', 'measurement': 'latency', 'live': 'true'}
@@ -365,7 +320,7 @@ class LiveSystemMetricsService:
             
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.NETWORK_THROUGHPUT,
+                name='network_throughput',
                 value=metrics.network_throughput,
                 unit='MB/s',
                 tags={'component': 'network', 'measurement': 'throughput', 'live': 'true'}
@@ -375,7 +330,7 @@ class LiveSystemMetricsService:
             if metrics.power_consumption:
                 system_metrics.append(SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.POWER_CONSUMPTION,
+                    name='power_consumption',
                     value=metrics.power_consumption,
                     unit='W',
                     tags={'component': 'power', 'measurement': 'consumption', 'live': 'true'}
@@ -384,7 +339,7 @@ class LiveSystemMetricsService:
             # Process metrics
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.PROCESS_COUNT,
+                name='process_count',
                 value=metrics.process_count,
                 unit='processes',
                 tags={'component': 'process', 'measurement': 'count', 'live': 'true'}
@@ -393,7 +348,7 @@ class LiveSystemMetricsService:
             # Uptime
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.SYSTEM_UPTIME,
+                name='system_uptime',
                 value=metrics.uptime / 3600,  # hours
                 unit='hours',
                 tags={'component': 'system', 'measurement': 'uptime', 'live': 'true'}
@@ -403,7 +358,7 @@ class LiveSystemMetricsService:
             for i, load in enumerate(metrics.load_average):
                 system_metrics.append(SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.LOAD_AVERAGE,
+                    name='load_average',
                     value=load,
                     unit='load',
                     tags={'component': 'cpu', 'measurement': f'load_{i+1}m', 'live': 'true'}
@@ -412,22 +367,21 @@ class LiveSystemMetricsService:
             # Network connections
             system_metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.NETWORK_CONNECTIONS,
+                name='network_connections',
                 value=metrics.connections,
                 unit='connections',
                 tags={'component': 'network', 'measurement': 'connections', 'live': 'true'}
             ))
             
-            # Save all metrics
-            for metric in system_metrics:
-                db.add(metric)
-            
-            await db.commit()
-            logger.info(f"Saved {len(system_metrics)} live metrics to database")
+            # Queue all metrics for the bulk writer
+            await get_bulk_writer().put_many([
+                (metric.name, metric.value, metric.timestamp, metric_series_tags(metric.tags, metric.type), metric.unit)
+                for metric in system_metrics
+            ])
+            logger.debug(f"Saved {len(system_metrics)} live metrics")
             
         except Exception as e:
-            await db.rollback()
-            logger.error(f"Error saving live metrics to database: {e}")
+            logger.error(f"Error saving live metrics: {e}")
     
     async def get_metrics_dashboard(self) -> Dict[str, Any]:
         """Get comprehensive metrics dashboard data."""
@@ -514,14 +468,8 @@ class LiveSystemMetricsService:
                 # Collect live metrics
                 metrics = await self.collect_live_metrics()
                 
-                # Save to database if available
-                try:
-                    db = await get_db_session_optional()
-                    if db:
-                        await self.save_metrics_to_db(metrics, db)
-                        await db.close()
-                except Exception as e:
-                    logger.error(f"Error saving metrics to database: {e}")
+                # Persist for history queries
+                await self.save_metrics(metrics)
                 
                 # Store in memory for quick access
                 self.metrics_history.append(metrics)
@@ -535,27 +483,60 @@ class LiveSystemMetricsService:
             
             await asyncio.sleep(interval_seconds)
     
+    def _history_rollups(self, hours: float) -> Dict[str, Any]:
+        """Rollups of the history fields over the last ``hours``, keyed by field."""
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(hours=hours)
+        step = pick_step(hours * 3600)
+        store = get_timeseries_store()
+        rollups = {}
+        for field, name in HISTORY_SERIES.items():
+            series = store.aggregate(name, step, start_time, end_time, tags={'live': 'true'})
+            if series:
+                rollups[field] = series[0]
+        return rollups
+    
     async def get_metrics_history(self, hours: int = 1) -> List[Dict[str, Any]]:
-        """Get metrics history for the specified number of hours."""
+        """
+        Get metrics history for the specified number of hours.
+        
+        Points are per-bucket averages at a step that keeps the response
+        to a few hundred points, read from pre-aggregated rollups.
+        """
         try:
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-            recent_metrics = [m for m in self.metrics_history if m.timestamp >= cutoff_time]
-            
-            return [
-                {
-                    "timestamp": m.timestamp.isoformat(),
-                    "cpu_usage": m.cpu_usage,
-                    "memory_usage": m.memory_usage,
-                    "disk_usage": m.disk_usage,
-                    "network_latency": m.network_latency,
-                    "process_count": m.process_count
-                }
-                for m in recent_metrics
-            ]
+            points: Dict[int, Dict[str, Any]] = {}
+            for field, data in self._history_rollups(hours).items():
+                for start, value in zip(data.timestamps, data.values('avg')):
+                    point = points.setdefault(start, {
+                        "timestamp": from_millis(start).isoformat(),
+                        **{name: None for name in HISTORY_SERIES}
+                    })
+                    point[field] = round(value, 3) if value is not None else None
+            return [points[start] for start in sorted(points)]
         except Exception as e:
             logger.error(f"Error getting metrics history: {e}")
             return []
     
+    async def get_metrics_history_statistics(self, hours: int = 1) -> Dict[str, Dict[str, float]]:
+        """Min/max/avg/std per history field over the whole window, from rollups."""
+        try:
+            statistics = {}
+            for field, data in self._history_rollups(hours).items():
+                total = Rollup()
+                for rollup in data.rollups:
+                    total.merge(rollup)
+                if total.count:
+                    statistics[field] = {
+                        "min": round(total.minimum, 2),
+                        "max": round(total.maximum, 2),
+                        "avg": round(total.mean, 2),
+                        "std": round(total.std, 2)
+                    }
+            return statistics
+        except Exception as e:
+            logger.error(f"Error getting metrics history statistics: {e}")
+            return {}
+    
     async def get_performance_graphs_data(self) -> Dict[str, Any]:
         """Get data for performance graphs and charts."""
         try:
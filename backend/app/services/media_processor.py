@@ -15,6 +15,10 @@ from PIL import Image
 import numpy as np
 from fastapi import UploadFile
 import mimetypes
+import uuid
+
+from app.config import settings
+from app.core.upload_ingest import UploadTooLargeError, ingest_upload
 
 logger = logging.getLogger(__name__)
 
@@ -53,13 +57,21 @@ class MediaProcessor:
         """Get file extension"""
         return Path(filename).suffix.lower()
 
-    async def validate_upload(
+    def _max_size(self, media_type: str) -> int:
+        """Maximum upload size for a media type"""
+        return {
+            'image': self.MAX_IMAGE_SIZE,
+            'video': self.MAX_VIDEO_SIZE,
+            'audio': self.MAX_AUDIO_SIZE
+        }[media_type]
+
+    def _validate_format(
         self,
         file: UploadFile,
         media_type: str
     ) -> Tuple[bool, Optional[str]]:
         """
-        Validate uploaded file
+        Validate filename and format without reading the content
 
         Args:
             file: Uploaded file
@@ -77,19 +89,87 @@ class MediaProcessor:
         # Check format support
         if media_type == 'image':
             supported = self.SUPPORTED_IMAGE_FORMATS
-            max_size = self.MAX_IMAGE_SIZE
         elif media_type == 'video':
             supported = self.SUPPORTED_VIDEO_FORMATS
-            max_size = self.MAX_VIDEO_SIZE
         elif media_type == 'audio':
             supported = self.SUPPORTED_AUDIO_FORMATS
-            max_size = self.MAX_AUDIO_SIZE
         else:
             return False, f"Unknown media type: {media_type}"
 
         if extension not in supported:
             return False, f"Unsupported format: {extension}. Supported: {', '.join(supported)}"
 
+        return True, None
+
+    async def _stream_upload(
+        self,
+        file: UploadFile,
+        media_type: str
+    ) -> Tuple[Path, str, int]:
+        """
+        Validate and stream an upload to the uploads directory
+
+        The file is written block by block and hashed as it arrives, so
+        large video/audio uploads are never held in memory.
+
+        Args:
+            file: Uploaded file
+            media_type: Type ('video', 'audio')
+
+        Returns:
+            (filepath, file_hash, file_size)
+        """
+        is_valid, error = self._validate_format(file, media_type)
+        if not is_valid:
+            raise ValueError(error)
+
+        max_size = self._max_size(media_type)
+        extension = self._get_file_extension(file.filename)
+        partial_path = self.media_dir / 'uploads' / f".upload_{uuid.uuid4().hex}.part"
+
+        try:
+            result = await ingest_upload(
+                file,
+                partial_path,
+                block_size=settings.compression.upload_block_size,
+                window_size=settings.compression.upload_window_size,
+                max_size=max_size,
+                analyze=False
+            )
+        except UploadTooLargeError:
+            raise ValueError(f"File too large (max: {max_size} bytes)")
+
+        if result.size == 0:
+            os.unlink(partial_path)
+            raise ValueError("Empty file")
+
+        # Same name as hashing the whole content would give
+        file_hash = result.sha256[:16]
+        filepath = self.media_dir / 'uploads' / f"upload_{file_hash}{extension}"
+        os.replace(partial_path, filepath)
+
+        return filepath, file_hash, result.size
+
+    async def validate_upload(
+        self,
+        file: UploadFile,
+        media_type: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Validate uploaded file
+
+        Args:
+            file: Uploaded file
+            media_type: Type ('image', 'video', 'audio')
+
+        Returns:
+            (is_valid, error_message)
+        """
+        is_valid, error = self._validate_format(file, media_type)
+        if not is_valid:
+            return False, error
+        max_size = self._max_size(media_type)
+
         # Check file size
         content = await file.read()
         await file.seek(0)  # Reset for further reading
@@ -270,22 +350,10 @@ class MediaProcessor:
         Returns:
             Dictionary with file info and metrics
         """
-        # Validate
-        is_valid, error = await self.validate_upload(file, 'video')
-        if not is_valid:
-            raise ValueError(error)
-
-        # Read content
-        content = await file.read()
-        file_hash = self._generate_hash(content)
-        extension = self._get_file_extension(file.filename)
-
-        # Save file
-        filename = f"upload_{file_hash}{extension}"
-        filepath = self.media_dir / 'uploads' / filename
-
-        with open(filepath, 'wb') as f:
-            f.write(content)
+        # Validate and stream to disk
+        filepath, file_hash, file_size = await self._stream_upload(file, 'video')
+        extension = filepath.suffix
+        filename = filepath.name
 
         # Basic metadata (would use ffprobe in production)
         metadata = {
@@ -299,7 +367,7 @@ class MediaProcessor:
             'filename': filename,
             'filepath': str(filepath),
             'url': f"/media/uploads/{filename}",
-            'file_size': len(content),
+            'file_size': file_size,
             'hash': file_hash,
             'metadata': metadata,
             'uploaded_at': datetime.utcnow().isoformat()
@@ -318,22 +386,10 @@ class MediaProcessor:
         Returns:
             Dictionary with file info and metrics
         """
-        # Validate
-        is_valid, error = await self.validate_upload(file, 'audio')
-        if not is_valid:
-            raise ValueError(error)
-
-        # Read content
-        content = await file.read()
-        file_hash = self._generate_hash(content)
-        extension = self._get_file_extension(file.filename)
-
-        # Save file
-        filename = f"upload_{file_hash}{extension}"
-        filepath = self.media_dir / 'uploads' / filename
-
-        with open(filepath, 'wb') as f:
-            f.write(content)
+        # Validate and stream to disk
+        filepath, file_hash, file_size = await self._stream_upload(file, 'audio')
+        extension = filepath.suffix
+        filename = filepath.name
 
         # Basic metadata
         metadata = {
@@ -347,7 +403,7 @@ class MediaProcessor:
             'filename': filename,
             'filepath': str(filepath),
             'url': f"/media/uploads/{filename}",
-            'file_size': len(content),
+            'file_size': file_size,
             'hash': file_hash,
             'metadata': metadata,
             'uploaded_at': datetime.utcnow().isoformat()
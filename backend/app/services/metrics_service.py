@@ -10,29 +10,41 @@ import math
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, desc
 from sqlalchemy.orm import selectinload
 import numpy as np
 
-from ..models.sensor import SystemMetric, MetricType
-from ..database.connection import get_db_session_optional
+from ..core.system_sampler import get_system_sampler
+from ..core.timeseries_ingest import get_bulk_writer
+from ..core.timeseries_rollup import merge_buckets
+from ..core.timeseries_store import from_millis, get_timeseries_store
+from ..models.sensor import MetricType, SystemMetric
 
 logger = logging.getLogger(__name__)
 
+# Reserved tag holding a metric's MetricType in the time-series store
+METRIC_TYPE_TAG = 'type'
+
+
+def metric_series_tags(tags: Optional[Dict[str, Any]], metric_type: Optional[str]) -> Dict[str, Any]:
+    """Tags a metric is stored under: its own tags plus its type."""
+    series_tags = dict(tags or {})
+    series_tags[METRIC_TYPE_TAG] = getattr(metric_type, 'value', metric_type) or MetricType.GAUGE.value
+    return series_tags
+
 
 class MetricsService:
     """Service for managing system metrics and performance analytics."""
     
     @staticmethod
-    async def collect_system_metrics(db: AsyncSession) -> List[SystemMetric]:
+    async def collect_system_metrics(db: Optional[AsyncSession] = None) -> List[SystemMetric]:
         """
-        Collect comprehensive system metrics.
+        Collect comprehensive system metrics into the time-series store.
         
         Args:
-            db: Database session
+            db: Unused; metrics are stored in the time-series store
             
         Returns:
-            List[SystemMetric]: List of collected metrics
+            List[SystemMetric]: List of collected metrics (not ORM-persisted)
         """
         try:
             metrics = []
@@ -58,19 +70,40 @@ class MetricsService:
             process_metrics = await MetricsService._collect_process_metrics(timestamp)
             metrics.extend(process_metrics)
             
-            # Save all metrics
-            for metric in metrics:
-                db.add(metric)
+            # Queue for the bulk writer, which batches them into the store
+            await get_bulk_writer().put_many([
+                (metric.name, metric.value, metric.timestamp, metric_series_tags(metric.tags, metric.type), metric.unit)
+                for metric in metrics
+            ])
             
-            await db.commit()
             logger.info(f"Collected {len(metrics)} system metrics")
             return metrics
             
         except Exception as e:
-            await db.rollback()
             logger.error(f"Error collecting system metrics: {e}")
             return []
     
+    @staticmethod
+    async def ingest_metrics(metrics_data: List[Dict[str, Any]]) -> int:
+        """
+        Queue a batch of externally reported metrics for the store.
+        
+        Args:
+            metrics_data: Metric dicts with name, value and optionally
+                type, timestamp, tags and unit
+            
+        Returns:
+            int: Number of metrics accepted
+        """
+        now = datetime.utcnow()
+        samples = [
+            (data['name'], float(data['value']), data.get('timestamp') or now,
+             metric_series_tags(data.get('tags'), data.get('type')), data.get('unit'))
+            for data in metrics_data
+        ]
+        await get_bulk_writer().put_many(samples)
+        return len(samples)
+    
     @staticmethod
     async def _collect_cpu_metrics(timestamp: datetime) -> List[SystemMetric]:
         """
@@ -85,11 +118,13 @@ class MetricsService:
         metrics = []
         
         try:
+            snapshot = get_system_sampler().latest()
+            
             # CPU percentage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = snapshot.cpu_percent
             metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.CPU_PERCENT,
+                name='cpu_percent',
                 value=cpu_percent,
                 unit='percent',
                 tags={'component': 'cpu', 'measurement': 'usage'}
@@ -100,28 +135,28 @@ class MetricsService:
             if cpu_freq:
                 metrics.append(SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.CPU_FREQUENCY,
+                    name='cpu_frequency',
                     value=cpu_freq.current,
                     unit='MHz',
                     tags={'component': 'cpu', 'measurement': 'frequency'}
                 ))
             
             # CPU count
-            cpu_count = psutil.cpu_count()
+            cpu_count = snapshot.cpu_count
             metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.CPU_COUNT,
+                name='cpu_count',
                 value=cpu_count,
                 unit='cores',
                 tags={'component': 'cpu', 'measurement': 'count'}
             ))
             
             # Load average
-            load_avg = psutil.getloadavg()
+            load_avg = snapshot.load_average
             for i, load in enumerate(load_avg):
                 metrics.append(SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.LOAD_AVERAGE,
+                    name='load_average',
                     value=load,
                     unit='load',
                     tags={'component': 'cpu', 'measurement': f'load_{i+1}m'}
@@ -135,7 +170,7 @@ class MetricsService:
                         for entry in entries:
                             metrics.append(SystemMetric(
                                 timestamp=timestamp,
-                                metric_type=MetricType.CPU_TEMPERATURE,
+                                name='cpu_temperature',
                                 value=entry.current,
                                 unit='°C',
                                 tags={'component': 'cpu', 'sensor': name, 'measurement': 'temperature'}
@@ -162,33 +197,35 @@ class MetricsService:
         metrics = []
         
         try:
+            snapshot = get_system_sampler().latest()
+            
             # Virtual memory
-            virtual_memory = psutil.virtual_memory()
+            virtual_memory = snapshot.memory
             metrics.extend([
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.MEMORY_TOTAL,
+                    name='memory_total',
                     value=virtual_memory.total / (1024**3),  # GB
                     unit='GB',
                     tags={'component': 'memory', 'measurement': 'total'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.MEMORY_AVAILABLE,
+                    name='memory_available',
                     value=virtual_memory.available / (1024**3),  # GB
                     unit='GB',
                     tags={'component': 'memory', 'measurement': 'available'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.MEMORY_USED,
+                    name='memory_used',
                     value=virtual_memory.used / (1024**3),  # GB
                     unit='GB',
                     tags={'component': 'memory', 'measurement': 'used'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.MEMORY_PERCENT,
+                    name='memory_percent',
                     value=virtual_memory.percent,
                     unit='percent',
                     tags={'component': 'memory', 'measurement': 'usage'}
@@ -196,25 +233,25 @@ class MetricsService:
             ])
             
             # Swap memory
-            swap_memory = psutil.swap_memory()
+            swap_memory = snapshot.swap
             metrics.extend([
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.SWAP_TOTAL,
+                    name='swap_total',
                     value=swap_memory.total / (1024**3),  # GB
                     unit='GB',
                     tags={'component': 'swap', 'measurement': 'total'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.SWAP_USED,
+                    name='swap_used',
                     value=swap_memory.used / (1024**3),  # GB
                     unit='GB',
                     tags={'component': 'swap', 'measurement': 'used'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.SWAP_PERCENT,
+                    name='swap_percent',
                     value=swap_memory.percent,
                     unit='percent',
                     tags={'component': 'swap', 'measurement': 'usage'}
@@ -250,28 +287,28 @@ class MetricsService:
                     metrics.extend([
                         SystemMetric(
                             timestamp=timestamp,
-                            metric_type=MetricType.DISK_TOTAL,
+                            name='disk_total',
                             value=disk_usage.total / (1024**3),  # GB
                             unit='GB',
                             tags={'component': 'disk', 'device': partition.device, 'mountpoint': partition.mountpoint}
                         ),
                         SystemMetric(
                             timestamp=timestamp,
-                            metric_type=MetricType.DISK_USED,
+                            name='disk_used',
                             value=disk_usage.used / (1024**3),  # GB
                             unit='GB',
                             tags={'component': 'disk', 'device': partition.device, 'mountpoint': partition.mountpoint}
                         ),
                         SystemMetric(
                             timestamp=timestamp,
-                            metric_type=MetricType.DISK_FREE,
+                            name='disk_free',
                             value=disk_usage.free / (1024**3),  # GB
                             unit='GB',
                             tags={'component': 'disk', 'device': partition.device, 'mountpoint': partition.mountpoint}
                         ),
                         SystemMetric(
                             timestamp=timestamp,
-                            metric_type=MetricType.DISK_PERCENT,
+                            name='disk_percent',
                             value=disk_usage.percent,
                             unit='percent',
                             tags={'component': 'disk', 'device': partition.device, 'mountpoint': partition.mountpoint}
@@ -281,33 +318,33 @@ class MetricsService:
                     continue  # Skip partitions that can't be accessed
             
             # Disk I/O
-            disk_io = psutil.disk_io_counters()
+            disk_io = get_system_sampler().latest().disk_io
             if disk_io:
                 metrics.extend([
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.DISK_READ_BYTES,
+                        name='disk_read_bytes',
                         value=disk_io.read_bytes / (1024**2),  # MB
                         unit='MB',
                         tags={'component': 'disk_io', 'measurement': 'read'}
                     ),
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.DISK_WRITE_BYTES,
+                        name='disk_write_bytes',
                         value=disk_io.write_bytes / (1024**2),  # MB
                         unit='MB',
                         tags={'component': 'disk_io', 'measurement': 'write'}
                     ),
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.DISK_READ_COUNT,
+                        name='disk_read_count',
                         value=disk_io.read_count,
                         unit='operations',
                         tags={'component': 'disk_io', 'measurement': 'read_ops'}
                     ),
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.DISK_WRITE_COUNT,
+                        name='disk_write_count',
                         value=disk_io.write_count,
                         unit='operations',
                         tags={'component': 'disk_io', 'measurement': 'write_ops'}
@@ -334,33 +371,33 @@ class MetricsService:
         
         try:
             # Network I/O
-            net_io = psutil.net_io_counters()
+            net_io = get_system_sampler().latest().net_io
             if net_io:
                 metrics.extend([
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.NETWORK_BYTES_SENT,
+                        name='network_bytes_sent',
                         value=net_io.bytes_sent / (1024**2),  # MB
                         unit='MB',
                         tags={'component': 'network', 'measurement': 'bytes_sent'}
                     ),
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.NETWORK_BYTES_RECV,
+                        name='network_bytes_recv',
                         value=net_io.bytes_recv / (1024**2),  # MB
                         unit='MB',
                         tags={'component': 'network', 'measurement': 'bytes_recv'}
                     ),
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.NETWORK_PACKETS_SENT,
+                        name='network_packets_sent',
                         value=net_io.packets_sent,
                         unit='packets',
                         tags={'component': 'network', 'measurement': 'packets_sent'}
                     ),
                     SystemMetric(
                         timestamp=timestamp,
-                        metric_type=MetricType.NETWORK_PACKETS_RECV,
+                        name='network_packets_recv',
                         value=net_io.packets_recv,
                         unit='packets',
                         tags={'component': 'network', 'measurement': 'packets_recv'}
@@ -371,7 +408,7 @@ class MetricsService:
             net_connections = psutil.net_connections()
             metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.NETWORK_CONNECTIONS,
+                name='network_connections',
                 value=len(net_connections),
                 unit='connections',
                 tags={'component': 'network', 'measurement': 'active_connections'}
@@ -397,10 +434,10 @@ class MetricsService:
         
         try:
             # Process count
-            process_count = len(psutil.pids())
+            process_count = get_system_sampler().latest().process_count
             metrics.append(SystemMetric(
                 timestamp=timestamp,
-                metric_type=MetricType.PROCESS_COUNT,
+                name='process_count',
                 value=process_count,
                 unit='processes',
                 tags={'component': 'process', 'measurement': 'count'}
@@ -411,21 +448,21 @@ class MetricsService:
             metrics.extend([
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.PROCESS_CPU_PERCENT,
+                    name='process_cpu_percent',
                     value=current_process.cpu_percent(),
                     unit='percent',
                     tags={'component': 'process', 'measurement': 'cpu_usage'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.PROCESS_MEMORY_PERCENT,
+                    name='process_memory_percent',
                     value=current_process.memory_percent(),
                     unit='percent',
                     tags={'component': 'process', 'measurement': 'memory_usage'}
                 ),
                 SystemMetric(
                     timestamp=timestamp,
-                    metric_type=MetricType.PROCESS_MEMORY_RSS,
+                    name='process_memory_rss',
                     value=current_process.memory_info().rss / (1024**2),  # MB
                     unit='MB',
                     tags={'component': 'process', 'measurement': 'memory_rss'}
@@ -443,57 +480,59 @@ class MetricsService:
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         tags: Optional[Dict[str, str]] = None,
-        limit: int = 1000,
-        db: AsyncSession = None
+        limit: Optional[int] = 1000,
+        db: AsyncSession = None,
+        series_id: Optional[int] = None
     ) -> List[SystemMetric]:
         """
         Get metrics with filters.
         
+        Returned metrics are not ORM rows: ``id`` is the time-series id
+        (one per metric name and tag set) and ``type`` comes from the
+        reserved ``type`` tag, which is not repeated in ``tags``.
+        
         Args:
-            metric_type: Filter by metric type
+            metric_type: Metric name (all metrics if None)
             start_time: Start time filter
             end_time: End time filter
-            tags: Tag filters
-            limit: Maximum number of metrics
-            db: Database session
+            tags: Tag filters (a list value matches any of its elements);
+                filter by metric type with the ``type`` tag
+            limit: Maximum number of metrics (None for all)
+            db: Unused; metrics are read from the time-series store
+            series_id: Only samples of this series
             
         Returns:
-            List[SystemMetric]: List of metrics
+            List[SystemMetric]: List of metrics, newest first
         """
         try:
-            if db is None:
-                db = await get_db_session_optional()
-                if db is None:
-                    return []
-            
-            query = select(SystemMetric)
-            
-            conditions = []
-            if metric_type:
-                conditions.append(SystemMetric.metric_type == metric_type)
-            if start_time:
-                conditions.append(SystemMetric.timestamp >= start_time)
-            if end_time:
-                conditions.append(SystemMetric.timestamp <= end_time)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
-            
-            query = query.order_by(desc(SystemMetric.timestamp)).limit(limit)
-            
-            result = await db.execute(query)
-            metrics = result.scalars().all()
-            
-            # Filter by tags if provided
-            if tags:
-                filtered_metrics = []
-                for metric in metrics:
-                    metric_tags = metric.tags or {}
-                    if all(metric_tags.get(k) == v for k, v in tags.items()):
-                        filtered_metrics.append(metric)
-                metrics = filtered_metrics
+            # One query: the name, tag and series id postings select the
+            # series, and only the newest blocks of each are decoded when a
+            # limit is set
+            store = get_timeseries_store()
+            if metric_type is not None:
+                names = metric_type
+            else:
+                # Sensor readings share the store but are served by SensorService
+                names = {name for name, _ in store.series(tags=tags) if not name.startswith('sensor.')}
+            series_list = store.query(names, start_time, end_time, tags=tags, limit=limit, series_id=series_id)
             
-            return metrics
+            metrics = []
+            for series in series_list:
+                series_tags = dict(series.tags)
+                kind = series_tags.pop(METRIC_TYPE_TAG, MetricType.GAUGE.value)
+                for millis, value in zip(series.timestamps.tolist(), series.values.tolist()):
+                    metrics.append(SystemMetric(
+                        id=series.series_id,
+                        name=series.name,
+                        type=kind,
+                        timestamp=from_millis(millis),
+                        value=value,
+                        unit=series.unit,
+                        tags=series_tags
+                    ))
+            
+            metrics.sort(key=lambda metric: metric.timestamp, reverse=True)
+            return metrics[:limit] if limit is not None else metrics
             
         except Exception as e:
             logger.error(f"Error getting metrics: {e}")
@@ -514,75 +553,45 @@ class MetricsService:
         
         Args:
             metric_type: Metric type to aggregate
-            aggregation: Aggregation function (avg, sum, min, max, count)
+            aggregation: Aggregation function (avg, sum, min, max, count, std,
+                or a percentile such as p95)
             interval: Time interval (1m, 5m, 1h, 1d)
             start_time: Start time
             end_time: End time
             tags: Tag filters
-            db: Database session
+            db: Unused; metrics are read from the time-series store
             
         Returns:
             List[Dict[str, Any]]: Aggregated metrics
         """
         try:
-            if db is None:
-                db = await get_db_session_optional()
-                if db is None:
-                    return []
-            
-            # Get raw metrics
-            metrics = await MetricsService.get_metrics(
-                metric_type=metric_type,
-                start_time=start_time,
-                end_time=end_time,
-                tags=tags,
-                limit=10000,
-                db=db
-            )
-            
-            if not metrics:
-                return []
-            
             # Parse interval
             interval_seconds = MetricsService._parse_interval(interval)
-            if interval_seconds is None:
+            if interval_seconds is None or interval_seconds <= 0:
                 logger.error(f"Invalid interval: {interval}")
                 return []
             
-            # Group metrics by time intervals
-            grouped_metrics = {}
-            for metric in metrics:
-                interval_start = MetricsService._get_interval_start(metric.timestamp, interval_seconds)
-                if interval_start not in grouped_metrics:
-                    grouped_metrics[interval_start] = []
-                grouped_metrics[interval_start].append(metric.value)
+            # Served from the coarsest adequate rollup; matching series are merged per bucket
+            series_list = get_timeseries_store().aggregate(
+                metric_type, interval_seconds, start_time, end_time, tags=tags
+            )
+            buckets = merge_buckets(
+                ((start, rollup) for series in series_list for start, rollup in zip(series.timestamps, series.rollups)),
+                interval_seconds * 1000
+            )
             
-            # Aggregate each group
             aggregated = []
-            for interval_start, values in grouped_metrics.items():
-                if aggregation == 'avg':
-                    agg_value = sum(values) / len(values)
-                elif aggregation == 'sum':
-                    agg_value = sum(values)
-                elif aggregation == 'min':
-                    agg_value = min(values)
-                elif aggregation == 'max':
-                    agg_value = max(values)
-                elif aggregation == 'count':
-                    agg_value = len(values)
-                else:
+            for interval_start, rollup in buckets:
+                agg_value = rollup.value(aggregation)
+                if agg_value is None:
                     continue
-                
                 aggregated.append({
-                    'timestamp': interval_start,
+                    'timestamp': from_millis(interval_start),
                     'value': round(agg_value, 4),
-                    'count': len(values),
+                    'count': rollup.count,
                     'aggregation': aggregation,
                     'interval': interval
                 })
-            
-            # Sort by timestamp
-            aggregated.sort(key=lambda x: x['timestamp'])
             return aggregated
             
         except Exception as e:
@@ -612,22 +621,6 @@ class MetricsService:
         except (ValueError, AttributeError):
             return None
     
-    @staticmethod
-    def _get_interval_start(timestamp: datetime, interval_seconds: int) -> datetime:
-        """
-        Get the start of the interval containing the timestamp.
-        
-        Args:
-            timestamp: Timestamp
-            interval_seconds: Interval in seconds
-            
-        Returns:
-            datetime: Interval start timestamp
-        """
-        timestamp_seconds = int(timestamp.timestamp())
-        interval_start_seconds = (timestamp_seconds // interval_seconds) * interval_seconds
-        return datetime.fromtimestamp(interval_start_seconds)
-    
     @staticmethod
     async def calculate_statistics(
         metric_type: str,
@@ -821,11 +814,11 @@ class MetricsService:
             
             # Collect statistics for key metrics
             key_metrics = [
-                MetricType.CPU_PERCENT,
-                MetricType.MEMORY_PERCENT,
-                MetricType.DISK_PERCENT,
-                MetricType.NETWORK_BYTES_SENT,
-                MetricType.NETWORK_BYTES_RECV
+                'cpu_percent',
+                'memory_percent',
+                'disk_percent',
+                'network_bytes_sent',
+                'network_bytes_recv'
             ]
             
             for metric_type in key_metrics:
@@ -838,11 +831,11 @@ class MetricsService:
                 report['metrics'][metric_type] = stats
                 
                 # Check for performance issues
-                if metric_type == MetricType.CPU_PERCENT and stats.get('mean', 0) > 80:
+                if metric_type == 'cpu_percent' and stats.get('mean', 0) > 80:
                     report['recommendations'].append('High CPU usage detected - consider optimizing processes')
-                elif metric_type == MetricType.MEMORY_PERCENT and stats.get('mean', 0) > 85:
+                elif metric_type == 'memory_percent' and stats.get('mean', 0) > 85:
                     report['recommendations'].append('High memory usage detected - consider memory optimization')
-                elif metric_type == MetricType.DISK_PERCENT and stats.get('mean', 0) > 90:
+                elif metric_type == 'disk_percent' and stats.get('mean', 0) > 90:
                     report['recommendations'].append('High disk usage detected - consider cleanup or expansion')
             
             # Detect anomalies
@@ -881,17 +874,7 @@ class MetricsService:
         
         while True:
             try:
-                db = await get_db_session_optional()
-                if db is None:
-                    logger.error("Could not get database session for metrics collection")
-                    await asyncio.sleep(interval_seconds)
-                    continue
-                
-                # Collect system metrics
-                await MetricsService.collect_system_metrics(db)
-                
-                await db.close()
-                
+                await MetricsService.collect_system_metrics()
             except Exception as e:
                 logger.error(f"Error in metrics collection loop: {e}")
             
@@ -4,23 +4,27 @@ Sensor service for the Dynamic Compression Algorithms backend.
 
 import logging
 import asyncio
-import psutil
 import random
 import math
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func
 
 from ..models.sensor import (
     Sensor, SensorReading, SensorFusion, SensorFusionResult, SystemHealth,
     SensorType, MetricType, SensorStatus
 )
+from ..core.system_sampler import get_system_sampler
+from ..core.timeseries_ingest import get_bulk_writer
+from ..core.timeseries_store import from_millis, get_timeseries_store
 from ..database.connection import get_db_session_optional
 
 logger = logging.getLogger(__name__)
 
+# Numeric SensorReading columns kept as time series, primary value first
+SENSOR_READING_FIELDS = ('value', 'raw_value', 'quality', 'confidence', 'error_margin')
+
 
 class SensorService:
     """Service for managing sensors and sensor data."""
@@ -209,29 +213,32 @@ class SensorService:
             Dict[str, Any]: System reading data
         """
         metric_type = sensor.configuration.get('metric_type', 'cpu_percent')
+        snapshot = get_system_sampler().latest()
         
         if metric_type == 'cpu_percent':
-            value = psutil.cpu_percent(interval=1)
+            value = snapshot.cpu_percent
             unit = 'percent'
         elif metric_type == 'memory_percent':
-            memory = psutil.virtual_memory()
-            value = memory.percent
+            value = snapshot.memory.percent
             unit = 'percent'
         elif metric_type == 'memory_available':
-            memory = psutil.virtual_memory()
-            value = memory.available / (1024 * 1024 * 1024)  # GB
+            value = snapshot.memory.available / (1024 * 1024 * 1024)  # GB
             unit = 'GB'
         elif metric_type == 'disk_usage':
-            disk = psutil.disk_usage('/')
-            value = disk.percent
+            value = snapshot.disk.percent
             unit = 'percent'
         elif metric_type == 'network_io':
-            net_io = psutil.net_io_counters()
+            net_io = snapshot.net_io
             value = (net_io.bytes_sent + net_io.bytes_recv) / (1024 * 1024)  # MB
             unit = 'MB'
+        elif metric_type == 'network_throughput':
+            value = (snapshot.net_sent_bytes_per_sec + snapshot.net_recv_bytes_per_sec) / (1024 * 1024)
+            unit = 'MB/s'
+        elif metric_type == 'disk_io_throughput':
+            value = (snapshot.disk_read_bytes_per_sec + snapshot.disk_write_bytes_per_sec) / (1024 * 1024)
+            unit = 'MB/s'
         elif metric_type == 'load_average':
-            load_avg = psutil.getloadavg()
-            value = load_avg[0]  # 1-minute load average
+            value = snapshot.load_average[0]  # 1-minute load average
             unit = 'load'
         else:
             value = random.uniform(0, 100)
@@ -406,35 +413,90 @@ class SensorService:
         }
     
     @staticmethod
-    async def save_sensor_reading(reading_data: Dict[str, Any], db: AsyncSession) -> Optional[SensorReading]:
+    async def save_sensor_reading(reading_data: Dict[str, Any], db: Optional[AsyncSession] = None) -> Optional[SensorReading]:
         """
-        Save sensor reading to database.
+        Save sensor reading to the time-series store.
+        
+        Each numeric field becomes a sample of series ``sensor.<field>``
+        tagged with the sensor id. Samples go through the bulk writer, so
+        they become visible to queries once its batch is written.
         
         Args:
             reading_data: Reading data
-            db: Database session
+            db: Unused; readings are stored in the time-series store
             
         Returns:
-            Optional[SensorReading]: Saved reading or None
+            Optional[SensorReading]: Saved reading (not ORM-persisted) or None
         """
         try:
-            reading = SensorReading(**reading_data)
-            db.add(reading)
-            await db.commit()
-            await db.refresh(reading)
+            reading, samples = SensorService._reading_samples(reading_data)
+            await get_bulk_writer().put_many(samples)
             return reading
         except Exception as e:
-            await db.rollback()
             logger.error(f"Error saving sensor reading: {e}")
             return None
     
+    @staticmethod
+    async def save_sensor_readings(readings_data: List[Dict[str, Any]]) -> int:
+        """
+        Save a batch of sensor readings with one queue put.
+        
+        Args:
+            readings_data: Reading data, as for ``save_sensor_reading``
+            
+        Returns:
+            int: Number of readings accepted
+            
+        Raises:
+            ValueError: If a reading has no numeric value (nothing is saved)
+        """
+        samples = []
+        for reading_data in readings_data:
+            samples.extend(SensorService._reading_samples(reading_data)[1])
+        await get_bulk_writer().put_many(samples)
+        return len(readings_data)
+    
+    @staticmethod
+    def _reading_samples(reading_data: Dict[str, Any]) -> Tuple[SensorReading, List[Tuple]]:
+        """Split a reading into store samples, one per numeric field."""
+        sensor_id = reading_data['sensor_id']
+        timestamp = reading_data.get('timestamp') or datetime.utcnow()
+        unit = reading_data.get('unit')
+        tags = {'sensor_id': sensor_id}
+        fields = {}
+        samples = []
+        for field in SENSOR_READING_FIELDS:
+            value = reading_data.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                samples.append((f'sensor.{field}', value, timestamp, tags,
+                                unit if field in ('value', 'raw_value') else None))
+                fields[field] = float(value)
+        if 'value' not in fields:
+            raise ValueError("Sensor reading has no numeric value")
+        return SensorReading(sensor_id=sensor_id, timestamp=timestamp, unit=unit, **fields), samples
+    
+    @staticmethod
+    async def count_sensor_readings(sensor_id: Optional[int] = None) -> int:
+        """
+        Count stored readings without decoding them.
+        
+        Args:
+            sensor_id: Only readings of this sensor (all sensors if None)
+            
+        Returns:
+            int: Number of readings
+        """
+        tags = {'sensor_id': sensor_id} if sensor_id is not None else None
+        return get_timeseries_store().count('sensor.value', tags=tags)
+    
     @staticmethod
     async def get_sensor_readings(
         sensor_id: Optional[int] = None,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         limit: int = 1000,
-        db: AsyncSession = None
+        db: AsyncSession = None,
+        sensor_ids: Optional[List[int]] = None
     ) -> List[SensorReading]:
         """
         Get sensor readings with filters.
@@ -444,34 +506,51 @@ class SensorService:
             start_time: Start time filter
             end_time: End time filter
             limit: Maximum number of readings
-            db: Database session
+            db: Unused; readings are read from the time-series store
+            sensor_ids: Filter by any of several sensor IDs
             
         Returns:
-            List[SensorReading]: List of sensor readings
+            List[SensorReading]: List of sensor readings, newest first
         """
         try:
-            if db is None:
-                db = await get_db_session_optional()
-                if db is None:
-                    return []
-            
-            query = select(SensorReading).options(selectinload(SensorReading.sensor))
-            
-            conditions = []
+            store = get_timeseries_store()
+            tags = None
             if sensor_id:
-                conditions.append(SensorReading.sensor_id == sensor_id)
-            if start_time:
-                conditions.append(SensorReading.timestamp >= start_time)
-            if end_time:
-                conditions.append(SensorReading.timestamp <= end_time)
+                tags = {'sensor_id': sensor_id}
+            elif sensor_ids:
+                tags = {'sensor_id': list(sensor_ids)}
             
-            if conditions:
-                query = query.where(and_(*conditions))
+            # Newest values first; only the blocks holding them are decoded
+            kept = []
+            for series in store.query('sensor.value', start_time, end_time, tags=tags, limit=limit):
+                owner = series.tags['sensor_id']
+                kept.extend((millis, owner, value, series.unit)
+                            for millis, value in zip(series.timestamps.tolist(), series.values.tolist()))
+            kept.sort(key=lambda item: item[0], reverse=True)
+            kept = kept[:limit]
+            if not kept:
+                return []
             
-            query = query.order_by(SensorReading.timestamp.desc()).limit(limit)
+            # Secondary fields keyed by (sensor id, timestamp), read over the
+            # span of the kept values only
+            extras: Dict[Tuple[str, int], Dict[str, float]] = {}
+            oldest = from_millis(kept[-1][0])
+            for field in SENSOR_READING_FIELDS[1:]:
+                for series in store.query(f'sensor.{field}', oldest, end_time, tags=tags):
+                    owner = series.tags['sensor_id']
+                    for millis, value in zip(series.timestamps.tolist(), series.values.tolist()):
+                        extras.setdefault((owner, millis), {})[field] = value
             
-            result = await db.execute(query)
-            return result.scalars().all()
+            return [
+                SensorReading(
+                    sensor_id=int(owner),
+                    timestamp=from_millis(millis),
+                    value=value,
+                    unit=unit,
+                    **extras.get((owner, millis), {})
+                )
+                for millis, owner, value, unit in kept
+            ]
             
         except Exception as e:
             logger.error(f"Error getting sensor readings: {e}")
@@ -836,9 +915,10 @@ class SensorService:
         """
         try:
             # Collect system metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            snapshot = get_system_sampler().latest()
+            cpu_percent = snapshot.cpu_percent
+            memory = snapshot.memory
+            disk = snapshot.disk
             
             # Determine health status
             health_score = 100.0
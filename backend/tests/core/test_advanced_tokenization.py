@@ -0,0 +1,315 @@
+"""
+Tests for the tokenizers in advanced_tokenization.
+
+Tests cover:
+- Incremental BPE training matching a full recount per merge
+- Rank-based encoding matching merge-rule replay
+- Round trips and the per-word cache
+- BPE training/encoding benchmark on 10-100 MB corpora
+- Array-backed token streams: interning order, round trips
+- Block bit-packed token ids: widths, seeking, range decoding
+- Byte tokenization memory/throughput on 100 MB
+"""
+
+import random
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+import numpy as np
+import pytest
+import zstandard as zstd
+
+from app.core.advanced_tokenization import (
+    ByteTokenizer, PackedTokenIds, SubwordTokenizer, Token, TokenStream, TokenizationResult,
+    TokenizationType
+)
+
+
+MB = 1024 * 1024
+
+
+def _corpus(size: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    stems = ["compress", "token", "stream", "metric", "sensor", "archive", "encode", "decode", "window"]
+    suffixes = ["", "s", "ed", "ing", "er", "ion", "able"]
+    words = [rng.choice(stems) + rng.choice(suffixes) for _ in range(5000)]
+    words += ["".join(rng.choice("abcdefghij") for _ in range(rng.randint(2, 8))) for _ in range(5000)]
+    out = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out)
+
+
+def _reference_merges(data: str, num_merges: int, min_frequency: int):
+    """Recount every pair for every merge (the previous implementation)."""
+    word_freqs = Counter(data.split())
+    splits = {word: list(word) + ["</w>"] for word in word_freqs}
+    merges = []
+    for _ in range(num_merges):
+        pair_freqs = defaultdict(int)
+        for word, freq in word_freqs.items():
+            split = splits[word]
+            for pair in zip(split, split[1:]):
+                pair_freqs[pair] += freq
+        if not pair_freqs:
+            break
+        best_pair = min(pair_freqs, key=lambda pair: (-pair_freqs[pair], pair))
+        if pair_freqs[best_pair] < min_frequency:
+            break
+        merges.append(best_pair)
+        for word in splits:
+            splits[word] = SubwordTokenizer._merge_pair(splits[word], best_pair) or splits[word]
+    return merges
+
+
+def _replay(word: str, merges):
+    splits = list(word) + ["</w>"]
+    for pair in merges:
+        splits = SubwordTokenizer._merge_pair(splits, pair) or splits
+    return splits
+
+
+def test_incremental_bpe_matches_full_recount():
+    """Test that heap-based training learns the same merges."""
+    data = _corpus(200_000)
+    tokenizer = SubwordTokenizer()
+
+    tokenizer.learn_bpe(data, num_merges=300)
+
+    assert tokenizer.merge_rules == _reference_merges(data, 300, tokenizer.min_frequency)
+
+
+def test_rank_encoding_matches_replay():
+    """Test that rank-based encoding equals replaying every merge rule."""
+    data = _corpus(100_000)
+    tokenizer = SubwordTokenizer()
+    tokenizer.learn_bpe(data, num_merges=200)
+
+    for word in set(data.split()[:2000]) | {"unseenword", "x"}:
+        assert tokenizer._apply_bpe(word) == _replay(word, tokenizer.merge_rules)
+
+
+def test_min_frequency_stops_training():
+    """Test that pairs rarer than min_frequency are not merged."""
+    tokenizer = SubwordTokenizer({"min_frequency": 3})
+
+    tokenizer.learn_bpe("ab ab ab cd cd", num_merges=100)
+
+    assert ("c", "d") not in tokenizer.merge_rules
+    assert tokenizer.merge_rules[0] == ("a", "b")
+
+
+def test_roundtrip_and_cache():
+    """Test detokenize(tokenize(x)) and cache reuse and bounds."""
+    data = _corpus(50_000)
+    tokenizer = SubwordTokenizer({"bpe_cache_size": 100})
+    tokenizer.learn_bpe(data, num_merges=100)
+
+    tokens = tokenizer.tokenize(data)
+
+    assert tokenizer.detokenize(tokens) == " ".join(data.split())
+    assert len(tokenizer._bpe_cache) <= 100
+    word = data.split()[0]
+    assert tokenizer._apply_bpe(word) is tokenizer._apply_bpe(word)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size_mb", [10, pytest.param(100, marks=pytest.mark.slow)])
+def test_bpe_benchmark(size_mb):
+    """Benchmark BPE training and encoding throughput."""
+    data = _corpus(size_mb * MB)
+    tokenizer = SubwordTokenizer()
+
+    start = time.perf_counter()
+    tokenizer.learn_bpe(data, num_merges=1000)
+    train_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokens = tokenizer.tokenize(data[:10 * MB])
+    encode_time = time.perf_counter() - start
+
+    print(f"\nBPE {size_mb} MB: {len(tokenizer.merge_rules)} merges in {train_time:.1f}s, "
+          f"encoding {10 / encode_time:.1f} MB/s ({len(tokens)} tokens)")
+    assert len(tokenizer.merge_rules) == 1000
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 8, 12])
+def test_byte_stream_ids_match_token_by_token_interning(chunk_size):
+    """Test that vectorized interning assigns ids in order of first occurrence."""
+    data = bytes(np.random.default_rng(chunk_size).integers(0, 6, 20_003, dtype=np.uint8))
+    tokenizer = ByteTokenizer({"chunk_size": chunk_size})
+
+    stream = tokenizer.tokenize(data)
+
+    expected = {}
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    ids = [expected.setdefault(chunk, len(expected)) for chunk in chunks]
+    assert stream.ids.tolist() == ids
+    assert stream.values() == chunks
+    assert tokenizer.token_frequencies == Counter(chunks)
+    assert tokenizer.detokenize(stream) == data
+
+
+def test_stream_indexing_yields_tokens():
+    """Test that streams still behave like lists of Token objects."""
+    tokenizer = ByteTokenizer({"chunk_size": 2})
+    stream = tokenizer.tokenize(b"abcdabe")
+
+    assert stream[1] == Token(value=b"cd", type=TokenizationType.BYTE, position=2, length=2)
+    assert [token.position for token in stream] == [0, 2, 4, 6]
+    assert stream[-1].value == b"e"
+    assert isinstance(stream[1:3], TokenStream) and stream[1:3].values() == [b"cd", b"ab"]
+    assert tokenizer.detokenize(list(stream)) == b"abcdabe"
+
+
+def test_encode_decode_tokens_roundtrip():
+    """Test encode_tokens/decode_tokens for streams and token lists."""
+    data = _corpus(20_000)
+    tokenizer = SubwordTokenizer()
+    tokenizer.learn_bpe(data, num_merges=50)
+    stream = tokenizer.tokenize(data)
+
+    encoded = tokenizer.encode_tokens(stream)
+    decoded = tokenizer.decode_tokens(encoded)
+
+    assert np.array_equal(decoded.ids, stream.ids)
+    assert np.array_equal(decoded.lengths, stream.lengths)
+    assert tokenizer.detokenize(decoded) == " ".join(data.split())
+    assert tokenizer.encode_tokens(list(stream)) == encoded
+    assert np.array_equal(tokenizer.decode_tokens(encoded, 1000, 1300).ids, stream.ids[1000:1300])
+    assert tokenizer.detokenize(tokenizer.decode_tokens(tokenizer.encode_tokens(stream, byte_aligned=True))) == \
+        " ".join(data.split())
+
+
+def _id_arrays():
+    rng = np.random.default_rng(11)
+    yield "empty", np.zeros(0, dtype=np.uint32)
+    for count in (1, 127, 128, 129, 5000):
+        yield f"constant-{count}", np.full(count, 7, dtype=np.uint32)
+        yield f"small-{count}", rng.integers(0, 50, count).astype(np.uint32)
+        yield f"offset-{count}", rng.integers(1000, 1300, count).astype(np.uint32)
+        yield f"wide-{count}", rng.integers(0, 2**32, count, dtype=np.uint64).astype(np.uint32)
+    # One width per block, 0 through 32 bits
+    yield "all-widths", np.concatenate([
+        rng.integers(0, 2**width, 128, dtype=np.uint64).astype(np.uint32) | np.uint32(2**width >> 1)
+        for width in range(33)
+    ])
+
+
+@pytest.mark.parametrize("byte_aligned", [False, True])
+@pytest.mark.parametrize("name,ids", list(_id_arrays()))
+def test_packed_ids_roundtrip_and_seek(name, ids, byte_aligned):
+    """Test packing round trips, single-id access and range reads."""
+    packed = PackedTokenIds(PackedTokenIds.encode(ids, byte_aligned))
+
+    assert len(packed) == ids.size
+    assert np.array_equal(packed.to_array(), ids)
+    for index in {0, ids.size // 2, ids.size - 1} if ids.size else ():
+        assert packed[index] == ids[index]
+    assert np.array_equal(packed.read(100, 300), ids[100:300])
+    if byte_aligned:
+        assert set(packed.widths.tolist()) <= {0, 8, 16, 24, 32}
+
+
+def test_packed_ids_use_block_frame_of_reference():
+    """Test that widths follow the block range, not the absolute ids."""
+    ids = np.arange(100_000, 100_000 + 128 * 4, dtype=np.uint32) // 8
+
+    data = PackedTokenIds.encode(ids)
+
+    assert PackedTokenIds(data).widths.tolist() == [4, 4, 4, 4]
+    assert len(data) < ids.size
+    with pytest.raises(IndexError):
+        PackedTokenIds(data)[ids.size]
+
+
+def test_packed_ids_reject_corrupt_input():
+    """Test that foreign or truncated data is refused."""
+    data = PackedTokenIds.encode(np.arange(1000, dtype=np.uint32))
+
+    with pytest.raises(ValueError):
+        PackedTokenIds(b"nope" + data[4:])
+    with pytest.raises(ValueError):
+        PackedTokenIds(data[:-1])
+
+
+def test_byte_aligned_ids_feed_entropy_coder():
+    """Test that byte-aligned ids give zstd stable symbols to work with."""
+    data = _corpus(500_000)
+    tokenizer = SubwordTokenizer()
+    tokenizer.learn_bpe(data, num_merges=500)
+    stream = tokenizer.tokenize(data)
+    compressor = zstd.ZstdCompressor(level=3)
+
+    packed = compressor.compress(tokenizer.encode_tokens(stream))
+    aligned = compressor.compress(tokenizer.encode_tokens(stream, byte_aligned=True))
+
+    assert len(aligned) < len(packed)
+
+
+def test_tokenization_result_pickles_arrays():
+    """Test that serialized results stay compact and round trip."""
+    tokenizer = ByteTokenizer()
+    data = _corpus(100_000).encode()
+    stream = tokenizer.tokenize(data)
+    result = TokenizationResult(stream, tokenizer.vocabulary, {}, True)
+
+    payload = result.to_bytes()
+
+    assert len(payload) < len(data) * 16  # three fixed-width arrays, not one object per token
+    assert tokenizer.detokenize(TokenizationResult.from_bytes(payload).tokens) == data
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_byte_tokenize_benchmark():
+    """Benchmark byte tokenization of 100 MB and its peak memory."""
+    data = bytes(np.random.default_rng(0).integers(0, 64, 100 * MB, dtype=np.uint8))
+    tokenizer = ByteTokenizer()
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        stream = tokenizer.tokenize(data)
+        tokenize_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    encoded = tokenizer.encode_tokens(stream)
+    decoded = tokenizer.decode_tokens(encoded)
+    coding_time = time.perf_counter() - start
+
+    print(f"\nByte tokenize 100 MB: {100 / tokenize_time:.1f} MB/s, peak {peak / MB:.0f} MB, "
+          f"packed encode+decode {coding_time:.1f}s ({len(encoded) / len(stream):.2f} bytes/token)")
+    # Ids, positions and lengths: 12 bytes per token plus temporaries
+    assert peak < 16 * len(data)
+    assert tokenizer.detokenize(decoded) == data
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_packed_ids_benchmark():
+    """Benchmark packing and seeking 100M skewed ids."""
+    ids = np.minimum(np.random.default_rng(1).zipf(1.3, 100_000_000), 5000).astype(np.uint32)
+
+    start = time.perf_counter()
+    data = PackedTokenIds.encode(ids)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    packed = PackedTokenIds(data)
+    assert np.array_equal(packed.to_array(), ids)
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for index in range(0, ids.size, ids.size // 10_000):
+        assert packed[index] == ids[index]
+    seek_time = (time.perf_counter() - start) / 10_000
+
+    print(f"\nPacked 100M ids: encode {encode_time:.1f}s, decode {decode_time:.1f}s, "
+          f"{len(data) / ids.size:.2f} bytes/id, seek {seek_time * 1e6:.1f}us")
@@ -0,0 +1,194 @@
+"""
+Tests for the online codec cost model.
+
+Tests cover:
+- Content profiles and size buckets
+- Exponential decay of estimates
+- Fallback from unseen buckets to coarser scopes
+- Service-level selection
+- Recording from real engine compressions
+- Selector and degradation integration
+- Analysis results carrying the cost model key
+"""
+
+import json
+import os
+
+import pytest
+
+from app.core import compression_engine as engine_module
+from app.core.algorithm_selector import AlgorithmSelector
+from app.core.codec_cost_model import (
+    ANY, CodecCostModel, ServiceLevel, content_profile, size_bucket
+)
+from app.core.compression_engine import CompressionEngine
+from app.core.content_analyzer import ContentAnalyzer
+from app.core.graceful_degradation import GracefulDegradationSystem
+from app.models.compression import CompressionAlgorithm
+from app.services.algorithm_recommender import AlgorithmRecommender
+from app.services.content_analysis import ContentAnalysisService
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def model(clock):
+    return CodecCostModel(half_life=10.0, min_samples=2, clock=clock)
+
+
+def _record(model, codec, level, ratio, mbps, profile="text/mid", size=1 << 20, times=2):
+    for _ in range(times):
+        model.record_compression(profile, size, codec, level, int(size / ratio), size / 1e6 / mbps)
+
+
+def test_profiles_and_buckets():
+    """Test the cheap content profile and power-of-4 size buckets."""
+    assert content_profile(json.dumps({"user": "alice", "events": ["login", "page_view"]}).encode()) == "json/mid"
+    assert content_profile(b"<html><body><p>Compression studio</p></body></html>") == "markup/mid"
+    assert content_profile(b"a" * 1000) == "text/low"
+    assert content_profile(os.urandom(1 << 16)) == "binary/high"
+    # A UTF-8 character split by the sample boundary is still text
+    assert content_profile("é".encode() * 20000).startswith("text/")
+    assert content_profile(b"") == "empty"
+
+    assert size_bucket(1) == 0
+    assert size_bucket(4) == 1
+    assert size_bucket(4 ** 10 - 1) == 9
+    assert size_bucket(4 ** 10) == 10
+
+
+def test_estimates_decay_toward_recent_samples(model, clock):
+    """Test that old observations lose weight with the half-life."""
+    _record(model, "zstd", 3, ratio=2.0, mbps=100, times=10)
+    clock.now = 100.0  # Ten half-lives later
+    _record(model, "zstd", 3, ratio=4.0, mbps=100, times=1)
+
+    option, = model.estimate("text/mid", 1 << 20)
+    assert option["ratio"] > 3.9
+
+
+def test_unseen_bucket_falls_back_to_coarser_scope(model):
+    """Test profile/size fallback and the minimum sample count."""
+    _record(model, "zstd", 3, ratio=3.0, mbps=100, profile="json/mid", size=1 << 20)
+    model.record_compression("json/mid", 1 << 10, "lz4", 1, 1 << 9, 1e-6)
+
+    options = {option["codec"]: option for option in model.estimate("json/mid", 1 << 10)}
+    # zstd only measured at 1MB; lz4 has a single sample, below min_samples
+    assert set(options) == {"zstd"}
+    assert options["zstd"]["scope"] == {"profile": "json/mid", "size_bucket": ANY}
+
+    option, = model.estimate("binary/high", 1 << 20)
+    assert option["scope"] == {"profile": ANY, "size_bucket": size_bucket(1 << 20)}
+
+
+def test_select_best_ratio_meeting_service_level(model):
+    """Test SLO-constrained selection and the fastest-option fallback."""
+    _record(model, "lzma", 9, ratio=6.0, mbps=5)
+    _record(model, "zstd", 3, ratio=4.0, mbps=200)
+    _record(model, "lz4", 1, ratio=2.0, mbps=800)
+    model.record_decompression(1 << 20, "zstd", 0.001)
+    model.record_decompression(1 << 20, "zstd", 0.001)
+
+    assert model.select("text/mid", 1 << 20)["codec"] == "lzma"
+
+    choice = model.select("text/mid", 1 << 20, ServiceLevel(max_latency=0.05))
+    assert (choice["codec"], choice["level"], choice["meets_service_level"]) == ("zstd", 3, True)
+
+    # Only zstd has measured decompression speed
+    choice = model.select("text/mid", 1 << 20, ServiceLevel(min_decompress_mbps=500))
+    assert choice["codec"] == "zstd"
+
+    choice = model.select("text/mid", 1 << 20, ServiceLevel(max_latency=1e-6))
+    assert (choice["codec"], choice["meets_service_level"]) == ("lz4", False)
+
+    assert model.select("text/mid", 1 << 20, codecs=["brotli"]) is None
+
+
+@pytest.mark.asyncio
+async def test_engine_records_real_compressions(model, monkeypatch):
+    """Test that engine compressions and decompressions feed the model."""
+    monkeypatch.setattr(engine_module, "get_codec_cost_model", lambda: model)
+    engine = CompressionEngine()
+    data = b"cost model payload line\n" * 4000
+
+    for _ in range(2):
+        result = await engine.compress(data, algorithm="gzip", level=6)
+        await engine.decompress(result.compressed_data, "gzip")
+
+    # The second compression was a cache hit and is not a new measurement
+    assert model.observations == 1
+    await engine.compress(data, algorithm="gzip", level=6, use_cache=False)
+
+    option, = model.estimate(content_profile(data), len(data))
+    assert (option["codec"], option["level"]) == ("gzip", 6)
+    assert option["ratio"] == pytest.approx(len(data) / result.compressed_size)
+    assert option["compress_mbps"] > 0
+    assert option["decompress_mbps"] > 0
+
+
+def test_selector_uses_measurements(model):
+    """Test that the selector honours a service level using measured costs."""
+    selector = AlgorithmSelector(cost_model=model)
+    analysis = {"content_size": 1 << 20, "codec_profile": "text/mid"}
+
+    # Without measurements history is neutral rather than random
+    assert selector._get_historical_performance("zstd", analysis) == 0.5
+
+    _record(model, "lzma", 9, ratio=6.0, mbps=5)
+    _record(model, "lz4", 1, ratio=2.0, mbps=800)
+
+    assert selector.select_algorithm(analysis, ServiceLevel(max_latency=0.01)) == CompressionAlgorithm.LZ4
+    assert selector.select_algorithm(analysis, ServiceLevel()) == CompressionAlgorithm.LZMA
+    assert selector._get_historical_performance("LZ78", analysis) > selector._get_historical_performance("BWT", analysis)
+
+
+@pytest.mark.asyncio
+async def test_analysis_profiles_drive_selection(model):
+    """Test that analysers set the profile the selector and recommender look up."""
+    records = json.dumps([{"user": f"user-{i}", "event": "page_view", "path": "/files"} for i in range(400)])
+    text = ContentAnalyzer().analyze_content(records)
+    binary = ContentAnalyzer().analyze_content(os.urandom(len(records)))
+    assert (text["codec_profile"], binary["codec_profile"]) == ("json/mid", "binary/high")
+    assert text["content_size"] == binary["content_size"] == len(records)
+    service = await ContentAnalysisService().analyze_content(records)
+    assert service["codec_profile"] == "json/mid"
+
+    # Structured text pays for zstd, random bytes do not
+    _record(model, "zstd", 3, ratio=5.0, mbps=200, profile="json/mid", size=len(records))
+    _record(model, "lz4", 1, ratio=2.0, mbps=800, profile="json/mid", size=len(records))
+    _record(model, "zstd", 3, ratio=1.0, mbps=100, profile="binary/high", size=len(records))
+    _record(model, "lz4", 1, ratio=1.01, mbps=900, profile="binary/high", size=len(records))
+
+    selector = AlgorithmSelector(cost_model=model)
+    assert selector.select_algorithm(text, ServiceLevel()) == CompressionAlgorithm.ZSTD
+    assert selector.select_algorithm(binary, ServiceLevel()) == CompressionAlgorithm.LZ4
+
+    recommender = AlgorithmRecommender(cost_model=model)
+    assert recommender._predict_performance("zstd", service)["compression_ratio"] == pytest.approx(5.0)
+    assert recommender._predict_performance("zstd", binary)["compression_ratio"] == pytest.approx(1.0)
+
+
+def test_degradation_routes_by_service_level(model):
+    """Test that the degradation system skips codecs predicted to miss the level."""
+    system = GracefulDegradationSystem({"gzip_strategy": object(), "gzip_basic": object()}, isolate=False)
+    system.cost_model = model
+    data = b"x" * (1 << 20)
+    try:
+        _record(model, "gzip_strategy", None, ratio=8.0, mbps=2, profile=content_profile(data))
+        _record(model, "gzip_basic", None, ratio=4.0, mbps=500, profile=content_profile(data))
+
+        assert system.select_best_algorithm(data, ServiceLevel(max_latency=0.05)) == "gzip_basic"
+        assert system.select_best_algorithm(data, ServiceLevel(min_compress_mbps=1)) in ("gzip_strategy", "gzip_basic")
+    finally:
+        system.shutdown()
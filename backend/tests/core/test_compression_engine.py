@@ -7,11 +7,15 @@ Tests cover:
 - Performance metrics
 - Caching functionality
 - Error handling
+- Compression API endpoints
 """
 
 import pytest
 import asyncio
-from app.core.compression_engine import CompressionEngine, CompressionResult
+from app.core.compression_engine import (
+    CompressionEngine, CompressionResult, CompressionCache, get_compression_engine
+)
+from app.models.compression import CompressionRequest, CompressionParameters, CompressionAlgorithm
 
 
 @pytest.fixture
@@ -275,6 +279,165 @@ async def test_clear_cache(engine, test_data):
     assert stats_after["cache_misses"] == 0
 
 
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    """Test that recently read entries survive eviction."""
+    engine = CompressionEngine(cache_size=2)
+    first, second, third = b"first" * 10, b"second" * 10, b"third" * 10
+    
+    await engine.compress(first, algorithm="gzip", level=6)
+    await engine.compress(second, algorithm="gzip", level=6)
+    await engine.compress(first, algorithm="gzip", level=6)  # Hit, refreshes recency
+    await engine.compress(third, algorithm="gzip", level=6)  # Evicts 'second'
+    
+    stats = engine.get_cache_stats()
+    assert stats["cache_evictions"] == 1
+    
+    await engine.compress(first, algorithm="gzip", level=6)
+    assert engine.get_cache_stats()["cache_hits"] == 2
+    
+    await engine.compress(second, algorithm="gzip", level=6)
+    assert engine.get_cache_stats()["cache_misses"] == 4
+
+
+def test_cache_byte_budget():
+    """Test that the cache stays within its byte budget."""
+    cache = CompressionCache(max_entries=100, max_bytes=250)
+    
+    for i in range(5):
+        result = CompressionResult("gzip", 1000, 100, 0.001, compressed_data=b"x" * 100)
+        assert cache.put(f"gzip:6:{i}", result) is True
+    
+    stats = cache.get_stats()
+    assert stats["cache_bytes"] <= 250
+    assert stats["cache_size"] == 2
+    assert stats["cache_evictions"] == 3
+    assert "gzip:6:4" in cache
+    assert "gzip:6:0" not in cache
+    
+    # Oversized results are never cached
+    huge = CompressionResult("gzip", 1000, 500, 0.001, compressed_data=b"x" * 500)
+    assert cache.put("gzip:6:huge", huge) is False
+    assert "gzip:6:huge" not in cache
+
+
+def test_shared_engine_singleton():
+    """Test that the dependency provider returns one process-wide engine."""
+    assert get_compression_engine() is get_compression_engine()
+
+
+@pytest.mark.asyncio
+async def test_compress_request_roundtrip(engine):
+    """Test compressing an API request model."""
+    import base64
+    
+    content = "Request model content. " * 20
+    request = CompressionRequest(
+        content=content,
+        parameters=CompressionParameters(algorithm=CompressionAlgorithm.ZSTD, level="maximum")
+    )
+    
+    response = await engine.compress_request(request)
+    
+    assert response.success is True
+    assert response.result.original_size == len(content)
+    assert response.metadata["level"] == 9
+    compressed = base64.b64decode(response.compressed_content)
+    assert await engine.decompress(compressed, "zstd") == content.encode()
+
+
+def test_compression_endpoints_compress_requests():
+    """Test that the compress, test and debug endpoints go through compress_request."""
+    import base64
+    import gzip
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
+    client = TestClient(app)
+    content = "Endpoint content. " * 30
+    response = client.post("/api/v1/compression/compress", json={
+        "content": content,
+        "parameters": {"algorithm": "gzip", "level": "balanced"}
+    })
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True and body["result"]["algorithm_used"] == "gzip"
+    assert gzip.decompress(base64.b64decode(body["compressed_content"])) == content.encode()
+    
+    body = client.get("/api/v1/compression/test").json()
+    assert body["test"] == "successful" and body["algorithm_used"] == "gzip"
+    body = client.get("/api/v1/compression/debug-compression").json()
+    assert "error" not in body and body["has_compressed_content"] is True
+
+
+@pytest.mark.asyncio
+async def test_iter_batch_deduplicates_identical_items(engine):
+    """Test that identical batch items are compressed once."""
+    def make_request(content, algorithm=CompressionAlgorithm.GZIP):
+        return CompressionRequest(
+            content=content,
+            parameters=CompressionParameters(algorithm=algorithm, level=6)
+        )
+    
+    requests = [
+        make_request("alpha " * 50),
+        make_request("beta " * 50),
+        make_request("alpha " * 50),
+        make_request("alpha " * 50, CompressionAlgorithm.LZ4),
+        make_request("unsupported", CompressionAlgorithm.BZIP2),
+    ]
+    
+    results = {}
+    async for index, response in engine.iter_batch(requests, max_concurrency=2, use_cache=False):
+        results[index] = response
+    
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert results[2].metadata["duplicate_of"] == 0
+    assert results[2].compressed_content == results[0].compressed_content
+    assert "duplicate_of" not in results[3].metadata
+    assert results[4].success is False
+    assert engine.get_cache_stats()["total_operations"] == 4
+
+
+@pytest.mark.asyncio
+async def test_compare_runs_all_algorithms(engine, test_data):
+    """Test concurrent comparison across algorithms."""
+    data = test_data["text"]
+    
+    results = await engine.compare(data, ["gzip", "zstd", "unknown", "gzip"], level="balanced")
+    
+    assert list(results) == ["gzip", "zstd", "unknown"]
+    assert results["gzip"].success is True
+    assert results["zstd"].success is True
+    assert results["unknown"].success is False
+    assert results["unknown"].timed_out is False
+
+
+@pytest.mark.asyncio
+async def test_compare_returns_partial_results_on_time_budget(engine):
+    """Test that a slow algorithm is cut off by the time budget."""
+    import time as time_module
+    
+    class SlowCompressor:
+        supported_levels = list(range(1, 10))
+        
+        async def compress(self, data, level):
+            await asyncio.sleep(1.0)
+            return data
+    
+    engine.algorithms["slow"] = SlowCompressor()
+    
+    start = time_module.perf_counter()
+    results = await engine.compare(b"partial results " * 20, ["gzip", "slow"], time_budget=0.2)
+    elapsed = time_module.perf_counter() - start
+    
+    assert elapsed < 0.9
+    assert results["gzip"].success is True
+    assert results["slow"].success is False
+    assert results["slow"].timed_out is True
+
+
 # Integration test
 @pytest.mark.asyncio
 @pytest.mark.integration
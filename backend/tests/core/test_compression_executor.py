@@ -0,0 +1,76 @@
+"""
+Tests for CompressionExecutor.
+
+Tests cover:
+- Lane routing for fast and heavy codecs
+- Admission control when a lane is saturated
+- Queue-depth statistics
+"""
+
+import asyncio
+import gzip
+import threading
+
+import pytest
+
+from app.core.compression_engine import LZMACompressor, ZstdCompressor, GzipCompressor
+from app.core.compression_executor import (
+    CompressionExecutor, CompressionQueueFullError, FAST_LANE, HEAVY_LANE
+)
+
+
+@pytest.fixture
+def executor():
+    """Create a small executor for testing."""
+    executor = CompressionExecutor(fast_workers=1, heavy_workers=1, max_queue_depth=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_lane_routing():
+    """Test that codecs and levels map to the expected lanes."""
+    assert GzipCompressor().lane_for(9) == FAST_LANE
+    assert LZMACompressor().lane_for(1) == HEAVY_LANE
+    assert ZstdCompressor().lane_for(3) == FAST_LANE
+    assert ZstdCompressor().lane_for(19) == HEAVY_LANE
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result(executor):
+    """Test that work runs on the lane and is accounted for."""
+    data = b"executor test data " * 100
+    compressed = await executor.run(FAST_LANE, gzip.compress, data, 6)
+
+    assert gzip.decompress(compressed) == data
+
+    stats = executor.get_stats()
+    assert stats[FAST_LANE]["completed"] == 1
+    assert stats[FAST_LANE]["in_flight"] == 0
+    assert stats[HEAVY_LANE]["submitted"] == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_control_rejects_when_saturated(executor):
+    """Test that a full lane rejects new work instead of queueing it."""
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(HEAVY_LANE, release.wait, 5))
+    queued = asyncio.ensure_future(executor.run(HEAVY_LANE, release.wait, 5))
+    await asyncio.sleep(0.05)
+
+    assert executor.get_stats()[HEAVY_LANE]["queue_depth"] == 1
+
+    with pytest.raises(CompressionQueueFullError) as exc_info:
+        await executor.run(HEAVY_LANE, release.wait, 5)
+    assert exc_info.value.lane == HEAVY_LANE
+
+    # Fast lane is unaffected by the saturated heavy lane
+    assert await executor.run(FAST_LANE, len, b"abc") == 3
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    stats = executor.get_stats()[HEAVY_LANE]
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
@@ -0,0 +1,170 @@
+"""
+Tests for the single-pass ContentAnalyzer.
+
+Tests cover:
+- Agreement with a per-character multi-pass reference on ASCII input
+- Byte-level entropy for non-ASCII text
+- Binary and memoryview input
+- Sampled mode for large inputs
+- Benchmark of multi-pass vs single-pass analysis
+"""
+
+import math
+import random
+import time
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.core.content_analyzer import PATTERN_LENGTHS, ContentAnalyzer, _max_nesting_depth
+from app.models.compression import ContentType
+
+
+CODE_UNIT = "def handler(event):\n    return {'status': 200, 'body': event.get('path', '/')}  # ok\n"
+
+SCALAR_DIMENSIONS = ['entropy', 'redundancy_ratio', 'locality_score', 'temporal_score']
+
+
+def _payload(size: int) -> str:
+    return (CODE_UNIT * (size // len(CODE_UNIT) + 1))[:size]
+
+
+def _multi_pass_analysis(content: str) -> dict:
+    """Previous analysis: one pure-Python pass over the characters per dimension."""
+    counts = Counter(content)
+    entropy = -sum(count / len(content) * math.log2(count / len(content)) for count in counts.values())
+
+    total_patterns = 0
+    for length in PATTERN_LENGTHS:
+        windows = Counter(content[i:i + length] for i in range(len(content) - length + 1))
+        total_patterns += sum(1 for count in windows.values() if count > 1)
+
+    window_size = 100
+    locality = sum(
+        len(set(content[i:i + window_size])) / window_size
+        for i in range(0, len(content) - window_size, window_size // 2)
+    ) / max(1, (len(content) - window_size) // (window_size // 2))
+
+    max_distance = min(1000, len(content) // 2)
+    temporal = sum(
+        sum(1 for i in range(len(content) - distance) if content[i] == content[i + distance])
+        / (len(content) - distance)
+        for distance in range(1, max_distance, 10)
+    ) / (max_distance // 10) if max_distance > 10 else 0.0
+
+    return {
+        'entropy': entropy,
+        'redundancy_ratio': 1 - len(counts) / len(content),
+        'total_patterns': total_patterns,
+        'locality_score': locality,
+        'temporal_score': temporal,
+    }
+
+
+@pytest.mark.parametrize("content", [
+    "The quick brown fox jumps over the lazy dog. " * 40,
+    CODE_UNIT * 30,
+    "".join(random.Random(7).choice("abcdefghij()<>{} \n") for _ in range(3000)),
+])
+def test_matches_multi_pass_reference(content):
+    """Test that shared aggregates reproduce the per-character results on ASCII."""
+    result = ContentAnalyzer().analyze_content(content)
+    reference = _multi_pass_analysis(content)
+
+    for dimension in SCALAR_DIMENSIONS:
+        assert result[dimension] == pytest.approx(reference[dimension]), dimension
+    assert result['pattern_frequency']['total_patterns'] == reference['total_patterns']
+    assert len(result['content_profile']) == 8
+
+
+def test_entropy_is_over_utf8_bytes():
+    """Test that non-ASCII text is measured in its encoded form."""
+    result = ContentAnalyzer().analyze_content("é" * 100)
+
+    # One character, but two distinct bytes (0xC3 0xA9) in equal shares
+    assert result['entropy'] == pytest.approx(1.0)
+    assert result['redundancy_ratio'] == pytest.approx(1 - 2 / 200)
+
+
+def test_reported_patterns_are_most_frequent():
+    """Test that the pattern report lists the top patterns with exact counts."""
+    analyzer = ContentAnalyzer(max_patterns_per_length=3)
+    content = "abcabcabcxyxy"
+
+    patterns = analyzer.analyze_content(content)['pattern_frequency']['patterns']
+
+    assert len(patterns['length_2']) == 3
+    assert patterns['length_3']['abc'] == 3
+    assert patterns['length_16'] == {}
+
+
+def test_binary_and_memoryview_input():
+    """Test that bytes-like input is analyzed without decoding first."""
+    analyzer = ContentAnalyzer()
+    data = bytes(range(256)) * 16
+
+    from_bytes = analyzer.analyze_content(data)
+    from_view = analyzer.analyze_content(memoryview(bytearray(data)))
+
+    assert from_bytes['entropy'] == pytest.approx(8.0)
+    assert from_bytes['redundancy_ratio'] == pytest.approx(1 - 256 / 4096)
+    assert from_view['entropy'] == from_bytes['entropy']
+
+
+def test_structured_content_classified_as_data():
+    """Test that CSV-like content without code indicators is data."""
+    result = ContentAnalyzer().analyze_content("a,b\n1,2\n3,4\n")
+
+    assert result['content_type_score']['type'] == ContentType.DATA
+
+
+def test_nesting_depth_clamps_unmatched_closers():
+    """Test the vectorized depth against the sequential definition."""
+    data = np.frombuffer(b"))({[(<>)]}((", dtype=np.uint8)
+
+    assert _max_nesting_depth(data) == 5
+
+
+def test_large_inputs_are_sampled():
+    """Test that sampling bounds the analyzed bytes but keeps the histogram exact."""
+    analyzer = ContentAnalyzer(sample_threshold=64 * 1024, sample_blocks=4, sample_block_size=4096)
+    content = _payload(256 * 1024)
+
+    result = analyzer.analyze_content(content)
+    exact = analyzer.analyze_content(content, sampled=False)
+
+    assert result['sampling'] == {'sampled': True, 'analyzed_bytes': 16384, 'total_bytes': 262144}
+    assert exact['sampling']['sampled'] is False
+    assert result['entropy'] == pytest.approx(exact['entropy'])
+    assert result['redundancy_ratio'] == pytest.approx(exact['redundancy_ratio'])
+    assert result['temporal_score'] == pytest.approx(exact['temporal_score'], abs=0.05)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", [
+    1024,
+    64 * 1024,
+    1024 * 1024,
+    10 * 1024 * 1024,
+    pytest.param(100 * 1024 * 1024, marks=pytest.mark.slow),
+])
+def test_analysis_benchmark(size):
+    """Benchmark multi-pass vs single-pass analysis from 1 KB to 100 MB."""
+    analyzer = ContentAnalyzer()
+    content = _payload(size)
+
+    start = time.perf_counter()
+    result = analyzer.analyze_content(content)
+    single_pass = time.perf_counter() - start
+
+    print(f"\nContent analysis @ {size} bytes (sampled={result['sampling']['sampled']}):")
+    print(f"  Single pass: {single_pass * 1000:.1f}ms")
+
+    # The multi-pass reference runs pure-Python loops; skip it beyond 64 KB
+    if size <= 64 * 1024:
+        start = time.perf_counter()
+        _multi_pass_analysis(content)
+        multi_pass = time.perf_counter() - start
+        print(f"  Multi pass:  {multi_pass * 1000:.1f}ms ({multi_pass / single_pass:.1f}x slower)")
+        assert single_pass < multi_pass
@@ -0,0 +1,435 @@
+"""
+Tests for ChunkGenerator chunking strategies and DistributedCompressor.
+
+Tests cover:
+- FastCDC size bounds and lossless reassembly
+- Identical boundaries for bytes, file-like and differently blocked input
+- Boundary stability after an insertion
+- Throughput benchmark against the existing strategies
+- Windowed, order-preserving distributed compression
+- Seekable containers: range reads, checksums and legacy compatibility
+- Containers embedded in a larger stream
+- Zero-copy mmap compression and its RSS/throughput benchmark
+"""
+
+import filecmp
+import io
+import mmap
+import random
+import threading
+import time
+import zlib
+
+import psutil
+import pytest
+
+from app.algorithms.gzip.versions.v1_basic import GzipBasic
+from app.algorithms.gzip.versions.v6_stream import GzipStream
+from app.core.distributed_streaming import (
+    ChunkGenerator, ChunkingStrategy, ContainerFormatError, DistributedCompressor,
+    SeekableContainerReader, StreamingCompressor
+)
+
+
+KB = 1024
+
+
+def _text_payload(size: int, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    words = [bytes(rng.choice(b"abcdefghijklmnop") for _ in range(rng.randint(2, 9))) for _ in range(2000)]
+    out = bytearray()
+    while len(out) < size:
+        out += rng.choice(words) + b" "
+    return bytes(out[:size])
+
+
+def _generator(strategy=ChunkingStrategy.FASTCDC, **overrides) -> ChunkGenerator:
+    generator = ChunkGenerator(strategy=strategy, target_size=16 * KB, min_size=4 * KB, max_size=64 * KB)
+    for name, value in overrides.items():
+        setattr(generator, name, value)
+    return generator
+
+
+def test_fastcdc_chunks_respect_bounds_and_reassemble():
+    """Test size bounds, offsets and lossless reassembly."""
+    data = _text_payload(1024 * KB)
+
+    chunks = list(_generator().generate_chunks(data))
+
+    assert b"".join(chunk for chunk, _ in chunks) == data
+    for chunk, metadata in chunks[:-1]:
+        assert 4 * KB <= metadata.size <= 64 * KB
+        assert metadata.validate(chunk)
+    offsets = [metadata.offset for _, metadata in chunks]
+    assert offsets == sorted(offsets) and offsets[0] == 0
+
+
+def test_fastcdc_boundaries_independent_of_input_blocking():
+    """Test that bytes, file-like input and block size give the same chunks."""
+    data = _text_payload(512 * KB)
+
+    from_bytes = [m.checksum for _, m in _generator().generate_chunks(data)]
+    from_file = [m.checksum for _, m in _generator(cdc_block_size=10_000).generate_chunks(io.BytesIO(data))]
+
+    assert from_bytes == from_file
+
+
+def test_fastcdc_boundaries_survive_insertion():
+    """Test that a prefix insertion only changes the first chunk."""
+    data = _text_payload(1024 * KB)
+
+    original = {m.checksum for _, m in _generator().generate_chunks(data)}
+    shifted = {m.checksum for _, m in _generator().generate_chunks(b"inserted" + data)}
+
+    assert len(original - shifted) <= 2
+
+
+def test_fastcdc_handles_small_and_empty_input():
+    """Test inputs below the minimum chunk size."""
+    assert list(_generator().generate_chunks(b"")) == []
+
+    chunks = list(_generator().generate_chunks(b"tiny"))
+    assert [chunk for chunk, _ in chunks] == [b"tiny"]
+
+
+@pytest.mark.performance
+def test_chunking_throughput_benchmark():
+    """Benchmark FastCDC against the existing chunking strategies."""
+    data = _text_payload(8 * 1024 * KB)
+    # The byte-by-byte rolling hash is too slow for the full payload
+    sizes = {ChunkingStrategy.ROLLING_HASH: 1024 * KB}
+
+    throughput = {}
+    for strategy in (ChunkingStrategy.FIXED_SIZE, ChunkingStrategy.CONTENT_AWARE,
+                     ChunkingStrategy.ROLLING_HASH, ChunkingStrategy.FASTCDC):
+        payload = data[:sizes.get(strategy, len(data))]
+        start = time.perf_counter()
+        for _ in _generator(strategy).generate_chunks(payload):
+            pass
+        throughput[strategy] = len(payload) / (time.perf_counter() - start) / 1e6
+
+    print("\nChunking throughput:")
+    for strategy, mb_per_s in throughput.items():
+        print(f"  {strategy.value:14s} {mb_per_s:8.1f} MB/s")
+
+    assert throughput[ChunkingStrategy.FASTCDC] > throughput[ChunkingStrategy.ROLLING_HASH]
+
+
+@pytest.fixture(scope="module")
+def distributed():
+    """Create a two-worker compressor with a small in-flight window."""
+    compressor = DistributedCompressor(GzipBasic(), num_workers=2, max_in_flight=3)
+    yield compressor
+    compressor.shutdown()
+
+
+def test_distributed_results_in_offset_order(distributed):
+    """Test that chunks come back in offset order and decompress to the input."""
+    data = _text_payload(512 * KB)
+
+    chunks, metadata = distributed.compress_distributed(data, ChunkingStrategy.FIXED_SIZE, 32 * KB)
+
+    offsets = [chunk.offset for chunk in metadata['chunk_metadata']]
+    assert offsets == sorted(offsets)
+    assert metadata['num_chunks'] == 16
+    assert metadata['total_original_size'] == len(data)
+    assert b"".join(GzipBasic().decompress(chunk) for chunk in chunks) == data
+
+
+def test_distributed_window_bounds_in_flight(distributed, monkeypatch):
+    """Test that no more than max_in_flight chunks are outstanding."""
+    submit, collect = distributed._backend_calls()
+    outstanding = []
+
+    def counting_submit(chunk_data, chunk_meta):
+        outstanding.append(chunk_meta.offset)
+        assert len(outstanding) <= distributed.max_in_flight
+        return submit(chunk_data, chunk_meta)
+
+    def counting_collect(future):
+        outstanding.pop(0)
+        return collect(future)
+
+    monkeypatch.setattr(distributed, "_backend_calls", lambda: (counting_submit, counting_collect))
+
+    results = list(distributed.iter_compressed(_text_payload(256 * KB), ChunkingStrategy.FIXED_SIZE, 16 * KB))
+
+    assert len(results) == 16
+    assert outstanding == []
+
+
+def test_distributed_compress_to_file_streams_frames(distributed, tmp_path):
+    """Test that file output is readable by StreamingCompressor."""
+    data = _text_payload(300 * KB)
+    source = tmp_path / "input.bin"
+    source.write_bytes(data)
+    target = tmp_path / "output.dcs"
+
+    metadata = distributed.compress_to_file(source, target, ChunkingStrategy.FASTCDC, 32 * KB)
+
+    restored = io.BytesIO()
+    with open(target, "rb") as stream:
+        state = StreamingCompressor(GzipBasic(), use_mmap=False).decompress_stream(stream, restored)
+    assert restored.getvalue() == data
+    assert state.chunk_count == metadata['num_chunks']
+
+
+def _seekable_container(data: bytes, chunk_size: int = 16 * KB) -> io.BytesIO:
+    output = io.BytesIO()
+    StreamingCompressor(GzipBasic(), use_mmap=False).compress_stream(
+        io.BytesIO(data), output, chunk_size=chunk_size, seekable=True
+    )
+    output.seek(0)
+    return output
+
+
+@pytest.mark.parametrize("offset, length", [
+    (0, 10), (16 * KB - 5, 10), (50_000, 40_000), (0, 200 * KB), (199 * KB, 10 * KB), (300 * KB, 5),
+])
+def test_container_read_range(offset, length):
+    """Test range reads against slicing the original data."""
+    data = _text_payload(200 * KB)
+    container = _seekable_container(data)
+
+    result = StreamingCompressor(GzipBasic()).read_range(container, offset, length)
+
+    assert result == data[offset:offset + length]
+
+
+def test_container_range_decompresses_only_covering_chunks(monkeypatch):
+    """Test that a range inside one chunk decompresses exactly one chunk."""
+    data = _text_payload(200 * KB)
+    algorithm = GzipBasic()
+    reader = SeekableContainerReader(_seekable_container(data), algorithm)
+    calls = []
+    original = algorithm.decompress
+    monkeypatch.setattr(algorithm, "decompress", lambda compressed: calls.append(1) or original(compressed))
+
+    assert reader.read_range(40 * KB, 100) == data[40 * KB:40 * KB + 100]
+    assert len(calls) == 1
+    assert reader.size == len(data)
+    assert reader.header.codec == "GzipBasic"
+
+
+def test_container_embedded_in_larger_stream():
+    """Test reading a container wrapped in leading and trailing bytes."""
+    data = _text_payload(100 * KB)
+    container = _seekable_container(data).getvalue()
+    stream = io.BytesIO(b"leading bytes" + container + b"trailing bytes, not a trailer")
+    start, end = len(b"leading bytes"), len(b"leading bytes") + len(container)
+
+    stream.seek(start)
+    reader = SeekableContainerReader(stream, GzipBasic(), end=end)
+    assert reader.size == len(data)
+    assert reader.read_range(30 * KB, 5000) == data[30 * KB:30 * KB + 5000]
+    stream.seek(start)
+    assert StreamingCompressor(GzipBasic()).read_range(stream, 0, 10, end=end) == data[:10]
+
+    # Without the end the trailing bytes are not mistaken for an index
+    stream.seek(start)
+    with pytest.raises(ContainerFormatError):
+        SeekableContainerReader(stream, GzipBasic())
+
+
+def test_container_truncated_chunk_payload():
+    """Test that a payload cut short is reported as a container error."""
+    data = _text_payload(64 * KB)
+    container = _seekable_container(data)
+    entry = SeekableContainerReader(container, GzipBasic()).index[1]
+    # Keep the 16-byte frame header and half of the payload
+    truncated = container.getvalue()[:entry.frame_offset + 16 + entry.compressed_size // 2]
+
+    with pytest.raises(ContainerFormatError, match="Truncated container chunk"):
+        StreamingCompressor(GzipBasic()).decompress_stream(io.BytesIO(truncated), io.BytesIO())
+
+
+def test_container_sequential_decompress_and_legacy_frames(tmp_path):
+    """Test that decompress_stream reads both containers and bare frames."""
+    data = _text_payload(100 * KB)
+    compressor = StreamingCompressor(GzipBasic(), buffer_size=16 * KB)
+
+    restored = io.BytesIO()
+    compressor.decompress_stream(_seekable_container(data), restored)
+    assert restored.getvalue() == data
+
+    source = tmp_path / "input.bin"
+    source.write_bytes(data)
+    for seekable in (False, True):
+        target = tmp_path / f"output_{seekable}.bin"
+        StreamingCompressor(GzipBasic(), buffer_size=16 * KB).compress_file_streaming(source, target, seekable)
+        restored = io.BytesIO()
+        with open(target, "rb") as stream:
+            compressor.decompress_stream(stream, restored)
+        assert restored.getvalue() == data
+
+
+def test_container_detects_corruption_and_codec_mismatch():
+    """Test checksum verification and codec checks."""
+    data = _text_payload(64 * KB)
+    container = _seekable_container(data)
+    reader = SeekableContainerReader(container, GzipBasic())
+    entry = reader.index[1]
+
+    class OtherCodec(GzipBasic):
+        pass
+
+    raw = bytearray(container.getvalue())
+    # Alter the stored checksum of the second chunk
+    raw[entry.frame_offset + 8] ^= 0xFF
+
+    with pytest.raises(ContainerFormatError):
+        SeekableContainerReader(io.BytesIO(bytes(raw)), GzipBasic()).read_range(entry.original_offset, 1)
+    with pytest.raises(ContainerFormatError):
+        StreamingCompressor(GzipBasic()).decompress_stream(io.BytesIO(bytes(raw)), io.BytesIO())
+    with pytest.raises(ContainerFormatError):
+        SeekableContainerReader(io.BytesIO(container.getvalue()), OtherCodec())
+
+
+class ZlibBufferCodec:
+    """Minimal codec whose compress() accepts any buffer."""
+
+    accepts_buffers = True
+    compression_level = 1
+
+    def __init__(self):
+        self.input_types = set()
+
+    def compress(self, data):
+        self.input_types.add(type(data))
+        return zlib.compress(data, self.compression_level), {}
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+
+def _legacy_compress_with_mmap(algorithm, input_path, output_path, buffer_size):
+    """Previous mmap path: copy each slice and write frames with two calls."""
+    with open(input_path, 'rb') as infile:
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mmapped:
+            with open(output_path, 'wb') as outfile:
+                offset = 0
+                while offset < len(mmapped):
+                    chunk_size = min(buffer_size, len(mmapped) - offset)
+                    chunk = mmapped[offset:offset + chunk_size]
+                    compressed, _ = algorithm.compress(chunk)
+                    outfile.write(len(chunk).to_bytes(4, 'big') + len(compressed).to_bytes(4, 'big'))
+                    outfile.write(compressed)
+                    offset += chunk_size
+
+
+def _write_sample_file(path, size):
+    block = _text_payload(4 * 1024 * KB, seed=5)
+    with open(path, 'wb') as out:
+        for start in range(0, size, len(block)):
+            out.write(block[:size - start])
+
+
+@pytest.mark.parametrize("seekable", [False, True])
+def test_mmap_path_is_zero_copy_and_lossless(tmp_path, seekable):
+    """Test that buffer-capable codecs get memoryviews and output round-trips."""
+    data = _text_payload(3 * 256 * KB + 123)
+    source = tmp_path / "input.bin"
+    source.write_bytes(data)
+    target = tmp_path / "output.bin"
+    codec = ZlibBufferCodec()
+
+    state = StreamingCompressor(codec, buffer_size=256 * KB).compress_file_streaming(source, target, seekable)
+
+    assert codec.input_types == {memoryview}
+    assert state.chunk_count == 4
+    restored = io.BytesIO()
+    with open(target, "rb") as stream:
+        StreamingCompressor(ZlibBufferCodec()).decompress_stream(stream, restored)
+    assert restored.getvalue() == data
+    if seekable:
+        with open(target, "rb") as stream:
+            assert StreamingCompressor(ZlibBufferCodec()).read_range(stream, 300 * KB, 10) == data[300 * KB:300 * KB + 10]
+
+
+def test_mmap_path_copies_for_bytes_only_algorithms(tmp_path):
+    """Test that algorithms without accepts_buffers still receive bytes."""
+    data = _text_payload(300 * KB)
+    source = tmp_path / "input.bin"
+    source.write_bytes(data)
+    target = tmp_path / "output.bin"
+
+    StreamingCompressor(GzipBasic(), buffer_size=128 * KB).compress_file_streaming(source, target)
+
+    restored = io.BytesIO()
+    with open(target, "rb") as stream:
+        StreamingCompressor(GzipBasic()).decompress_stream(stream, restored)
+    assert restored.getvalue() == data
+
+
+def test_mmap_path_passes_views_to_stream_gzip(tmp_path, monkeypatch):
+    """Test that the zlib-backed stream codec is fed mmap views and round-trips."""
+    data = _text_payload(600 * KB, seed=3)
+    source = tmp_path / "input.bin"
+    source.write_bytes(data)
+    target = tmp_path / "output.bin"
+    codec = GzipStream(1)
+    compress = codec.compress
+    input_types = set()
+
+    def recording_compress(chunk, **params):
+        input_types.add(type(chunk))
+        return compress(chunk, **params)
+
+    monkeypatch.setattr(codec, "compress", recording_compress)
+    StreamingCompressor(codec, buffer_size=128 * KB).compress_file_streaming(source, target, seekable=True)
+
+    assert input_types == {memoryview}
+    with open(target, "rb") as stream:
+        reader = SeekableContainerReader(stream, GzipStream())
+        assert reader.read_range(0, len(data)) == data
+
+
+def _measure(run):
+    """Run ``run`` while sampling RSS; return (seconds, peak RSS growth)."""
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], process.memory_info().rss)
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    return elapsed, peak[0] - baseline
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", [
+    256 * 1024 * KB,
+    pytest.param(2 * 1024 * 1024 * KB, marks=pytest.mark.slow),
+    pytest.param(4 * 1024 * 1024 * KB, marks=pytest.mark.slow),
+])
+def test_mmap_compression_benchmark(tmp_path, size):
+    """Benchmark RSS and throughput of the zero-copy mmap path against the previous one."""
+    source = tmp_path / "input.bin"
+    _write_sample_file(source, size)
+    buffer_size = 1024 * KB
+
+    legacy_time, legacy_rss = _measure(
+        lambda: _legacy_compress_with_mmap(ZlibBufferCodec(), source, tmp_path / "legacy.bin", buffer_size)
+    )
+    compressor = StreamingCompressor(ZlibBufferCodec(), buffer_size=buffer_size)
+    zero_copy_time, zero_copy_rss = _measure(
+        lambda: compressor.compress_file_streaming(source, tmp_path / "zero_copy.bin")
+    )
+
+    mb = size / 1e6
+    print(f"\nmmap compression @ {size // (1024 * KB)} MiB:")
+    print(f"  Previous:  {mb / legacy_time:.0f} MB/s, peak RSS +{legacy_rss / 1e6:.0f} MB")
+    print(f"  Zero-copy: {mb / zero_copy_time:.0f} MB/s, peak RSS +{zero_copy_rss / 1e6:.0f} MB")
+
+    assert filecmp.cmp(tmp_path / "zero_copy.bin", tmp_path / "legacy.bin", shallow=False)
+    assert zero_copy_rss < max(legacy_rss, 64 * 1024 * KB)
@@ -0,0 +1,236 @@
+"""
+Tests for the resilient compression runner.
+
+Tests cover:
+- Isolated process pool: results, errors, killing overrunning jobs
+- Reaping killed workers off the event loop, forkserver workers
+- Fallback, retries and non-blocking backoff
+- Killing timed-out attempts instead of leaving them running
+- Hedging slow attempts with the fast fallback codec
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import pytest
+
+from app.core import graceful_degradation as degradation_module
+from app.core import compression_executor as executor_module
+from app.core.compression_executor import IsolatedProcessPool
+from app.core.graceful_degradation import GracefulDegradationSystem, HedgingPolicy, RetryPolicy
+
+
+DATA = b"graceful degradation test payload " * 200
+
+
+@dataclass
+class _Metadata:
+    data_characteristics: Dict[str, Any] = field(default_factory=dict)
+
+
+class _Codec:
+    """Picklable stand-in for a compression algorithm."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+
+    def compress(self, data: bytes, **params):
+        if self.fail:
+            raise ValueError("codec failure")
+        deadline = time.perf_counter() + self.delay
+        while time.perf_counter() < deadline:
+            pass  # Burn CPU like a runaway codec
+        return zlib.compress(data, params.get("level", 6)), _Metadata()
+
+
+class _LocalCodec(_Codec):
+    """Codec that cannot be sent to a worker process."""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+
+def _spin(seconds: float) -> str:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return "done"
+
+
+def _raise():
+    raise KeyError("boom")
+
+
+@pytest.fixture
+def pool():
+    pool = IsolatedProcessPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def make_system(pool, monkeypatch):
+    monkeypatch.setattr(degradation_module, "get_isolated_process_pool", lambda: pool)
+    systems = []
+
+    def make(algorithms, **options):
+        options.setdefault("retry_policy", RetryPolicy(max_attempts=2, initial_delay=0.05, jitter=False))
+        system = GracefulDegradationSystem(algorithms, **options)
+        system.resource_monitor.should_degrade = lambda: False
+        systems.append(system)
+        return system
+
+    yield make
+    for system in systems:
+        system.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_jobs_and_reuses_workers(pool):
+    """Test results, remote exceptions and worker reuse."""
+    assert await pool.run(_spin, 0) == "done"
+    assert await pool.run(zlib.decompress, zlib.compress(DATA)) == DATA
+    with pytest.raises(KeyError):
+        await pool.run(_raise)
+
+    assert pool.get_stats()["spawned"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_kills_overrunning_job(pool):
+    """Test that a timed-out job is killed and its worker replaced."""
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        await pool.run(_spin, 30, timeout=0.3)
+    assert time.perf_counter() - start < 2
+
+    stats = pool.get_stats()
+    assert stats["killed"] == 1
+    assert stats["idle"] == 0
+    assert await pool.run(_spin, 0) == "done"
+
+
+@pytest.mark.asyncio
+async def test_pool_reaps_killed_workers_off_the_loop(pool, monkeypatch):
+    """Test that abandoning a job only signals its worker from the loop."""
+    assert pool._context.get_start_method() == "forkserver"
+    reaped = []
+    kill = executor_module._IsolatedWorker.kill
+
+    def slow_kill(worker):
+        reaped.append(threading.current_thread().name)
+        time.sleep(0.5)  # A worker slow to exit
+        kill(worker)
+
+    monkeypatch.setattr(executor_module._IsolatedWorker, "kill", slow_kill)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        await pool.run(_spin, 30, timeout=1.5)
+    assert time.perf_counter() - start < 1.8
+
+    await asyncio.sleep(0.7)
+    assert reaped and all(name.startswith("compression-isolated") for name in reaped)
+    assert pool.get_stats()["killed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_cancellation_kills_job(pool):
+    """Test that cancelling the awaiting task stops the job."""
+    task = asyncio.ensure_future(pool.run(_spin, 30))
+    await asyncio.sleep(0.3)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert pool.get_stats()["killed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_after_retries_without_blocking_loop(make_system):
+    """Test retry backoff on the loop and fallback to the next algorithm."""
+    system = make_system({"gzip_strategy": _Codec(fail=True), "gzip_basic": _Codec()})
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticking = asyncio.ensure_future(ticker())
+    compressed, metadata = await system.compress_with_fallback_async(DATA)
+    ticking.cancel()
+
+    assert zlib.decompress(compressed) == DATA
+    assert metadata.data_characteristics["degradation"] == {"algorithm": "gzip_basic", "hedged": False}
+    assert system.health_status["gzip_strategy"].failure_count == 1
+    assert system.health_status["gzip_basic"].success_count == 1
+    # The loop kept running through the 50ms backoff
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_timed_out_attempt_is_killed(make_system, pool, monkeypatch):
+    """Test that an overrunning attempt stops consuming CPU."""
+    system = make_system({"gzip_strategy": _Codec(delay=30), "gzip_basic": _Codec()},
+                         retry_policy=RetryPolicy(max_attempts=1))
+    monkeypatch.setattr(system, "_attempt_timeout", lambda data: 0.3)
+    # Start both workers first so the fallback does not wait for a spawn
+    await asyncio.gather(pool.run(_spin, 0.1), pool.run(_spin, 0.1))
+
+    compressed, metadata = await system.compress_with_fallback_async(DATA)
+
+    assert metadata.data_characteristics["degradation"]["algorithm"] == "gzip_basic"
+    assert pool.get_stats()["killed"] == 1
+    assert "was killed" in system.health_status["gzip_strategy"].error_messages[0]
+
+
+@pytest.mark.asyncio
+async def test_hedge_bounds_tail_latency(make_system, pool):
+    """Test that a slow attempt is hedged once it passes the latency percentile."""
+    system = make_system(
+        {"gzip_metarecursive": _Codec(delay=30), "gzip_basic": _Codec()},
+        hedging_policy=HedgingPolicy(percentile=95, min_samples=10)
+    )
+    system.health_status["gzip_metarecursive"].performance_history.extend([0.05] * 20)
+
+    start = time.perf_counter()
+    compressed, metadata = await system.compress_with_fallback_async(DATA)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2
+    assert zlib.decompress(compressed) == DATA
+    assert metadata.data_characteristics["degradation"] == {"algorithm": "gzip_basic", "hedged": True}
+    assert system.hedge_stats == {"launched": 1, "won": 1}
+    # The losing primary was killed, not left running
+    assert pool.get_stats()["killed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_latency_history(make_system):
+    """Test that hedging waits for enough samples."""
+    system = make_system({"gzip_strategy": _Codec(delay=0.2), "gzip_basic": _Codec()})
+
+    _, metadata = await system.compress_with_fallback_async(DATA)
+
+    assert metadata.data_characteristics["degradation"]["algorithm"] == "gzip_strategy"
+    assert system.hedge_stats["launched"] == 0
+    assert len(system.health_status["gzip_strategy"].performance_history) == 1
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_algorithm_runs_on_threads(make_system, pool):
+    """Test the thread fallback for algorithms that cannot be pickled."""
+    system = make_system({"local": _LocalCodec()})
+
+    compressed, _ = await system.compress_with_fallback_async(DATA)
+
+    assert zlib.decompress(compressed) == DATA
+    assert "local" in system._unpicklable
+    assert pool.get_stats()["completed"] == 0
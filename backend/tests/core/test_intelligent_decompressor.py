@@ -0,0 +1,108 @@
+"""
+Tests for IntelligentDecompressor auto-detection.
+
+Tests cover:
+- Header validation for each container format
+- Prefix probing for formats without magic bytes
+- Only the winning candidate being fully decompressed
+"""
+
+import bz2
+import gzip
+import lzma
+
+import brotli
+import lz4.frame
+import pytest
+import zstandard as zstd
+
+from app.core.intelligent_decompressor import IntelligentDecompressor
+from app.models.compression import CompressionAlgorithm
+
+
+TEXT = ("The quick brown fox jumps over the lazy dog. Ünïcödé ✓\n" * 5000).encode()
+
+CONTAINERS = {
+    CompressionAlgorithm.GZIP: gzip.compress,
+    CompressionAlgorithm.BZIP2: bz2.compress,
+    CompressionAlgorithm.LZMA: lzma.compress,
+    CompressionAlgorithm.LZ4: lz4.frame.compress,
+    CompressionAlgorithm.ZSTD: lambda data: zstd.ZstdCompressor().compress(data),
+}
+
+
+@pytest.fixture
+def decompressor():
+    """Create a decompressor for testing."""
+    return IntelligentDecompressor()
+
+
+@pytest.mark.parametrize("algorithm, compress", CONTAINERS.items())
+def test_headers_detected_without_decoding(decompressor, algorithm, compress):
+    """Test that each container is recognised from its header alone."""
+    header = compress(TEXT)[:16]
+
+    assert decompressor._detect_by_magic_bytes(header) == algorithm
+
+
+def test_lzma_alone_header_detected(decompressor):
+    """Test the legacy .lzma header check."""
+    data = lzma.compress(TEXT, format=lzma.FORMAT_ALONE)
+
+    assert decompressor._detect_by_magic_bytes(data) == CompressionAlgorithm.LZMA
+
+
+def test_weak_magic_is_not_trusted(decompressor):
+    """Test that plain text starting with 'BZ' is not taken for bzip2."""
+    assert decompressor._detect_by_magic_bytes(b"BZhello world, not bzip2") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm, compress", CONTAINERS.items())
+async def test_decompress_auto_roundtrip(decompressor, algorithm, compress):
+    """Test auto-detection for formats with headers."""
+    result = await decompressor.decompress_auto(compress(TEXT))
+
+    assert result.success
+    assert result.algorithm == algorithm
+    assert result.decompressed_data == TEXT
+    assert result.validation_metrics['data_size'] == len(TEXT)
+    assert result.validation_metrics['probe_size'] <= decompressor.PROBE_OUTPUT_BYTES
+
+
+@pytest.mark.asyncio
+async def test_probe_detects_brotli_and_decompresses_only_winner(decompressor, monkeypatch):
+    """Test that prefix probes pick Brotli and only it is fully decompressed."""
+    full_decompressions = []
+    original = decompressor._try_decompress
+
+    async def tracking_try_decompress(data, algorithm, probe_metrics=None):
+        full_decompressions.append(algorithm)
+        return await original(data, algorithm, probe_metrics)
+
+    monkeypatch.setattr(decompressor, "_try_decompress", tracking_try_decompress)
+
+    result = await decompressor.decompress_auto(brotli.compress(TEXT))
+
+    assert result.success
+    assert result.algorithm == CompressionAlgorithm.BROTLI
+    assert result.decompressed_data == TEXT
+    assert full_decompressions == [CompressionAlgorithm.BROTLI]
+
+
+def test_probe_output_is_bounded(decompressor):
+    """Test that probes stop at the output limit for highly compressible data."""
+    bomb = gzip.compress(b"\x00" * (16 * 1024 * 1024))
+
+    output = decompressor.PROBE_ALGORITHMS[CompressionAlgorithm.GZIP](bomb, 1024)
+
+    assert len(output) == 1024
+
+
+@pytest.mark.asyncio
+async def test_undecodable_data_fails(decompressor):
+    """Test that garbage is reported as undecodable."""
+    result = await decompressor.decompress_auto(b"not compressed at all" * 10)
+
+    assert not result.success
+    assert result.algorithm is None
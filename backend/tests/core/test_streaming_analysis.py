@@ -0,0 +1,151 @@
+"""
+Tests for StreamingContentAnalyzer and its sketches.
+
+Tests cover:
+- Chunked updates matching a single update
+- Merging partial profiles
+- HyperLogLog and Count-Min accuracy bounds
+- The service wrapper running updates on the executor fast lane
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.core.compression_executor import FAST_LANE, get_compression_executor
+from app.core.content_analyzer import ContentAnalyzer
+from app.core.streaming_analysis import (
+    CountMinSketch, HyperLogLog, StreamingContentAnalyzer, analyze_chunks
+)
+from app.services.content_analysis_service import ContentAnalysisService
+
+
+RECORD = b'{"user_id": 1234, "event": "page_view", "path": "/compression"}\n'
+
+
+def _mixed_payload(records: int = 4000, seed: int = 3) -> bytes:
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(records):
+        if rng.random() < 0.7:
+            parts.append(RECORD)
+        else:
+            parts.append(bytes(rng.randrange(256) for _ in range(24)))
+    return b"".join(parts)
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_chunked_updates_match_single_update():
+    """Test that chunk boundaries do not change exact statistics or sketches."""
+    data = _mixed_payload()
+
+    whole = StreamingContentAnalyzer().update(data)
+    chunked = StreamingContentAnalyzer()
+    for chunk in _chunks(data, 997):
+        chunked.update(chunk)
+
+    assert np.array_equal(whole.histogram, chunked.histogram)
+    assert whole.run_count == chunked.run_count
+    assert whole.max_run_length == chunked.max_run_length
+    for length in whole.pattern_lengths:
+        assert np.array_equal(whole.distinct[length].registers, chunked.distinct[length].registers)
+        assert np.array_equal(whole.frequencies[length].table, chunked.frequencies[length].table)
+
+
+def test_profile_agrees_with_content_analyzer():
+    """Test that exact statistics match the in-memory analyzer."""
+    data = _mixed_payload()
+
+    profile = analyze_chunks(_chunks(data, 4096))
+    reference = ContentAnalyzer().analyze_content(data, sampled=False)
+
+    assert profile['total_bytes'] == len(data)
+    assert profile['entropy'] == pytest.approx(reference['entropy'])
+    assert profile['redundancy_ratio'] == pytest.approx(reference['redundancy_ratio'])
+    assert profile['run_length'] == reference['run_length']
+
+
+def test_distinct_ngram_estimates_are_accurate():
+    """Test HyperLogLog estimates against exact distinct counts."""
+    data = _mixed_payload()
+
+    profile = analyze_chunks(_chunks(data, 8192))
+
+    for length in (2, 4, 8):
+        exact = len({data[i:i + length] for i in range(len(data) - length + 1)})
+        assert profile['distinct_ngrams'][length] == pytest.approx(exact, rel=0.05)
+
+
+def test_heavy_hitters_found():
+    """Test that the dominant record shows up with a bounded overestimate."""
+    data = _mixed_payload()
+    record = RECORD.decode()
+
+    profile = analyze_chunks(_chunks(data, 8192))
+    hitters = profile['heavy_hitters']['length_8']
+
+    assert len(hitters) == 16
+    for pattern, estimate in hitters.items():
+        assert pattern in record
+        exact = data.count(pattern.encode())
+        assert exact <= estimate <= exact * 1.1
+
+
+def test_merge_of_shards_matches_whole():
+    """Test that merged shard profiles equal the whole-input profile."""
+    data = _mixed_payload()
+    # Split on a record boundary so no n-gram spans the seam
+    split = data.index(RECORD, len(data) // 2)
+
+    whole = StreamingContentAnalyzer().update(data)
+    left = StreamingContentAnalyzer().update(data[:split])
+    right = StreamingContentAnalyzer().update(data[split:])
+    merged = left.merge(right)
+
+    assert np.array_equal(whole.histogram, merged.histogram)
+    assert merged.finalize()['entropy'] == pytest.approx(whole.finalize()['entropy'])
+    for length in (2, 4):
+        assert merged.finalize()['distinct_ngrams'][length] == pytest.approx(
+            whole.finalize()['distinct_ngrams'][length], rel=0.01
+        )
+
+
+def test_merge_rejects_incompatible_sketches():
+    """Test that sketches of different shapes cannot be merged."""
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+    with pytest.raises(ValueError):
+        CountMinSketch(1024).merge(CountMinSketch(2048))
+    with pytest.raises(ValueError):
+        StreamingContentAnalyzer(pattern_lengths=(2,)).merge(StreamingContentAnalyzer())
+
+
+def test_empty_profile():
+    """Test finalizing without any content."""
+    profile = StreamingContentAnalyzer().finalize()
+
+    assert profile['total_bytes'] == 0
+    assert profile['entropy'] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_service_analyze_stream_accepts_async_chunks():
+    """Test the service wrapper with an async chunk source on the fast lane."""
+    data = _mixed_payload(500)
+    chunks = _chunks(data, 1000)
+
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    lane = get_compression_executor().lanes[FAST_LANE]
+    completed = lane.get_stats()['completed']
+    profile = await ContentAnalysisService.analyze_stream(source(), pattern_lengths=(2, 4))
+
+    assert profile['total_bytes'] == len(data)
+    assert set(profile['distinct_ngrams']) == {2, 4}
+    assert lane.get_stats()['completed'] - completed == len(chunks)
@@ -0,0 +1,151 @@
+"""
+Tests for the shared system sampler.
+
+Tests cover:
+- CPU utilisation and I/O rates from consecutive readings
+- Ring buffer history
+- Background sampling without blocking the event loop
+- TCP connect latency probe
+- Services reading the shared snapshot
+"""
+
+import asyncio
+import time
+from collections import namedtuple
+
+import pytest
+
+from app.core import system_sampler as sampler_module
+from app.core.system_sampler import SystemSampler, read_snapshot
+
+
+CpuTimes = namedtuple("CpuTimes", "user system idle iowait")
+NetIO = namedtuple("NetIO", "bytes_sent bytes_recv packets_sent packets_recv")
+DiskIO = namedtuple("DiskIO", "read_count write_count read_bytes write_bytes")
+
+
+class _FakeCounters:
+    """Deterministic counters advanced by the test."""
+
+    def __init__(self):
+        self.cpu = [CpuTimes(0.0, 0.0, 0.0, 0.0), CpuTimes(0.0, 0.0, 0.0, 0.0)]
+        self.net = NetIO(0, 0, 0, 0)
+        self.disk = DiskIO(0, 0, 0, 0)
+
+    def advance(self, busy, idle, sent, read_bytes):
+        self.cpu = [CpuTimes(c.user + b, c.system, c.idle + i, c.iowait) for c, b, i in zip(self.cpu, busy, idle)]
+        self.net = self.net._replace(bytes_sent=self.net.bytes_sent + sent)
+        self.disk = self.disk._replace(read_bytes=self.disk.read_bytes + read_bytes, read_count=self.disk.read_count + 10)
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    fake = _FakeCounters()
+    psutil = sampler_module.psutil
+    monkeypatch.setattr(psutil, "cpu_times", lambda percpu=False: list(fake.cpu))
+    monkeypatch.setattr(psutil, "net_io_counters", lambda: fake.net)
+    monkeypatch.setattr(psutil, "disk_io_counters", lambda: fake.disk)
+    return fake
+
+
+def test_rates_from_consecutive_readings(counters, monkeypatch):
+    """Test per-core utilisation and per-second I/O rates."""
+    clock = iter([100.0, 102.0])
+    monkeypatch.setattr(sampler_module.time, "time", lambda: next(clock))
+
+    counters.advance(busy=[1.0, 1.0], idle=[1.0, 1.0], sent=0, read_bytes=0)
+    first = read_snapshot()
+    counters.advance(busy=[1.5, 0.0], idle=[0.5, 2.0], sent=4096, read_bytes=2048)
+    second = read_snapshot(first)
+
+    assert second.interval == 2.0
+    assert second.cpu_per_core == (75.0, 0.0)
+    assert second.cpu_percent == 37.5
+    assert second.net_sent_bytes_per_sec == 2048
+    assert second.disk_read_bytes_per_sec == 1024
+    assert second.disk_read_ops_per_sec == 5
+    assert first.net_sent_bytes_per_sec == 0
+
+
+def test_history_ring_buffer():
+    """Test that the ring keeps the newest readings in order."""
+    sampler = SystemSampler(interval=1.0, history_size=3)
+    taken = [sampler.sample() for _ in range(5)]
+
+    assert sampler.history() == taken[-3:]
+    assert sampler.history(limit=2) == taken[-2:]
+    assert sampler.latest() is taken[-1]
+
+
+def test_latest_refreshes_when_not_running():
+    """Test the inline refresh used outside the application."""
+    sampler = SystemSampler(interval=0.05)
+    first = sampler.latest()
+    assert sampler.latest() is first
+
+    time.sleep(0.1)
+    assert sampler.latest() is not first
+
+
+@pytest.mark.asyncio
+async def test_background_sampling_keeps_loop_free():
+    """Test cadence, microsecond reads and a responsive loop."""
+    sampler = SystemSampler(interval=0.05)
+    await sampler.start()
+    try:
+        gaps = []
+        last = time.perf_counter()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            sampler.latest()
+        per_read = (time.perf_counter() - start) / 1000
+
+        stats = sampler.get_stats()
+        assert stats["running"] and stats["errors"] == 0
+        assert stats["samples"] >= 3
+        assert max(gaps) < 0.1
+        assert per_read < 50e-6
+    finally:
+        await sampler.stop()
+    assert not sampler.running
+
+
+@pytest.mark.asyncio
+async def test_latency_probe():
+    """Test the TCP connect probe against a local listener."""
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        latency = await SystemSampler(latency_host="127.0.0.1", latency_port=port).probe_latency()
+        assert latency is not None and latency < 1000
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert await SystemSampler().probe_latency() is None
+
+
+@pytest.mark.asyncio
+async def test_services_read_shared_snapshot(monkeypatch):
+    """Test that metrics services no longer block on psutil sampling."""
+    from app.core.enhanced_metrics_collector import EnhancedSystemMetrics
+    from app.services.live_system_metrics import LiveSystemMetricsService
+
+    sampler = SystemSampler(interval=60)
+    snapshot = sampler.sample()
+    monkeypatch.setattr(sampler_module, "_sampler", sampler)
+
+    start = time.perf_counter()
+    live = await LiveSystemMetricsService()._measure_network_latency()
+    metrics = EnhancedSystemMetrics.get_comprehensive_system_metrics()
+
+    assert time.perf_counter() - start < 0.5
+    assert live == 999.0  # No probe configured
+    assert metrics["cpu_usage"] == snapshot.cpu_percent
+    assert metrics["cpu_details"]["usage_per_cpu"] == list(snapshot.cpu_per_core)
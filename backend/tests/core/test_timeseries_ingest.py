@@ -0,0 +1,168 @@
+"""
+Tests for batched time-series ingest.
+
+Tests cover:
+- Batch appends matching single appends
+- Size- and time-triggered batch writes off the event loop
+- Backpressure from a bounded queue and draining on stop
+- Write latency and queue depth reporting
+- Bulk sensor reading and metric ingest through the services
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core import timeseries_ingest as ingest_module
+from app.core import timeseries_store as store_module
+from app.core.timeseries_ingest import BulkWriter
+from app.core.timeseries_store import TimeSeriesStore
+
+BASE = 1_700_000_000  # Epoch seconds
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), block_size=100)
+    yield store
+    store.close()
+
+
+def _samples(count, sensor_id=1, start=BASE):
+    return [("sensor.value", float(i), start + i / 10, {"sensor_id": sensor_id}, "C") for i in range(count)]
+
+
+def _count(store, name="sensor.value"):
+    return sum(len(data) for data in store.query(name))
+
+
+def test_append_many_matches_append(tmp_path):
+    """Test that a batch append stores the same series and samples."""
+    single = TimeSeriesStore(str(tmp_path / "single"), block_size=100)
+    batched = TimeSeriesStore(str(tmp_path / "batched"), block_size=100)
+    samples = _samples(250, 1) + _samples(250, 2)
+    for sample in samples:
+        single.append(*sample)
+    assert batched.append_many(samples) == 500
+
+    for left, right in zip(single.query("sensor.value"), batched.query("sensor.value")):
+        assert left.tags == right.tags and left.unit == right.unit == "C"
+        assert left.timestamps.tolist() == right.timestamps.tolist()
+        assert left.values.tolist() == right.values.tolist()
+    assert batched.get_stats()["blocks"] == single.get_stats()["blocks"] == 4
+    single.close()
+    batched.close()
+
+
+@pytest.mark.asyncio
+async def test_batches_by_size_and_delay(store):
+    """Test that a full batch is written at once and a partial one after the delay."""
+    writer = BulkWriter(store, batch_size=1000, max_delay=0.2)
+    await writer.start()
+
+    # 10 Hz sensors posting a second of readings at a time
+    for second in range(20):
+        for sensor_id in range(5):
+            await writer.put_many(_samples(10, sensor_id, BASE + second))
+    await asyncio.sleep(0.05)
+    assert writer.batches_written == 1 and writer.samples_written == 1000
+    assert _count(store) == 1000
+
+    await writer.put_many(_samples(7, 9, BASE + 100))
+    await asyncio.sleep(0.05)
+    assert _count(store) == 1000  # Still queued
+    await asyncio.sleep(0.3)
+    assert _count(store) == 1007
+
+    stats = writer.get_stats()
+    assert stats["running"] and stats["queued_samples"] == 0
+    assert stats["batches_written"] == 2 and stats["last_batch_size"] == 7
+    assert stats["write_latency_ms"]["max"] >= 200
+    assert {name for name, _ in store.series()} >= {"ingest.write_latency_ms", "ingest.queue_depth"}
+    await writer.stop()
+    assert not writer.running
+
+
+@pytest.mark.asyncio
+async def test_backpressure_and_drain_on_stop(store):
+    """Test that producers wait on a full queue and stop writes everything queued."""
+    release = threading.Event()
+
+    class SlowStore:
+        def append_many(self, samples):
+            release.wait(5)
+            return store.append_many(samples)
+
+        def flush_due(self):
+            return store.flush_due()
+
+    writer = BulkWriter(SlowStore(), batch_size=10, max_delay=0.0, queue_size=2)
+    await writer.start()
+
+    producers = [asyncio.ensure_future(writer.put_many(_samples(10, sensor_id))) for sensor_id in range(6)]
+    await asyncio.sleep(0.1)
+    # One batch is stuck in the store and two puts fill the queue
+    assert sum(task.done() for task in producers) == 3
+    assert writer.get_stats()["queued_puts"] == 2
+
+    release.set()
+    await asyncio.gather(*producers)
+    await writer.stop()
+    assert _count(store) == 60
+    assert writer.get_stats()["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_services_ingest_in_bulk(tmp_path, monkeypatch):
+    """Test bulk readings and metrics through the services and API."""
+    from fastapi import HTTPException
+
+    from app.api.sensors import create_sensor_readings_bulk, create_system_metrics_bulk, get_ingest_stats
+    from app.models.sensor import SensorReadingCreate, SystemMetricCreate
+    from app.services.sensor_service import SensorService
+
+    store = TimeSeriesStore(str(tmp_path))
+    writer = BulkWriter(store, batch_size=100, max_delay=0.05)
+    monkeypatch.setattr(store_module, "_timeseries_store", store)
+    monkeypatch.setattr(ingest_module, "_bulk_writer", writer)
+
+    # Without a running writer samples are written through
+    assert await SensorService.save_sensor_readings([{"sensor_id": 4, "value": 1.0, "timestamp": BASE}]) == 1
+    assert writer.written_through == 1 and _count(store) == 1
+    with pytest.raises(ValueError):
+        await SensorService.save_sensor_readings([{"sensor_id": 4, "quality": 0.5}])
+
+    class Result:
+        def __init__(self, ids):
+            self.ids = ids
+
+        def scalars(self):
+            return self
+
+        def all(self):
+            return self.ids
+
+    class Session:
+        async def execute(self, query):
+            return Result([4])
+
+    await writer.start()
+    readings = [SensorReadingCreate(sensor_id=4, value=float(i), confidence=0.9, timestamp=BASE + 1 + i / 10)
+                for i in range(50)]
+    assert await create_sensor_readings_bulk(readings, Session()) == {"accepted": 50}
+    metrics = [SystemMetricCreate(name="pump_rpm", value=1200.0 + i, unit="rpm", tags={"pump": "p1"})
+               for i in range(30)]
+    assert await create_system_metrics_bulk(metrics) == {"accepted": 30}
+    await asyncio.sleep(0.2)
+
+    assert _count(store) == 51 and _count(store, "sensor.confidence") == 50
+    assert store.query("pump_rpm", tags={"pump": "p1"})[0].unit == "rpm"
+    stats = await get_ingest_stats()
+    assert stats["samples_written"] == 130 and stats["batches_written"] == 2
+
+    with pytest.raises(HTTPException) as missing:
+        await create_sensor_readings_bulk([SensorReadingCreate(sensor_id=5, value=1.0)], Session())
+    assert missing.value.status_code == 404
+    await writer.stop()
+    store.close()
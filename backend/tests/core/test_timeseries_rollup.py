@@ -0,0 +1,170 @@
+"""
+Tests for continuous time-series rollups.
+
+Tests cover:
+- Quantile sketch accuracy, merging and serialization
+- Rollups maintained at ingest and resolution routing
+- Persistence across reopen and rebuild after a crash
+- Raw and rollup retention
+- Metrics endpoints served from rollups
+"""
+
+import os
+import random
+import time
+
+import pytest
+
+from app.core import timeseries_store as store_module
+from app.core.timeseries_rollup import QuantileSketch, parse_rollup_policy, pick_step
+from app.core.timeseries_store import TimeSeriesStore
+
+HOUR = 3600
+DAY = 86400
+
+
+@pytest.fixture
+def now():
+    # Whole day boundary well inside every default retention
+    return (int(time.time()) // DAY - 2) * DAY
+
+
+def _fill(store, start, seconds, name="cpu_percent", tags=None):
+    for i in range(seconds):
+        store.append(name, i % 100, start + i, tags=tags)
+
+
+def test_quantile_sketch():
+    """Test relative accuracy, merging and the byte round trip."""
+    rng = random.Random(3)
+    values = [rng.lognormvariate(0, 1) for _ in range(20000)] + [-1.5, 0.0]
+    first, second = QuantileSketch(0.01), QuantileSketch(0.01)
+    for i, value in enumerate(values):
+        (first if i % 2 else second).add(value)
+    first.merge(second)
+    restored = QuantileSketch.from_bytes(first.to_bytes())
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        expected = ordered[int(q * (len(ordered) - 1))]
+        assert restored.quantile(q) == pytest.approx(expected, rel=0.02)
+    assert restored.quantile(0) == pytest.approx(-1.5, rel=0.02)
+    assert restored.count == len(values)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_policy_and_step_helpers():
+    """Test policy parsing and step selection."""
+    assert parse_rollup_policy("5m:7d, 1m:1d") == {60: DAY, 300: 7 * DAY}
+    assert parse_rollup_policy("") == {}
+    with pytest.raises(ValueError):
+        parse_rollup_policy("1x:1d")
+    assert pick_step(HOUR) == 60
+    assert pick_step(DAY, max_points=48) == HOUR
+
+
+def test_routes_to_coarsest_adequate_resolution(tmp_path, now):
+    """Test rollup routing, exact aggregates and the raw fallback."""
+    store = TimeSeriesStore(str(tmp_path), block_size=500)
+    _fill(store, now, 2 * HOUR)
+
+    hourly, = store.aggregate("cpu_percent", HOUR, now, now + 2 * HOUR - 1, now=now + 2 * HOUR)
+    assert hourly.resolution == HOUR
+    assert hourly.timestamps == [now * 1000, (now + HOUR) * 1000]
+    assert hourly.values("count") == [3600, 3600]
+    assert hourly.values("min") == [0, 0] and hourly.values("max") == [99, 99]
+    assert hourly.values("avg")[0] == pytest.approx(49.5)
+    assert hourly.values("p50")[0] == pytest.approx(49, rel=0.01)
+
+    # 10 minutes is not a resolution but is made of 5-minute buckets
+    assert store.aggregate("cpu_percent", 600, now, now + HOUR, now=now + 2 * HOUR)[0].resolution == 300
+
+    # Beyond the 1m retention a 2m step falls back to raw samples
+    old = store.aggregate("cpu_percent", 120, now, now + 600, now=now + 2 * DAY)[0]
+    assert old.resolution == 0 and old.values("count")[0] == 120
+
+    stats = store.get_stats()
+    assert stats["blocks_decoded"] > 0
+    decoded = stats["blocks_decoded"]
+    store.aggregate("cpu_percent", DAY, now, now + DAY, now=now + 2 * HOUR)
+    assert store.get_stats()["blocks_decoded"] == decoded  # Rollups need no raw blocks
+    store.close()
+
+
+def test_rollups_survive_reopen_and_crash(tmp_path, now):
+    """Test the persisted log and the rebuild of open buckets from raw blocks."""
+    directory = str(tmp_path)
+    store = TimeSeriesStore(directory, block_size=100)
+    _fill(store, now, 1000)
+    store.close()
+
+    reopened = TimeSeriesStore(directory, block_size=100)
+    hourly, = reopened.aggregate("cpu_percent", HOUR, now, now + HOUR)
+    assert hourly.values("count") == [1000]
+
+    # Crash: flushed raw blocks and closed buckets reach disk, the open
+    # day and hour buckets do not
+    _fill(reopened, now + 1000, 500)
+    reopened.flush()
+    recovered = TimeSeriesStore(directory, block_size=100)
+    assert recovered.aggregate("cpu_percent", DAY, now, now + DAY)[0].values("count") == [1500]
+    assert recovered.aggregate("cpu_percent", 60, now, now + DAY)[0].values("count")[-1] == 1500 - 24 * 60
+    reopened.close()
+    recovered.close()
+
+
+def test_retention(tmp_path, now):
+    """Test segment deletion and rollup pruning."""
+    store = TimeSeriesStore(str(tmp_path), block_size=100, segment_max_bytes=100, raw_retention=DAY)
+    _fill(store, now - 3 * DAY, 600)
+    _fill(store, now, 600)
+    store.flush()
+    segments = len([name for name in os.listdir(str(tmp_path)) if name.endswith(".tsb")])
+
+    dropped = store.apply_retention(now=now + 60)
+    assert dropped["segments"] == dropped["blocks"] == 6
+    assert len([name for name in os.listdir(str(tmp_path)) if name.endswith(".tsb")]) == segments - 6
+    result, = store.query("cpu_percent")
+    assert result.timestamps[0] == now * 1000
+    # 1m buckets older than a day are gone; the hourly rollup keeps them
+    assert dropped["rollup_buckets"] == 10
+    assert store.aggregate("cpu_percent", HOUR, now - 3 * DAY, now + 600, now=now + 60)[0].values("count") == [600, 600]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_services_read_rollups(tmp_path, now, monkeypatch):
+    """Test aggregate_metrics, live history and trends over the store."""
+    from app.api.metrics import get_metrics_trends
+    from app.core.metrics_collector import MetricsCollector
+    from app.models.metrics import MetricType, TimeRange
+    from app.services.live_system_metrics import LiveSystemMetricsService
+    from app.services.metrics_service import MetricsService
+
+    store = TimeSeriesStore(str(tmp_path))
+    monkeypatch.setattr(store_module, "_timeseries_store", store)
+
+    _fill(store, now, HOUR, tags={"component": "cpu"})
+    _fill(store, now, HOUR, tags={"component": "cpu", "host": "b"})
+    aggregated = await MetricsService.aggregate_metrics("cpu_percent", "p99", "30m", now, now + HOUR - 1)
+    assert [(item["count"], item["value"]) for item in aggregated] == [(3600, pytest.approx(99, rel=0.02))] * 2
+
+    recent = int(time.time()) - 300
+    for i in range(300):
+        store.append("cpu_percent", 10 + i % 3, recent + i, tags={"live": "true"})
+        store.append("memory_percent", 40.0, recent + i, tags={"live": "true"})
+    live = LiveSystemMetricsService.__new__(LiveSystemMetricsService)
+    history = await live.get_metrics_history(hours=1)
+    statistics = await live.get_metrics_history_statistics(hours=1)
+    assert 5 <= len(history) <= 6
+    assert history[-1]["memory_usage"] == 40.0 and history[-1]["disk_usage"] is None
+    assert statistics["cpu_usage"] == {"min": 10, "max": 12, "avg": 11.0, "std": pytest.approx(0.82, abs=0.01)}
+
+    collector = MetricsCollector()
+    for size in (2000, 4000):
+        collector.collect_compression_metrics(10000, size, 0.01, algorithm="gzip", memory_usage=1, cpu_usage=1.0)
+    trends = await get_metrics_trends(MetricType.COMPRESSION_RATIO, TimeRange.HOUR, "gzip", collector)
+    assert sum(point["count"] for point in trends["trends"]) == 2
+    assert trends["statistics"]["average_value"] == 3.75
+    assert trends["statistics"]["peak_value"] == 5.0
+    store.close()
@@ -0,0 +1,302 @@
+"""
+Tests for the compressed time-series store.
+
+Tests cover:
+- Gorilla block round trips and truncation
+- Buffering, flushing and storage size
+- Range scans decoding only overlapping blocks
+- Limited scans decoding only the newest blocks
+- Collision-free series keys
+- Reopening and torn-write recovery
+- Metrics and sensor services reading and writing through the store
+- Sensor and metrics endpoints sharing the store
+"""
+
+import asyncio
+import math
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.core import timeseries_store as store_module
+from app.core.gorilla_codec import decode_block, encode_block
+from app.core.timeseries_store import TimeSeriesStore, from_millis, series_key, to_millis
+
+BASE = 1_700_000_000  # Epoch seconds
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "ts"), block_size=100)
+    yield store
+    store.close()
+
+
+def test_block_roundtrip():
+    """Test exact round trips for irregular timestamps and special floats."""
+    rng = random.Random(7)
+    times = [BASE * 1000]
+    for _ in range(999):
+        times.append(times[-1] + rng.choice([0, 1000, 1000, 1000, 999, 60000, 2 ** 40]))
+    values = [rng.choice([0.0, -0.0, 1.5, math.inf, -math.inf, 1e-300, rng.uniform(-1e6, 1e6)]) for _ in times]
+    values[10] = math.nan
+
+    payload = encode_block(times, values)
+    decoded_times, decoded_values = decode_block(payload, len(times))
+
+    assert decoded_times.tolist() == times
+    assert decoded_values.view(np.uint64).tolist() == np.array(values).view(np.uint64).tolist()
+
+    with pytest.raises(ValueError):
+        decode_block(payload[:len(payload) // 2], len(times))
+    with pytest.raises(ValueError):
+        encode_block([2, 1], [0.0, 0.0])
+
+
+def test_regular_series_compresses(store):
+    """Test that a regular gauge costs a few bytes per sample."""
+    value = 50.0
+    for i in range(1000):
+        value += random.gauss(0, 0.5)
+        store.append("cpu_percent", round(value, 1), BASE + i, tags={"host": "a"})
+        store.append("cpu_count", 8, BASE + i)
+
+    stats = store.get_stats()
+    assert stats["series"] == 2
+    assert stats["stored_samples"] == 2000 and stats["buffered_samples"] == 0
+    # A SystemMetric row with JSON tags is well over 100 bytes
+    assert stats["bytes_per_sample"] < 6
+
+
+def test_range_scan_decodes_only_overlapping_blocks(store):
+    """Test block pruning and inclusion of buffered samples."""
+    for i in range(1050):
+        store.append("load", i, BASE + i)
+
+    result, = store.query("load", BASE + 250, BASE + 349)
+    assert result.values.tolist() == list(range(250, 350))
+    assert result.datetimes()[0] == datetime.fromtimestamp(BASE + 250, tz=timezone.utc)
+    assert store.get_stats()["blocks_decoded"] == 2
+
+    result, = store.query("load", BASE + 1040)
+    assert result.values.tolist() == list(range(1040, 1050))  # Still buffered
+    assert store.get_stats()["blocks_decoded"] == 2
+
+    assert store.query("load", BASE + 5000) == []
+    assert store.query("missing") == []
+
+
+def test_limited_scan_decodes_newest_blocks(store):
+    """Test that a latest-N scan stops once enough newest samples are decoded."""
+    for i in range(1050):
+        store.append("load", i, BASE + i)
+
+    result, = store.query("load", limit=5)
+    assert result.values.tolist() == list(range(1045, 1050))
+    assert store.get_stats()["blocks_decoded"] == 0  # Served from the buffer
+
+    result, = store.query("load", limit=80)
+    assert result.values.tolist() == list(range(970, 1050))
+    assert store.get_stats()["blocks_decoded"] == 1
+
+    result, = store.query("load", end=BASE + 549, limit=150)
+    assert result.values.tolist() == list(range(400, 550))
+    assert store.get_stats()["blocks_decoded"] == 1 + 3  # The partial block is not counted
+
+    # Late samples land in blocks overlapping older ones and are still merged in
+    for i in range(150):
+        store.append("load", -i, BASE + 900 + i + 0.5)
+    store.flush()
+    full, = store.query("load")
+    decoded = store.get_stats()["blocks_decoded"]
+    result, = store.query("load", limit=120)
+    assert result.timestamps.tolist() == full.timestamps[-120:].tolist()
+    assert result.values.tolist() == full.values[-120:].tolist()
+    assert store.get_stats()["blocks_decoded"] - decoded < store.get_stats()["blocks"] / 2
+    store.append("load", 0, BASE + 2000)
+    assert store.query("load", limit=0) == []
+
+
+def test_tags_and_out_of_order_samples(store):
+    """Test subset tag matching and sorting of late samples."""
+    for i in (3, 1, 2):
+        store.append("disk", i, BASE + i, tags={"device": "sda", "mount": "/"})
+    store.append("disk", 9, BASE, tags={"device": "sdb", "mount": "/"})
+    store.flush()
+
+    assert len(store.query("disk", tags={"mount": "/"})) == 2
+    result, = store.query("disk", tags={"device": "sda"})
+    assert result.values.tolist() == [1, 2, 3]
+    assert to_millis(from_millis(result.timestamps[0])) == (BASE + 1) * 1000
+
+
+def test_series_keys_do_not_collide(store):
+    """Test that separators inside names and tags keep series apart."""
+    colliding = [
+        ("m", {"a": "1,b=2"}), ("m", {"a": "1", "b": "2"}),
+        ("m", {"a=1": "x"}), ("m", {"a": "1=x"}),
+        ("m{a=1}", {}), ("m", {"a": "1"}),
+        ("m", {"a": "}"}), ("m", {"a": "\\}"}),
+    ]
+    assert len({series_key(name, tags) for name, tags in colliding}) == len(colliding)
+
+    for i, (name, tags) in enumerate(colliding):
+        store.append(name, i, BASE, tags=tags)
+    assert store.get_stats()["series"] == len(colliding)
+    result, = store.query("m", tags={"a": "1,b=2"})
+    assert result.values.tolist() == [0]
+
+
+def test_flush_due(tmp_path):
+    """Test that idle series are flushed after the interval."""
+    clock = _Clock()
+    store = TimeSeriesStore(str(tmp_path), block_size=100, flush_interval=60, clock=clock)
+    store.append("m", 1.0, BASE)
+    assert store.flush_due() == 0
+
+    clock.now = 61
+    assert store.flush_due() == 1
+    assert store.get_stats()["blocks"] == 1
+    store.close()
+
+
+def test_reopen_and_torn_tail_recovery(tmp_path):
+    """Test index rebuild on open and truncation of a partial record."""
+    directory = str(tmp_path)
+    store = TimeSeriesStore(directory, block_size=10, segment_max_bytes=200)
+    for i in range(95):
+        store.append("m", i * 0.5, BASE + i, tags={"k": "v"})
+    store.close()
+
+    segments = sorted(name for name in os.listdir(directory) if name.endswith(".tsb"))
+    assert len(segments) > 1
+    last = os.path.join(directory, segments[-1])
+    size = os.path.getsize(last)
+    with open(last, "ab") as f:
+        f.write(b"\x01\x00\x00\x00partial")
+    with open(os.path.join(directory, "series.jsonl"), "a") as f:
+        f.write('{"id": 2, "na')
+
+    store = TimeSeriesStore(directory, block_size=10)
+    assert os.path.getsize(last) == size
+    result, = store.query("m", tags={"k": "v"})
+    assert result.values.tolist() == [i * 0.5 for i in range(95)]
+
+    store.append("n", 1.0, BASE)
+    store.close()
+    assert TimeSeriesStore(directory).series() == [("m", {"k": "v"}), ("n", {})]
+
+
+@pytest.mark.asyncio
+async def test_services_use_store(tmp_path, monkeypatch):
+    """Test that metrics and sensor readings round-trip through the store."""
+    from app.services.metrics_service import MetricsService
+    from app.services.sensor_service import SensorService
+
+    store = TimeSeriesStore(str(tmp_path), block_size=100)
+    monkeypatch.setattr(store_module, "_timeseries_store", store)
+
+    collected = await MetricsService.collect_system_metrics()
+    assert {"cpu_percent", "memory_percent", "process_count"} <= {metric.name for metric in collected}
+
+    metrics = await MetricsService.get_metrics("cpu_percent")
+    assert len(metrics) == 1 and metrics[0].tags["component"] == "cpu"
+
+    now = datetime.utcnow()
+    for i in range(5):
+        reading = await SensorService.save_sensor_reading({
+            "sensor_id": 3, "timestamp": now + timedelta(seconds=i), "value": float(i),
+            "unit": "C", "confidence": 0.9, "quality": "good"
+        })
+        assert reading.value == float(i)
+
+    readings = await SensorService.get_sensor_readings(sensor_id=3, limit=2)
+    assert [reading.value for reading in readings] == [4.0, 3.0]
+    assert readings[0].confidence == 0.9 and readings[0].unit == "C"
+    assert await SensorService.get_sensor_readings(sensor_id=4) == []
+    store.close()
+
+
+def test_sensor_api_paths_share_the_store(tmp_path, monkeypatch):
+    """Test that every sensors endpoint reads what the others wrote."""
+    from fastapi.testclient import TestClient
+
+    from app.database.connection import get_db_session
+    from app.main import app
+    from app.models.sensor import Sensor
+    from app.services.metrics_service import MetricsService
+
+    store = TimeSeriesStore(str(tmp_path), block_size=100)
+    monkeypatch.setattr(store_module, "_timeseries_store", store)
+
+    class Result:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def scalar_one_or_none(self):
+            return self.rows[0] if self.rows else None
+
+        def scalars(self):
+            return self
+
+        def all(self):
+            return self.rows
+
+    class Session:
+        async def execute(self, query):
+            # Only the sensors table stays in the database
+            if [table.name for table in query.get_final_froms()] == ["sensors"]:
+                return Result([Sensor(id=7, name="probe", type="temperature", status="active",
+                                      created_at=datetime.utcnow(), updated_at=datetime.utcnow())])
+            return Result([])
+
+    async def session():
+        yield Session()
+
+    app.dependency_overrides[get_db_session] = session
+    try:
+        client = TestClient(app)
+        now = datetime.utcnow()
+        for i in range(3):
+            response = client.post("/api/v1/sensors/sensors/7/readings", json={
+                "sensor_id": 7, "value": 20.0 + i, "unit": "C", "timestamp": (now + timedelta(seconds=i)).isoformat()
+            })
+            assert response.status_code == 200
+        client.post("/api/v1/sensors/metrics", json={"name": "fan_rpm", "value": 900, "type": "counter",
+                                                     "tags": {"fan": "1"}})
+
+        # Readings posted per sensor show up in the bulk query and the list
+        queried = client.post("/api/v1/sensors/query", json={"sensor_ids": [7], "metric_names": ["fan_rpm"]}).json()
+        assert [reading["value"] for reading in queried["sensor_readings"]] == [22.0, 21.0, 20.0]
+        assert queried["metrics"][0]["value"] == 900 and queried["metrics"][0]["type"] == "counter"
+        listed = client.get("/api/v1/sensors/sensors/7/readings", params={"skip": 1, "limit": 1}).json()
+        assert [reading["value"] for reading in listed] == [21.0]
+
+        # Collected metrics show up in the metrics endpoints, sensor readings do not
+        asyncio.run(MetricsService.collect_system_metrics())
+        metrics = client.get("/api/v1/sensors/metrics", params={"limit": 1000}).json()
+        names = {metric["name"] for metric in metrics}
+        assert {"cpu_percent", "fan_rpm"} <= names and not any(name.startswith("sensor.") for name in names)
+        counters = client.get("/api/v1/sensors/metrics", params={"type": "counter"}).json()
+        assert [metric["name"] for metric in counters] == ["fan_rpm"] and counters[0]["tags"] == {"fan": "1"}
+        latest = client.get(f"/api/v1/sensors/metrics/{counters[0]['id']}").json()
+        assert latest["name"] == "fan_rpm"
+        assert client.get("/api/v1/sensors/metrics/9999").status_code == 404
+        history = client.get("/api/v1/sensors/metrics/names/cpu_percent/history").json()
+        assert len(history) == 1
+
+        assert client.get("/api/v1/sensors/sensors/7").json()["readings_count"] == 3
+    finally:
+        app.dependency_overrides.clear()
+        store.close()
@@ -0,0 +1,164 @@
+"""
+Tests for the time-series tag index.
+
+Tests cover:
+- Posting-set intersection, list (IN) filters and missing tags
+- Only matching series being scanned
+- Limits applied after tag filtering
+- Name lists and series ids resolved through the index in one query
+- Compression metric aggregation and comparison by algorithm and content type
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import timeseries_store as store_module
+from app.core.timeseries_store import TimeSeriesStore
+
+BASE = 1_700_000_000  # Epoch seconds
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = TimeSeriesStore(str(tmp_path), block_size=100)
+    monkeypatch.setattr(store_module, "_timeseries_store", store)
+    yield store
+    store.close()
+
+
+def _scanned(store):
+    return store.get_stats()["series_scanned"]
+
+
+def test_index_selects_matching_series(store):
+    """Test intersections, IN filters and that other series are never visited."""
+    for host in range(50):
+        for core in range(4):
+            store.append("cpu", host + core, BASE, tags={"host": f"h{host}", "core": core})
+        store.append("mem", host, BASE, tags={"host": f"h{host}"})
+
+    before = _scanned(store)
+    result, = store.query("cpu", tags={"host": "h7", "core": 2})
+    assert result.values.tolist() == [9]
+    assert _scanned(store) - before == 1
+
+    before = _scanned(store)
+    results = store.query("cpu", tags={"host": ["h1", "h2", "h404"], "core": 0})
+    assert sorted(data.tags["host"] for data in results) == ["h1", "h2"]
+    assert _scanned(store) - before == 2
+
+    # Any metric carrying the tag
+    assert sorted(data.name for data in store.query(None, tags={"host": "h3"})) == ["cpu"] * 4 + ["mem"]
+
+    before = _scanned(store)
+    assert store.query("cpu", tags={"rack": "r1"}) == []
+    assert store.query("disk", tags={"host": "h1"}) == []
+    assert _scanned(store) == before
+
+    assert store.tag_values("core", "cpu", tags={"host": "h0"}) == ["0", "1", "2", "3"]
+    assert store.series("mem", tags={"host": "h9"}) == [("mem", {"host": "h9"})]
+
+
+def test_index_rebuilt_on_open(tmp_path):
+    """Test that the registry restores the postings."""
+    store = TimeSeriesStore(str(tmp_path))
+    store.append("m", 1.0, BASE, tags={"a": "x", "b": "y"})
+    store.append("m", 2.0, BASE, tags={"a": "x"})
+    store.close()
+
+    reopened = TimeSeriesStore(str(tmp_path))
+    assert reopened.series("m", tags={"a": "x", "b": "y"}) == [("m", {"a": "x", "b": "y"})]
+    assert len(reopened.series(tags={"a": "x"})) == 2
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_limit_counts_matching_samples(store):
+    """Test that newer samples of other series do not crowd out the filtered ones."""
+    from app.services.metrics_service import MetricsService
+    from app.services.sensor_service import SensorService
+
+    for i in range(200):
+        store.append("cpu_percent", 90.0, BASE + 100 + i, tags={"component": "cpu", "host": "busy"})
+    for i in range(20):
+        store.append("cpu_percent", 5.0, BASE + i, tags={"component": "cpu", "host": "idle"})
+
+    metrics = await MetricsService.get_metrics("cpu_percent", tags={"host": "idle"}, limit=10)
+    assert len(metrics) == 10 and {metric.value for metric in metrics} == {5.0}
+    assert metrics[0].timestamp > metrics[-1].timestamp
+
+    start = datetime.utcnow()
+    for sensor_id in (1, 2, 3):
+        for i in range(3):
+            await SensorService.save_sensor_reading({
+                "sensor_id": sensor_id, "timestamp": start + timedelta(seconds=i), "value": float(sensor_id)
+            })
+    readings = await SensorService.get_sensor_readings(sensor_ids=[1, 3], limit=4)
+    assert len(readings) == 4 and {reading.sensor_id for reading in readings} == {1, 3}
+
+
+@pytest.mark.asyncio
+async def test_metrics_served_by_one_indexed_query(store, monkeypatch):
+    """Test that name lists and series ids select series without decoding others."""
+    from app.services.metrics_service import MetricsService
+
+    for i in range(300):
+        store.append("cpu", i, BASE + i, tags={"host": "a"})
+        store.append("cpu", -i, BASE + i, tags={"host": "b"})
+        store.append("mem", i, BASE + i, tags={"host": "a"})
+        store.append("sensor.value", i, BASE + i, tags={"sensor_id": "1"})
+    store.flush()
+
+    before = _scanned(store)
+    assert sorted(data.name for data in store.query(["cpu", "disk"], tags={"host": "a"})) == ["cpu"]
+    assert _scanned(store) - before == 1
+
+    target, = store.query("cpu", tags={"host": "b"})
+    queries = []
+    query = store.query
+    monkeypatch.setattr(store, "query", lambda *args, **kwargs: queries.append(args) or query(*args, **kwargs))
+    before = store.get_stats()["blocks_decoded"]
+    metrics = await MetricsService.get_metrics(series_id=target.series_id, limit=None)
+    assert len(queries) == 1
+    assert len(metrics) == 300 and {metric.id for metric in metrics} == {target.series_id}
+    # Only the blocks of the selected series are decoded
+    assert store.get_stats()["blocks_decoded"] - before == 3
+
+    metrics = await MetricsService.get_metrics(limit=None)
+    assert len(queries) == 2
+    assert {metric.name for metric in metrics} == {"cpu", "mem"}
+
+
+@pytest.mark.asyncio
+async def test_aggregate_and_compare_by_tags(store):
+    """Test collector aggregation and the compare endpoint over tagged series."""
+    from app.api.metrics import compare_metrics
+    from app.core.metrics_collector import MetricsCollector
+    from app.models.metrics import MetricType, TimeRange
+
+    collector = MetricsCollector()
+    for algorithm, content_type, size in (("gzip", "text", 5000), ("gzip", "binary", 8000),
+                                          ("lzma", "text", 2500), ("zstd", "text", 4000)):
+        collector.collect_compression_metrics(10000, size, 0.01, algorithm=algorithm, memory_usage=1,
+                                              cpu_usage=1.0, content_type=content_type)
+
+    start, end = datetime.utcnow() - timedelta(hours=1), datetime.utcnow() + timedelta(minutes=1)
+    gzip_text = collector.aggregate_metrics(MetricType.COMPRESSION_RATIO, TimeRange.HOUR, start, end,
+                                            algorithm_filter="gzip", content_type_filter="text")
+    assert gzip_text.count == 1 and gzip_text.mean_value == 2.0
+    assert gzip_text.algorithm_filter == "gzip" and gzip_text.content_type_filter == "text"
+
+    text = collector.aggregate_metrics(MetricType.COMPRESSION_RATIO, TimeRange.HOUR, start, end,
+                                       algorithm_filter=["gzip", "lzma"], content_type_filter="text")
+    assert text.count == 2 and text.max_value == 4.0
+    assert text.algorithm_filter == "gzip,lzma"
+
+    missing = collector.aggregate_metrics(MetricType.COMPRESSION_RATIO, TimeRange.HOUR, start, end,
+                                          algorithm_filter="brotli")
+    assert missing.count == 0 and missing.algorithm_filter == "brotli"
+
+    comparison = await compare_metrics("algorithm", "gzip", ["lzma", "zstd"], MetricType.COMPRESSION_RATIO,
+                                       TimeRange.DAY, collector)
+    assert comparison.best_performer == "lzma"
+    assert comparison.relative_performance["zstd"] == pytest.approx(2.5 / 1.625)
@@ -0,0 +1,153 @@
+"""
+Tests for the streaming upload ingest path.
+
+Tests cover:
+- Raw and seekable-container ingest with incremental hashing and profiling
+- Bounded read-ahead while the executor is busy
+- Size limit enforcement and partial file cleanup
+- The file upload endpoint storing a plain gzip container
+"""
+
+import asyncio
+import hashlib
+import io
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.algorithms.gzip.versions.v1_basic import GzipBasic
+from app.algorithms.gzip.versions.v6_stream import GzipStream
+from app.core.distributed_streaming import SeekableContainerReader
+from app.core.streaming_analysis import StreamingContentAnalyzer
+from app.core.upload_ingest import StreamingUploadIngestor, UploadTooLargeError, ingest_upload
+
+
+KB = 1024
+
+DATA = b"".join(b"%06d level=info msg=stored object key=media/%d\n" % (i, i % 97) for i in range(20000))
+
+
+class _Upload:
+    """Minimal stand-in for UploadFile that records the read sizes."""
+
+    def __init__(self, data: bytes):
+        self.stream = io.BytesIO(data)
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return self.stream.read(size)
+
+
+@pytest.mark.asyncio
+async def test_raw_ingest_hashes_and_profiles_blocks(tmp_path):
+    """Test that the stored file, hash and profile match the whole upload."""
+    upload = _Upload(DATA)
+
+    result = await ingest_upload(upload, tmp_path / "upload.bin", block_size=64 * KB)
+
+    assert (tmp_path / "upload.bin").read_bytes() == DATA
+    assert result.size == result.stored_size == len(DATA)
+    assert result.sha256 == hashlib.sha256(DATA).hexdigest()
+    assert result.block_count == -(-len(DATA) // (64 * KB))
+    assert set(upload.reads) == {64 * KB}
+    assert result.profile["entropy"] == pytest.approx(
+        StreamingContentAnalyzer().update(DATA).finalize()["entropy"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_compressed_ingest_writes_seekable_container(tmp_path):
+    """Test that compressed uploads can be range-read back."""
+    path = tmp_path / "upload.dcsk"
+
+    result = await ingest_upload(_Upload(DATA), path, algorithm=GzipBasic(), block_size=32 * KB, analyze=False)
+
+    assert result.compressed and result.stored_size < len(DATA)
+    assert result.profile == {}
+    with open(path, "rb") as stream:
+        reader = SeekableContainerReader(stream, GzipBasic())
+        assert reader.size == len(DATA)
+        assert reader.read_range(100 * KB, 5000) == DATA[100 * KB:100 * KB + 5000]
+
+
+@pytest.mark.asyncio
+async def test_async_chunks_are_reblocked(tmp_path):
+    """Test that arbitrary chunk sizes are regrouped into full blocks."""
+    async def chunks():
+        for start in range(0, len(DATA), 10_000):
+            yield DATA[start:start + 10_000]
+
+    result = await ingest_upload(chunks(), tmp_path / "upload.bin", block_size=64 * KB, analyze=False)
+
+    assert (tmp_path / "upload.bin").read_bytes() == DATA
+    assert result.block_count == -(-len(DATA) // (64 * KB))
+
+
+@pytest.mark.asyncio
+async def test_read_ahead_is_bounded_by_window(tmp_path):
+    """Test that a stalled executor stops the upload from being read further."""
+    release = threading.Event()
+    ingestor = StreamingUploadIngestor(tmp_path / "upload.bin", block_size=16 * KB, window_size=64 * KB)
+    process = ingestor._process_block
+
+    def slow_process(block):
+        release.wait()
+        process(block)
+
+    ingestor._process_block = slow_process
+    upload = _Upload(DATA)
+    task = asyncio.create_task(ingestor.ingest(upload))
+    await asyncio.sleep(0.2)
+
+    # One block in the codec, the rest of the window queued, one read waiting
+    assert len(upload.reads) * 16 * KB <= 64 * KB + 16 * KB
+    release.set()
+    result = await task
+    assert result.size == len(DATA)
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_is_rejected_and_removed(tmp_path):
+    """Test the size limit and cleanup of the partial file."""
+    path = tmp_path / "upload.bin"
+
+    with pytest.raises(UploadTooLargeError):
+        await ingest_upload(_Upload(DATA), path, block_size=16 * KB, max_size=100 * KB)
+
+    assert not path.exists()
+
+
+def test_upload_endpoint_streams_to_disk(tmp_path, monkeypatch):
+    """Test that the upload endpoint reports the streamed size and hash."""
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("events.log", io.BytesIO(DATA), "text/plain")},
+        data={"compress": "true"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == len(DATA)
+    assert body["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert body["compressed"] and body["stored_size"] < len(DATA)
+    stored, = tmp_path.iterdir()
+    assert stored.suffix == ".dcsk"
+    with open(stored, "rb") as stream:
+        reader = SeekableContainerReader(stream, GzipStream())
+        assert reader.header.codec == "GzipStream"
+        assert reader.read_range(0, len(DATA)) == DATA
+
+
+def test_stream_codec_matches_basic_output():
+    """Test that the stream codec writes gzip that GzipBasic reads and vice versa."""
+    compressed, metadata = GzipStream(6).compress(DATA)
+    assert GzipBasic().decompress(compressed) == DATA
+    assert GzipStream().decompress(GzipBasic(6).compress(DATA)[0]) == DATA
+    assert metadata.compression_ratio == len(DATA) / len(compressed)
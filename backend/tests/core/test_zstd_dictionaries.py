@@ -0,0 +1,139 @@
+"""
+Tests for the Zstandard dictionary registry.
+
+Tests cover:
+- Content category detection
+- Bounded reservoir sampling
+- Classifying payloads only when sampled or a dictionary is active
+- Training, on-disk versioning and reloading
+- Frames written with older versions still decompressing
+- Automatic dictionary use in the compression engine
+"""
+
+import json
+import random
+
+import pytest
+import zstandard as zstd
+
+from app.core import compression_engine as engine_module
+from app.core import zstd_dictionaries as dictionaries_module
+from app.core.compression_engine import CompressionEngine
+from app.core.zstd_dictionaries import ZstdDictionaryRegistry, content_category
+
+
+def _records(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        json.dumps({
+            "id": i,
+            "user": f"user-{rng.randint(0, 999)}",
+            "event": rng.choice(["login", "logout", "page_view", "purchase"]),
+            "path": rng.choice(["/", "/compression", "/files/upload", "/metrics"]),
+            "duration_ms": rng.randint(1, 900),
+        }).encode()
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ZstdDictionaryRegistry(tmp_path / "dictionaries", max_samples=300, min_samples=50)
+
+
+def test_content_categories():
+    """Test that categories are the content profile structure classes."""
+    assert content_category(b'{"a": 1}') == "json"
+    assert content_category(b"plain log line without structure") == "text"
+    assert content_category(b"<event id='1'/>") == "markup"
+    assert content_category(bytes(range(256))) is None
+
+
+def test_sampling_is_bounded(registry):
+    """Test that reservoir sampling keeps at most max_samples per category."""
+    for record in _records(1000):
+        registry.observe(record)
+    registry.observe(b"x" * (registry.max_payload_size + 1))
+
+    stats = registry.get_stats()["json"]
+    assert stats["samples"] == 300
+    assert stats["payloads_seen"] == 1000
+
+
+def test_select_classifies_only_when_needed(registry, monkeypatch):
+    """Test that select skips classification without sampling or dictionaries."""
+    calls = []
+    monkeypatch.setattr(dictionaries_module, "content_category",
+                        lambda data: calls.append(data) or content_category(data))
+    records = _records(200)
+
+    registry.sample_rate = 0.0
+    assert all(registry.select(record) == 0 for record in records)
+    assert calls == [] and registry.get_stats() == {}
+
+    registry.sample_rate = 1.0
+    for record in records:
+        registry.select(record)
+    assert len(calls) == 200 and registry.sample_count("json") == 200
+
+    registry.sample_rate = 0.0
+    version = registry.train("json")
+    assert registry.select(records[0]) == version.dict_id
+    assert registry.select(bytes(range(256))) == 0
+    assert len(calls) == 202 and registry.sample_count("json") == 200
+
+
+def test_train_improves_ratio_and_persists(registry, tmp_path):
+    """Test training from samples, the ratio gain and reloading from disk."""
+    records = _records(2000)
+    for record in records[:1000]:
+        registry.observe(record)
+
+    version = registry.train("json", dict_size=16 * 1024)
+    dictionary = registry.compression_dict(version.dict_id, 3)
+
+    plain = sum(len(zstd.ZstdCompressor(level=3).compress(r)) for r in records[1000:])
+    with_dict = sum(len(zstd.ZstdCompressor(level=3, dict_data=dictionary).compress(r)) for r in records[1000:])
+    assert with_dict < plain * 0.6
+
+    reloaded = ZstdDictionaryRegistry(tmp_path / "dictionaries")
+    assert reloaded.select(records[0]) == version.dict_id
+
+
+def test_older_versions_still_decompress(registry):
+    """Test versioning, rollback and decoding frames by their dictionary id."""
+    first = registry.train("json", _records(500, seed=1), dict_size=8 * 1024)
+    frame = zstd.ZstdCompressor(dict_data=registry.compression_dict(first.dict_id, 3)).compress(_records(1)[0])
+    second = registry.train("json", _records(500, seed=2), dict_size=8 * 1024)
+
+    assert second.version == first.version + 1
+    assert registry.select(_records(1)[0]) == second.dict_id
+    restored = zstd.ZstdDecompressor(dict_data=registry.dictionary_for_frame(frame)).decompress(frame)
+    assert restored == _records(1)[0]
+
+    registry.activate("json", first.version)
+    assert registry.select(_records(1)[0]) == first.dict_id
+
+
+def test_train_requires_enough_samples(registry):
+    """Test that training refuses tiny corpora."""
+    with pytest.raises(ValueError, match="at least 50 samples"):
+        registry.train("json", _records(10))
+
+
+@pytest.mark.asyncio
+async def test_engine_uses_trained_dictionary(registry, monkeypatch):
+    """Test that the engine picks up the category dictionary automatically."""
+    monkeypatch.setattr(engine_module, "get_dictionary_registry", lambda: registry)
+    engine = CompressionEngine()
+    records = _records(600)
+    record = records[-1]
+
+    before = await engine.compress(record, algorithm="zstd", level=3, use_cache=False)
+    version = registry.train("json", records[:500], dict_size=16 * 1024)
+    after = await engine.compress(record, algorithm="zstd", level=3, use_cache=False)
+
+    assert zstd.get_frame_parameters(after.compressed_data).dict_id == version.dict_id
+    assert after.compressed_size < before.compressed_size
+    assert await engine.decompress(after.compressed_data, "zstd") == record
+    assert await engine.decompress(before.compressed_data, "zstd") == record